@@ -0,0 +1,390 @@
+"""
+Activity Rollup Service - Daily pre-aggregated activity metrics for SkyModderAI.
+
+Folds raw ``user_activity`` rows into ``activity_daily_rollups`` (one row per
+day / event type / game / feature) so reports read a handful of small rows
+instead of scanning every event for the week.
+
+Provides:
+- HyperLogLog sketch for mergeable unique-user estimates
+- Incremental refresh job (watermarked by the last folded activity id; each
+  batch claims its id range with a compare-and-swap on the watermark, so
+  overlapping runs never fold the same rows twice)
+- Period queries: event counts by type/game/feature and unique users
+
+Usage:
+    from activity_rollup import refresh_activity_rollups, get_rollup_metrics
+
+    refresh_activity_rollups()  # scheduled hourly (scheduler.py)
+    metrics = get_rollup_metrics(start_date, end_date)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from models import ActivityDailyRollup, RollupWatermark, UserActivity, create_database_engine
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_ROLLUP_WATERMARK = "activity_daily"
+DEFAULT_BATCH_SIZE = 5000
+
+# event_data keys that identify the product feature behind an event
+_FEATURE_KEYS = ("feature", "source")
+
+_session_factory = None
+
+
+def _database_url() -> str:
+    """Same resolution as migrations/env.py: DATABASE_URL, else the dev SQLite file."""
+    from config import config
+
+    url = config.DATABASE_URL
+    if not url:
+        return "sqlite:///users.db"
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def _open_session():
+    """
+    Open a SQLAlchemy session on the app database.
+
+    Rollups run from the scheduler and reports, outside any Flask request,
+    so they can't use the per-request sqlite3 connection from db.get_db().
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(bind=create_database_engine(_database_url()))
+    return _session_factory()
+
+
+# =============================================================================
+# HyperLogLog
+# =============================================================================
+
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality sketch.
+
+    2^precision one-byte registers (4 KB at the default precision of 12,
+    ~1.6% standard error). Sketches with the same precision merge losslessly,
+    so daily sketches can be combined into a weekly unique-user estimate.
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is not None and len(registers) != self.m:
+            raise ValueError(f"expected {self.m} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> HyperLogLog:
+        """Rebuild a sketch from stored registers (empty sketch for None)."""
+        if not data:
+            return cls()
+        return cls(precision=int(math.log2(len(data))), registers=bytes(data))
+
+    def to_bytes(self) -> bytes:
+        """Serialize registers for storage."""
+        return bytes(self.registers)
+
+    def add(self, value: str) -> None:
+        """Add a value to the sketch."""
+        x = int.from_bytes(hashlib.sha1(value.encode("utf-8")).digest()[:8], "big")
+        idx = x >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        w = x & ((1 << rest_bits) - 1)
+        rank = rest_bits - w.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other: HyperLogLog) -> None:
+        """Merge another sketch into this one (register-wise max)."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+# =============================================================================
+# Rollup Refresh
+# =============================================================================
+
+
+def _parse_event_data(raw: Optional[str]) -> dict[str, Any]:
+    """Parse event_data JSON, tolerating legacy str(dict) payloads."""
+    if not raw or not raw.lstrip().startswith("{"):
+        return {}
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _rollup_key(
+    event_type: Optional[str], event_data: Optional[str], created_at: Any
+) -> tuple[str, str, str, str]:
+    """Return the (day, event_type, game, feature) bucket for an activity row."""
+    if isinstance(created_at, str):
+        day = created_at[:10]
+    elif isinstance(created_at, (datetime, date)):
+        day = created_at.strftime("%Y-%m-%d")
+    else:
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    data = _parse_event_data(event_data)
+    game = str(data.get("game") or "")[:50]
+    feature = ""
+    for key in _FEATURE_KEYS:
+        if data.get(key):
+            feature = str(data[key])[:100]
+            break
+
+    return day, (event_type or "unknown")[:100], game, feature
+
+
+def _apply_buckets(session, buckets: dict[tuple[str, str, str, str], list]) -> None:
+    """Merge in-memory buckets into the rollup table."""
+    days = {key[0] for key in buckets}
+    existing = {
+        (row.day, row.event_type, row.game, row.feature): row
+        for row in session.query(ActivityDailyRollup).filter(ActivityDailyRollup.day.in_(days))
+    }
+
+    for key, (count, sketch) in buckets.items():
+        row = existing.get(key)
+        if row is None:
+            day, event_type, game, feature = key
+            session.add(
+                ActivityDailyRollup(
+                    day=day,
+                    event_type=event_type,
+                    game=game,
+                    feature=feature,
+                    event_count=count,
+                    user_sketch=sketch.to_bytes(),
+                )
+            )
+            continue
+
+        merged = HyperLogLog.from_bytes(row.user_sketch)
+        merged.merge(sketch)
+        row.event_count = (row.event_count or 0) + count
+        row.user_sketch = merged.to_bytes()
+
+
+def refresh_activity_rollups(session=None, batch_size: int = DEFAULT_BATCH_SIZE) -> dict[str, Any]:
+    """
+    Fold activity rows added since the last run into the daily rollups.
+
+    Rows are read in id order in batches of ``batch_size``; each batch is
+    merged and committed together with the watermark, so an interrupted
+    refresh resumes where it stopped and never double-counts.
+
+    The watermark is advanced with ``UPDATE ... WHERE last_id = <read value>``
+    before the batch is merged. If another refresh (e.g. the one at the start
+    of the weekly report) got there first, no row matches, the batch is rolled
+    back and this run stops.
+
+    Returns:
+        {"processed": int, "buckets": int, "last_id": int}
+    """
+    stats = {"processed": 0, "buckets": 0, "last_id": 0}
+    owns_session = session is None
+    last_id = 0
+
+    try:
+        if owns_session:
+            session = _open_session()
+
+        watermark = session.get(RollupWatermark, ACTIVITY_ROLLUP_WATERMARK)
+        if watermark is None:
+            session.add(RollupWatermark(name=ACTIVITY_ROLLUP_WATERMARK, last_id=0))
+            session.commit()
+        else:
+            last_id = watermark.last_id or 0
+
+        while True:
+            rows = (
+                session.query(
+                    UserActivity.id,
+                    UserActivity.event_type,
+                    UserActivity.event_data,
+                    UserActivity.user_email,
+                    UserActivity.created_at,
+                )
+                .filter(UserActivity.id > last_id)
+                .order_by(UserActivity.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            new_last_id = rows[-1].id
+            claimed = session.execute(
+                update(RollupWatermark)
+                .where(
+                    RollupWatermark.name == ACTIVITY_ROLLUP_WATERMARK,
+                    RollupWatermark.last_id == last_id,
+                )
+                .values(last_id=new_last_id, updated_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed != 1:
+                session.rollback()
+                logger.info(f"Activity rollup: ids after {last_id} claimed by another run")
+                break
+
+            buckets: dict[tuple[str, str, str, str], list] = {}
+            for row in rows:
+                key = _rollup_key(row.event_type, row.event_data, row.created_at)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = [0, HyperLogLog()]
+                bucket[0] += 1
+                if row.user_email:
+                    bucket[1].add(row.user_email.lower())
+
+            _apply_buckets(session, buckets)
+            session.commit()
+            last_id = new_last_id
+
+            stats["processed"] += len(rows)
+            stats["buckets"] += len(buckets)
+            if len(rows) < batch_size:
+                break
+
+        stats["last_id"] = last_id
+        logger.info(
+            f"Activity rollup refreshed: {stats['processed']} events into "
+            f"{stats['buckets']} buckets (watermark {last_id})"
+        )
+
+    except Exception as e:
+        if session is not None:
+            session.rollback()
+        logger.exception(f"Activity rollup refresh failed: {e}")
+
+    finally:
+        if owns_session and session is not None:
+            session.close()
+
+    return stats
+
+
+# =============================================================================
+# Period Queries
+# =============================================================================
+
+
+def _day_range(start_date: datetime, end_date: datetime) -> list[str]:
+    """
+    Days from start_date's day up to, but not including, end_date's day.
+
+    A 7-day period (``now - 7 days`` to ``now``) is 7 days, like the old
+    timestamp query; the partial current day is left out.
+    """
+    days = []
+    current = start_date.date()
+    last = end_date.date()
+    while current < last:
+        days.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return days
+
+
+def get_rollup_rows(
+    start_date: datetime,
+    end_date: datetime,
+    event_types: Optional[Iterable[str]] = None,
+    session=None,
+) -> list[ActivityDailyRollup]:
+    """Return rollup rows for the days in the period (day granularity)."""
+    owns_session = session is None
+    if owns_session:
+        session = _open_session()
+    try:
+        query = session.query(ActivityDailyRollup).filter(
+            ActivityDailyRollup.day.in_(_day_range(start_date, end_date))
+        )
+        if event_types is not None:
+            query = query.filter(ActivityDailyRollup.event_type.in_(list(event_types)))
+        rows = query.all()
+        if owns_session:
+            session.expunge_all()
+        return rows
+    finally:
+        if owns_session:
+            session.close()
+
+
+def get_event_count(event_type: str, start_date: datetime, end_date: datetime, session=None) -> int:
+    """Count events of one type in the period from the rollups."""
+    rows = get_rollup_rows(start_date, end_date, event_types=[event_type], session=session)
+    return sum(row.event_count or 0 for row in rows)
+
+
+def get_rollup_metrics(start_date: datetime, end_date: datetime, session=None) -> dict[str, Any]:
+    """
+    Aggregate rollups for the period.
+
+    Returns:
+        {
+            "total_events": int,
+            "by_type": {...},
+            "by_game": {...},
+            "by_feature": {...},
+            "unique_users": int  # HyperLogLog estimate
+        }
+    """
+    rows = get_rollup_rows(start_date, end_date, session=session)
+
+    metrics: dict[str, Any] = {
+        "total_events": 0,
+        "by_type": {},
+        "by_game": {},
+        "by_feature": {},
+        "unique_users": 0,
+    }
+    users = HyperLogLog()
+
+    for row in rows:
+        count = row.event_count or 0
+        metrics["total_events"] += count
+        metrics["by_type"][row.event_type] = metrics["by_type"].get(row.event_type, 0) + count
+        if row.game:
+            metrics["by_game"][row.game] = metrics["by_game"].get(row.game, 0) + count
+        if row.feature:
+            metrics["by_feature"][row.feature] = metrics["by_feature"].get(row.feature, 0) + count
+        if row.user_sketch:
+            users.merge(HyperLogLog.from_bytes(row.user_sketch))
+
+    metrics["unique_users"] = users.count()
+    return metrics
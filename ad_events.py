@@ -0,0 +1,197 @@
+"""
+Ad Events — buffered impression/click accounting for sponsors and shopping ads.
+
+Every page that shows sponsors or shopping ads records impressions, and
+every click used to run a duplicate-window SELECT, an audit INSERT and a
+handful of UPDATEs, each with its own commit. Instead:
+
+- Counter deltas (impressions, clicks, credits) and audit rows are
+  accumulated in an AdEventBuffer and written by the owning service in one
+  transaction at most every FLUSH_INTERVAL seconds.
+- Duplicate clicks are filtered by a ClickWindow: a sliding window of the
+  last click time per (fingerprint hash, sponsor/campaign), held in memory.
+  The window is warmed once per process from the click log so restarts
+  don't reset fraud protection. Workers filter independently.
+- CTR and ranking scores are recomputed by the services after each flush,
+  for the rows the flush touched.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = float(os.environ.get("AD_EVENTS_FLUSH_INTERVAL", "10"))  # seconds
+CLICK_WINDOW_MAXSIZE = int(os.environ.get("AD_CLICK_WINDOW_SIZE", "200000"))
+
+# (table, key column, key, counter column)
+CounterKey = tuple[str, str, Any, str]
+# (table, columns)
+LogKey = tuple[str, tuple[str, ...]]
+
+
+class AdEventBuffer:
+    """Counter deltas and audit rows accumulated in memory between batched flushes."""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL) -> None:
+        self.flush_interval = flush_interval
+        self._counts: dict[CounterKey, float] = {}
+        self._logs: dict[LogKey, list[tuple[Any, ...]]] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def increment(
+        self, table: str, key_column: str, key: Any, column: str, amount: float = 1
+    ) -> None:
+        counter = (table, key_column, key, column)
+        with self._lock:
+            self._counts[counter] = self._counts.get(counter, 0) + amount
+
+    def log(self, table: str, columns: tuple[str, ...], row: tuple[Any, ...]) -> None:
+        with self._lock:
+            self._logs.setdefault((table, columns), []).append(row)
+
+    def pending(self, table: str, key_column: str, key: Any, column: str) -> float:
+        """Delta for one counter not yet written to the database."""
+        with self._lock:
+            return self._counts.get((table, key_column, key, column), 0)
+
+    def take_due(
+        self, force: bool = False
+    ) -> tuple[dict[CounterKey, float], dict[LogKey, list[tuple[Any, ...]]]]:
+        now = time.monotonic()
+        with self._lock:
+            empty = not self._counts and not self._logs
+            if empty or (not force and now - self._last_flush < self.flush_interval):
+                return {}, {}
+            counts, self._counts = self._counts, {}
+            logs, self._logs = self._logs, {}
+            self._last_flush = now
+            return counts, logs
+
+    def restore(
+        self, counts: dict[CounterKey, float], logs: dict[LogKey, list[tuple[Any, ...]]]
+    ) -> None:
+        """Put back a batch whose write failed so the next flush retries it."""
+        with self._lock:
+            for counter, amount in counts.items():
+                self._counts[counter] = self._counts.get(counter, 0) + amount
+            for log_key, rows in logs.items():
+                self._logs.setdefault(log_key, [])[:0] = rows
+
+
+def write_events(
+    db: sqlite3.Connection,
+    counts: dict[CounterKey, float],
+    logs: dict[LogKey, list[tuple[Any, ...]]],
+) -> None:
+    """Apply counter deltas and insert audit rows; one executemany per statement. No commit."""
+    for (table, columns), rows in logs.items():
+        placeholders = ", ".join("?" for _ in columns)
+        db.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            rows,
+        )
+
+    updates: dict[tuple[str, str, str], list[tuple[float, Any]]] = {}
+    for (table, key_column, key, column), amount in counts.items():
+        updates.setdefault((table, key_column, column), []).append((amount, key))
+    for (table, key_column, column), params in updates.items():
+        db.executemany(
+            f"UPDATE {table} SET {column} = COALESCE({column}, 0) + ? WHERE {key_column} = ?",
+            params,
+        )
+
+
+def flush_buffer(
+    db: sqlite3.Connection,
+    buffer: AdEventBuffer,
+    force: bool = False,
+    after: Callable[[dict[CounterKey, float]], None] | None = None,
+) -> int:
+    """
+    Write a buffer's due events in one transaction. Returns counters written.
+
+    after(counts) runs inside the transaction, before the commit, so derived
+    columns (CTR, ranking) land together with the counters they depend on.
+    """
+    counts, logs = buffer.take_due(force=force)
+    if not counts and not logs:
+        return 0
+    try:
+        write_events(db, counts, logs)
+        if after is not None:
+            after(counts)
+        db.commit()
+    except Exception as e:
+        logger.warning(f"Ad event flush failed: {e}")
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        buffer.restore(counts, logs)
+        return 0
+    return len(counts)
+
+
+def touched_keys(counts: Iterable[CounterKey], table: str) -> set[Any]:
+    """Keys of `table` rows that a flushed batch changed."""
+    return {key for tbl, _, key, _ in counts if tbl == table}
+
+
+class ClickWindow:
+    """
+    Sliding duplicate-click window: last click time per (fingerprint, target).
+
+    Every click, billable or not, refreshes the entry, matching the click log
+    semantics where any logged click inside the window makes the next one a
+    duplicate. Entries are kept in last-click order so pruning is cheap.
+    """
+
+    def __init__(self, window: float, maxsize: int = CLICK_WINDOW_MAXSIZE) -> None:
+        self.window = window
+        self.maxsize = maxsize
+        self._last: OrderedDict[tuple[str, Any], float] = OrderedDict()
+        self._warmed = False
+        self._lock = threading.Lock()
+
+    @property
+    def warmed(self) -> bool:
+        return self._warmed
+
+    def warm(self, entries: Iterable[tuple[str, Any, float]]) -> None:
+        """Seed from (fingerprint_hash, target, timestamp) rows, e.g. the click log."""
+        with self._lock:
+            for fingerprint_hash, target, ts in sorted(entries, key=lambda e: e[2]):
+                key = (fingerprint_hash, target)
+                if ts > self._last.get(key, 0.0):
+                    self._last[key] = ts
+                    self._last.move_to_end(key)
+            self._warmed = True
+
+    def hit(self, fingerprint_hash: str, target: Any, now: float | None = None) -> bool:
+        """Record a click; True if the same fingerprint clicked target within the window."""
+        now = time.time() if now is None else now
+        key = (fingerprint_hash, target)
+        with self._lock:
+            last = self._last.get(key)
+            self._last[key] = now
+            self._last.move_to_end(key)
+            if len(self._last) > self.maxsize:
+                self._prune(now)
+            return last is not None and now - last < self.window
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._last:
+            key, ts = next(iter(self._last.items()))
+            if ts >= cutoff and len(self._last) <= self.maxsize:
+                break
+            self._last.popitem(last=False)
@@ -0,0 +1,467 @@
+"""
+Async Analysis Jobs for SkyModderAI
+
+Large mod lists (or ?async=1 requests) on /api/v1/analyze are queued instead
+of analyzed inline. The caller gets a job ID back immediately and polls
+/api/v1/analyze/jobs/<id>, or supplies a webhook URL that is POSTed a signed
+notification when the job finishes. Webhooks are always sent from the worker
+(also for jobs answered from the result cache), to an address that was
+resolved and checked to be public just before connecting.
+
+Job records and results live in the shared cache:
+- analysis_job:{job_id}       status, progress, stage, owner, result hash
+- analysis_result:{sha256}    the analysis payload, keyed by list content
+
+Identical lists for the same game share one cached result, so re-submitting
+a list that was just analyzed completes immediately.
+
+Backends (ANALYSIS_JOBS_BACKEND):
+- celery   hand off to celery_worker.analyze_mod_list_async
+- thread   small in-process pool (default)
+- eager    run inline during submit (tests)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import secrets
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache_service import get_cache
+from config import config
+from conflict_detector import ConflictDetector, parse_mod_list_text
+from exceptions import ValidationError
+from loot_parser import LOOTParser
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY = "analysis_job:{}"
+RESULT_KEY = "analysis_result:{}"
+JOB_TTL = 86400  # 24 hours
+RESULT_TTL = 6 * 3600  # 6 hours
+WEBHOOK_TIMEOUT = 10
+SIGNATURE_HEADER = "X-SkyModderAI-Signature"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETE = "complete"
+STATUS_FAILED = "failed"
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+# =============================================================================
+# Analysis
+# =============================================================================
+
+
+def mod_list_content_hash(mods: list, game: str) -> str:
+    """
+    Stable hash of a parsed mod list.
+
+    Covers game, load order and enabled state — everything the analysis
+    depends on — and nothing else, so whitespace and comment differences in
+    the pasted text map to the same result.
+    """
+    digest = hashlib.sha256(game.encode("utf-8"))
+    for mod in mods:
+        digest.update(b"\n+" if mod.enabled else b"\n-")
+        digest.update(mod.name.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def analyze_mod_list(
+    mod_list_text: str,
+    game: str,
+    nexus_slug: str = "skyrimspecialedition",
+    progress: Optional[Callable[[int, str], None]] = None,
+) -> dict[str, Any]:
+    """
+    Run the developer-API analysis on a mod list.
+
+    Returns the short, report-free payload served by /api/v1/analyze.
+    ``progress(percent, stage)`` is called as each stage starts.
+    """
+
+    def report(percent: int, stage: str) -> None:
+        if progress:
+            progress(percent, stage)
+
+    report(5, "parsing")
+    mods = parse_mod_list_text(mod_list_text)
+    if not mods:
+        raise ValidationError("Could not parse mod list")
+
+    report(15, "loading_masterlist")
+    try:
+        parser = LOOTParser(game_id=game)
+        parser.download_masterlist()
+    except Exception:
+        parser = LOOTParser(game_id="skyrimse")
+
+    report(40, "detecting_conflicts")
+    detector = ConflictDetector(parser, nexus_slug=nexus_slug)
+    detector.analyze_load_order(mods)
+
+    report(90, "assembling")
+    grouped = detector.get_conflicts_by_severity()
+    err_list = grouped.get("error", [])
+    warn_list = grouped.get("warning", [])
+    info_list = grouped.get("info", [])
+
+    def short_conflict(c):
+        return {
+            "severity": c.severity,
+            "type": getattr(c, "type", "unknown"),
+            "message": str(c.message or ""),
+            "affected_mod": c.affected_mod,
+            "suggested_action": c.suggested_action,
+        }
+
+    return {
+        "game": game,
+        "mod_count": len(mods),
+        "enabled_count": sum(1 for m in mods if m.enabled),
+        "conflicts": [short_conflict(c) for c in err_list + warn_list + info_list],
+        "summary": {
+            "errors": len(err_list),
+            "warnings": len(warn_list),
+            "info": len(info_list),
+            "total": len(err_list) + len(warn_list) + len(info_list),
+        },
+    }
+
+
+# =============================================================================
+# Job records
+# =============================================================================
+
+
+def get_job(job_id: str) -> Optional[dict[str, Any]]:
+    """Return the job record, or None if unknown or expired."""
+    if not job_id:
+        return None
+    return get_cache().get(JOB_KEY.format(job_id))
+
+
+def get_result(content_hash: str) -> Optional[dict[str, Any]]:
+    """Return a cached analysis result by content hash."""
+    return get_cache().get(RESULT_KEY.format(content_hash))
+
+
+def _save_job(job: dict[str, Any]) -> None:
+    job["updated_at"] = time.time()
+    get_cache().set(JOB_KEY.format(job["job_id"]), job, ttl=JOB_TTL)
+
+
+def _update_job(job_id: str, **fields) -> Optional[dict[str, Any]]:
+    job = get_job(job_id)
+    if job is None:
+        return None
+    job.update(fields)
+    _save_job(job)
+    return job
+
+
+def _resolve_public_address(host: str, port: int) -> str:
+    """
+    Resolve a webhook host and return the address to connect to.
+
+    Every address the name resolves to must be global, so a hostname pointing
+    at loopback, link-local (cloud metadata) or RFC 1918 space is refused.
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValidationError("webhook_url host does not resolve") from e
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise ValidationError("webhook_url host does not resolve")
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%", 1)[0]).is_global:
+            raise ValidationError("webhook_url must point to a public host")
+    return addresses[0]
+
+
+def _webhook_port(parsed) -> int:
+    try:
+        port = parsed.port
+    except ValueError as e:
+        raise ValidationError("webhook_url has an invalid port") from e
+    return port or (443 if parsed.scheme == "https" else 80)
+
+
+def validate_webhook_url(url: Optional[str]) -> Optional[str]:
+    """
+    Check a caller-supplied webhook URL.
+
+    Only http(s) URLs without credentials whose host resolves exclusively to
+    public addresses are accepted, so the worker can't be pointed at internal
+    services. The host is resolved again right before each delivery.
+    """
+    if not url:
+        return None
+    url = url.strip()
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValidationError("webhook_url must be an http(s) URL")
+    if parsed.username or parsed.password:
+        raise ValidationError("webhook_url must not contain credentials")
+    host = parsed.hostname.lower()
+    if host == "localhost" or host.endswith(".localhost"):
+        raise ValidationError("webhook_url must point to a public host")
+    _resolve_public_address(host, _webhook_port(parsed))
+    return url
+
+
+def submit_job(
+    mod_list_text: str,
+    game: str,
+    nexus_slug: str = "skyrimspecialedition",
+    user_email: Optional[str] = None,
+    webhook_url: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Queue an analysis and return its job record.
+
+    If a result for the same list content is already cached the job is
+    created complete and no work is queued.
+    """
+    mods = parse_mod_list_text(mod_list_text)
+    if not mods:
+        raise ValidationError("Could not parse mod list")
+    webhook_url = validate_webhook_url(webhook_url)
+    content_hash = mod_list_content_hash(mods, game)
+
+    now = time.time()
+    job = {
+        "job_id": secrets.token_urlsafe(16),
+        "status": STATUS_QUEUED,
+        "progress": 0,
+        "stage": "queued",
+        "game": game,
+        "nexus_slug": nexus_slug,
+        "mod_count": len(mods),
+        "content_hash": content_hash,
+        "user_email": user_email,
+        "webhook_url": webhook_url,
+        "error": None,
+        "created_at": now,
+    }
+
+    if get_result(content_hash) is not None:
+        job.update(status=STATUS_COMPLETE, progress=100, stage="cached", finished_at=now)
+        _save_job(job)
+        if webhook_url:
+            # Deliver from the worker, never inside the request.
+            _dispatch(job["job_id"])
+        return get_job(job["job_id"]) or job
+
+    # The list text only lives as long as it's needed by a worker.
+    job["mod_list"] = mod_list_text
+    _save_job(job)
+    _dispatch(job["job_id"])
+    return get_job(job["job_id"]) or job
+
+
+def _dispatch(job_id: str) -> None:
+    global _executor
+    backend = (getattr(config, "ANALYSIS_JOBS_BACKEND", "thread") or "thread").lower()
+
+    if backend == "celery":
+        try:
+            from celery_worker import analyze_mod_list_async
+
+            analyze_mod_list_async.delay(job_id)
+            return
+        except Exception as e:
+            logger.warning(f"Celery unavailable for analysis job {job_id}, using threads: {e}")
+            backend = "thread"
+
+    if backend == "eager":
+        run_job(job_id)
+        return
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(config, "ANALYSIS_JOBS_WORKERS", 2),
+            thread_name_prefix="analysis-job",
+        )
+    _executor.submit(run_job, job_id)
+
+
+def run_job(job_id: str) -> Optional[dict[str, Any]]:
+    """
+    Execute a queued job. Called by the worker backend.
+
+    Failures are recorded on the job rather than raised, so pollers and
+    webhooks always see a terminal state.
+    """
+    job = get_job(job_id)
+    if job is None:
+        logger.warning(f"Analysis job {job_id} expired before it ran")
+        return None
+    if job["status"] in (STATUS_COMPLETE, STATUS_FAILED):
+        if job.get("webhook_url") and not job.get("webhook_sent_at"):
+            _notify_webhook(job)
+            job = _update_job(job_id, webhook_sent_at=time.time()) or job
+        return job
+
+    _update_job(job_id, status=STATUS_RUNNING, started_at=time.time())
+
+    def progress(percent: int, stage: str) -> None:
+        _update_job(job_id, progress=percent, stage=stage)
+
+    try:
+        result = get_result(job["content_hash"])
+        if result is None:
+            result = analyze_mod_list(
+                job["mod_list"],
+                job["game"],
+                job.get("nexus_slug") or "skyrimspecialedition",
+                progress,
+            )
+            get_cache().set(RESULT_KEY.format(job["content_hash"]), result, ttl=RESULT_TTL)
+        job = _update_job(
+            job_id,
+            status=STATUS_COMPLETE,
+            progress=100,
+            stage="complete",
+            mod_list=None,
+            finished_at=time.time(),
+        )
+    except Exception as e:
+        logger.exception(f"Analysis job {job_id} failed: {e}")
+        message = e.message if isinstance(e, ValidationError) else "Analysis failed"
+        job = _update_job(
+            job_id,
+            status=STATUS_FAILED,
+            stage="failed",
+            error=message,
+            mod_list=None,
+            finished_at=time.time(),
+        )
+
+    if job and job.get("webhook_url"):
+        _notify_webhook(job)
+        job = _update_job(job_id, webhook_sent_at=time.time()) or job
+    return job
+
+
+def job_status_payload(job: dict[str, Any]) -> dict[str, Any]:
+    """Public view of a job record, with the result attached once complete."""
+    payload = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "progress": job.get("progress", 0),
+        "stage": job.get("stage"),
+        "game": job.get("game"),
+        "mod_count": job.get("mod_count"),
+        "content_hash": job.get("content_hash"),
+        "created_at": job.get("created_at"),
+        "updated_at": job.get("updated_at"),
+    }
+    if job["status"] == STATUS_FAILED:
+        payload["error"] = job.get("error")
+    if job["status"] == STATUS_COMPLETE:
+        result = get_result(job["content_hash"])
+        if result is None:
+            payload["status"] = "expired"
+        else:
+            payload["result"] = result
+    return payload
+
+
+# =============================================================================
+# Webhooks
+# =============================================================================
+
+
+def sign_payload(body: bytes) -> str:
+    """HMAC-SHA256 signature for a webhook body, as sent in the signature header."""
+    secret = getattr(config, "ANALYSIS_WEBHOOK_SECRET", None) or config.SECRET_KEY
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+class _PinnedHostAdapter(HTTPAdapter):
+    """Connect to a pre-resolved IP while using the original hostname for TLS (SNI + cert check)."""
+
+    def __init__(self, hostname: str, **kwargs) -> None:
+        self._hostname = hostname
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        kwargs["server_hostname"] = self._hostname
+        kwargs["assert_hostname"] = self._hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _post_webhook(url: str, body: bytes, headers: dict[str, str]) -> requests.Response:
+    """
+    POST to a webhook via the address checked by _resolve_public_address.
+
+    The host is resolved and checked here, at send time, and the connection
+    goes to that exact address, so a DNS answer that changes after submission
+    (rebinding) can't redirect the request to an internal service.
+    """
+    parsed = urlparse(url)
+    port = _webhook_port(parsed)
+    address = _resolve_public_address(parsed.hostname, port)
+    pinned = f"[{address}]" if ":" in address else address
+    pinned_url = parsed._replace(netloc=f"{pinned}:{port}").geturl()
+
+    with requests.Session() as session:
+        session.trust_env = False  # no proxies from the environment
+        if parsed.scheme == "https":
+            session.mount("https://", _PinnedHostAdapter(parsed.hostname))
+        return session.post(
+            pinned_url,
+            data=body,
+            headers={**headers, "Host": parsed.netloc},
+            timeout=WEBHOOK_TIMEOUT,
+            allow_redirects=False,
+        )
+
+
+def _notify_webhook(job: dict[str, Any]) -> bool:
+    url = job.get("webhook_url")
+    if not url:
+        return False
+
+    body = json.dumps(
+        {
+            "event": f"analysis.{job['status']}",
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "content_hash": job.get("content_hash"),
+            "error": job.get("error"),
+            "finished_at": job.get("finished_at"),
+        },
+        sort_keys=True,
+    ).encode("utf-8")
+
+    try:
+        response = _post_webhook(
+            url,
+            body,
+            {"Content-Type": "application/json", SIGNATURE_HEADER: sign_payload(body)},
+        )
+        if response.status_code >= 400:
+            logger.warning(f"Webhook for job {job['job_id']} returned {response.status_code}")
+            return False
+        return True
+    except (requests.RequestException, ValidationError) as e:
+        logger.warning(f"Webhook for job {job['job_id']} failed: {e}")
+        return False
@@ -0,0 +1,153 @@
+"""
+API Key Cache — verification and usage counting without per-call DB work.
+
+/api/v1 traffic (MO2 extension, bots) authenticates every call with an API
+key. Verification is a SHA-256 plus a lookup of the hash:
+
+- Lookups go through an in-process LRU, then the shared cache (Redis when
+  configured), then api_keys. Invalid keys are cached too (negative
+  caching) so a bad key hammering the API doesn't hit the database.
+- api_key_revoke() drops the key from this process's LRU and replaces the
+  shared entry with a negative one. Other workers pick that up when their
+  LRU entry expires, after at most LOCAL_TTL seconds.
+- Each successful call bumps an in-memory counter. flush_usage() writes the
+  accumulated counts to api_keys.request_count in one batch.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MAXSIZE = int(os.environ.get("API_KEY_CACHE_SIZE", "10000"))
+LOCAL_TTL = 30.0  # seconds; bounds how long another worker honours a revoked key
+SHARED_TTL = 300  # seconds
+NEGATIVE_TTL = 60  # seconds, shared and local, for keys that don't exist
+USAGE_FLUSH_INTERVAL = 10.0  # seconds between batched request_count writes
+
+# Cached value for a key hash with no api_keys row
+_INVALID: dict[str, Any] = {"user_email": None}
+
+
+def _shared_key(key_hash: str) -> str:
+    return f"api_key:{key_hash}"
+
+
+class ApiKeyCache:
+    """LRU of key_hash -> {"user_email", "key_id"} backed by the shared cache."""
+
+    def __init__(self, maxsize: int = LOCAL_MAXSIZE, ttl: float = LOCAL_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, key_hash: str, load: Callable[[str], Optional[dict[str, Any]]]
+    ) -> Optional[dict[str, Any]]:
+        """
+        Entry for key_hash, or None if the key is invalid.
+
+        load(key_hash) reads api_keys on a miss in both tiers and returns None
+        for unknown keys; exceptions from it propagate and nothing is cached.
+        """
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key_hash)
+            if hit and hit[0] > now:
+                self._entries.move_to_end(key_hash)
+                return hit[1] if hit[1]["user_email"] else None
+
+        entry = get_cache().get(_shared_key(key_hash))
+        if entry is None:
+            entry = load(key_hash) or _INVALID
+            ttl = SHARED_TTL if entry["user_email"] else NEGATIVE_TTL
+            get_cache().set(_shared_key(key_hash), entry, ttl=ttl)
+        self._store(key_hash, entry, now)
+        return entry if entry["user_email"] else None
+
+    def _store(self, key_hash: str, entry: dict[str, Any], now: float) -> None:
+        ttl = self.ttl if entry["user_email"] else min(self.ttl, NEGATIVE_TTL)
+        with self._lock:
+            self._entries[key_hash] = (now + ttl, entry)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def revoke(self, key_hash: str) -> None:
+        """Mark key_hash invalid here and in the shared cache."""
+        with self._lock:
+            self._entries.pop(key_hash, None)
+        get_cache().set(_shared_key(key_hash), _INVALID, ttl=SHARED_TTL)
+
+    def forget(self, key_hash: str) -> None:
+        """Drop any cached state for key_hash (e.g. a newly created key)."""
+        with self._lock:
+            self._entries.pop(key_hash, None)
+        get_cache().delete(_shared_key(key_hash))
+
+
+class ApiKeyUsage:
+    """Per-key request counts accumulated in memory between batched flushes."""
+
+    def __init__(self, flush_interval: float = USAGE_FLUSH_INTERVAL) -> None:
+        self.flush_interval = flush_interval
+        self._counts: dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, key_hash: str) -> None:
+        with self._lock:
+            self._counts[key_hash] = self._counts.get(key_hash, 0) + 1
+
+    def pending(self, key_hash: str) -> int:
+        """Calls counted for key_hash and not yet written to the database."""
+        with self._lock:
+            return self._counts.get(key_hash, 0)
+
+    def take_due(self, force: bool = False) -> dict[str, int]:
+        now = time.monotonic()
+        with self._lock:
+            if not self._counts or (not force and now - self._last_flush < self.flush_interval):
+                return {}
+            counts, self._counts = self._counts, {}
+            self._last_flush = now
+            return counts
+
+    def restore(self, counts: dict[str, int]) -> None:
+        """Put back counts whose write failed so the next flush retries them."""
+        with self._lock:
+            for key_hash, count in counts.items():
+                self._counts[key_hash] = self._counts.get(key_hash, 0) + count
+
+
+api_key_cache = ApiKeyCache()
+api_key_usage = ApiKeyUsage()
+
+
+def flush_usage(db: sqlite3.Connection, force: bool = False) -> int:
+    """Add accumulated call counts to api_keys in one transaction. Returns keys written."""
+    counts = api_key_usage.take_due(force=force)
+    if not counts:
+        return 0
+    try:
+        db.executemany(
+            "UPDATE api_keys SET request_count = COALESCE(request_count, 0) + ?, "
+            "last_used_at = CURRENT_TIMESTAMP WHERE key_hash = ?",
+            [(count, key_hash) for key_hash, count in counts.items()],
+        )
+        db.commit()
+    except Exception as e:
+        logger.warning(f"API key usage flush failed: {e}")
+        api_key_usage.restore(counts)
+        return 0
+    return len(counts)
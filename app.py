@@ -6,6 +6,7 @@ Main Flask application with improved security, error handling, and Stripe integr
 from __future__ import annotations
 
 import hashlib
+import hmac
 import html
 import json
 import logging
@@ -14,6 +15,8 @@ import re
 import secrets
 import smtplib
 import sqlite3
+import struct
+import tempfile
 from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from email.mime.multipart import MIMEMultipart
@@ -42,6 +45,9 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import check_password_hash, generate_password_hash
 
 # Local modules
+import analysis_jobs
+from api_key_cache import api_key_cache, api_key_usage
+from api_key_cache import flush_usage as flush_api_key_usage
 from community_builds import (
     get_community_builds_service,
 )
@@ -51,6 +57,8 @@ from conflict_detector import ConflictDetector, parse_mod_list_text
 # Shared constants - imported from constants.py
 from constants import (
     MAX_INPUT_SIZE,
+    MAX_PLUGIN_UPLOAD_BYTES,
+    MAX_PLUGIN_UPLOADS,
     PLUGIN_LIMIT,
     PLUGIN_LIMIT_WARN_THRESHOLD,
     RATE_LIMIT_ANALYZE,
@@ -62,6 +70,9 @@ from deterministic_analysis import (
     generate_bespoke_setups_deterministic,
     scan_game_folder_deterministic,
 )
+from exceptions import InvalidPluginError, ValidationError
+from github_fetcher import fetch_github_repo
+from json_provider import FastJSONProvider
 from knowledge_index import (
     build_ai_context as build_knowledge_context,
 )
@@ -86,7 +97,15 @@ from openclaw_engine import (
     build_openclaw_plan,
     suggest_loop_adjustments,
 )
-from result_consolidator import consolidate_conflicts
+from plugin_scanner import (
+    PLUGIN_EXTENSIONS,
+    build_report,
+    order_plugins,
+    parse_load_order,
+    report_to_conflicts,
+    scan_plugin,
+)
+from result_consolidator import ConflictAssembler
 from search_engine import get_search_engine
 
 # Security utilities
@@ -99,6 +118,18 @@ from security_utils import (
     validate_mod_list,
     validate_search_query,
 )
+from session_cache import (
+    cache_session,
+    cache_user_status,
+    flush_last_seen,
+    get_cached_session,
+    get_cached_user_status,
+    invalidate_session,
+    invalidate_sessions,
+    invalidate_user_status,
+    last_seen_batcher,
+)
+from stage_timing import render_prometheus, stage, start_stage_timer
 from system_impact import (
     format_system_impact_for_ai,
     format_system_impact_report,
@@ -345,6 +376,7 @@ def api_success(data: dict = None, message: str = None):
 
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson when installed, stdlib json otherwise
 
 # Add request logging middleware for structured request tracing (BEFORE ProxyFix)
 request_logging = RequestLoggingMiddleware(app, logger=logger)
@@ -353,10 +385,13 @@ app.wsgi_app = request_logging
 # ProxyFix must be applied AFTER other middleware
 app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)  # Trust reverse proxy headers
 
-# Gzip compression for faster responses (2025 best practice)
+# Response compression, negotiated per request from Accept-Encoding
 try:
     from flask_compress import Compress
 
+    app.config.setdefault("COMPRESS_ALGORITHM", ["br", "gzip"])
+    app.config.setdefault("COMPRESS_BR_LEVEL", 4)  # fast enough for multi-MB analyze payloads
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
     Compress(app)
 except ImportError:
     pass  # Graceful fallback if Flask-Compress not installed
@@ -373,6 +408,9 @@ app.config.update(
     SESSION_COOKIE_SAMESITE=config.SESSION_COOKIE_SAMESITE,
     PERMANENT_SESSION_LIFETIME=86400,  # 24 hours
     REMEMBER_COOKIE_DURATION=86400 * 30,  # 30 days
+    # Largest accepted request body (/api/scan-plugins). Werkzeug enforces it
+    # while reading, so chunked uploads without Content-Length are capped too.
+    MAX_CONTENT_LENGTH=MAX_PLUGIN_UPLOAD_BYTES,
 )
 
 # Production-specific session configuration (fixes OAuth 500 errors)
@@ -585,9 +623,20 @@ def init_db():
                 key_hash TEXT NOT NULL UNIQUE,
                 key_prefix TEXT NOT NULL,
                 label TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                request_count INTEGER DEFAULT 0,
+                last_used_at TIMESTAMP
             )
         """)
+        for col, col_type in (
+            ("request_count", "INTEGER DEFAULT 0"),
+            ("last_used_at", "TIMESTAMP"),
+        ):
+            try:
+                db.execute(f"ALTER TABLE api_keys ADD COLUMN {col} {col_type}")
+                db.commit()
+            except sqlite3.OperationalError:
+                db.rollback()
         db.execute("""
             CREATE TABLE IF NOT EXISTS community_posts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1021,14 +1070,29 @@ def get_user_tier(email):
         if dev_pro or dev_pro_plus or (test_email and email.lower() == test_email):
             return "pro"
     try:
-        db = get_db()
-        row = db.execute("SELECT tier FROM users WHERE email = ?", (email.lower(),)).fetchone()
-        return row["tier"] if row else "free"
+        return _user_status(email)["tier"]
     except Exception as e:
         logger.error(f"Database error in get_user_tier: {e}")
         return "free"  # Fail safe
 
 
+def _user_status(email):
+    """{"tier", "verified"} for a user, cached briefly (see session_cache). Raises on DB errors."""
+    status = get_cached_user_status(email)
+    if status is None:
+        row = (
+            get_db()
+            .execute("SELECT tier, email_verified FROM users WHERE email = ?", (email.lower(),))
+            .fetchone()
+        )
+        status = {
+            "tier": row["tier"] if row else "free",
+            "verified": bool(row and row["email_verified"]),
+        }
+        cache_user_status(email, status)
+    return status
+
+
 def set_user_tier(email, tier, customer_id=None, subscription_id=None):
     """Update or insert user tier information. Preserves email_verified when updating."""
     try:
@@ -1050,6 +1114,7 @@ def set_user_tier(email, tier, customer_id=None, subscription_id=None):
                 (email, tier, customer_id, subscription_id),
             )
         db.commit()
+        invalidate_user_status(email)
         logger.info(f"Updated user {_redact_email(email)} to tier {tier}")
     except Exception:
         logger.error(f"Failed to update user tier for {_redact_email(email)}")
@@ -1459,6 +1524,7 @@ def ensure_user_unverified(email, password=None):
                 (pwhash, email),
             )
         db.commit()
+        invalidate_user_status(email)
     except Exception as e:
         logger.error(f"ensure_user_unverified: {e}")
 
@@ -1469,6 +1535,7 @@ def set_user_verified(email):
         db = get_db()
         db.execute("UPDATE users SET email_verified = 1 WHERE email = ?", (email.lower(),))
         db.commit()
+        invalidate_user_status(email)
     except Exception as e:
         logger.error(f"set_user_verified: {e}")
 
@@ -1478,11 +1545,7 @@ def is_user_verified(email):
     if not email:
         return False
     try:
-        db = get_db()
-        row = db.execute(
-            "SELECT email_verified FROM users WHERE email = ?", (email.lower(),)
-        ).fetchone()
-        return bool(row and row[0])
+        return bool(_user_status(email)["verified"])
     except Exception:
         return False
 
@@ -1528,22 +1591,31 @@ def session_create(user_email, remember_me=False, user_agent=None):
 
 
 def session_get(token):
-    """Return session row (with user_email) if token valid and not expired; else None. Updates last_seen."""
+    """
+    Return session row (with user_email) if token valid and not expired; else None.
+
+    Rows are cached briefly and last_seen is queued for a batched write at most
+    every few minutes (see session_cache), so validation rarely touches the DB.
+    """
     if not token:
         return None
     try:
-        db = get_db()
-        now_ts = _utc_ts()
-        row = db.execute(
-            "SELECT token, user_email, user_agent, created_at, last_seen, expires_at FROM user_sessions WHERE token = ?",
-            (token,),
-        ).fetchone()
-        if not row or (row["expires_at"] or 0) < now_ts:
+        row = get_cached_session(token)
+        if row is None:
+            db_row = (
+                get_db()
+                .execute(
+                    "SELECT token, user_email, user_agent, created_at, last_seen, expires_at FROM user_sessions WHERE token = ?",
+                    (token,),
+                )
+                .fetchone()
+            )
+            if not db_row:
+                return None
+            row = cache_session(token, db_row)
+        if (row["expires_at"] or 0) < _utc_ts():
             return None
-        db.execute(
-            "UPDATE user_sessions SET last_seen = CURRENT_TIMESTAMP WHERE token = ?", (token,)
-        )
-        db.commit()
+        last_seen_batcher.touch(token, row["last_seen"])
         return row
     except Exception as e:
         logger.error(f"session_get: {e}")
@@ -1556,6 +1628,7 @@ def session_revoke(token):
         db = get_db()
         db.execute("DELETE FROM user_sessions WHERE token = ?", (token,))
         db.commit()
+        invalidate_session(token)
     except Exception as e:
         logger.error(f"session_revoke: {e}")
 
@@ -1566,11 +1639,13 @@ def session_revoke_all_other(user_email, keep_token):
         return
     try:
         db = get_db()
-        db.execute(
-            "DELETE FROM user_sessions WHERE user_email = ? AND token != ?",
-            (user_email.lower(), keep_token),
-        )
+        params = (user_email.lower(), keep_token)
+        revoked = db.execute(
+            "SELECT token FROM user_sessions WHERE user_email = ? AND token != ?", params
+        ).fetchall()
+        db.execute("DELETE FROM user_sessions WHERE user_email = ? AND token != ?", params)
         db.commit()
+        invalidate_sessions(r["token"] for r in revoked)
     except Exception as e:
         logger.error(f"session_revoke_all_other: {e}")
 
@@ -1614,11 +1689,13 @@ def session_revoke_by_display_id(user_email, display_id):
         return False
     try:
         db = get_db()
-        db.execute(
-            "DELETE FROM user_sessions WHERE user_email = ? AND display_id = ?",
-            (user_email.lower(), display_id),
-        )
+        params = (user_email.lower(), display_id)
+        revoked = db.execute(
+            "SELECT token FROM user_sessions WHERE user_email = ? AND display_id = ?", params
+        ).fetchall()
+        db.execute("DELETE FROM user_sessions WHERE user_email = ? AND display_id = ?", params)
         db.commit()
+        invalidate_sessions(r["token"] for r in revoked)
         return db.total_changes > 0
     except Exception as e:
         logger.error(f"session_revoke_by_display_id: {e}")
@@ -1647,6 +1724,7 @@ def api_key_create(user_email, label=None):
             (user_email.lower(), key_hash, prefix, (label or "").strip()[:64] or None),
         )
         db.commit()
+        api_key_cache.forget(key_hash)
         row = db.execute(
             "SELECT id, created_at FROM api_keys WHERE key_hash = ?", (key_hash,)
         ).fetchone()
@@ -1656,31 +1734,51 @@ def api_key_create(user_email, label=None):
         return (None, None, None, None, None)
 
 
+def _load_api_key(key_hash):
+    row = (
+        get_db()
+        .execute("SELECT id, user_email FROM api_keys WHERE key_hash = ?", (key_hash,))
+        .fetchone()
+    )
+    return {"user_email": row["user_email"], "key_id": row["id"]} if row else None
+
+
 def api_key_lookup(raw_key):
-    """Return user_email for a valid API key, else None."""
+    """
+    Return user_email for a valid API key, else None.
+
+    Verified through api_key_cache (LRU + shared cache, with negative entries
+    for unknown keys); the call is counted and counts are flushed in batches.
+    """
     if not raw_key or not raw_key.startswith(API_KEY_PREFIX):
         return None
     key_hash = _hash_api_key(raw_key)
     try:
-        row = (
-            get_db()
-            .execute("SELECT user_email FROM api_keys WHERE key_hash = ?", (key_hash,))
-            .fetchone()
-        )
-        return row["user_email"] if row else None
+        entry = api_key_cache.lookup(key_hash, _load_api_key)
     except Exception:
         return None
+    if not entry:
+        return None
+    api_key_usage.record(key_hash)
+    flush_api_key_usage(get_db())
+    return entry["user_email"]
 
 
 def api_key_list(user_email):
-    """List API keys for user (id, key_prefix, label, created_at) — no raw keys."""
+    """List API keys for user (id, key_prefix, label, created_at, request_count, last_used_at) — no raw keys."""
     try:
         db = get_db()
         rows = db.execute(
-            "SELECT id, key_prefix, label, created_at FROM api_keys WHERE user_email = ? ORDER BY created_at DESC",
+            "SELECT id, key_hash, key_prefix, label, created_at, request_count, last_used_at FROM api_keys WHERE user_email = ? ORDER BY created_at DESC",
             (user_email.lower(),),
         ).fetchall()
-        return [dict(r) for r in rows]
+        keys = []
+        for r in rows:
+            key = dict(r)
+            key_hash = key.pop("key_hash")
+            key["request_count"] = (key["request_count"] or 0) + api_key_usage.pending(key_hash)
+            keys.append(key)
+        return keys
     except Exception as e:
         logger.error(f"api_key_list: {e}")
         return []
@@ -1690,11 +1788,14 @@ def api_key_revoke(user_email, key_id):
     """Revoke (delete) an API key if it belongs to user. Returns True if deleted."""
     try:
         db = get_db()
-        db.execute(
-            "DELETE FROM api_keys WHERE id = ? AND user_email = ?",
-            (int(key_id), user_email.lower()),
-        )
+        params = (int(key_id), user_email.lower())
+        row = db.execute(
+            "SELECT key_hash FROM api_keys WHERE id = ? AND user_email = ?", params
+        ).fetchone()
+        db.execute("DELETE FROM api_keys WHERE id = ? AND user_email = ?", params)
         db.commit()
+        if row:
+            api_key_cache.revoke(row["key_hash"])
         return db.total_changes > 0
     except Exception as e:
         logger.error(f"api_key_revoke: {e}")
@@ -1785,6 +1886,7 @@ def load_session_from_cookie():
     if token:
         row = session_get(token)
         if row:
+            flush_last_seen(get_db())
             email = row["user_email"]
             g.user_email = email
             session["user_email"] = email
@@ -1842,6 +1944,15 @@ def not_found(e):
     return render_template("error.html", code=404, message="Page not found"), 404
 
 
+@app.errorhandler(413)
+def request_too_large(e):
+    """Request body over MAX_CONTENT_LENGTH."""
+    message = f"Upload too large (max {MAX_PLUGIN_UPLOAD_BYTES // (1024 * 1024)} MB)"
+    if request.path.startswith("/api/"):
+        return api_error(message, 413)
+    return render_template("error.html", code=413, message=message), 413
+
+
 @app.errorhandler(500)
 def server_error(e):
     """Custom 500 page."""
@@ -4508,6 +4619,7 @@ def analyze_mods():
         )
 
     try:
+        timer = start_stage_timer("analyze")
         data = request.get_json() or {}
         if not data:
             return api_error("Invalid JSON request body", 400)
@@ -4518,8 +4630,10 @@ def analyze_mods():
         game_version = (data.get("game_version") or "").strip() or None
         masterlist_version = (data.get("masterlist_version") or "").strip() or None
         specs = data.get("specs") if isinstance(data.get("specs"), dict) else None
+        fields = _requested_fields(data)
 
-        mods = parse_mod_list_text(mod_list_text)
+        with stage("parse_list"):
+            mods = parse_mod_list_text(mod_list_text)
         # No minimum: 1 mod, 2 mods, or any number is allowed.
         if not mods:
             return api_error(
@@ -4535,12 +4649,13 @@ def analyze_mods():
         game = game_raw if game_raw in allowed_ids else DEFAULT_GAME
         masterlist_version = (data.get("masterlist_version") or "").strip() or "latest"
         game_version = (data.get("game_version") or "").strip()
-        try:
-            active_parser = LOOTParser(game)  # Positional argument, not keyword
-            active_parser.download_masterlist()
-        except Exception as e:
-            logger.warning(f"Parser for {game} failed: {e}, using default")
-            active_parser = LOOTParser(DEFAULT_GAME)
+        with stage("load_masterlist"):
+            try:
+                active_parser = LOOTParser(game)  # Positional argument, not keyword
+                active_parser.download_masterlist()
+            except Exception as e:
+                logger.warning(f"Parser for {game} failed: {e}, using default")
+                active_parser = LOOTParser(DEFAULT_GAME)
 
         nexus_slug = NEXUS_GAME_SLUGS.get(game, "skyrimspecialedition")
         detector = ConflictDetector(active_parser, nexus_slug=nexus_slug)
@@ -4550,8 +4665,15 @@ def analyze_mods():
         warn_list = grouped.get("warning", [])
         info_list = grouped.get("info", [])
 
+        # Record-level overrides from a plugin scan report (plugin_scanner CLI or /api/scan-plugins)
+        if isinstance(data.get("plugin_scan"), dict):
+            enabled_names = [m.name for m in mods if m.enabled]
+            for c in report_to_conflicts(data["plugin_scan"], enabled_names):
+                (warn_list if c.severity == "warning" else info_list).append(c)
+
         enabled_count = sum(1 for m in mods if m.enabled)
-        suggested_order = detector.get_suggested_load_order(mods)
+        with stage("load_order"):
+            suggested_order = detector.get_suggested_load_order(mods)
         plugin_limit_warning = None
         if enabled_count >= PLUGIN_LIMIT_WARN_THRESHOLD:
             plugin_limit_warning = (
@@ -4560,83 +4682,31 @@ def analyze_mods():
                 "Merging or disabling some plugins may be needed."
             )
 
-        def _build_conflict_links(c, slug):
-            """Build contextual links for a conflict (Nexus, xEdit, LOOT) + resolution from knowledge_index."""
-            from urllib.parse import quote
-
-            links = []
-            base = f"https://www.nexusmods.com/games/{slug}/mods?keyword="
-            if c.affected_mod:
-                links.append(
-                    {
-                        "title": "Nexus: "
-                        + (
-                            c.affected_mod[:30] + "…"
-                            if len(c.affected_mod) > 30
-                            else c.affected_mod
-                        ),
-                        "url": base + quote(c.affected_mod),
-                    }
-                )
-            related = getattr(c, "related_mod", None)
-            if related and related != (c.affected_mod or ""):
-                links.append(
-                    {
-                        "title": "Nexus: " + (related[:30] + "…" if len(related) > 30 else related),
-                        "url": base + quote(related),
-                    }
-                )
-            if c.type == "dirty_edits":
-                from conflict_detector import _XEDIT_DOCS, _XEDIT_LINKS
-
-                game_id = getattr(active_parser, "game", "skyrimse")
-                _, editor_url = _XEDIT_LINKS.get(game_id, ("xEdit", _XEDIT_DOCS))
-                links.append({"title": "xEdit cleaning guide", "url": _XEDIT_DOCS})
-            if c.type == "load_order_violation":
-                links.append({"title": "LOOT", "url": "https://loot.github.io/"})
-            # Add resolution links from knowledge_index (dedupe by URL)
-            seen_urls = {lnk["url"] for lnk in links}
-            resolution = get_resolution_for_conflict(getattr(c, "type", "info"))
-            for link in resolution.get("links") or []:
-                if isinstance(link, (list, tuple)) and len(link) >= 2 and link[1] not in seen_urls:
-                    seen_urls.add(link[1])
-                    links.append({"title": link[0], "url": link[1]})
-            return links
-
-        def safe_conflict_dict(c):
-            d = c.__dict__.copy()
-            d["message"] = html.escape(str(d.get("message", "")))
-            if d.get("suggested_action"):
-                d["suggested_action"] = html.escape(str(d["suggested_action"]))
-            d["links"] = _build_conflict_links(c, nexus_slug)
-            if id(c) in conflict_counts:
-                d["occurrence_count"] = conflict_counts[id(c)]
-            return d
-
         all_visible = err_list + warn_list + info_list
         things_to_verify = _extract_things_to_verify(all_visible)
         game_name = GAME_DISPLAY_NAMES.get(game, game)
 
-        # Refinement Cycle: Log conflicts to learn from them
-        _log_conflict_stats(game, all_visible)
+        with stage("stats_enrichment"):
+            # Refinement Cycle: Log conflicts to learn from them
+            _log_conflict_stats(game, all_visible)
 
-        # Enrich conflicts with community frequency (The "Intimate Database")
-        conflict_counts = {}
-        try:
-            db = get_db()
-            for c in all_visible:
-                mod_a = getattr(c, "affected_mod", None)
-                mod_b = getattr(c, "related_mod", None) or ""
-                c_type = getattr(c, "type", "unknown")
-                if mod_a:
-                    row = db.execute(
-                        "SELECT occurrence_count FROM conflict_stats WHERE game = ? AND mod_a = ? AND mod_b = ? AND conflict_type = ?",
-                        (game, mod_a, mod_b, c_type),
-                    ).fetchone()
-                    if row:
-                        conflict_counts[id(c)] = row["occurrence_count"]
-        except Exception as e:
-            logger.debug(f"Failed to fetch conflict stats: {e}")
+            # Enrich conflicts with community frequency (The "Intimate Database")
+            conflict_counts = {}
+            try:
+                db = get_db()
+                for c in all_visible:
+                    mod_a = getattr(c, "affected_mod", None)
+                    mod_b = getattr(c, "related_mod", None) or ""
+                    c_type = getattr(c, "type", "unknown")
+                    if mod_a:
+                        row = db.execute(
+                            "SELECT occurrence_count FROM conflict_stats WHERE game = ? AND mod_a = ? AND mod_b = ? AND conflict_type = ?",
+                            (game, mod_a, mod_b, c_type),
+                        ).fetchone()
+                        if row:
+                            conflict_counts[id(c)] = row["occurrence_count"]
+            except Exception as e:
+                logger.debug(f"Failed to fetch conflict stats: {e}")
 
         masterlist_ver = getattr(active_parser, "version", "latest")
 
@@ -4651,47 +4721,41 @@ def analyze_mods():
         metadata = start_analysis(analysis_id)
 
         # Knowledge index: resolutions + esoteric solutions for AI
-        knowledge_ctx = build_knowledge_context(
-            game_id=game,
-            conflicts=all_visible,
-            mod_list=[m.name for m in mods if m.enabled],
-            specs=specs,
-            user_query=None,
-        )
+        with stage("knowledge_context"):
+            knowledge_ctx = build_knowledge_context(
+                game_id=game,
+                conflicts=all_visible,
+                mod_list=[m.name for m in mods if m.enabled],
+                specs=specs,
+                user_query=None,
+            )
 
         # System impact + heaviest mods ranking: free for all tiers
         mod_names = [m.name for m in mods if m.enabled]
-        system_impact = get_system_impact(
-            mod_names=mod_names,
-            enabled_count=enabled_count,
-            specs=specs,
-        )
+        with stage("system_impact"):
+            system_impact = get_system_impact(
+                mod_names=mod_names,
+                enabled_count=enabled_count,
+                specs=specs,
+            )
 
         # Unified mod warnings (plugin limit, VRAM, etc.) with fix links
-        mod_warnings_list = get_mod_warnings(
-            mod_list_text=mod_list_text,
-            mod_list=mod_names,
-            game=game,
-            specs=specs,
-        )
-
-        # Consolidate conflicts for readability
-        all_conflicts = []
-        for c in err_list + warn_list + info_list:
-            all_conflicts.append(
-                {
-                    "affected_mod": getattr(c, "affected_mod", ""),
-                    "type": getattr(c, "type", "unknown"),
-                    "severity": (
-                        "critical" if c in err_list else "warning" if c in warn_list else "info"
-                    ),
-                    "message": str(getattr(c, "message", "")),
-                    "suggested_action": getattr(c, "suggested_action", ""),
-                    "related_mod": getattr(c, "related_mod", ""),
-                }
+        with stage("warnings"):
+            mod_warnings_list = get_mod_warnings(
+                mod_list_text=mod_list_text,
+                mod_list=mod_names,
+                game=game,
+                specs=specs,
             )
 
-        consolidated = consolidate_conflicts(all_conflicts)
+        # One pass builds the API lists, the flat list and the grouped view
+        with stage("consolidation"):
+            assembler = ConflictAssembler(nexus_slug, occurrence_counts=conflict_counts)
+            assembler.add_all(err_list, "error")
+            assembler.add_all(warn_list, "warning")
+            assembler.add_all(info_list, "info")
+            all_conflicts = assembler.flat
+            consolidated = assembler.consolidated()
 
         # Complete transparency tracking
         result = {
@@ -4699,86 +4763,99 @@ def analyze_mods():
             "conflicts": all_conflicts,
             "version_info": {"matched": True, "version": game_version} if game_version else {},
         }
-        metadata = complete_analysis(analysis_id, metadata, result)
+        metadata = complete_analysis(analysis_id, metadata, result, stages=timer.as_dict())
 
-        payload = {
-            "success": True,
-            "mod_count": len(mods),
-            "enabled_count": enabled_count,
-            "user_tier": user_tier,
-            "game": game,
-            "nexus_game_slug": NEXUS_GAME_SLUGS.get(game, "skyrimspecialedition"),
-            "conflicts": {
-                "errors": [safe_conflict_dict(c) for c in err_list],
-                "warnings": [safe_conflict_dict(c) for c in warn_list],
-                "info": [safe_conflict_dict(c) for c in info_list],
-            },
-            "consolidated": consolidated.to_dict(),  # NEW: Hierarchical conflict display
-            "metadata": metadata.to_dict(),  # NEW: Transparency data
-            "report": detector.format_report()
-            + (format_system_impact_report(system_impact) if system_impact else ""),
-            "summary": {
-                "total": len(err_list) + len(warn_list) + len(info_list),
-                "errors": len(err_list),
-                "warnings": len(warn_list),
-                "info": len(info_list),
-            },
-            "suggested_load_order": suggested_order,
-            "plugin_limit_warning": plugin_limit_warning,
-            "data_source": f"LOOT masterlist ({game_name})",
-            "masterlist_version": masterlist_ver,
-            "things_to_verify": things_to_verify,
-            "ai_context": (
-                detector.format_report_for_ai(
-                    game_name=game_name, nexus_slug=nexus_slug, specs=specs
-                )
-                + (("\n\n" + format_system_impact_for_ai(system_impact)) if system_impact else "")
-                + format_knowledge_for_ai(knowledge_ctx)
-            ),
-            "specs": specs,
-            "system_impact": system_impact,
-            "knowledge": knowledge_ctx,
-            "mod_warnings": mod_warnings_list,
-            # HAL+JSON style links for the analysis itself
-            "_links": {
-                "self": {"href": f"/api/analyze?game={game}", "title": "Analyze this mod list"},
-                "search": {
-                    "href": f"/api/search?game={game}&limit=10",
-                    "title": "Search mods for this game",
-                },
-                "build_list": {
-                    "href": "/api/build-list",
-                    "title": "Build a mod list for this game",
+        with stage("assemble"):
+            payload = {
+                "success": True,
+                "mod_count": len(mods),
+                "enabled_count": enabled_count,
+                "user_tier": user_tier,
+                "game": game,
+                "nexus_game_slug": NEXUS_GAME_SLUGS.get(game, "skyrimspecialedition"),
+                "conflicts": {
+                    "errors": assembler.by_severity["error"],
+                    "warnings": assembler.by_severity["warning"],
+                    "info": assembler.by_severity["info"],
                 },
-                "save_list": {"href": "/api/list-preferences", "title": "Save this mod list (Pro)"},
-                "solutions": {
-                    "href": f"/api/search-solutions?game={game}",
-                    "title": "Search for solutions to conflicts",
+                "consolidated": consolidated.to_dict(),  # NEW: Hierarchical conflict display
+                "metadata": metadata.to_dict(include_stages=_is_admin_email(user_email)),
+                "summary": {
+                    "total": len(err_list) + len(warn_list) + len(info_list),
+                    "errors": len(err_list),
+                    "warnings": len(warn_list),
+                    "info": len(info_list),
                 },
-                "community": {
-                    "href": "/api/community/posts?game=" + game,
-                    "title": "Community posts for this game",
+                "suggested_load_order": suggested_order,
+                "plugin_limit_warning": plugin_limit_warning,
+                "data_source": f"LOOT masterlist ({game_name})",
+                "masterlist_version": masterlist_ver,
+                "things_to_verify": things_to_verify,
+                "specs": specs,
+                "system_impact": system_impact,
+                "knowledge": knowledge_ctx,
+                "mod_warnings": mod_warnings_list,
+                # HAL+JSON style links for the analysis itself
+                "_links": {
+                    "self": {"href": f"/api/analyze?game={game}", "title": "Analyze this mod list"},
+                    "search": {
+                        "href": f"/api/search?game={game}&limit=10",
+                        "title": "Search mods for this game",
+                    },
+                    "build_list": {
+                        "href": "/api/build-list",
+                        "title": "Build a mod list for this game",
+                    },
+                    "save_list": {
+                        "href": "/api/list-preferences",
+                        "title": "Save this mod list (Pro)",
+                    },
+                    "solutions": {
+                        "href": f"/api/search-solutions?game={game}",
+                        "title": "Search for solutions to conflicts",
+                    },
+                    "community": {
+                        "href": "/api/community/posts?game=" + game,
+                        "title": "Community posts for this game",
+                    },
                 },
-            },
-        }
-        payload["next_actions"] = _build_next_actions(
-            game=game,
-            errors=payload["conflicts"]["errors"],
-            warnings=payload["conflicts"]["warnings"],
-            info=payload["conflicts"]["info"],
-            plugin_limit_warning=plugin_limit_warning,
-            mod_warnings_list=mod_warnings_list,
-            masterlist_version=masterlist_ver,
-            game_version=game_version or None,
-        )
-        if game_version:
-            payload["game_version"] = game_version
-            version_info = get_version_info(game, game_version)
-            if version_info:
-                payload["game_version_info"] = version_info
-            version_warn = get_version_warning(game, game_version)
-            if version_warn:
-                payload["game_version_warning"] = version_warn
+            }
+            # The text renderings are the priciest fields; skip them unless asked for
+            if fields is None or "report" in fields:
+                payload["report"] = detector.format_report() + (
+                    format_system_impact_report(system_impact) if system_impact else ""
+                )
+            if fields is None or "ai_context" in fields:
+                payload["ai_context"] = (
+                    detector.format_report_for_ai(
+                        game_name=game_name, nexus_slug=nexus_slug, specs=specs
+                    )
+                    + (
+                        ("\n\n" + format_system_impact_for_ai(system_impact))
+                        if system_impact
+                        else ""
+                    )
+                    + format_knowledge_for_ai(knowledge_ctx)
+                )
+            payload["next_actions"] = _build_next_actions(
+                game=game,
+                errors=payload["conflicts"]["errors"],
+                warnings=payload["conflicts"]["warnings"],
+                info=payload["conflicts"]["info"],
+                plugin_limit_warning=plugin_limit_warning,
+                mod_warnings_list=mod_warnings_list,
+                masterlist_version=masterlist_ver,
+                game_version=game_version or None,
+            )
+            if game_version:
+                payload["game_version"] = game_version
+                version_info = get_version_info(game, game_version)
+                if version_info:
+                    payload["game_version_info"] = version_info
+                version_warn = get_version_warning(game, game_version)
+                if version_warn:
+                    payload["game_version_warning"] = version_warn
+
         track_activity(
             "analyze",
             {
@@ -4791,12 +4868,36 @@ def analyze_mods():
             },
             user_email,
         )
-        return jsonify(payload)
+        with stage("serialization"):
+            response = jsonify(_project_fields(payload, fields))
+        return response
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
         return api_error("Analysis failed. Please try again or contact support.", 500)
 
 
+def _requested_fields(data: dict) -> Optional[set[str]]:
+    """
+    Top-level response keys requested via ?fields=a,b (or "fields" in the JSON body).
+
+    None means the full payload. "success" is always kept.
+    """
+    raw = request.args.get("fields") or data.get("fields")
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, list):
+        return None
+    fields = {str(name).strip() for name in raw if str(name).strip()}
+    return fields | {"success"} if fields else None
+
+
+def _project_fields(payload: dict, fields: Optional[set[str]]) -> dict:
+    """Keep only the requested top-level keys of a response payload."""
+    if fields is None:
+        return payload
+    return {key: value for key, value in payload.items() if key in fields}
+
+
 def _get_api_key_from_request():
     """Extract API key from Authorization: Bearer <key> or X-API-Key: <key>. Returns raw key or None."""
     auth = request.headers.get("Authorization")
@@ -4828,48 +4929,55 @@ def api_v1_analyze():
         game_raw = (data.get("game") or DEFAULT_GAME).lower().strip()
         allowed_ids = {g["id"] for g in SUPPORTED_GAMES}
         game = game_raw if game_raw in allowed_ids else DEFAULT_GAME
-        masterlist_version = (data.get("masterlist_version") or "").strip() or "latest"
-        try:
-            active_parser = LOOTParser(game_id=game)
-            active_parser.download_masterlist()
-        except Exception:
-            active_parser = LOOTParser(game_id=DEFAULT_GAME)
         nexus_slug = NEXUS_GAME_SLUGS.get(game, "skyrimspecialedition")
-        detector = ConflictDetector(active_parser, nexus_slug=nexus_slug)
-        detector.analyze_load_order(mods)
-        grouped = detector.get_conflicts_by_severity()
-        err_list = grouped.get("error", [])
-        warn_list = grouped.get("warning", [])
-        info_list = grouped.get("info", [])
-        enabled_count = sum(1 for m in mods if m.enabled)
-
-        def short_conflict(c):
-            return {
-                "severity": c.severity,
-                "type": getattr(c, "type", "unknown"),
-                "message": str(c.message or ""),
-                "affected_mod": c.affected_mod,
-                "suggested_action": c.suggested_action,
-            }
-
-        payload = {
-            "game": game,
-            "mod_count": len(mods),
-            "enabled_count": enabled_count,
-            "conflicts": [short_conflict(c) for c in err_list + warn_list + info_list],
-            "summary": {
-                "errors": len(err_list),
-                "warnings": len(warn_list),
-                "info": len(info_list),
-                "total": len(err_list) + len(warn_list) + len(info_list),
-            },
-        }
-        return jsonify(payload)
+        run_async = request.args.get("async", "").lower() in ("1", "true") or bool(
+            data.get("async")
+        )
+        if run_async or len(mods) > config.ANALYSIS_ASYNC_MOD_THRESHOLD:
+            try:
+                job = analysis_jobs.submit_job(
+                    mod_list_text,
+                    game,
+                    nexus_slug=nexus_slug,
+                    user_email=user_email,
+                    webhook_url=data.get("webhook_url"),
+                )
+            except ValidationError as e:
+                return api_error(e.message, 400)
+            status_url = url_for("api_v1_analyze_job", job_id=job["job_id"])
+            response = jsonify(
+                {
+                    "job_id": job["job_id"],
+                    "status": job["status"],
+                    "status_url": status_url,
+                }
+            )
+            response.status_code = 202
+            response.headers["Location"] = status_url
+            return response
+        payload = analysis_jobs.analyze_mod_list(mod_list_text, game, nexus_slug=nexus_slug)
+        return jsonify(_project_fields(payload, _requested_fields(data)))
     except Exception as e:
         logger.exception("API v1 analyze error: %s", e)
         return api_error("Analysis failed", 500)
 
 
+@app.route("/api/v1/analyze/jobs/<job_id>", methods=["GET"])
+@rate_limit(RATE_LIMIT_API, "api")
+def api_v1_analyze_job(job_id):
+    """Developer API: status, progress and (once complete) result of a queued analysis."""
+    raw_key = _get_api_key_from_request()
+    user_email = api_key_lookup(raw_key) if raw_key else None
+    if not user_email:
+        return api_error(
+            "Invalid or missing API key. Use Authorization: Bearer <key> or X-API-Key header.", 401
+        )
+    job = analysis_jobs.get_job(job_id)
+    if not job or job.get("user_email") != user_email:
+        return api_error("Job not found", 404)
+    return jsonify(analysis_jobs.job_status_payload(job))
+
+
 @app.route("/payment-success")
 def payment_success():
     """Handle successful payment return."""
@@ -5304,6 +5412,52 @@ def chat():
         return jsonify({"error": "Something went wrong. Please try again."}), 500
 
 
+@app.route("/api/scan-plugins", methods=["POST"])
+@rate_limit(RATE_LIMIT_ANALYZE, "scan-plugins")
+def scan_plugins_upload():
+    """
+    Scan uploaded plugin files for record-level overrides. Returns a plugin_scan report for /api/analyze.
+    Auth: logged-in session, or Authorization: Bearer <key> / X-API-Key: <key>.
+    """
+    if "user_email" not in session:
+        raw_key = _get_api_key_from_request()
+        if not (raw_key and api_key_lookup(raw_key)):
+            return api_error("Unauthorized", 401)
+    if (request.content_length or 0) > MAX_PLUGIN_UPLOAD_BYTES:
+        return api_error(
+            f"Upload too large (max {MAX_PLUGIN_UPLOAD_BYTES // (1024 * 1024)} MB). "
+            "Run plugin_scanner.py locally and send its report instead.",
+            413,
+        )
+    uploads = [
+        f
+        for f in request.files.getlist("plugins")
+        if f.filename.lower().endswith(PLUGIN_EXTENSIONS)
+    ]
+    if not uploads:
+        return api_error("No plugin files (.esp/.esm/.esl) uploaded", 400)
+    load_order = parse_load_order((request.form.get("load_order") or "").splitlines())
+
+    scans = {}
+    skipped = []
+    # Each upload is streamed to disk and memory-mapped, never read whole into memory.
+    with tempfile.TemporaryDirectory(prefix="plugin-scan-") as scan_dir:
+        for i, upload in enumerate(uploads[:MAX_PLUGIN_UPLOADS]):
+            name = os.path.basename(upload.filename)
+            path = os.path.join(scan_dir, f"{i}.plugin")
+            try:
+                upload.save(path)
+                scans[name.lower()] = scan_plugin(path, name)
+            except (InvalidPluginError, OSError, struct.error):
+                skipped.append(name)
+            finally:
+                upload.close()
+    ordered = order_plugins(list(scans), load_order or None)
+    report = build_report([scans[name] for name in ordered])
+    report["skipped"] = skipped
+    return jsonify(report)
+
+
 @app.route("/api/scan-game-folder", methods=["POST"])
 @rate_limit(RATE_LIMIT_ANALYZE, "scan-folder")
 def scan_game_folder():
@@ -5403,19 +5557,6 @@ def scan_game_folder():
 # -------------------------------------------------------------------
 # Dev Tools (Pro) — AI code analysis for mod authors
 # -------------------------------------------------------------------
-_DEV_RELEVANT_EXT = (
-    ".psc",
-    ".ini",
-    ".json",
-    ".toml",
-    ".yaml",
-    ".yml",
-    ".txt",
-    ".md",
-)  # text only; .esp/.esm/.esl are binary
-_DEV_RELEVANT_NAMES = ("readme", "license", "changelog", "fomod", "meta.ini", "moduleconfig")
-
-
 def _parse_github_url(url):
     """Extract owner/repo from GitHub URL. Returns (owner, repo) or None."""
     url = (url or "").strip()
@@ -5435,76 +5576,6 @@ def _parse_github_url(url):
     return None
 
 
-def _fetch_github_repo(owner, repo, max_files=25, max_bytes=400000):
-    """Fetch relevant text files from a public GitHub repo. Returns {path: content}."""
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    token = os.environ.get("GITHUB_TOKEN", "").strip()
-    if token:
-        headers["Authorization"] = f"token {token}"
-    base = f"https://api.github.com/repos/{owner}/{repo}"
-    files = {}
-    plugin_paths = []
-    total_bytes = 0
-
-    session = requests.Session()
-    session.headers.update(headers)
-
-    def is_relevant(name):
-        n = name.lower()
-        if any(n.endswith(e) for e in _DEV_RELEVANT_EXT):
-            return True
-        if any(r in n for r in _DEV_RELEVANT_NAMES):
-            return True
-        return False
-
-    def is_plugin(name):
-        return name.lower().endswith((".esp", ".esm", ".esl"))
-
-    def fetch_dir(path, depth=0):
-        nonlocal total_bytes
-        if depth > 3 or len(files) >= max_files or total_bytes >= max_bytes:
-            return
-        url = f"{base}/contents/{path}" if path else f"{base}/contents/"
-        try:
-            r = session.get(url, timeout=10)
-            r.raise_for_status()
-            items = r.json()
-            if not isinstance(items, list):
-                items = [items]
-            for item in items:
-                if len(files) >= max_files or total_bytes >= max_bytes:
-                    return
-                name = item.get("name") or ""
-                full_path = item.get("path") or (f"{path}/{name}".lstrip("/") if path else name)
-                if item.get("type") == "dir":
-                    fetch_dir(full_path, depth + 1)
-                elif item.get("type") == "file":
-                    if is_plugin(name):
-                        plugin_paths.append(full_path)
-                    elif is_relevant(name):
-                        dl = item.get("download_url")
-                        if dl:
-                            try:
-                                rr = session.get(dl, timeout=8)
-                                if rr.ok:
-                                    content = rr.text[:15000]
-                                    files[full_path] = content
-                                    total_bytes += len(content)
-                            except Exception:
-                                pass
-        except requests.RequestException:
-            pass
-
-    try:
-        fetch_dir("")
-    finally:
-        session.close()
-
-    if plugin_paths:
-        files["_plugins_list"] = "Plugin files (binary): " + ", ".join(plugin_paths[:30])
-    return files
-
-
 @app.route("/api/dev-analyze", methods=["POST"])
 @rate_limit(RATE_LIMIT_ANALYZE, "dev-analyze")
 def api_dev_analyze():
@@ -5525,7 +5596,7 @@ def api_dev_analyze():
         if not parsed:
             return jsonify({"error": "Invalid GitHub URL. Use https://github.com/owner/repo"}), 400
         try:
-            files_content = _fetch_github_repo(parsed[0], parsed[1])
+            files_content = fetch_github_repo(parsed[0], parsed[1])
         except Exception as e:
             logger.warning("Dev analyze GitHub fetch: %s", e)
             return jsonify({"error": "Could not fetch repo. Is it public?"}), 502
@@ -5734,8 +5805,9 @@ def api_track_sponsor_click():
     sponsor_service = get_sponsor_service()
 
     # Record click with fraud protection
-    is_valid, message = sponsor_service.record_click(
+    is_valid, message, _ = sponsor_service.record_click(
         sponsor_id=sponsor_id,
+        creative_id=data.get("creative_id"),
         user_id=session.get("user_email"),
         request=request,
     )
@@ -5747,6 +5819,16 @@ def api_track_sponsor_click():
     return jsonify({"success": True, "message": message})
 
 
+def _is_admin_email(email):
+    """True if email is listed in the ADMIN_EMAILS env var (comma-separated)."""
+    if not email:
+        return False
+    admin_emails = {
+        e.strip().lower() for e in os.environ.get("ADMIN_EMAILS", "").split(",") if e.strip()
+    }
+    return email.lower() in admin_emails
+
+
 @app.route("/admin/sponsors")
 def admin_sponsors():
     """
@@ -5761,10 +5843,7 @@ def admin_sponsors():
         return redirect(url_for("login", next="/admin/sponsors"))
 
     # Admin role check via env var
-    admin_emails = [
-        e.strip().lower() for e in os.environ.get("ADMIN_EMAILS", "").split(",") if e.strip()
-    ]
-    if session["user_email"].lower() not in admin_emails:
+    if not _is_admin_email(session["user_email"]):
         return redirect(url_for("index"))
 
     sponsor_service = get_sponsor_service()
@@ -7952,6 +8031,26 @@ def health():
     )
 
 
+@app.route("/metrics")
+def metrics():
+    """
+    Prometheus scrape endpoint: per-stage and per-request duration histograms.
+    With METRICS_TOKEN set, requires "Authorization: Bearer <token>"; otherwise
+    only admins and local scrapers may read it.
+    """
+    token = config.METRICS_TOKEN
+    if token:
+        supplied = request.headers.get("Authorization", "")
+        allowed = hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode())
+    else:
+        allowed = request.remote_addr in ("127.0.0.1", "::1") or _is_admin_email(
+            session.get("user_email")
+        )
+    if not allowed:
+        return Response("Forbidden\n", status=403, mimetype="text/plain")
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 # =============================================================================
 # OpenCLAW Learning & Telemetry API
 # =============================================================================
@@ -0,0 +1,211 @@
+"""
+Batch Compatibility Testing for SkyModderAI
+
+Lets a mod author test one mod against many load orders at once (e.g. the
+hundreds of popular lists they want to support before release).
+
+The author's mod is resolved against the masterlist once, and every load
+order is analyzed against the same parser with a shared lookup cache, so a
+mod that appears in most lists is only resolved (or fuzzy-matched) once.
+Large batches fan out over a process pool; each worker gets the parsed
+masterlist database once at start-up rather than re-reading it per order.
+
+Returns per-order results plus a rule matrix: which conflict rules involving
+the author's mod fire, against which other mods, in how many orders.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Union
+
+from conflict_detector import ConflictDetector, ModListEntry, parse_mod_list_text
+from loot_parser import LOOTParser, ModConflict
+
+logger = logging.getLogger(__name__)
+
+MAX_LOAD_ORDERS = 500
+PARALLEL_THRESHOLD = 64  # orders; below this, process start-up costs more than it saves
+MAX_WORKERS = 4
+
+# Per-process state for pool workers (set by _init_worker).
+_worker_parser: Optional[LOOTParser] = None
+_worker_cache: dict = {}
+
+
+def _to_entries(load_order: Union[str, list[str]]) -> list[ModListEntry]:
+    """Accept pasted text (any supported format) or a list of plugin names."""
+    if isinstance(load_order, str):
+        return parse_mod_list_text(load_order)
+    names = [str(n).strip() for n in load_order if str(n).strip()]
+    return [ModListEntry(name=name, position=i) for i, name in enumerate(names)]
+
+
+def _short_conflict(c: ModConflict) -> dict[str, Any]:
+    return {
+        "type": getattr(c, "type", "unknown"),
+        "severity": c.severity,
+        "message": str(c.message or ""),
+        "affected_mod": c.affected_mod,
+        "related_mod": c.related_mod,
+        "suggested_action": c.suggested_action,
+    }
+
+
+def _analyze_order(
+    parser: LOOTParser,
+    cache: dict,
+    mod_name: str,
+    mod_key: str,
+    load_order: Union[str, list[str]],
+) -> dict[str, Any]:
+    """Analyze one load order with the author's mod in it."""
+    mods = _to_entries(load_order)
+    added = not any(parser._normalize_name(m.name) == mod_key for m in mods)
+    if added:
+        mods.append(ModListEntry(name=mod_name, position=len(mods)))
+
+    detector = ConflictDetector(parser, shared_cache=cache)
+    conflicts = detector.analyze_load_order(mods)
+
+    involving = []
+    counts: Counter[str] = Counter()
+    for c in conflicts:
+        counts[c.severity] += 1
+        affected_is_mod = bool(c.affected_mod and parser._normalize_name(c.affected_mod) == mod_key)
+        related_is_mod = bool(c.related_mod and parser._normalize_name(c.related_mod) == mod_key)
+        if affected_is_mod or related_is_mod:
+            entry = _short_conflict(c)
+            entry["other_mod"] = c.related_mod if affected_is_mod else c.affected_mod
+            involving.append(entry)
+
+    severities = {c["severity"] for c in involving}
+    status = "error" if "error" in severities else "warning" if "warning" in severities else "ok"
+    return {
+        "mod_count": len(mods),
+        "added_mod": added,
+        "status": status,
+        "summary": {
+            "errors": counts["error"],
+            "warnings": counts["warning"],
+            "info": counts["info"],
+            "total": sum(counts.values()),
+        },
+        "mod_conflicts": involving,
+    }
+
+
+def _init_worker(game: str, version: str, mod_database: dict) -> None:
+    global _worker_parser, _worker_cache
+    parser = LOOTParser(game, version=version)
+    parser.mod_database = mod_database
+    _worker_parser = parser
+    _worker_cache = {}
+
+
+def _worker_analyze(args: tuple) -> dict[str, Any]:
+    mod_name, mod_key, load_order = args
+    assert _worker_parser is not None, "pool worker started without _init_worker"
+    return _analyze_order(_worker_parser, _worker_cache, mod_name, mod_key, load_order)
+
+
+def build_rule_matrix(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Count, per (rule type, other mod), how many load orders the rule fired in.
+
+    A rule that fires twice in one order counts once; sorted most common first.
+    """
+    fired: Counter = Counter()
+    severity: dict[tuple[str, str], str] = {}
+    for result in results:
+        seen = set()
+        for c in result["mod_conflicts"]:
+            key = (c["type"], c["other_mod"] or "")
+            if key in seen:
+                continue
+            seen.add(key)
+            fired[key] += 1
+            severity[key] = c["severity"]
+
+    total = len(results) or 1
+    return [
+        {
+            "type": rule_type,
+            "other_mod": other or None,
+            "severity": severity[(rule_type, other)],
+            "orders": count,
+            "share": round(count / total, 3),
+        }
+        for (rule_type, other), count in sorted(
+            fired.items(), key=lambda item: (-item[1], item[0][0], item[0][1].lower())
+        )
+    ]
+
+
+def run_batch_test(
+    mod_name: str,
+    load_orders: list[Union[str, list[str]]],
+    parser: LOOTParser,
+    names: Optional[list[str]] = None,
+    workers: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Test ``mod_name`` against every load order.
+
+    Args:
+        mod_name: The author's plugin; appended to orders that don't include it
+        load_orders: Pasted load-order text or lists of plugin names
+        parser: Loaded LOOT parser for the game (shared by every order)
+        names: Optional display names, one per load order
+        workers: Process count for large batches (1 forces in-process)
+
+    Returns:
+        {"mod", "resolved", "results": [...], "aggregate": {...}}
+    """
+    load_orders = list(load_orders)[:MAX_LOAD_ORDERS]
+    info = parser.get_mod_info(mod_name)
+    resolved_name = info.name if info else mod_name
+    mod_key = parser._normalize_name(resolved_name)
+
+    if workers is None:
+        workers = min(MAX_WORKERS, os.cpu_count() or 1)
+    results = None
+    if workers > 1 and len(load_orders) >= PARALLEL_THRESHOLD:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(parser.game, parser.version, parser.mod_database),
+            ) as pool:
+                tasks = [(resolved_name, mod_key, order) for order in load_orders]
+                chunk = max(1, len(tasks) // (workers * 4))
+                results = list(pool.map(_worker_analyze, tasks, chunksize=chunk))
+        except Exception as e:
+            logger.warning(f"Batch test pool failed, running in-process: {e}")
+            results = None
+    if results is None:
+        cache: dict = {}
+        results = [
+            _analyze_order(parser, cache, resolved_name, mod_key, order) for order in load_orders
+        ]
+
+    for i, result in enumerate(results):
+        label = names[i] if names and i < len(names) and names[i] else f"Load Order {i + 1}"
+        result["load_order_name"] = str(label)[:100]
+
+    statuses = Counter(r["status"] for r in results)
+    return {
+        "mod": mod_name,
+        "resolved": resolved_name if info else None,
+        "results": results,
+        "aggregate": {
+            "orders": len(results),
+            "orders_with_errors": statuses["error"],
+            "orders_with_warnings": statuses["warning"],
+            "clean_orders": statuses["ok"],
+            "rule_matrix": build_rule_matrix(results),
+        },
+    }
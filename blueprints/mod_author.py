@@ -25,7 +25,7 @@ from flask import (
 )
 
 from exceptions import AuthenticationError, ValidationError
-from security_utils import rate_limit
+from security_utils import rate_limit, validate_game_id
 
 if TYPE_CHECKING:
     pass
@@ -315,29 +315,32 @@ def batch_test() -> Any:
     results = None
     if request.method == "POST":
         try:
-            data = request.get_json() or request.form
+            data = request.get_json(silent=True) or request.form
             mod_name = data.get("mod_name", "").strip()
-            load_orders = data.get("load_orders", [])  # List of mod lists
+            load_orders: Any = data.get("load_orders", [])  # List of mod lists
+            if isinstance(load_orders, str):
+                # Form posts: one textarea, load orders separated by "---" lines
+                load_orders = [o for o in load_orders.split("\n---\n") if o.strip()]
 
-            if not mod_name or not load_orders:
+            if not mod_name or not load_orders or not isinstance(load_orders, list):
                 raise ValidationError("Mod name and load orders required")
 
-            # Perform batch analysis
-            from deterministic_analysis import analyze_load_order_deterministic
+            valid, game, error = validate_game_id(data.get("game") or "skyrimse")
+            if not valid:
+                raise ValidationError(error)
 
-            results = []
-            for i, load_order in enumerate(load_orders):
-                mod_list = load_order.split("\n") if isinstance(load_order, str) else load_order
-                analysis = analyze_load_order_deterministic(mod_list, "skyrimse")
-                results.append(
-                    {
-                        "load_order_name": f"Load Order {i + 1}",
-                        "analysis": analysis,
-                    }
-                )
+            # One parser and one lookup cache for the whole batch
+            from app import get_parser
+            from batch_compatibility import run_batch_test
+
+            raw_names = data.get("names")
+            # Blank names fall back to "Load Order N"
+            names = [str(n or "") for n in raw_names] if isinstance(raw_names, list) else None
+            batch = run_batch_test(mod_name, load_orders, get_parser(game), names=names)
+            results = batch["results"]
 
             if request.is_json:
-                return jsonify({"success": True, "results": results})
+                return jsonify({"success": True, **batch})
 
             return render_template("mod_author/batch_test.html", results=results, mod_name=mod_name)
 
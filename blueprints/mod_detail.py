@@ -12,6 +12,8 @@ from typing import TYPE_CHECKING, Any
 
 from flask import Blueprint, jsonify, render_template, request
 
+from security_utils import validate_game_id
+
 if TYPE_CHECKING:
     pass
 
@@ -39,15 +41,16 @@ def mod_page(mod_name: str) -> Any:
         (mod_name.lower(), game),
     ).fetchone()
 
-    # Get compatibility reports involving this mod
+    # Get compatibility reports involving this mod (via the mod → report index)
     reports = db.execute(
         """
-        SELECT * FROM compatibility_reports
-        WHERE (mod_a = ? OR mod_b = ?) AND game = ?
-        ORDER BY upvotes - downvotes DESC, created_at DESC
+        SELECT r.* FROM compatibility_report_mods m
+        JOIN compatibility_reports r ON r.id = m.report_id
+        WHERE m.mod_name = ? AND m.game = ?
+        ORDER BY r.upvotes - r.downvotes DESC, r.created_at DESC
         LIMIT 50
     """,
-        (mod_name.lower(), mod_name.lower(), game),
+        (mod_name.lower(), game),
     ).fetchall()
 
     # Get author info if verified
@@ -60,64 +63,19 @@ def mod_page(mod_name: str) -> Any:
         (mod_name.lower(), game),
     ).fetchone()
 
-    # Calculate statistics
-    total_reports = len(reports)
-    compatible_count = sum(1 for r in reports if r["status"] == "compatible")
-    incompatible_count = sum(1 for r in reports if r["status"] == "incompatible")
-    needs_patch_count = sum(1 for r in reports if r["status"] == "needs_patch")
+    # Counts, score, related mods and patches are precomputed per mod
+    from mod_summary_service import get_mod_summary
 
-    # Get related mods (mods that appear in reports with this mod)
-    related_mods = set()
-    for report in reports:
-        other_mod = report["mod_b"] if report["mod_a"] == mod_name.lower() else report["mod_a"]
-        related_mods.add(other_mod)
-
-    # Get patches for this mod
-    patches = db.execute(
-        """
-        SELECT DISTINCT
-            CASE WHEN mod_a = ? THEN mod_b ELSE mod_a END as patch_mod,
-            description
-        FROM compatibility_reports
-        WHERE (mod_a = ? OR mod_b = ?)
-        AND game = ?
-        AND status = 'needs_patch'
-        AND (description LIKE '%patch%' OR description LIKE '%compatibility%')
-        LIMIT 20
-    """,
-        (mod_name.lower(), mod_name.lower(), mod_name.lower(), game),
-    ).fetchall()
-
-    # Build compatibility score (0-100)
-    if total_reports > 0:
-        compatible_weight = compatible_count * 1.0
-        patch_weight = needs_patch_count * 0.5
-        incompatible_weight = incompatible_count * 0.0
-        total_weight = compatible_count + needs_patch_count + incompatible_count
-
-        # Weight by votes
-        weighted_score = 0
-        total_votes = 0
-        for report in reports:
-            vote_weight = (report["upvotes"] - report["downvotes"]) + 1
-            if report["status"] == "compatible":
-                weighted_score += vote_weight * 1.0
-            elif report["status"] == "needs_patch":
-                weighted_score += vote_weight * 0.5
-            total_votes += vote_weight
-
-        compatibility_score = (weighted_score / total_votes * 100) if total_votes > 0 else 50
-    else:
-        compatibility_score = 75  # Default score for mods with no reports
+    summary = get_mod_summary(mod_name, game)
 
     # Get load order rules if available
     loot_rules = db.execute(
         """
         SELECT * FROM loot_rules
-        WHERE mod_name = ? OR mod_name LIKE ?
+        WHERE mod_name = ?
         LIMIT 10
     """,
-        (mod_name.lower(), f"%{mod_name.lower()}%"),
+        (mod_name.lower(),),
     ).fetchall()
 
     response_data = {
@@ -127,16 +85,16 @@ def mod_page(mod_name: str) -> Any:
         "author_claim": dict(author_claim) if author_claim else None,
         "reports": [dict(r) for r in reports],
         "stats": {
-            "total_reports": total_reports,
-            "compatible": compatible_count,
-            "incompatible": incompatible_count,
-            "needs_patch": needs_patch_count,
-            "related_mods_count": len(related_mods),
-            "patches_count": len(patches),
+            "total_reports": summary["total_reports"],
+            "compatible": summary["compatible"],
+            "incompatible": summary["incompatible"],
+            "needs_patch": summary["needs_patch"],
+            "related_mods_count": summary["related_mods_count"],
+            "patches_count": len(summary["patches"]),
         },
-        "compatibility_score": round(compatibility_score, 1),
-        "related_mods": list(related_mods)[:20],
-        "patches": [dict(p) for p in patches],
+        "compatibility_score": summary["score"],
+        "related_mods": summary["related_mods"],
+        "patches": summary["patches"],
         "loot_rules": [dict(r) for r in loot_rules],
     }
 
@@ -164,12 +122,13 @@ def mod_compatibility_json(mod_name: str) -> Any:
     if include_reports:
         reports = db.execute(
             """
-            SELECT * FROM compatibility_reports
-            WHERE (mod_a = ? OR mod_b = ?) AND game = ?
-            ORDER BY upvotes - downvotes DESC
+            SELECT r.* FROM compatibility_report_mods m
+            JOIN compatibility_reports r ON r.id = m.report_id
+            WHERE m.mod_name = ? AND m.game = ?
+            ORDER BY r.upvotes - r.downvotes DESC
             LIMIT 100
         """,
-            (mod_name.lower(), mod_name.lower(), game),
+            (mod_name.lower(), game),
         ).fetchall()
 
     # Build compatibility matrix
@@ -229,41 +188,27 @@ def mod_embed_widget(mod_name: str) -> Any:
     """Embeddable compatibility widget for mod pages."""
     game = request.args.get("game", "skyrimse")
     theme = request.args.get("theme", "dark")  # dark, light
+    if theme not in ("dark", "light"):
+        theme = "dark"
+    valid, game, _ = validate_game_id(game)
+    if not valid:
+        game = "skyrimse"
+
+    from mod_summary_service import conditional_html_response, get_cached_embed
+
+    def render(summary: dict[str, Any]) -> str:
+        return render_template(
+            "mod_detail/embed.html",
+            mod_name=mod_name,
+            game=game,
+            score=summary["score"],
+            total_reports=summary["total_reports"],
+            compatible=summary["compatible"],
+            incompatible=summary["incompatible"],
+            needs_patch=summary["needs_patch"],
+            theme=theme,
+        )
 
-    from db import get_db
-
-    db = get_db()
-
-    # Get basic stats
-    stats = db.execute(
-        """
-        SELECT
-            COUNT(*) as total,
-            SUM(CASE WHEN status = 'compatible' THEN 1 ELSE 0 END) as compatible,
-            SUM(CASE WHEN status = 'incompatible' THEN 1 ELSE 0 END) as incompatible,
-            SUM(CASE WHEN status = 'needs_patch' THEN 1 ELSE 0 END) as needs_patch
-        FROM compatibility_reports
-        WHERE (mod_a = ? OR mod_b = ?) AND game = ?
-    """,
-        (mod_name.lower(), mod_name.lower(), game),
-    ).fetchone()
-
-    # Calculate score
-    total = stats["total"] or 0
-    if total > 0:
-        score = ((stats["compatible"] + stats["needs_patch"] * 0.5) / total) * 100
-    else:
-        score = 75
-
-    widget_data = {
-        "mod_name": mod_name,
-        "game": game,
-        "score": round(score, 1),
-        "total_reports": total,
-        "compatible": stats["compatible"] or 0,
-        "incompatible": stats["incompatible"] or 0,
-        "needs_patch": stats["needs_patch"] or 0,
-        "theme": theme,
-    }
-
-    return render_template("mod_detail/embed.html", **widget_data)
+    # Embedded on third-party pages: serve a cached fragment with validators
+    # so browsers and CDNs can absorb read spikes.
+    return conditional_html_response(get_cached_embed(mod_name, game, theme, render))
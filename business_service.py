@@ -12,7 +12,7 @@ from __future__ import annotations
 
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from db import get_db
@@ -20,6 +20,25 @@ from db import get_db
 logger = logging.getLogger(__name__)
 
 
+def _utcnow() -> datetime:
+    """Naive UTC now, comparable with SQLite CURRENT_TIMESTAMP values."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    """datetime from a TIMESTAMP column (sqlite returns text unless detect_types is set)."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class BusinessService:
     """Business directory service."""
 
@@ -41,6 +60,11 @@ class BusinessService:
         (85, 100, "flagship", "Exceptional standing"),
     ]
 
+    # Longevity score grows until a business is 12 months old
+    LONGEVITY_RAMP_DAYS = 365
+    # Businesses per grouped query (stays under SQLite's bound-parameter limit)
+    BATCH_SIZE = 500
+
     def register_business(
         self, data: dict[str, Any], owner_email: Optional[str] = None
     ) -> Optional[str]:
@@ -237,93 +261,194 @@ class BusinessService:
             return False
 
     def _recalculate_trust_score(self, business_id: str):
-        """Recalculate trust score for a business."""
+        """Recalculate trust score for a business (caller commits)."""
         try:
-            db = get_db()
-
-            # Get votes
-            votes = db.execute(
-                """
-                SELECT score, COUNT(*) as count
-                FROM business_votes
-                WHERE business_id = ?
-                GROUP BY score
-            """,
-                (business_id,),
-            ).fetchall()
-
-            total_votes = sum(v["count"] for v in votes)
-            positive_votes = sum(v["count"] for v in votes if v["score"] >= 4)
-
-            # Calculate vote score
-            vote_score = (positive_votes / total_votes) if total_votes > 0 else 0.5
-            vote_score *= min(1.0, total_votes / 100)  # Volume multiplier
-
-            # Get flags
-            flags = db.execute(
-                """
-                SELECT COUNT(*) as total, SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END) as open
-                FROM business_flags
-                WHERE business_id = ?
-            """,
-                (business_id,),
-            ).fetchone()
-
-            flag_penalty = (flags["open"] / flags["total"]) * 15 if flags["total"] > 0 else 0
-
-            # Get business age
-            business = db.execute(
-                """
-                SELECT created_at FROM businesses WHERE id = ?
-            """,
-                (business_id,),
-            ).fetchone()
+            self._apply_trust_scores(get_db(), [business_id])
+        except Exception as e:
+            logger.error(f"Failed to recalculate trust score: {e}")
 
-            months_active = ((datetime.now() - business["created_at"]).days / 30) if business else 0
-            longevity_score = min(1.0, months_active / 12)
+    def calculate_all_trust_scores(self, full: bool = False, db=None) -> dict[str, int]:
+        """
+        Batch-recalculate trust scores.
 
-            # Calculate composite score
-            composite = (
-                vote_score * self.WEIGHTS["community_votes"]
-                + 0.5 * self.WEIGHTS["sponsor_performance"]  # Placeholder
-                + 0.5 * self.WEIGHTS["participation"]  # Placeholder
-                + longevity_score * self.WEIGHTS["longevity"]
-            ) * 100
+        Only businesses whose inputs changed since their last calculation are
+        recomputed: new votes, new or reviewed flags, no score row yet, or
+        still inside the 12-month longevity ramp. full=True recomputes all.
 
-            composite = max(0, composite - flag_penalty)
+        Args:
+            full: Recompute every business, not just the changed ones
+            db: Connection to use (defaults to the request's)
 
-            # Assign tier
-            tier = "new"
-            for low, high, name, _ in self.TIERS:
-                if low <= composite < high:
-                    tier = name
-                    break
+        Returns:
+            {"candidates": businesses considered, "updated": scores written}
+        """
+        db = db or get_db()
+        business_ids = (
+            [row["id"] for row in db.execute("SELECT id FROM businesses").fetchall()]
+            if full
+            else self._dirty_business_ids(db)
+        )
+        updated = self._apply_trust_scores(db, business_ids)
+        db.commit()
+        logger.info(f"Trust scores recalculated: {updated} of {len(business_ids)} businesses")
+        return {"candidates": len(business_ids), "updated": updated}
+
+    def _dirty_business_ids(self, db) -> list[str]:
+        """Businesses with votes or flags newer than their last trust calculation."""
+        ramp_start = (_utcnow() - timedelta(days=self.LONGEVITY_RAMP_DAYS + 1)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        rows = db.execute(
+            """
+            SELECT v.business_id AS id
+            FROM business_votes v
+            LEFT JOIN business_trust_scores ts ON ts.business_id = v.business_id
+            WHERE ts.last_calculated IS NULL OR v.voted_at >= ts.last_calculated
+            UNION
+            SELECT f.business_id
+            FROM business_flags f
+            LEFT JOIN business_trust_scores ts ON ts.business_id = f.business_id
+            WHERE ts.last_calculated IS NULL
+               OR f.reported_at >= ts.last_calculated
+               OR f.reviewed_at >= ts.last_calculated
+            UNION
+            SELECT b.id
+            FROM businesses b
+            LEFT JOIN business_trust_scores ts ON ts.business_id = b.id
+            WHERE ts.business_id IS NULL OR b.created_at >= ?
+        """,
+            (ramp_start,),
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def _apply_trust_scores(self, db, business_ids: list[str]) -> int:
+        """Compute and upsert trust scores for business_ids in chunks. No commit."""
+        now = _utcnow()
+        updated = 0
+        for start in range(0, len(business_ids), self.BATCH_SIZE):
+            chunk = business_ids[start : start + self.BATCH_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+
+            votes = {
+                row["business_id"]: (row["total"], row["positive"] or 0)
+                for row in db.execute(
+                    f"""
+                    SELECT business_id, COUNT(*) as total,
+                           SUM(CASE WHEN score >= 4 THEN 1 ELSE 0 END) as positive
+                    FROM business_votes
+                    WHERE business_id IN ({placeholders})
+                    GROUP BY business_id
+                """,
+                    chunk,
+                ).fetchall()
+            }
+            flags = {
+                row["business_id"]: (row["total"], row["open"] or 0)
+                for row in db.execute(
+                    f"""
+                    SELECT business_id, COUNT(*) as total,
+                           SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END) as open
+                    FROM business_flags
+                    WHERE business_id IN ({placeholders})
+                    GROUP BY business_id
+                """,
+                    chunk,
+                ).fetchall()
+            }
+            created = {
+                row["id"]: row["created_at"]
+                for row in db.execute(
+                    f"SELECT id, created_at FROM businesses WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            }
 
-            # Update trust score
-            db.execute(
+            params = []
+            for business_id in chunk:
+                if business_id not in created:
+                    continue
+                total_votes, positive_votes = votes.get(business_id, (0, 0))
+                total_flags, open_flags = flags.get(business_id, (0, 0))
+                params.append(
+                    (business_id, total_flags)
+                    + self._score_components(
+                        total_votes,
+                        positive_votes,
+                        total_flags,
+                        open_flags,
+                        _parse_datetime(created[business_id]),
+                        now,
+                    )
+                )
+
+            db.executemany(
                 """
-                UPDATE business_trust_scores
-                SET trust_score = ?, trust_tier = ?, total_votes = ?, positive_votes = ?,
-                    community_vote_score = ?, longevity_score = ?, flag_penalty = ?,
+                INSERT INTO business_trust_scores (
+                    business_id, total_flags, trust_score, trust_tier, total_votes,
+                    positive_votes, community_vote_score, longevity_score, flag_penalty,
+                    last_calculated
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(business_id) DO UPDATE SET
+                    total_flags = excluded.total_flags,
+                    trust_score = excluded.trust_score,
+                    trust_tier = excluded.trust_tier,
+                    total_votes = excluded.total_votes,
+                    positive_votes = excluded.positive_votes,
+                    community_vote_score = excluded.community_vote_score,
+                    longevity_score = excluded.longevity_score,
+                    flag_penalty = excluded.flag_penalty,
                     last_calculated = CURRENT_TIMESTAMP
-                WHERE business_id = ?
             """,
-                (
-                    round(composite, 1),
-                    tier,
-                    total_votes,
-                    positive_votes,
-                    round(vote_score, 3),
-                    round(longevity_score, 3),
-                    round(flag_penalty, 1),
-                    business_id,
-                ),
+                params,
             )
-
-            db.commit()
-
-        except Exception as e:
-            logger.error(f"Failed to recalculate trust score: {e}")
+            updated += len(params)
+        return updated
+
+    def _score_components(
+        self,
+        total_votes: int,
+        positive_votes: int,
+        total_flags: int,
+        open_flags: int,
+        created_at: Optional[datetime],
+        now: datetime,
+    ) -> tuple[float, str, int, int, float, float, float]:
+        """(trust_score, tier, total_votes, positive_votes, vote_score, longevity, flag_penalty)."""
+        # Calculate vote score
+        vote_score = (positive_votes / total_votes) if total_votes > 0 else 0.5
+        vote_score *= min(1.0, total_votes / 100)  # Volume multiplier
+
+        flag_penalty = (open_flags / total_flags) * 15 if total_flags > 0 else 0
+
+        months_active = ((now - created_at).days / 30) if created_at else 0
+        longevity_score = min(1.0, months_active / 12)
+
+        # Calculate composite score
+        composite = (
+            vote_score * self.WEIGHTS["community_votes"]
+            + 0.5 * self.WEIGHTS["sponsor_performance"]  # Placeholder
+            + 0.5 * self.WEIGHTS["participation"]  # Placeholder
+            + longevity_score * self.WEIGHTS["longevity"]
+        ) * 100
+
+        composite = max(0, composite - flag_penalty)
+
+        # Assign tier
+        tier = "new"
+        for low, high, name, _ in self.TIERS:
+            if low <= composite < high:
+                tier = name
+                break
+
+        return (
+            round(composite, 1),
+            tier,
+            total_votes,
+            positive_votes,
+            round(vote_score, 3),
+            round(longevity_score, 3),
+            round(flag_penalty, 1),
+        )
 
     def get_trust_score(self, business_id: str) -> dict[str, Any]:
         """Get trust score for a business."""
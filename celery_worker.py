@@ -81,6 +81,11 @@ celery.conf.beat_schedule = {
         "task": "generate_weekly_reports",
         "schedule": crontab(minute=0, hour=0, day_of_week=0),  # Sunday midnight
     },
+    # Warm the mod image cache for frequently reported mods
+    "prefetch-mod-images": {
+        "task": "prefetch_mod_images",
+        "schedule": crontab(minute=30, hour="*/6"),
+    },
     # Calculate trust scores daily
     "calculate-trust-scores": {
         "task": "calculate_business_trust_scores",
@@ -176,42 +181,42 @@ def send_email_async(self, to: str, subject: str, body: str, html: bool = False)
 
 
 @celery.task(bind=True, max_retries=3)
-def analyze_mod_list_async(self, mod_list: list, game: str, user_email: str = None):
+def analyze_mod_list_async(self, job_id: str):
     """
-    Analyze mod list asynchronously.
+    Run a queued /api/v1/analyze job.
 
-    For 1M users: Queue all complex analyses, return job ID immediately.
-    User polls for results or gets webhook notification.
+    The job record (mod list, game, webhook) lives in the shared cache; the
+    result is stored under its content hash and the job marked complete or
+    failed. Callers poll /api/v1/analyze/jobs/<job_id>.
     """
-    from analysis_service import analyze_mod_list
+    from analysis_jobs import run_job
 
     try:
-        result = analyze_mod_list(mod_list, game)
-
-        # Store result for retrieval
-        from cache_service import get_cache
-
-        cache = get_cache()
-
-        result_key = f"analysis:{user_email}:{game}:{hash(str(mod_list))}"
-        cache.set(result_key, result, ttl=3600)  # 1 hour
-
-        logger.info(f"Analysis complete for {user_email}: {game}")
-        return {"success": True, "result_key": result_key}
+        job = run_job(job_id)
+        logger.info(f"Analysis job {job_id}: {job['status'] if job else 'expired'}")
+        return {"success": bool(job), "job_id": job_id}
 
     except Exception as e:
-        logger.error(f"Analysis failed: {e}")
+        logger.error(f"Analysis job {job_id} failed: {e}")
         raise self.retry(exc=e, countdown=60)
 
 
 @celery.task(bind=True, max_retries=3)
 def calculate_business_trust_scores(self):
-    """Calculate trust scores for all businesses."""
+    """Recalculate trust scores for businesses with new votes or flags."""
+    import sqlite3
+
     from business_service import get_business_service
 
     try:
         service = get_business_service()
-        result = service.calculate_all_trust_scores()
+        # No Flask app context here; use our own connection to the app database
+        conn = sqlite3.connect("users.db")
+        conn.row_factory = sqlite3.Row
+        try:
+            result = service.calculate_all_trust_scores(db=conn)
+        finally:
+            conn.close()
 
         logger.info(f"Trust scores calculated: {result}")
         return result
@@ -221,13 +226,31 @@ def calculate_business_trust_scores(self):
         raise self.retry(exc=e, countdown=300)
 
 
+@celery.task(bind=True, max_retries=3)
+def prefetch_mod_images(self):
+    """Resolve Nexus images for the most reported mods of each game."""
+    from mod_images import NEXUS_AVAILABLE, NEXUS_GAME_IDS, prefetch_popular_mod_images
+
+    if not NEXUS_AVAILABLE:
+        return {"skipped": "NEXUS_API_KEY not set"}
+
+    try:
+        fetched = {game: prefetch_popular_mod_images(game) for game in NEXUS_GAME_IDS}
+        logger.info(f"Mod images prefetched: {fetched}")
+        return fetched
+
+    except Exception as e:
+        logger.error(f"Mod image prefetch failed: {e}")
+        raise self.retry(exc=e, countdown=300)
+
+
 @celery.task(bind=True, max_retries=3)
 def generate_weekly_reports(self):
-    """Generate weekly analytics reports."""
-    from weekly_report import generate_report
+    """Generate weekly analytics reports from the daily rollups."""
+    from weekly_report import generate_weekly_report
 
     try:
-        report = generate_report()
+        report = generate_weekly_report()
         logger.info(f"Weekly report generated: {report}")
         return report
 
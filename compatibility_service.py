@@ -109,8 +109,26 @@ class CompatibilityService:
             )
 
             report_id = cursor.lastrowid
+
+            # Maintain the mod → report index used by per-mod feeds and pages
+            for mod_name in {mod_a.lower(), mod_b.lower()}:
+                db.execute(
+                    """
+                    INSERT INTO compatibility_report_mods (mod_name, game, report_id, created_at)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    (mod_name, game, report_id, now),
+                )
             db.commit()
 
+            from rss_service import invalidate_report_feeds
+
+            invalidate_report_feeds(mod_a, mod_b, game)
+
+            from mod_summary_service import refresh_report_mods
+
+            refresh_report_mods(mod_a, mod_b, game)
+
             logger.info(f"Compatibility report submitted: {mod_a} + {mod_b} = {status}")
             return report_id
 
@@ -201,6 +219,15 @@ class CompatibilityService:
                     )
 
             db.commit()
+
+            report = db.execute(
+                "SELECT mod_a, mod_b, game FROM compatibility_reports WHERE id = ?",
+                (report_id,),
+            ).fetchone()
+            if report:
+                from mod_summary_service import refresh_report_mods
+
+                refresh_report_mods(report["mod_a"], report["mod_b"], report["game"])
             return True
 
         except Exception as e:
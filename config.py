@@ -127,6 +127,15 @@ class Config:
     RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "10/1minute")
     RATE_LIMIT_API = os.getenv("RATE_LIMIT_API", "60/1minute")
 
+    # Async analysis jobs (/api/v1/analyze)
+    ANALYSIS_JOBS_BACKEND = os.getenv("ANALYSIS_JOBS_BACKEND", "thread")  # celery|thread|eager
+    ANALYSIS_JOBS_WORKERS = int(os.getenv("ANALYSIS_JOBS_WORKERS", 2))
+    ANALYSIS_ASYNC_MOD_THRESHOLD = int(os.getenv("ANALYSIS_ASYNC_MOD_THRESHOLD", 500))
+    ANALYSIS_WEBHOOK_SECRET = os.getenv("ANALYSIS_WEBHOOK_SECRET")
+
+    # Prometheus scrape endpoint (/metrics); unset = admin session or localhost only
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
     # Security Headers
     SESSION_COOKIE_SECURE = (
         os.getenv("SESSION_COOKIE_SECURE", str(FLASK_ENV == "production")).lower() == "true"
@@ -5,12 +5,13 @@ Analyzes user's mod list and detects conflicts, missing requirements, load order
 
 from __future__ import annotations
 
-import re
 from collections import defaultdict, deque
 from dataclasses import dataclass
 from typing import Optional
 
-from loot_parser import LOOTParser, ModConflict, ModInfo
+from loot_parser import LOOTParser, ModConflict, ModInfo, neutral_messages
+from pattern_matcher import PatternMatcher
+from stage_timing import stage
 
 
 @dataclass
@@ -134,53 +135,50 @@ _CROSS_GAME_HINTS = [
 ]
 
 
-def _neutralize_message(text: str) -> str:
-    """
-    Soften overly definitive LOOT language for clearer user-facing messages.
-    Keeps statements neutral: 'this may conflict if...' instead of 'You seem to be...'
-    """
-    if not text or not isinstance(text, str):
-        return text
-    t = text
-    # "You seem to be using X, but you have not enabled a compatibility patch..."
-    t = re.sub(
-        r"You seem to be using ([^,]+,) but you have not enabled a compatibility patch for this mod\.",
-        r"This may conflict if you have \1 a compatibility patch may be needed.",
-        t,
-        flags=re.I,
-    )
-    t = re.sub(r"\bYou seem to be using\b", "This may apply if you have", t, flags=re.I)
-    t = re.sub(r"\bIt appears you (do not|don\'t)\b", "You may want to check if", t, flags=re.I)
-    t = re.sub(r"\bYour installed version of\b", "The installed version of", t, flags=re.I)
-    t = re.sub(r"\bis not compatible\b", "may not be compatible", t, flags=re.I)
-    t = re.sub(
-        r"\bSome of this plugin\'s requirements seem to be missing\b",
-        "Some requirements may be missing for this plugin",
-        t,
-        flags=re.I,
+# One matcher per game; hints for a game keep their list order as priority.
+_CROSS_GAME_MATCHERS: dict[str, PatternMatcher[tuple[str, str]]] = {
+    game: PatternMatcher(
+        (
+            (pattern, (wrong_game, suggestion))
+            for gid, pattern, wrong_game, suggestion in _CROSS_GAME_HINTS
+            if gid == game
+        ),
+        literal=True,
+        flags=0,
     )
-    t = re.sub(r"\bA patch is required\b", "A patch may be required", t, flags=re.I)
-    t = re.sub(r"\bis required (?:for|to)\b", "may be required for", t, flags=re.I)
-    return t
+    for game in {hint[0] for hint in _CROSS_GAME_HINTS}
+}
 
 
 def _check_cross_game(mod_name: str, game_id: str) -> Optional[tuple]:
     """If mod appears to be from a different game, return (wrong_game_name, suggestion)."""
-    name_lower = mod_name.lower()
-    for gid, pattern, wrong_game, suggestion in _CROSS_GAME_HINTS:
-        if gid == game_id and pattern in name_lower:
-            return (wrong_game, suggestion)
-    return None
+    matcher = _CROSS_GAME_MATCHERS.get(game_id)
+    return matcher.first(mod_name.lower()) if matcher else None
 
 
 class ConflictDetector:
     """Detects conflicts in user's mod list"""
 
-    def __init__(self, parser: LOOTParser, nexus_slug: Optional[str] = None):
+    def __init__(
+        self,
+        parser: LOOTParser,
+        nexus_slug: Optional[str] = None,
+        shared_cache: Optional[dict] = None,
+    ):
+        """
+        Args:
+            parser: Loaded LOOT parser for the game
+            nexus_slug: Nexus game slug for links
+            shared_cache: Lookup cache reused across analyses (e.g. batch runs
+                against one parser). Without it, lookups are cached per analysis.
+        """
         self.parser = parser
         self.nexus_slug = nexus_slug or "skyrimspecialedition"
         self.conflicts: list[ModConflict] = []
-        self.mod_info_cache: dict[str, Optional[ModInfo]] = {}
+        self._shared_cache = shared_cache is not None
+        cache = shared_cache if shared_cache is not None else {}
+        self.mod_info_cache: dict[str, Optional[ModInfo]] = cache.setdefault("mod_info", {})
+        self._fuzzy_cache: dict[str, Optional[str]] = cache.setdefault("fuzzy", {})
 
     def _get_mod_info_cached(self, mod_name: str) -> Optional[ModInfo]:
         """Get mod info with caching to avoid repeated lookups."""
@@ -189,6 +187,12 @@ class ConflictDetector:
             self.mod_info_cache[key] = self.parser.get_mod_info(mod_name)
         return self.mod_info_cache[key]
 
+    def _get_fuzzy_suggestion_cached(self, mod_name: str) -> Optional[str]:
+        key = mod_name.lower()
+        if key not in self._fuzzy_cache:
+            self._fuzzy_cache[key] = self.parser.get_fuzzy_suggestion(mod_name)
+        return self._fuzzy_cache[key]
+
     def analyze_load_order(self, mod_list: list[ModListEntry]) -> list[ModConflict]:
         """
         Analyze a mod list and return all detected conflicts
@@ -200,111 +204,125 @@ class ConflictDetector:
             List of conflicts found
         """
         self.conflicts = []
-        self.mod_info_cache.clear()  # Clear cache for new analysis
+        if not self._shared_cache:
+            self.mod_info_cache.clear()  # Clear cache for new analysis
+            self._fuzzy_cache.clear()
 
         # Build lookup maps
         mod_positions = {mod.name.lower(): mod.position for mod in mod_list}
         enabled_mods = {mod.name.lower() for mod in mod_list if mod.enabled}
         mod_names_lower_to_original = {mod.name.lower(): mod.name for mod in mod_list}
 
-        game_id = getattr(self.parser, "game", "skyrimse")
-        for mod in mod_list:
-            if not mod.enabled:
-                continue
+        # Resolve every enabled name (and a suggestion for unknown ones) up front
+        with stage("resolve_names"):
+            for mod in mod_list:
+                if mod.enabled and self._get_mod_info_cached(mod.name) is None:
+                    self._get_fuzzy_suggestion_cached(mod.name)
+
+        with stage("detect_conflicts"):
+            game_id = getattr(self.parser, "game", "skyrimse")
+            for mod in mod_list:
+                if not mod.enabled:
+                    continue
+
+                # Check 0: Cross-game mod (e.g. LE mod in SE list)
+                cross = _check_cross_game(mod.name, game_id)
+                if cross:
+                    wrong_game, suggestion = cross
+                    self.conflicts.append(
+                        ModConflict(
+                            type="cross_game",
+                            severity="warning",
+                            message=f"**{mod.name}** looks like a **{wrong_game}** mod, but you selected a different game. {suggestion}",
+                            affected_mod=mod.name,
+                            suggested_action=suggestion,
+                        )
+                    )
 
-            # Check 0: Cross-game mod (e.g. LE mod in SE list)
-            cross = _check_cross_game(mod.name, game_id)
-            if cross:
-                wrong_game, suggestion = cross
-                self.conflicts.append(
-                    ModConflict(
-                        type="cross_game",
-                        severity="warning",
-                        message=f"**{mod.name}** looks like a **{wrong_game}** mod, but you selected a different game. {suggestion}",
-                        affected_mod=mod.name,
-                        suggested_action=suggestion,
+                # Get mod info from LOOT database (cached)
+                mod_info = self._get_mod_info_cached(mod.name)
+
+                if not mod_info:
+                    # Mod not in LOOT database - friendly note; suggest fuzzy match if any
+                    msg = f"We don't have **{mod.name}** in our database yet—it might be a custom or renamed mod."
+                    suggestion = self._get_fuzzy_suggestion_cached(mod.name)
+                    if suggestion:
+                        msg += f" Did you mean **{suggestion}**?"
+                    self.conflicts.append(
+                        ModConflict(
+                            type="unknown_mod", severity="info", message=msg, affected_mod=mod.name
+                        )
                     )
+                    continue
+
+                # Check 1: Missing requirements
+                self._check_requirements(
+                    mod.name, mod_info, enabled_mods, mod_names_lower_to_original
                 )
 
-            # Get mod info from LOOT database (cached)
-            mod_info = self._get_mod_info_cached(mod.name)
+                # Check 2: Incompatibilities
+                self._check_incompatibilities(
+                    mod.name, mod_info, enabled_mods, mod_names_lower_to_original
+                )
 
-            if not mod_info:
-                # Mod not in LOOT database - friendly note; suggest fuzzy match if any
-                msg = f"We don't have **{mod.name}** in our database yet—it might be a custom or renamed mod."
-                suggestion = self.parser.get_fuzzy_suggestion(mod.name)
-                if suggestion:
-                    msg += f" Did you mean **{suggestion}**?"
-                self.conflicts.append(
-                    ModConflict(
-                        type="unknown_mod", severity="info", message=msg, affected_mod=mod.name
-                    )
+                # Check 3: Load order violations
+                self._check_load_order(
+                    mod.name, mod_info, mod_positions, mod_names_lower_to_original
                 )
-                continue
 
-            # Check 1: Missing requirements
-            self._check_requirements(mod.name, mod_info, enabled_mods, mod_names_lower_to_original)
-
-            # Check 2: Incompatibilities
-            self._check_incompatibilities(
-                mod.name, mod_info, enabled_mods, mod_names_lower_to_original
-            )
-
-            # Check 3: Load order violations
-            self._check_load_order(mod.name, mod_info, mod_positions, mod_names_lower_to_original)
-
-            # Check 4: Patch available (user has both mods but not the patch)
-            for patch_entry in mod_info.patches:
-                if isinstance(patch_entry, dict):
-                    for other_mod, patch_name in patch_entry.items():
-                        other_clean = self.parser._normalize_name(other_mod)
-                        patch_clean = self.parser._normalize_name(patch_name)
-                        if other_clean in enabled_mods and patch_clean not in enabled_mods:
-                            orig_patch = mod_names_lower_to_original.get(patch_clean, patch_name)
-                            self.conflicts.append(
-                                ModConflict(
-                                    type="patch_available",
-                                    severity="warning",
-                                    message=f"**{mod.name}** and **{other_mod}** have a compatibility patch: **{orig_patch}**. Install and enable it for best results.",
-                                    affected_mod=mod.name,
-                                    suggested_action=f"Install and enable {orig_patch}",
-                                    related_mod=other_mod,
+                # Check 4: Patch available (user has both mods but not the patch)
+                for patch_entry in mod_info.patches:
+                    if isinstance(patch_entry, dict):
+                        for other_mod, patch_name in patch_entry.items():
+                            other_clean = self.parser._normalize_name(other_mod)
+                            patch_clean = self.parser._normalize_name(patch_name)
+                            if other_clean in enabled_mods and patch_clean not in enabled_mods:
+                                orig_patch = mod_names_lower_to_original.get(
+                                    patch_clean, patch_name
+                                )
+                                self.conflicts.append(
+                                    ModConflict(
+                                        type="patch_available",
+                                        severity="warning",
+                                        message=f"**{mod.name}** and **{other_mod}** have a compatibility patch: **{orig_patch}**. Install and enable it for best results.",
+                                        affected_mod=mod.name,
+                                        suggested_action=f"Install and enable {orig_patch}",
+                                        related_mod=other_mod,
+                                    )
                                 )
-                            )
 
-            # Check 5: Dirty edits (with game-specific xEdit links)
-            if mod_info.dirty_edits:
-                game_id = getattr(self.parser, "game", "skyrimse")
-                editor_name, editor_url = _XEDIT_LINKS.get(game_id, ("xEdit", _XEDIT_DOCS))
-                self.conflicts.append(
-                    ModConflict(
-                        type="dirty_edits",
-                        severity="warning",
-                        message=(
-                            f"**{mod.name}** has dirty edits. Cleaning it with "
-                            f"[{editor_name}]({editor_url}) or "
-                            f"[xEdit docs]({_XEDIT_DOCS}) "
-                            "can prevent subtle bugs—see the links for a short guide."
-                        ),
-                        affected_mod=mod.name,
-                        suggested_action=(
-                            f"Clean with [{editor_name}]({editor_url}) "
-                            f"or [xEdit](https://tes5edit.github.io/) — see the [cleaning guide]({_XEDIT_DOCS})."
-                        ),
+                # Check 5: Dirty edits (with game-specific xEdit links)
+                if mod_info.dirty_edits:
+                    game_id = getattr(self.parser, "game", "skyrimse")
+                    editor_name, editor_url = _XEDIT_LINKS.get(game_id, ("xEdit", _XEDIT_DOCS))
+                    self.conflicts.append(
+                        ModConflict(
+                            type="dirty_edits",
+                            severity="warning",
+                            message=(
+                                f"**{mod.name}** has dirty edits. Cleaning it with "
+                                f"[{editor_name}]({editor_url}) or "
+                                f"[xEdit docs]({_XEDIT_DOCS}) "
+                                "can prevent subtle bugs—see the links for a short guide."
+                            ),
+                            affected_mod=mod.name,
+                            suggested_action=(
+                                f"Clean with [{editor_name}]({editor_url}) "
+                                f"or [xEdit](https://tes5edit.github.io/) — see the [cleaning guide]({_XEDIT_DOCS})."
+                            ),
+                        )
                     )
-                )
 
-            # Check 6: LOOT messages (all from masterlist; softened for user-friendly tone)
-            for message in mod_info.messages:
-                neutral = _neutralize_message(message)
-                self.conflicts.append(
-                    ModConflict(
-                        type="info",
-                        severity="info",
-                        message=f"**{mod.name}**: {neutral}",
-                        affected_mod=mod.name,
+                # Check 6: LOOT messages (all from masterlist; softened for user-friendly tone)
+                for neutral in neutral_messages(mod_info):
+                    self.conflicts.append(
+                        ModConflict(
+                            type="info",
+                            severity="info",
+                            message=f"**{mod.name}**: {neutral}",
+                            affected_mod=mod.name,
+                        )
                     )
-                )
 
         return self.conflicts
 
@@ -22,6 +22,8 @@ MAX_SEARCH_QUERY_LENGTH = 200  # Maximum search query length
 MAX_LIST_NAME_LENGTH = 100  # Maximum saved list name length
 MAX_EMAIL_LENGTH = 254  # RFC 5321 compliant email length
 MAX_USER_AGENT_LENGTH = 512  # Maximum user agent string length
+MAX_PLUGIN_UPLOAD_BYTES = 256 * 1024 * 1024  # 256MB - /api/scan-plugins request body
+MAX_PLUGIN_UPLOADS = 500  # Maximum plugin files scanned per upload
 
 # =============================================================================
 # Rate Limits (per window)
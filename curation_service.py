@@ -2,6 +2,7 @@
 Curation Service - Daily intelligence curation for SkyModderAI.
 
 Handles:
+- Re-weighting stored reliability scores
 - Semantic clustering of new knowledge
 - Information compaction (duplicate removal)
 - Cross-linking related entries
@@ -16,14 +17,41 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from db import get_db_session
-from models import KnowledgeSource, TrashBinItem
+from models import (
+    KnowledgeCluster,
+    KnowledgeSource,
+    RollupWatermark,
+    SourceCredibility,
+    TrashBinItem,
+)
+from near_duplicates import (
+    JACCARD_THRESHOLD,
+    LSHIndex,
+    jaccard,
+    knowledge_text,
+    minhash,
+    shingles,
+    signature_from_bytes,
+    signature_to_bytes,
+)
+from reliability_weighter import DIMENSIONS, combine_dimensions, score_flags
+from semantic_clusters import MIN_SIMILARITY, build_index, kmeans, top_terms
 
 logger = logging.getLogger(__name__)
 
+# rollup_watermarks rows: highest knowledge_sources.id already processed
+COMPACTION_WATERMARK = "knowledge_compaction"
+CROSS_LINK_WATERMARK = "knowledge_cross_links"
+
+PAGE_SIZE = 1000  # rows per keyset page / bulk update
+MIN_CLUSTER_SIZE = 3
+DISCOVERY_MIN_SIZE = 5  # cluster members before its label becomes a subcategory
+
 
 def run_curation_pipeline() -> dict[str, Any]:
     """
@@ -31,7 +59,8 @@ def run_curation_pipeline() -> dict[str, Any]:
 
     Returns:
         {
-            "clustering": {"processed": int, "clusters_found": int},
+            "rescoring": {"processed": int, "updated": int},
+            "clustering": {"processed": int, "clusters_found": int, "reassigned": int},
             "compaction": {"duplicates_removed": int, "space_saved_bytes": int},
             "cross_linking": {"links_added": int},
             "trash_audit": {"reviewed": int, "deleted": int, "compacted": int},
@@ -41,6 +70,7 @@ def run_curation_pipeline() -> dict[str, Any]:
     logger.info("Starting curation pipeline...")
 
     results = {
+        "rescoring": run_credibility_rescore(),
         "clustering": run_semantic_clustering(),
         "compaction": run_information_compaction(),
         "cross_linking": run_cross_linking(),
@@ -52,82 +82,271 @@ def run_curation_pipeline() -> dict[str, Any]:
     return results
 
 
-def run_semantic_clustering() -> dict[str, Any]:
+def _iter_active_rows(session, *columns):
+    """Keyset-paged column rows of active sources, in id order."""
+    last_id = 0
+    while True:
+        rows = (
+            session.query(KnowledgeSource.id, *columns)
+            .filter(KnowledgeSource.status == "active", KnowledgeSource.id > last_id)
+            .order_by(KnowledgeSource.id)
+            .limit(PAGE_SIZE)
+            .all()
+        )
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+
+
+def run_semantic_clustering(session=None) -> dict[str, Any]:
     """
     Cluster related knowledge entries semantically.
 
-    Groups entries by:
-    - Game + version compatibility
-    - Mod name similarity
-    - Category/subcategory
-    - Shared tags
+    Active sources become TF-IDF vectors of their title and summary and are
+    clustered per game with mini-batch k-means (semantic_clusters). Members
+    must reach MIN_SIMILARITY to their centroid, and a cluster needs
+    MIN_CLUSTER_SIZE of them.
+
+    Last run's clusters seed the centroids, so cluster ids stay stable; the
+    id lives in KnowledgeSource.cluster_id and only sources whose cluster
+    changed are written.
 
     Returns:
-        {"processed": int, "clusters_found": int}
+        {"processed": int, "clusters_found": int, "reassigned": int}
     """
     logger.info("Running semantic clustering...")
 
-    session = get_db_session()
+    session = session or get_db_session()
 
     try:
-        # Get all active knowledge sources
-        sources = session.query(KnowledgeSource).filter(KnowledgeSource.status == "active").all()
-
-        # Group by game + category
-        clusters: dict[str, list[KnowledgeSource]] = {}
-        for source in sources:
-            key = f"{source.game}:{source.category or 'uncategorized'}"
-            if key not in clusters:
-                clusters[key] = []
-            clusters[key].append(source)
-
-        # Find sub-clusters by version compatibility
-        cluster_count = 0
-        for cluster_key, cluster_sources in clusters.items():
-            if len(cluster_sources) < 2:
+        ids: list[int] = []
+        games: list[str] = []
+        categories: list[Optional[str]] = []
+        previous: list[Optional[int]] = []
+
+        def texts():
+            for row in _iter_active_rows(
+                session,
+                KnowledgeSource.game,
+                KnowledgeSource.category,
+                KnowledgeSource.cluster_id,
+                KnowledgeSource.title,
+                KnowledgeSource.summary,
+            ):
+                ids.append(row.id)
+                games.append(row.game)
+                categories.append(row.category)
+                previous.append(row.cluster_id)
+                yield knowledge_text(row.title, row.summary)
+
+        index = build_index(texts())
+
+        existing = {cluster.id: cluster for cluster in session.query(KnowledgeCluster)}
+        by_game: dict[str, list[int]] = {}
+        for row, game in enumerate(games):
+            by_game.setdefault(game, []).append(row)
+
+        assigned: list[Optional[int]] = [None] * len(ids)
+        kept: set[int] = set()
+        for game, rows in by_game.items():
+            if len(rows) < MIN_CLUSTER_SIZE:
                 continue
 
-            # Group by version compatibility
-            version_groups: dict[str, list[KnowledgeSource]] = {}
-            for source in cluster_sources:
-                version_key = source.game_version or "any"
-                if version_key not in version_groups:
-                    version_groups[version_key] = []
-                version_groups[version_key].append(source)
-
-            # Mark clusters with 3+ related entries
-            for version_key, version_sources in version_groups.items():
-                if len(version_sources) >= 3:
-                    cluster_count += 1
-                    # Add cluster metadata
-                    for source in version_sources:
-                        if not source.tags:
-                            source.tags = "[]"
-                        tags = json.loads(source.tags)
-                        if "clustered" not in tags:
-                            tags.append("clustered")
-                            source.tags = json.dumps(tags)
+            # Last run's clusters (still in this game) start as centroids
+            seeds: dict[int, list[int]] = {}
+            for row in rows:
+                cluster_id = previous[row]
+                if cluster_id in existing and existing[cluster_id].game == game:
+                    seeds.setdefault(cluster_id, []).append(row)
+            seed_ids = sorted(seeds)
+
+            labels, similarity = kmeans(index, rows, [seeds[c] for c in seed_ids])
+            members: dict[int, list[int]] = {}
+            for row, label, score in zip(rows, labels, similarity):
+                if score >= MIN_SIMILARITY:
+                    members.setdefault(label, []).append(row)
+
+            for label, member_rows in sorted(members.items()):
+                if len(member_rows) < MIN_CLUSTER_SIZE:
+                    continue
+                if label < len(seed_ids):
+                    cluster = existing[seed_ids[label]]
+                else:
+                    cluster = KnowledgeCluster(game=game)
+                    session.add(cluster)
+                    session.flush()  # Get ID
+                    existing[cluster.id] = cluster
+                cluster.category = Counter(categories[r] for r in member_rows).most_common(1)[0][0]
+                cluster.label = "_".join(top_terms(index, member_rows)) or None
+                cluster.size = len(member_rows)
+                kept.add(cluster.id)
+                for row in member_rows:
+                    assigned[row] = cluster.id
+
+        updates = [
+            {"id": source_id, "cluster_id": cluster_id}
+            for source_id, old, cluster_id in zip(ids, previous, assigned)
+            if old != cluster_id
+        ]
+        for start in range(0, len(updates), PAGE_SIZE):
+            session.bulk_update_mappings(KnowledgeSource, updates[start : start + PAGE_SIZE])
+
+        # Dropped clusters, and archived sources still pointing at a cluster
+        for cluster_id in set(existing) - kept:
+            session.delete(existing[cluster_id])
+        session.query(KnowledgeSource).filter(
+            KnowledgeSource.status != "active", KnowledgeSource.cluster_id.isnot(None)
+        ).update({KnowledgeSource.cluster_id: None}, synchronize_session=False)
 
         session.commit()
 
-        result = {"processed": len(sources), "clusters_found": cluster_count}
+        result = {"processed": len(ids), "clusters_found": len(kept), "reassigned": len(updates)}
         logger.info(f"Semantic clustering complete: {result}")
         return result
 
     except Exception as e:
         logger.exception(f"Semantic clustering failed: {e}")
         session.rollback()
-        return {"processed": 0, "clusters_found": 0, "error": str(e)}
+        return {"processed": 0, "clusters_found": 0, "reassigned": 0, "error": str(e)}
 
 
-def run_information_compaction() -> dict[str, Any]:
+def run_credibility_rescore(session=None) -> dict[str, Any]:
+    """
+    Recombine stored dimension scores with the current DIMENSION_WEIGHTS.
+
+    Overall scores, confidences and flags of every SourceCredibility row are
+    recomputed page by page with reliability_weighter.combine_dimensions, so a
+    weighting change reaches the whole knowledge base without re-scoring the
+    sources. Only rows whose values changed are written.
+
+    Returns:
+        {"processed": int, "updated": int}
+    """
+    logger.info("Re-weighting credibility scores...")
+
+    session = session or get_db_session()
+
+    try:
+        processed = 0
+        updated = 0
+        last_id = 0
+        columns = [getattr(SourceCredibility, name) for name in DIMENSIONS]
+        while True:
+            rows = (
+                session.query(
+                    SourceCredibility.id,
+                    SourceCredibility.overall_score,
+                    SourceCredibility.confidence,
+                    SourceCredibility.flags,
+                    *columns,
+                )
+                .filter(SourceCredibility.id > last_id)
+                .order_by(SourceCredibility.id)
+                .limit(PAGE_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+            processed += len(rows)
+
+            # Unset dimensions count as unknown (0.5), as in ReliabilityScore
+            dimensions = {
+                name: [0.5 if getattr(row, name) is None else getattr(row, name) for row in rows]
+                for name in DIMENSIONS
+            }
+            overall, confidence = combine_dimensions(dimensions)
+            updates = []
+            for i, row in enumerate(rows):
+                flags = score_flags(
+                    dimensions["source_credibility"][i],
+                    dimensions["content_freshness"][i],
+                    dimensions["community_validation"][i],
+                    overall[i],
+                )
+                values = {
+                    "overall_score": float(overall[i]),
+                    "confidence": float(confidence[i]),
+                    "flags": json.dumps(flags) if flags else None,
+                }
+                if any(getattr(row, key) != value for key, value in values.items()):
+                    updates.append({"id": row.id, **values})
+            if updates:
+                session.bulk_update_mappings(SourceCredibility, updates)
+                updated += len(updates)
+
+        session.commit()
+
+        result = {"processed": processed, "updated": updated}
+        logger.info(f"Credibility re-weighting complete: {result}")
+        return result
+
+    except Exception as e:
+        logger.exception(f"Credibility re-weighting failed: {e}")
+        session.rollback()
+        return {"processed": 0, "updated": 0, "error": str(e)}
+
+
+def _credibility_score(source: KnowledgeSource) -> float:
+    if source.credibility:
+        return source.credibility.overall_score or 0.5
+    return 0.5
+
+
+def _load_signatures(session, rows) -> dict[int, tuple[int, ...]]:
+    """MinHash signatures by source id; computes and stores any that are missing."""
+    signatures: dict[int, tuple[int, ...]] = {}
+    missing: list[int] = []
+    for row in rows:
+        signature = signature_from_bytes(row.minhash)
+        if signature is None:
+            missing.append(row.id)
+        else:
+            signatures[row.id] = signature
+
+    # Sources ingested before signatures existed get one now
+    updates = []
+    for ids in _chunks(missing):
+        for text_row in session.query(
+            KnowledgeSource.id, KnowledgeSource.title, KnowledgeSource.summary
+        ).filter(KnowledgeSource.id.in_(ids)):
+            signature = minhash(shingles(knowledge_text(text_row.title, text_row.summary)))
+            signatures[text_row.id] = signature
+            updates.append({"id": text_row.id, "minhash": signature_to_bytes(signature)})
+    if updates:
+        session.bulk_update_mappings(KnowledgeSource, updates)
+    return signatures
+
+
+def _load_shingles(session, ids) -> dict[int, set[str]]:
+    result: dict[int, set[str]] = {}
+    for chunk in _chunks(sorted(ids)):
+        for row in session.query(
+            KnowledgeSource.id, KnowledgeSource.title, KnowledgeSource.summary
+        ).filter(KnowledgeSource.id.in_(chunk)):
+            result[row.id] = shingles(knowledge_text(row.title, row.summary))
+    return result
+
+
+def _chunks(ids: list[int], size: int = 500):
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def run_information_compaction(session=None, full: bool = False) -> dict[str, Any]:
     """
     Compact duplicate or near-duplicate entries.
 
-    Identifies duplicates by:
-    - Same source URL
-    - Same content hash
-    - Same title + game
+    Identifies duplicates within a game by title + summary: LSH over the
+    MinHash signatures stored at ingestion proposes candidates, and the exact
+    Jaccard similarity of their shingles (>= JACCARD_THRESHOLD) confirms
+    them. Exact copies always qualify.
+
+    Only sources added since the last run (the COMPACTION_WATERMARK row in
+    rollup_watermarks) are checked, against every active source; full=True
+    rechecks everything. Signatures are loaded without the source text, which
+    is read only for candidate pairs.
 
     Moves duplicates to trash bin, keeps best version (highest credibility).
 
@@ -136,37 +355,69 @@ def run_information_compaction() -> dict[str, Any]:
     """
     logger.info("Running information compaction...")
 
-    session = get_db_session()
+    session = session or get_db_session()
 
     try:
         duplicates_removed = 0
         space_saved = 0
 
-        # Group by content hash
-        hash_groups: dict[str, list[KnowledgeSource]] = {}
-        sources = (
-            session.query(KnowledgeSource)
-            .filter(KnowledgeSource.status == "active", KnowledgeSource.content_hash.isnot(None))
+        watermark = session.get(RollupWatermark, COMPACTION_WATERMARK)
+        if watermark is None:
+            watermark = RollupWatermark(name=COMPACTION_WATERMARK, last_id=0)
+            session.add(watermark)
+        since_id = 0 if full else (watermark.last_id or 0)
+
+        rows = (
+            session.query(KnowledgeSource.id, KnowledgeSource.game, KnowledgeSource.minhash)
+            .filter(KnowledgeSource.status == "active")
+            .order_by(KnowledgeSource.id)
             .all()
         )
-
-        for source in sources:
-            if source.content_hash not in hash_groups:
-                hash_groups[source.content_hash] = []
-            hash_groups[source.content_hash].append(source)
+        signatures = _load_signatures(session, rows)
+
+        # Candidate pairs: each new source against everything indexed before it
+        index = LSHIndex()
+        pairs: list[tuple[int, int]] = []
+        for row in rows:
+            signature = signatures[row.id]
+            if row.id > since_id:
+                pairs.extend((row.id, other) for other in index.query(signature, scope=row.game))
+            index.add(row.id, signature, scope=row.game)
+
+        # Verify candidates and group them (union-find)
+        parent: dict[int, int] = {}
+
+        def find(x: int) -> int:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        if pairs:
+            shingle_sets = _load_shingles(session, {i for pair in pairs for i in pair})
+            for a, b in pairs:
+                if jaccard(shingle_sets[a], shingle_sets[b]) >= JACCARD_THRESHOLD:
+                    parent[find(a)] = find(b)
+
+        groups: dict[int, list[int]] = {}
+        for source_id in parent:
+            groups.setdefault(find(source_id), []).append(source_id)
 
         # Process groups with duplicates
-        for content_hash, group in hash_groups.items():
-            if len(group) < 2:
+        for member_ids in groups.values():
+            if len(member_ids) < 2:
                 continue
 
-            # Sort by credibility (keep highest)
-            def get_credibility(source: KnowledgeSource) -> float:
-                if source.credibility:
-                    return source.credibility.overall_score or 0.5
-                return 0.5
+            group = (
+                session.query(KnowledgeSource)
+                .filter(KnowledgeSource.id.in_(member_ids))
+                .order_by(KnowledgeSource.id)
+                .all()
+            )
 
-            group.sort(key=get_credibility, reverse=True)
+            # Sort by credibility (keep highest)
+            group.sort(key=_credibility_score, reverse=True)
             keep = group[0]
             duplicates = group[1:]
 
@@ -194,6 +445,10 @@ def run_information_compaction() -> dict[str, Any]:
 
                 duplicates_removed += 1
 
+        if rows:
+            watermark.last_id = max(watermark.last_id or 0, rows[-1].id)
+            watermark.updated_at = datetime.now(timezone.utc)
+
         session.commit()
 
         result = {"duplicates_removed": duplicates_removed, "space_saved_bytes": space_saved}
@@ -206,7 +461,18 @@ def run_information_compaction() -> dict[str, Any]:
         return {"duplicates_removed": 0, "space_saved_bytes": 0, "error": str(e)}
 
 
-def run_cross_linking() -> dict[str, Any]:
+def _json_list(value: Optional[str]) -> list:
+    """Parse a JSON array column; anything else counts as empty."""
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def run_cross_linking(session=None, full: bool = False) -> dict[str, Any]:
     """
     Add cross-references between related entries.
 
@@ -216,72 +482,80 @@ def run_cross_linking() -> dict[str, Any]:
     - Share tags
     - Are in same category chain
 
+    Only pairs involving sources added since the last run (tracked by the
+    CROSS_LINK_WATERMARK row in rollup_watermarks) are considered; full=True
+    relinks everything. The linking columns are loaded in one query, links
+    are computed in memory and all changed rows are written in one bulk
+    update.
+
     Returns:
         {"links_added": int}
     """
     logger.info("Running cross-linking...")
 
-    session = get_db_session()
+    session = session or get_db_session()
 
     try:
-        links_added = 0
+        watermark = session.get(RollupWatermark, CROSS_LINK_WATERMARK)
+        if watermark is None:
+            watermark = RollupWatermark(name=CROSS_LINK_WATERMARK, last_id=0)
+            session.add(watermark)
+        since_id = 0 if full else (watermark.last_id or 0)
 
         # Get all active sources with requirements/compatibility info
-        sources = session.query(KnowledgeSource).filter(KnowledgeSource.status == "active").all()
+        rows = (
+            session.query(
+                KnowledgeSource.id,
+                KnowledgeSource.requires,
+                KnowledgeSource.conflicts_with,
+                KnowledgeSource.compatible_with,
+            )
+            .filter(KnowledgeSource.status == "active")
+            .order_by(KnowledgeSource.id)
+            .all()
+        )
 
-        # Build index by mod name
+        # Build index by mod name (requires and conflicts_with), ids ascending
         mod_index: dict[str, list[int]] = {}
-        for source in sources:
-            # Index by requires
-            if source.requires:
-                try:
-                    requires = json.loads(source.requires)
-                    for req in requires:
-                        if req not in mod_index:
-                            mod_index[req] = []
-                        mod_index[req].append(source.id)
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-            # Index by conflicts_with
-            if source.conflicts_with:
-                try:
-                    conflicts = json.loads(source.conflicts_with)
-                    for conflict in conflicts:
-                        if conflict not in mod_index:
-                            mod_index[conflict] = []
-                        mod_index[conflict].append(source.id)
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-        # Add cross-links
-        for mod_name, source_ids in mod_index.items():
-            if len(source_ids) < 2:
+        compatible_json: dict[int, Optional[str]] = {}
+        for row in rows:
+            compatible_json[row.id] = row.compatible_with
+            for mod_name in dict.fromkeys(
+                _json_list(row.requires) + _json_list(row.conflicts_with)
+            ):
+                mod_index.setdefault(mod_name, []).append(row.id)
+
+        # Each earlier source links to later sources sharing a mod; only new
+        # sources (id > since_id) can contribute pairs not linked on a prior run.
+        new_links: dict[int, dict[int, None]] = {}
+        for source_ids in mod_index.values():
+            if len(source_ids) < 2 or source_ids[-1] <= since_id:
                 continue
+            for i, id_b in enumerate(source_ids):
+                if id_b <= since_id:
+                    continue
+                for id_a in source_ids[:i]:
+                    new_links.setdefault(id_a, {})[id_b] = None
 
-            # Link all pairs
-            for i, id_a in enumerate(source_ids):
-                for id_b in source_ids[i + 1 :]:
-                    source_a = session.query(KnowledgeSource).get(id_a)
-                    source_b = session.query(KnowledgeSource).get(id_b)
-
-                    if not source_a or not source_b:
-                        continue
-
-                    # Add to compatible_with if not already linked
-                    if source_a.compatible_with:
-                        try:
-                            compatible = json.loads(source_a.compatible_with)
-                            if id_b not in compatible:
-                                compatible.append(id_b)
-                                source_a.compatible_with = json.dumps(compatible)
-                                links_added += 1
-                        except (json.JSONDecodeError, TypeError):
-                            source_a.compatible_with = json.dumps([id_b])
-                            links_added += 1
-                    else:
-                        source_a.compatible_with = json.dumps([id_b])
-                        links_added += 1
+        links_added = 0
+        updates = []
+        now = datetime.now(timezone.utc)
+        for id_a, targets in new_links.items():
+            compatible = _json_list(compatible_json[id_a])
+            existing = set(compatible)
+            added = [id_b for id_b in targets if id_b not in existing]
+            if not added:
+                continue
+            links_added += len(added)
+            updates.append(
+                {"id": id_a, "compatible_with": json.dumps(compatible + added), "updated_at": now}
+            )
+
+        if updates:
+            session.bulk_update_mappings(KnowledgeSource, updates)
+        if rows:
+            watermark.last_id = max(watermark.last_id or 0, rows[-1].id)
+            watermark.updated_at = now
 
         session.commit()
 
@@ -379,76 +653,63 @@ def run_trash_audit() -> dict[str, Any]:
         return {"reviewed": 0, "deleted": 0, "compacted": 0, "re_routed": 0, "error": str(e)}
 
 
-def run_category_discovery() -> dict[str, Any]:
+def run_category_discovery(session=None) -> dict[str, Any]:
     """
     Discover new categories from emerging patterns.
 
-    Analyzes:
-    - New tag combinations
-    - Emerging mod types
-    - User search patterns
-
-    Creates new subcategories when patterns are detected.
+    Reads the clusters found by run_semantic_clustering: a cluster of at
+    least DISCOVERY_MIN_SIZE sources is an emerging topic within its
+    category. Its label (top TF-IDF terms) becomes the subcategory of its
+    members in that category that don't have one yet.
 
     Returns:
         {"new_categories": int, "recategorized": int}
     """
     logger.info("Running category discovery...")
 
-    session = get_db_session()
+    session = session or get_db_session()
 
     try:
-        new_categories = 0
-        recategorized = 0
-
-        # Analyze existing categories
-        sources = (
-            session.query(KnowledgeSource)
-            .filter(KnowledgeSource.status == "active", KnowledgeSource.category.isnot(None))
+        clusters = (
+            session.query(KnowledgeCluster)
+            .filter(
+                KnowledgeCluster.size >= DISCOVERY_MIN_SIZE,
+                KnowledgeCluster.category.isnot(None),
+                KnowledgeCluster.label.isnot(None),
+            )
             .all()
         )
+        if not clusters:
+            return {"new_categories": 0, "recategorized": 0}
+
+        # Subcategories already in use, per category
+        known = {
+            (category, subcategory)
+            for category, subcategory in session.query(
+                KnowledgeSource.category, KnowledgeSource.subcategory
+            )
+            .filter(KnowledgeSource.subcategory.isnot(None))
+            .distinct()
+        }
 
-        # Group by category
-        category_sources: dict[str, list[KnowledgeSource]] = {}
-        for source in sources:
-            cat = source.category or "uncategorized"
-            if cat not in category_sources:
-                category_sources[cat] = []
-            category_sources[cat].append(source)
-
-        # Look for subcategory patterns in tags
-        for category, cat_sources in category_sources.items():
-            if len(cat_sources) < 10:
-                continue
-
-            # Count tag frequency
-            tag_counts: dict[str, int] = {}
-            for source in cat_sources:
-                if source.tags:
-                    try:
-                        tags = json.loads(source.tags)
-                        for tag in tags:
-                            if tag not in tag_counts:
-                                tag_counts[tag] = 0
-                            tag_counts[tag] += 1
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-
-            # Find dominant tags that could be subcategories
-            for tag, count in tag_counts.items():
-                if count >= len(cat_sources) * 0.3:  # 30%+ have this tag
-                    # This tag could be a subcategory
-                    # Check if subcategory already exists
-                    subcat_exists = any(s.subcategory == tag for s in cat_sources)
-
-                    if not subcat_exists:
-                        new_categories += 1
-                        # Update sources with this tag to use as subcategory
-                        for source in cat_sources:
-                            if source.tags and tag in json.loads(source.tags):
-                                if not source.subcategory:
-                                    source.subcategory = tag
-                                    recategorized += 1
+        new_categories = 0
+        recategorized = 0
+        for cluster in clusters:
+            updated = (
+                session.query(KnowledgeSource)
+                .filter(
+                    KnowledgeSource.cluster_id == cluster.id,
+                    KnowledgeSource.category == cluster.category,
+                    KnowledgeSource.status == "active",
+                    KnowledgeSource.subcategory.is_(None),
+                )
+                .update({KnowledgeSource.subcategory: cluster.label}, synchronize_session=False)
+            )
+            if updated:
+                recategorized += updated
+                if (cluster.category, cluster.label) not in known:
+                    known.add((cluster.category, cluster.label))
+                    new_categories += 1
 
         session.commit()
 
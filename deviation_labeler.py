@@ -8,28 +8,136 @@ Analyzes knowledge sources and flags approaches that:
 - Are novel but unverified
 
 This helps users understand risk levels and make informed decisions.
+
+The weekly run streams the knowledge base in keyset pages of plain columns
+instead of loading every source. The consensus check uses per-(game,
+category) counts of method keyword sets built in a first pass, the text
+checks run on a process pool for large pages, and each source stores a
+hash of its labeling inputs so unchanged sources are skipped.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from db import get_db_session
-from models import KnowledgeSource
+from models import KnowledgeSource, SourceCredibility
 
 logger = logging.getLogger(__name__)
 
-
-def analyze_deviations() -> dict[str, Any]:
+PAGE_SIZE = 1000  # sources read (and updated) per keyset page
+PARALLEL_THRESHOLD = 500  # changed sources in a page; below this, labeling stays in-process
+MAX_WORKERS = 4
+NOVEL_DAYS = 30
+# Bump when the rules below change so every source is relabeled
+RULES_VERSION = 1
+
+EXPERIMENTAL_KEYWORDS = [
+    "experimental",
+    "beta",
+    "wip",
+    "work in progress",
+    "unstable",
+    "use at own risk",
+    "not recommended",
+    "prototype",
+    "alpha",
+    "testing",
+]
+
+NONSTANDARD_PATTERNS = [
+    (r"script\s*extender\s+hook", "skse_hook"),
+    (r"memory\s+patch", "memory_patch"),
+    (r"dll\s+injection", "dll_injection"),
+    (r"engine\s+override", "engine_override"),
+    (r"unofficial\s+fix", "unofficial_fix"),
+    (r"hack", "code_hack"),
+    (r"workaround", "workaround"),
+]
+
+METHOD_KEYWORDS = [
+    "install",
+    "download",
+    "enable",
+    "disable",
+    "patch",
+    "merge",
+    "load order",
+    "skse",
+    "enb",
+    "replacer",
+    "modular",
+    "manual",
+    "automatic",
+    "mo2",
+    "vortex",
+]
+
+VERSION_KEYWORDS = [
+    "only works with",
+    "requires version",
+    "broken in",
+    "compatible with",
+    "version specific",
+    "ae only",
+    "se only",
+    "1.6.1170",
+    "1.5.97",
+    "next-gen",
+]
+
+
+def _keyword_pattern(keywords: list[str]) -> re.Pattern[str]:
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+# Compiled once; all matching is on lowercased text, like the keyword lists
+_EXPERIMENTAL_RE = _keyword_pattern(EXPERIMENTAL_KEYWORDS)
+_VERSION_RE = _keyword_pattern(VERSION_KEYWORDS)
+_NONSTANDARD_RES = [(re.compile(p, re.IGNORECASE), name) for p, name in NONSTANDARD_PATTERNS]
+# Lookahead so keywords overlapping an earlier match are still found
+_METHOD_RE = re.compile(f"(?=({_keyword_pattern(METHOD_KEYWORDS).pattern}))")
+_METHOD_BITS = {keyword: 1 << i for i, keyword in enumerate(METHOD_KEYWORDS)}
+
+# Columns the labeler reads; no ORM objects are loaded
+_ROW_COLUMNS = (
+    KnowledgeSource.id,
+    KnowledgeSource.title,
+    KnowledgeSource.summary,
+    KnowledgeSource.game,
+    KnowledgeSource.category,
+    KnowledgeSource.game_version,
+    KnowledgeSource.created_at,
+    KnowledgeSource.status,
+    KnowledgeSource.deviation_hash,
+    KnowledgeSource.credibility_id,
+    SourceCredibility.overall_score,
+    SourceCredibility.community_validation,
+    SourceCredibility.last_verified,
+)
+
+
+def analyze_deviations(
+    session=None, full: bool = False, workers: Optional[int] = None
+) -> dict[str, Any]:
     """
-    Analyze all knowledge sources for deviation flags.
+    Analyze active knowledge sources for deviation flags.
+
+    Sources whose labeling inputs are unchanged since their last run are
+    skipped unless full is set.
 
     Returns:
         {
             "analyzed": int,
+            "skipped": int,
             "deviations_found": int,
             "high_risk": int,
             "medium_risk": int,
@@ -38,45 +146,37 @@ def analyze_deviations() -> dict[str, Any]:
     """
     logger.info("Starting deviation analysis...")
 
-    session = get_db_session()
+    session = session or get_db_session()
+    result = {
+        "analyzed": 0,
+        "skipped": 0,
+        "deviations_found": 0,
+        "high_risk": 0,
+        "medium_risk": 0,
+        "low_risk": 0,
+    }
 
+    labeler = _Labeler(workers)
     try:
-        # Get all active knowledge sources
-        sources = session.query(KnowledgeSource).filter(KnowledgeSource.status == "active").all()
-
-        analyzed = 0
-        deviations_found = 0
-        high_risk = 0
-        medium_risk = 0
-        low_risk = 0
-
-        for source in sources:
-            analyzed += 1
-
-            # Analyze for deviations
-            deviation_flags, risk_level = analyze_source_deviations(source)
-
-            if deviation_flags:
-                deviations_found += 1
-                source.deviation_flags = json.dumps(deviation_flags)
-
-                if risk_level == "high":
-                    high_risk += 1
-                    source.is_standard_approach = False
-                elif risk_level == "medium":
-                    medium_risk += 1
-                else:
-                    low_risk += 1
-
-        session.commit()
+        groups = _method_groups(session)
+        now = datetime.now()
+        last_id = 0
+        while True:
+            rows = (
+                _row_query(session)
+                .filter(KnowledgeSource.status == "active", KnowledgeSource.id > last_id)
+                .order_by(KnowledgeSource.id)
+                .limit(PAGE_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
 
-        result = {
-            "analyzed": analyzed,
-            "deviations_found": deviations_found,
-            "high_risk": high_risk,
-            "medium_risk": medium_risk,
-            "low_risk": low_risk,
-        }
+            mappings = _label_rows(rows, groups, labeler, now, force=full, stats=result)
+            if mappings:
+                session.bulk_update_mappings(KnowledgeSource, mappings)
+            session.commit()
 
         logger.info(f"Deviation analysis complete: {result}")
         return result
@@ -86,84 +186,215 @@ def analyze_deviations() -> dict[str, Any]:
         session.rollback()
         return {
             "analyzed": 0,
+            "skipped": 0,
             "deviations_found": 0,
             "high_risk": 0,
             "medium_risk": 0,
             "low_risk": 0,
             "error": str(e),
         }
+    finally:
+        labeler.close()
+
 
+def _row_query(session):
+    return session.query(*_ROW_COLUMNS).outerjoin(
+        SourceCredibility, KnowledgeSource.credibility_id == SourceCredibility.id
+    )
 
-def analyze_source_deviations(source: KnowledgeSource) -> tuple[list[str], str]:
+
+def _method_groups(session, games: Optional[set[str]] = None) -> dict[tuple, Counter]:
     """
-    Analyze a single knowledge source for deviations.
+    Method keyword masks of active sources, counted per (game, category).
 
-    Args:
-        source: KnowledgeSource to analyze
+    This is everything the consensus check needs from the other sources, so
+    it is built once per run in keyset pages of (game, category, summary).
+    """
+    groups: dict[tuple, Counter] = {}
+    last_id = 0
+    while True:
+        query = session.query(
+            KnowledgeSource.id,
+            KnowledgeSource.game,
+            KnowledgeSource.category,
+            KnowledgeSource.summary,
+        ).filter(KnowledgeSource.status == "active", KnowledgeSource.id > last_id)
+        if games is not None:
+            query = query.filter(KnowledgeSource.game.in_(games))
+        rows = query.order_by(KnowledgeSource.id).limit(PAGE_SIZE).all()
+        if not rows:
+            return groups
+        last_id = rows[-1].id
+        for row in rows:
+            groups.setdefault((row.game, row.category), Counter())[_method_mask(row.summary)] += 1
+
+
+def _method_mask(text: Optional[str]) -> int:
+    mask = 0
+    for keyword in _METHOD_RE.findall(text.lower()) if text else ():
+        mask |= _METHOD_BITS[keyword]
+    return mask
+
+
+def _conflicts_with_group(mask: int, group: Optional[Counter], counted: bool = True) -> bool:
+    """
+    True if most other sources in the group use disjoint (non-empty) method sets.
 
-    Returns:
-        (deviation_flags, risk_level)
-        - deviation_flags: List of flags like ["experimental", "conflicts_consensus"]
-        - risk_level: "high", "medium", "low", or None
+    counted says whether the source itself is one of the group's counts.
     """
+    if not group:
+        return False
+    similar = sum(group.values()) - int(counted)
+    if similar <= 0:
+        return False
+    conflicts = sum(count for other, count in group.items() if mask and other and not mask & other)
+    return conflicts > similar * 0.5
+
+
+def _is_novel(
+    created_at: Optional[datetime],
+    has_credibility: bool,
+    validation: Optional[float],
+    now: datetime,
+) -> bool:
+    if not created_at:
+        return False
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if now - created_at > timedelta(days=NOVEL_DAYS):
+        return False
+    if not has_credibility:
+        return True
+    return validation is not None and validation < 0.3
+
+
+def _label_rows(
+    rows: list,
+    groups: dict[tuple, Counter],
+    labeler: _Labeler,
+    now: datetime,
+    force: bool,
+    stats: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Label changed rows, add their outcome to stats, and return update mappings."""
+    pending = []
+    for row in rows:
+        has_credibility = row.credibility_id is not None
+        inputs = (
+            row.title,
+            row.summary,
+            row.game_version,
+            _conflicts_with_group(
+                _method_mask(row.summary),
+                groups.get((row.game, row.category)),
+                counted=row.status == "active",
+            ),
+            _is_novel(row.created_at, has_credibility, row.community_validation, now),
+            row.overall_score if has_credibility and row.overall_score is not None else 0.5,
+            has_credibility and row.last_verified is not None,
+        )
+        fingerprint = hashlib.sha256(
+            json.dumps([RULES_VERSION, *inputs]).encode("utf-8")
+        ).hexdigest()
+        if not force and fingerprint == row.deviation_hash:
+            stats["skipped"] += 1
+            continue
+        pending.append((row.id, fingerprint, inputs))
+
+    labeled_at = datetime.now(timezone.utc)
+    mappings = []
+    for (source_id, fingerprint, _), (flags, risk_level) in zip(
+        pending, labeler.label([inputs for _, _, inputs in pending])
+    ):
+        stats["analyzed"] += 1
+        mapping = {
+            "id": source_id,
+            "deviation_hash": fingerprint,
+            "deviation_labeled_at": labeled_at,
+        }
+        if flags:
+            stats["deviations_found"] += 1
+            mapping["deviation_flags"] = json.dumps(flags)
+            if risk_level == "high":
+                stats["high_risk"] += 1
+                mapping["is_standard_approach"] = False
+            elif risk_level == "medium":
+                stats["medium_risk"] += 1
+            else:
+                stats["low_risk"] += 1
+        mappings.append(mapping)
+    return mappings
+
+
+class _Labeler:
+    """Runs _label_batch in-process, or on a process pool for large batches."""
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self.workers = min(MAX_WORKERS, os.cpu_count() or 1) if workers is None else workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def label(self, items: list[tuple]) -> list[tuple[list[str], Optional[str]]]:
+        if self.workers > 1 and len(items) >= PARALLEL_THRESHOLD:
+            try:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                size = max(1, len(items) // (self.workers * 4))
+                chunks = [items[i : i + size] for i in range(0, len(items), size)]
+                return [r for chunk in self._pool.map(_label_batch, chunks) for r in chunk]
+            except Exception as e:
+                logger.warning(f"Deviation labeling pool failed, running in-process: {e}")
+                self.close()
+                self.workers = 1
+        return _label_batch(items)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def _label_batch(items: list[tuple]) -> list[tuple[list[str], Optional[str]]]:
+    return [_label(*item) for item in items]
+
+
+def _label(
+    title: Optional[str],
+    summary: Optional[str],
+    game_version: Optional[str],
+    conflicting: bool,
+    novel: bool,
+    cred_score: float,
+    verified: bool,
+) -> tuple[list[str], Optional[str]]:
+    """Deviation flags and risk level from a source's text and precomputed checks."""
     flags = []
     risk_score = 0
 
-    # Get credibility score for context
-    credibility = source.credibility
-    cred_score = credibility.overall_score if credibility else 0.5
+    text = f"{title} {summary}".lower()
 
     # 1. Check for experimental keywords
-    experimental_keywords = [
-        "experimental",
-        "beta",
-        "wip",
-        "work in progress",
-        "unstable",
-        "use at own risk",
-        "not recommended",
-        "prototype",
-        "alpha",
-        "testing",
-    ]
-
-    text = f"{source.title} {source.summary}".lower()
-    for keyword in experimental_keywords:
-        if keyword in text:
-            flags.append("experimental")
-            risk_score += 2
-            break
+    if _EXPERIMENTAL_RE.search(text):
+        flags.append("experimental")
+        risk_score += 2
 
     # 2. Check for non-standard techniques
-    nonstandard_patterns = [
-        (r"script\s*extender\s+hook", "skse_hook"),
-        (r"memory\s+patch", "memory_patch"),
-        (r"dll\s+injection", "dll_injection"),
-        (r"engine\s+override", "engine_override"),
-        (r"unofficial\s+fix", "unofficial_fix"),
-        (r"hack", "code_hack"),
-        (r"workaround", "workaround"),
-    ]
-
-    for pattern, flag_name in nonstandard_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
+    for pattern, flag_name in _NONSTANDARD_RES:
+        if pattern.search(text):
             flags.append(f"non_standard_{flag_name}")
             risk_score += 1
 
     # 3. Check for conflicts with consensus
-    # If multiple sources exist for same topic with different approaches
-    conflicting_approaches = check_conflicting_approaches(source)
-    if conflicting_approaches:
+    if conflicting:
         flags.append("conflicts_consensus")
         risk_score += 2
 
     # 4. Check for novel techniques (new, unverified)
-    if is_novel_technique(source):
+    if novel:
         flags.append("novel_technique")
         risk_score += 1
 
     # 5. Check for version-specific issues
-    if has_version_issues(source):
+    if game_version and _VERSION_RE.search(text):
         flags.append("version_sensitive")
         risk_score += 1
 
@@ -176,7 +407,7 @@ def analyze_source_deviations(source: KnowledgeSource) -> tuple[list[str], str]:
         risk_score += 1
 
     # 7. Check for missing verification
-    if not source.credibility or not source.credibility.last_verified:
+    if not verified:
         flags.append("unverified")
         risk_score += 1
 
@@ -190,50 +421,58 @@ def analyze_source_deviations(source: KnowledgeSource) -> tuple[list[str], str]:
     else:
         risk_level = None
 
-    # Remove duplicates
-    flags = list(set(flags))
-
     return flags, risk_level
 
 
+def analyze_source_deviations(source: KnowledgeSource) -> tuple[list[str], Optional[str]]:
+    """
+    Analyze a single knowledge source for deviations.
+
+    Args:
+        source: KnowledgeSource to analyze
+
+    Returns:
+        (deviation_flags, risk_level)
+        - deviation_flags: List of flags like ["experimental", "conflicts_consensus"]
+        - risk_level: "high", "medium", "low", or None
+    """
+    # Get credibility score for context
+    credibility = source.credibility
+    cred_score = credibility.overall_score if credibility else 0.5
+
+    return _label(
+        source.title,
+        source.summary,
+        source.game_version,
+        # If multiple sources exist for same topic with different approaches
+        check_conflicting_approaches(source),
+        is_novel_technique(source),
+        cred_score,
+        bool(credibility and credibility.last_verified),
+    )
+
+
 def check_conflicting_approaches(source: KnowledgeSource) -> bool:
     """
     Check if this source conflicts with established consensus.
 
     Looks for other sources on same topic with different approaches.
     """
-    session = get_db_session()
-
     try:
+        session = get_db_session()
+
         # Find similar sources in same category
-        similar = (
-            session.query(KnowledgeSource)
-            .filter(
-                KnowledgeSource.game == source.game,
-                KnowledgeSource.category == source.category,
-                KnowledgeSource.id != source.id,
-                KnowledgeSource.status == "active",
-            )
-            .all()
+        summaries = session.query(KnowledgeSource.summary).filter(
+            KnowledgeSource.game == source.game,
+            KnowledgeSource.category == source.category,
+            KnowledgeSource.id != source.id,
+            KnowledgeSource.status == "active",
         )
-
-        if not similar:
-            return False
-
-        # Check for conflicting recommendations
-        source_methods = extract_methods(source.summary)
-
-        conflicts = 0
-        for other in similar:
-            other_methods = extract_methods(other.summary)
-
-            # If methods are different, count as conflict
-            if source_methods and other_methods:
-                if not source_methods.intersection(other_methods):
-                    conflicts += 1
+        group = Counter(_method_mask(summary) for (summary,) in summaries)
+        group[_method_mask(source.summary)] += 1
 
         # Conflict if >50% of similar sources use different methods
-        return conflicts > len(similar) * 0.5
+        return _conflicts_with_group(_method_mask(source.summary), group)
 
     except Exception as e:
         logger.debug(f"Error checking conflicting approaches: {e}")
@@ -242,32 +481,7 @@ def check_conflicting_approaches(source: KnowledgeSource) -> bool:
 
 def extract_methods(text: str) -> set:
     """Extract method keywords from text."""
-    methods = set()
-
-    method_keywords = [
-        "install",
-        "download",
-        "enable",
-        "disable",
-        "patch",
-        "merge",
-        "load order",
-        "skse",
-        "enb",
-        "replacer",
-        "modular",
-        "manual",
-        "automatic",
-        "mo2",
-        "vortex",
-    ]
-
-    text_lower = text.lower()
-    for keyword in method_keywords:
-        if keyword in text_lower:
-            methods.add(keyword)
-
-    return methods
+    return set(_METHOD_RE.findall(text.lower()))
 
 
 def is_novel_technique(source: KnowledgeSource) -> bool:
@@ -279,25 +493,13 @@ def is_novel_technique(source: KnowledgeSource) -> bool:
     - Low community validation
     - Unique approach
     """
-    if not source.created_at:
-        return False
-
-    from datetime import datetime, timedelta
-
-    # Check age
-    age = datetime.now() - source.created_at
-    if age > timedelta(days=30):
-        return False
-
-    # Check community validation
     credibility = source.credibility
-    if not credibility:
-        return True
-
-    if credibility.community_validation < 0.3:
-        return True
-
-    return False
+    return _is_novel(
+        source.created_at,
+        credibility is not None,
+        credibility.community_validation if credibility else None,
+        datetime.now(),
+    )
 
 
 def has_version_issues(source: KnowledgeSource) -> bool:
@@ -311,26 +513,7 @@ def has_version_issues(source: KnowledgeSource) -> bool:
     """
     if not source.game_version:
         return False
-
-    version_keywords = [
-        "only works with",
-        "requires version",
-        "broken in",
-        "compatible with",
-        "version specific",
-        "ae only",
-        "se only",
-        "1.6.1170",
-        "1.5.97",
-        "next-gen",
-    ]
-
-    text = f"{source.title} {source.summary}".lower()
-    for keyword in version_keywords:
-        if keyword in text:
-            return True
-
-    return False
+    return bool(_VERSION_RE.search(f"{source.title} {source.summary}".lower()))
 
 
 def get_deviation_warning(deviation_flags: list[str]) -> Optional[dict[str, Any]]:
@@ -422,7 +605,7 @@ def format_deviation_for_ui(deviation_flags: list[str]) -> Optional[str]:
     return md
 
 
-def batch_label_deviations(source_ids: list[int]) -> dict[str, Any]:
+def batch_label_deviations(source_ids: list[int], session=None) -> dict[str, Any]:
     """
     Batch label multiple sources for deviations.
 
@@ -436,30 +619,35 @@ def batch_label_deviations(source_ids: list[int]) -> dict[str, Any]:
             "errors": int
         }
     """
-    session = get_db_session()
+    session = session or get_db_session()
 
     try:
         processed = 0
         labeled = 0
         errors = 0
-
-        for source_id in source_ids:
-            try:
-                source = session.query(KnowledgeSource).get(source_id)
-                if not source:
-                    errors += 1
-                    continue
-
-                flags, _ = analyze_source_deviations(source)
-                if flags:
-                    source.deviation_flags = json.dumps(flags)
-                    labeled += 1
-
-                processed += 1
-
-            except Exception as e:
-                logger.debug(f"Error labeling source {source_id}: {e}")
-                errors += 1
+        ids = list(dict.fromkeys(source_ids))
+
+        stats = Counter()
+        labeler = _Labeler()
+        try:
+            for start in range(0, len(ids), PAGE_SIZE):
+                chunk = ids[start : start + PAGE_SIZE]
+                rows = _row_query(session).filter(KnowledgeSource.id.in_(chunk)).all()
+                errors += len(chunk) - len(rows)
+                processed += len(rows)
+
+                groups = _method_groups(session, games={row.game for row in rows})
+                mappings = _label_rows(
+                    rows, groups, labeler, datetime.now(), force=True, stats=stats
+                )
+                # Risk handling (is_standard_approach) is left to the full analysis
+                for mapping in mappings:
+                    mapping.pop("is_standard_approach", None)
+                if mappings:
+                    session.bulk_update_mappings(KnowledgeSource, mappings)
+                labeled += sum("deviation_flags" in m for m in mappings)
+        finally:
+            labeler.close()
 
         session.commit()
 
@@ -177,6 +177,18 @@ class InvalidModListError(ValidationError):
         super().__init__(message, error_code, details)
 
 
+class InvalidPluginError(ValidationError):
+    """Raised when a plugin file can't be parsed."""
+
+    def __init__(
+        self,
+        message: str = "Invalid plugin file",
+        error_code: str = "INVALID_PLUGIN",
+        details: Optional[dict[str, Any]] = None,
+    ):
+        super().__init__(message, error_code, details)
+
+
 class InputTooLargeError(ValidationError):
     """Raised when input exceeds size limits."""
 
@@ -0,0 +1,206 @@
+"""
+GitHub Repository Fetcher for SkyModderAI
+
+Pulls the relevant text files of a public mod repo for /api/dev-analyze.
+
+One call resolves HEAD to a commit SHA and one recursive Git Trees call
+lists every file, so relevant files are chosen up front instead of by
+walking directories. Chosen files are downloaded concurrently from the raw
+host under a total time and byte budget. Results are cached by
+(owner, repo, sha), so re-analyzing an unchanged repo costs a single request.
+
+API and raw hosts are parameters so tests can point at a local server.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API = "https://api.github.com"
+GITHUB_RAW = "https://raw.githubusercontent.com"
+CACHE_TTL = 86400  # commits are immutable; TTL only bounds cache size
+MAX_FILE_BYTES = 15000
+DOWNLOAD_WORKERS = 8
+
+RELEVANT_NAMES = ("readme", "license", "changelog", "fomod", "meta.ini", "moduleconfig")
+# Earlier extensions are more useful to the analysis and are fetched first.
+RELEVANT_EXTENSIONS = (
+    ".psc",
+    ".ini",
+    ".json",
+    ".toml",
+    ".yaml",
+    ".yml",
+    ".txt",
+    ".md",
+)  # text only; .esp/.esm/.esl are binary
+PLUGIN_EXTENSIONS = (".esp", ".esm", ".esl")
+
+
+def _file_priority(path: str) -> Optional[int]:
+    """Rank a path for download; None if it isn't worth fetching."""
+    lower = path.lower()
+    name = lower.rsplit("/", 1)[-1]
+    if any(r in name for r in RELEVANT_NAMES):
+        return 0
+    for rank, ext in enumerate(RELEVANT_EXTENSIONS, start=1):
+        if name.endswith(ext):
+            return rank
+    return None
+
+
+def select_files(
+    tree: list[dict], max_files: int = 25, max_bytes: int = 400000
+) -> tuple[list[str], list[str]]:
+    """
+    Choose which blobs to download from a Git Trees listing.
+
+    Returns (paths_to_fetch, plugin_paths). Files are ranked by relevance,
+    then depth, then size, and taken while their (truncated) sizes fit the
+    byte budget.
+    """
+    candidates = []
+    plugins = []
+    for entry in tree:
+        if entry.get("type") != "blob":
+            continue
+        path = entry.get("path") or ""
+        if path.lower().endswith(PLUGIN_EXTENSIONS):
+            plugins.append(path)
+            continue
+        priority = _file_priority(path)
+        if priority is None:
+            continue
+        size = min(int(entry.get("size") or 0), MAX_FILE_BYTES)
+        candidates.append((priority, path.count("/"), size, path))
+
+    candidates.sort()
+    chosen = []
+    budget = max_bytes
+    for _, _, size, path in candidates:
+        if len(chosen) >= max_files:
+            break
+        if size > budget:
+            continue
+        chosen.append(path)
+        budget -= size
+    return chosen, plugins
+
+
+def _download(session: requests.Session, url: str, timeout: float) -> Optional[str]:
+    try:
+        with session.get(url, timeout=timeout, stream=True) as r:
+            if not r.ok:
+                return None
+            data = r.raw.read(MAX_FILE_BYTES, decode_content=True)
+        return data.decode("utf-8", errors="replace")
+    except (requests.RequestException, OSError):
+        return None
+
+
+def fetch_github_repo(
+    owner: str,
+    repo: str,
+    max_files: int = 25,
+    max_bytes: int = 400000,
+    time_budget: float = 15.0,
+    api_base: str = GITHUB_API,
+    raw_base: str = GITHUB_RAW,
+) -> dict[str, str]:
+    """
+    Fetch relevant text files from a public GitHub repo. Returns {path: content}.
+
+    Binary plugins are listed under the ``_plugins_list`` key rather than
+    downloaded. Raises requests.RequestException if the repo can't be
+    resolved; individual file failures are skipped.
+    """
+    deadline = time.monotonic() + time_budget
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    token = os.environ.get("GITHUB_TOKEN", "").strip()
+    if token:
+        headers["Authorization"] = f"token {token}"
+
+    repo_path = f"{quote(owner, safe='')}/{quote(repo, safe='')}"
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=DOWNLOAD_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    try:
+        r = session.get(
+            f"{api_base}/repos/{repo_path}/commits/HEAD",
+            headers={"Accept": "application/vnd.github.sha"},
+            timeout=min(10.0, time_budget),
+        )
+        r.raise_for_status()
+        sha = r.text.strip()
+
+        cache = get_cache()
+        cache_key = f"github_repo:{owner.lower()}:{repo.lower()}:{sha}:{max_files}:{max_bytes}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        r = session.get(
+            f"{api_base}/repos/{repo_path}/git/trees/{sha}",
+            params={"recursive": "1"},
+            timeout=max(1.0, min(10.0, deadline - time.monotonic())),
+        )
+        r.raise_for_status()
+        listing = r.json()
+        if listing.get("truncated"):
+            logger.info(f"Tree for {owner}/{repo} truncated; using partial listing")
+
+        paths, plugin_paths = select_files(listing.get("tree") or [], max_files, max_bytes)
+
+        files = {}
+        complete = True
+        if paths:
+            pool = ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(paths)))
+            try:
+                pending = {}
+                for path in paths:
+                    url = f"{raw_base}/{repo_path}/{sha}/{quote(path)}"
+                    timeout = max(1.0, min(8.0, deadline - time.monotonic()))
+                    pending[pool.submit(_download, session, url, timeout)] = path
+                while pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        complete = False
+                        break
+                    done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        content = future.result()
+                        if content is not None:
+                            files[pending[future]] = content
+                        pending.pop(future)
+                for future in pending:
+                    future.cancel()
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        # Keep the tree's ranking in the output; the prompt is built in this order.
+        files = {path: files[path] for path in paths if path in files}
+        if plugin_paths:
+            files["_plugins_list"] = "Plugin files (binary): " + ", ".join(plugin_paths[:30])
+
+        if complete:
+            cache.set(cache_key, files, ttl=CACHE_TTL)
+        else:
+            logger.info(f"Fetch of {owner}/{repo} hit the {time_budget}s budget")
+        return files
+    finally:
+        session.close()
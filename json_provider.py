@@ -0,0 +1,90 @@
+"""
+JSON Provider — fast serialization for large API payloads.
+
+Flask's default provider runs everything through the stdlib json module.
+/api/analyze responses run to several megabytes, so the app uses orjson when
+it is installed and falls back to the stdlib otherwise. Output matches
+Flask's: sorted keys, HTTP dates for datetimes, str() for Decimal/UUID, and
+compact separators except in debug mode.
+
+dumps()/loads() give the same speedup to modules that store JSON blobs in
+the database (shared load orders, saved list snapshots).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.sansio.response import Response
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+    ORJSON_AVAILABLE = False
+
+
+def _orjson_dumps(
+    obj: Any, default: Any = None, sort_keys: bool = False, indent: bool = False
+) -> Optional[bytes]:
+    """orjson encoding, or None when orjson is missing or can't encode obj (e.g. ints over 64 bits)."""
+    if not ORJSON_AVAILABLE:
+        return None
+    # Datetimes go through default so they keep Flask's HTTP-date format.
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, default=default, option=option)
+    except TypeError:  # orjson.JSONEncodeError
+        return None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes and decodes with orjson when it can."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Custom stdlib options (cls, indent, ...) keep the stdlib path.
+        if not kwargs:
+            data = _orjson_dumps(obj, default=self.default, sort_keys=self.sort_keys)
+            if data is not None:
+                return data.decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if ORJSON_AVAILABLE and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # stdlib also accepts NaN/Infinity and raises its usual error otherwise
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = _orjson_dumps(obj, default=self.default, sort_keys=self.sort_keys, indent=indent)
+        if data is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)  # type: ignore[arg-type]
+
+
+def dumps(obj: Any) -> str:
+    """json.dumps() for stored blobs; orjson when available."""
+    data = _orjson_dumps(obj)
+    return data.decode("utf-8") if data is not None else json.dumps(obj)
+
+
+def loads(s: str | bytes) -> Any:
+    """json.loads() for stored blobs; orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(s)
@@ -12,7 +12,9 @@ from datetime import datetime, timezone
 from functools import wraps
 from typing import Any, Callable, Optional
 
-from flask import Flask, request
+from flask import Flask, g, request
+
+from stage_timing import REQUEST_METRIC, stage_metrics
 
 # =============================================================================
 # PII Redaction
@@ -228,7 +230,7 @@ class RequestLoggingMiddleware:
             """Log the start of a request."""
             import time
 
-            request.start_time = time.time()  # type: ignore[attr-defined]
+            request.start_time = time.perf_counter()  # type: ignore[attr-defined]
             ctx = get_request_context()
             self.logger.info(f"Request started: {request.method} {request.path}", extra=ctx)
 
@@ -237,14 +239,26 @@ class RequestLoggingMiddleware:
             """Log the end of a request."""
             import time
 
-            start_time = getattr(request, "start_time", time.time())
-            duration_ms = (time.time() - start_time) * 1000
+            start_time = getattr(request, "start_time", time.perf_counter())
+            duration_ms = (time.perf_counter() - start_time) * 1000
 
             ctx = get_request_context()
             ctx["status_code"] = response.status_code
             ctx["duration_ms"] = round(duration_ms, 2)
             ctx["response_size"] = response.content_length or 0
 
+            try:
+                stage_metrics.observe(
+                    REQUEST_METRIC,
+                    {"endpoint": request.endpoint or "unmatched", "method": request.method},
+                    duration_ms / 1000,
+                )
+                timer = g.get("stage_timer")
+                if timer is not None:
+                    timer.finish()
+            except Exception as e:
+                self.logger.debug(f"Could not record request timing: {e}")
+
             log_level = logging.INFO
             if response.status_code >= 500:
                 log_level = logging.ERROR
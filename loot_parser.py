@@ -53,6 +53,54 @@ class ModInfo:
     tags: list[str]
     nexus_mod_id: Optional[int] = None  # Nexus Mods ID for direct linking
     picture_url: Optional[str] = None  # URL to mod's primary image
+    neutral_messages: Optional[list[str]] = None  # messages softened for display, set at parse
+
+
+# LOOT phrasing -> neutral phrasing, applied in order by neutralize_message()
+_NEUTRAL_REWRITES = [
+    # "You seem to be using X, but you have not enabled a compatibility patch..."
+    (
+        re.compile(
+            r"You seem to be using ([^,]+,) but you have not enabled a compatibility patch for this mod\.",
+            re.I,
+        ),
+        r"This may conflict if you have \1 a compatibility patch may be needed.",
+    ),
+    (re.compile(r"\bYou seem to be using\b", re.I), "This may apply if you have"),
+    (re.compile(r"\bIt appears you (do not|don\'t)\b", re.I), "You may want to check if"),
+    (re.compile(r"\bYour installed version of\b", re.I), "The installed version of"),
+    (re.compile(r"\bis not compatible\b", re.I), "may not be compatible"),
+    (
+        re.compile(r"\bSome of this plugin\'s requirements seem to be missing\b", re.I),
+        "Some requirements may be missing for this plugin",
+    ),
+    (re.compile(r"\bA patch is required\b", re.I), "A patch may be required"),
+    (re.compile(r"\bis required (?:for|to)\b", re.I), "may be required for"),
+]
+
+
+def neutralize_message(text: str) -> str:
+    """
+    Soften overly definitive LOOT language for clearer user-facing messages.
+    Keeps statements neutral: 'this may conflict if...' instead of 'You seem to be...'
+    """
+    if not text or not isinstance(text, str):
+        return text
+    for pattern, replacement in _NEUTRAL_REWRITES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def neutral_messages(info: ModInfo) -> list[str]:
+    """
+    A mod's LOOT messages in neutral phrasing.
+
+    The parser fills these in when it builds the database; ModInfo created
+    elsewhere (tests, hand-built entries) gets them computed on first use.
+    """
+    if info.neutral_messages is None:
+        info.neutral_messages = [neutralize_message(m) for m in info.messages]
+    return info.neutral_messages
 
 
 class LOOTParser:
@@ -369,6 +417,7 @@ class LOOTParser:
                 existing.load_before = list(set(_strs(existing.load_before) + load_before))
                 existing.patches.extend(patches)  # patches are dicts, not easily deduped
                 existing.messages = list(set(_strs(existing.messages) + messages))
+                existing.neutral_messages = [neutralize_message(m) for m in existing.messages]
                 existing.tags = list(set(_strs(existing.tags) + tags))
                 # Update dirty_edits with the new value if it's True
                 existing.dirty_edits = existing.dirty_edits or dirty_edits
@@ -384,6 +433,7 @@ class LOOTParser:
                     dirty_edits=dirty_edits,
                     messages=messages,
                     tags=tags,
+                    neutral_messages=[neutralize_message(m) for m in messages],
                 )
                 self.mod_database[clean_name] = mod_info
 
@@ -488,7 +538,11 @@ class LOOTParser:
             filepath = self._database_path()
         filepath = Path(filepath)
 
-        data = {clean_name: asdict(info) for clean_name, info in self.mod_database.items()}
+        # neutral_messages are derived; load_database() recomputes them
+        data = {}
+        for clean_name, info in self.mod_database.items():
+            data[clean_name] = asdict(info)
+            del data[clean_name]["neutral_messages"]
         try:
             with open(filepath, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
@@ -518,7 +572,9 @@ class LOOTParser:
 
                 self.mod_database = {}
                 for clean_name, info_dict in data.items():
-                    self.mod_database[clean_name] = ModInfo(**info_dict)
+                    info = ModInfo(**info_dict)
+                    info.neutral_messages = [neutralize_message(m) for m in info.messages]
+                    self.mod_database[clean_name] = info
 
                 logger.info(f"Loaded {len(self.mod_database)} mods from database")
                 return True
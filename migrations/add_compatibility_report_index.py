@@ -0,0 +1,82 @@
+"""
+Database Migration: Mod → Compatibility Report Index
+
+Adds:
+- compatibility_report_mods: one row per (mod, report), so "reports for mod X"
+  is a single index range scan instead of (mod_a = ? OR mod_b = ?)
+
+Backfills the index from existing compatibility_reports. Safe to re-run.
+
+Run: python3 migrations/add_compatibility_report_index.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///users.db")
+
+
+def migrate():
+    """Run database migration."""
+    print("Starting compatibility report index migration...")
+    print(f"Database: {DATABASE_URL}")
+
+    engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        print("\nCreating compatibility_report_mods...")
+        conn.execute(
+            text("""
+            CREATE TABLE IF NOT EXISTS compatibility_report_mods (
+                mod_name TEXT NOT NULL,
+                game TEXT NOT NULL,
+                report_id INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (mod_name, game, report_id),
+                FOREIGN KEY (report_id) REFERENCES compatibility_reports(id) ON DELETE CASCADE
+            )
+        """)
+        )
+        conn.execute(
+            text("""
+            CREATE INDEX IF NOT EXISTS idx_compat_mod_recent
+            ON compatibility_report_mods(mod_name, game, created_at DESC)
+        """)
+        )
+        conn.execute(
+            text("""
+            CREATE INDEX IF NOT EXISTS idx_compat_mod_report
+            ON compatibility_report_mods(report_id)
+        """)
+        )
+
+        print("\nBackfilling from compatibility_reports...")
+        for column in ("mod_a", "mod_b"):
+            conn.execute(
+                text(f"""
+                INSERT INTO compatibility_report_mods (mod_name, game, report_id, created_at)
+                SELECT r.{column}, r.game, r.id, r.created_at
+                FROM compatibility_reports r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM compatibility_report_mods m
+                    WHERE m.mod_name = r.{column} AND m.game = r.game AND m.report_id = r.id
+                )
+            """)
+            )
+
+        conn.commit()
+
+    print("\n✅ Migration completed successfully!")
+    print("\nTables created:")
+    print("  - compatibility_report_mods (mod → report index)")
+    print("\nIndexes created:")
+    print("  - idx_compat_mod_recent (newest reports for a mod)")
+    print("  - idx_compat_mod_report (cleanup by report)")
+
+
+if __name__ == "__main__":
+    migrate()
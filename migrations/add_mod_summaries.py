@@ -0,0 +1,70 @@
+"""
+Database Migration: Per-Mod Compatibility Summaries
+
+Adds:
+- mod_compat_summaries: one precomputed row per (mod, game) with report
+  counts, the vote-weighted score, related mods and known patches
+
+Rows are filled lazily on the first page or embed view of a mod and
+refreshed whenever a report touching it changes (see mod_summary_service).
+Requires compatibility_report_mods (add_compatibility_report_index.py).
+Safe to re-run.
+
+Run: python3 migrations/add_mod_summaries.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///users.db")
+
+
+def migrate():
+    """Run database migration."""
+    print("Starting mod summary migration...")
+    print(f"Database: {DATABASE_URL}")
+
+    engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        print("\nCreating mod_compat_summaries...")
+        conn.execute(
+            text("""
+            CREATE TABLE IF NOT EXISTS mod_compat_summaries (
+                mod_name TEXT NOT NULL,
+                game TEXT NOT NULL,
+                total_reports INTEGER NOT NULL DEFAULT 0,
+                compatible INTEGER NOT NULL DEFAULT 0,
+                incompatible INTEGER NOT NULL DEFAULT 0,
+                needs_patch INTEGER NOT NULL DEFAULT 0,
+                score REAL NOT NULL,
+                related_mods_json TEXT NOT NULL DEFAULT '[]',
+                related_mods_count INTEGER NOT NULL DEFAULT 0,
+                patches_json TEXT NOT NULL DEFAULT '[]',
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (mod_name, game)
+            )
+        """)
+        )
+        conn.execute(
+            text("""
+            CREATE INDEX IF NOT EXISTS idx_mod_summary_score
+            ON mod_compat_summaries(game, score DESC)
+        """)
+        )
+
+        conn.commit()
+
+    print("\n✅ Migration completed successfully!")
+    print("\nTables created:")
+    print("  - mod_compat_summaries (per-mod report aggregates)")
+    print("\nIndexes created:")
+    print("  - idx_mod_summary_score (top-rated mods per game)")
+
+
+if __name__ == "__main__":
+    migrate()
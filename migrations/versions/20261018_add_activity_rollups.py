@@ -0,0 +1,63 @@
+"""Add daily activity rollup tables
+
+Revision ID: add_activity_rollups
+Revises: add_products
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_activity_rollups"
+down_revision: Union[str, None] = "add_products"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create activity rollup and watermark tables."""
+
+    # Daily activity aggregates (day / event type / game / feature)
+    op.create_table(
+        "activity_daily_rollups",
+        sa.Column("id", sa.Integer, nullable=False),
+        sa.Column("day", sa.String(10), nullable=False),
+        sa.Column("event_type", sa.String(100), nullable=False),
+        sa.Column("game", sa.String(50), nullable=False, server_default=""),
+        sa.Column("feature", sa.String(100), nullable=False, server_default=""),
+        sa.Column("event_count", sa.Integer, nullable=True, default=0),
+        sa.Column("user_sketch", sa.LargeBinary, nullable=True),
+        sa.Column(
+            "updated_at", sa.DateTime, nullable=True, server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day", "event_type", "game", "feature", name="uq_activity_rollup"),
+    )
+    op.create_index(
+        op.f("ix_activity_daily_rollups_day"), "activity_daily_rollups", ["day"], unique=False
+    )
+
+    # Incremental refresh watermarks
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("last_id", sa.Integer, nullable=True, default=0),
+        sa.Column(
+            "updated_at", sa.DateTime, nullable=True, server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Drop activity rollup tables."""
+    op.drop_table("rollup_watermarks")
+    op.drop_index(op.f("ix_activity_daily_rollups_day"), table_name="activity_daily_rollups")
+    op.drop_table("activity_daily_rollups")
@@ -0,0 +1,35 @@
+"""Add deviation labeling watermark to knowledge sources
+
+Revision ID: add_deviation_watermark
+Revises: add_knowledge_minhash
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_deviation_watermark"
+down_revision: Union[str, None] = "add_knowledge_minhash"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add knowledge_sources.deviation_hash and deviation_labeled_at."""
+    op.add_column("knowledge_sources", sa.Column("deviation_hash", sa.String(64), nullable=True))
+    op.add_column(
+        "knowledge_sources", sa.Column("deviation_labeled_at", sa.DateTime, nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Drop the deviation labeling watermark columns."""
+    op.drop_column("knowledge_sources", "deviation_labeled_at")
+    op.drop_column("knowledge_sources", "deviation_hash")
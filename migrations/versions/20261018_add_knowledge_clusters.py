@@ -0,0 +1,48 @@
+"""Add knowledge clusters
+
+Revision ID: add_knowledge_clusters
+Revises: add_deviation_watermark
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_knowledge_clusters"
+down_revision: Union[str, None] = "add_deviation_watermark"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create knowledge_clusters and add knowledge_sources.cluster_id."""
+    op.create_table(
+        "knowledge_clusters",
+        sa.Column("id", sa.Integer, nullable=False),
+        sa.Column("game", sa.String(50), nullable=False),
+        sa.Column("category", sa.String(100), nullable=True),
+        sa.Column("label", sa.String(200), nullable=True),
+        sa.Column("size", sa.Integer, nullable=True, default=0),
+        sa.Column(
+            "updated_at", sa.DateTime, nullable=True, server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.add_column("knowledge_sources", sa.Column("cluster_id", sa.Integer, nullable=True))
+    op.create_index(
+        op.f("ix_knowledge_sources_cluster_id"), "knowledge_sources", ["cluster_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop knowledge clusters."""
+    op.drop_index(op.f("ix_knowledge_sources_cluster_id"), table_name="knowledge_sources")
+    op.drop_column("knowledge_sources", "cluster_id")
+    op.drop_table("knowledge_clusters")
@@ -0,0 +1,31 @@
+"""Add MinHash signatures to knowledge sources
+
+Revision ID: add_knowledge_minhash
+Revises: add_activity_rollups
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_knowledge_minhash"
+down_revision: Union[str, None] = "add_activity_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add knowledge_sources.minhash (near-duplicate signatures)."""
+    op.add_column("knowledge_sources", sa.Column("minhash", sa.LargeBinary, nullable=True))
+
+
+def downgrade() -> None:
+    """Drop knowledge_sources.minhash."""
+    op.drop_column("knowledge_sources", "minhash")
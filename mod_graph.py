@@ -0,0 +1,264 @@
+"""
+Graph analytics over a LOOT masterlist.
+
+Mods become integer node ids once (names normalized a single time), edges
+become adjacency lists of ints, and every metric is computed from those:
+
+- requirement cycles via Tarjan's SCC algorithm (iterative, no recursion limit)
+- requirement depth via DP over the condensed DAG, so each mod's depth is
+  computed once instead of a BFS per mod
+- in/out degree distributions per edge type
+- top-k incompatible pairs from a counter and a heap
+
+Used by samson_fuel for fuel export; anything that shows dependency depth
+should read it from here too.
+
+Usage:
+  from mod_graph import ModGraph
+  graph = ModGraph.from_mod_database(parser.mod_database)
+  graph.depth_of("SkyUI.esp")
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from typing import Any, Optional
+
+EDGE_TYPES = ("requirement", "incompatible", "load_after", "load_before")
+
+
+def _norm(s: str) -> str:
+    """Normalize mod name for lookup (matches LOOT parser)."""
+    if not s:
+        return ""
+    return s.lower().replace(".esp", "").replace(".esm", "").replace(".esl", "").strip()
+
+
+def _ref_name(ref: Any) -> str:
+    return ref if isinstance(ref, str) else getattr(ref, "name", str(ref))
+
+
+class ModGraph:
+    """
+    Integer-encoded mod graph.
+
+    Node ids 0..masterlist_count-1 are masterlist entries (in database
+    order); mods only referenced by an edge get ids after them.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.ids: dict[str, int] = {}
+        self.masterlist_count = 0
+        self.edges: dict[str, list[list[int]]] = {t: [] for t in EDGE_TYPES}
+        # Raw list lengths, duplicates included (what the masterlist states)
+        self.edge_counts: dict[str, int] = dict.fromkeys((*EDGE_TYPES, "patch"), 0)
+        self._components: Optional[tuple[list[int], int]] = None
+        self._depths: Optional[list[int]] = None
+
+    @classmethod
+    def from_mod_database(cls, mod_database: dict[str, Any]) -> ModGraph:
+        graph = cls()
+        norm_cache: dict[str, str] = {}
+
+        def node(raw: str) -> Optional[int]:
+            key = norm_cache.get(raw)
+            if key is None:
+                key = norm_cache[raw] = _norm(raw)
+            if not key:
+                return None
+            node_id = graph.ids.get(key)
+            if node_id is None:
+                node_id = graph._add_node(key)
+            return node_id
+
+        for clean_name in mod_database:
+            node(clean_name)
+        graph.masterlist_count = len(graph.names)
+
+        attrs = {
+            "requirement": "requirements",
+            "incompatible": "incompatibilities",
+            "load_after": "load_after",
+            "load_before": "load_before",
+        }
+        for clean_name, info in mod_database.items():
+            source = node(clean_name)
+            for edge_type, attr in attrs.items():
+                refs = getattr(info, attr, None) or []
+                graph.edge_counts[edge_type] += len(refs)
+                if source is None:
+                    continue
+                targets = graph.edges[edge_type][source]
+                for ref in refs:
+                    target = node(_ref_name(ref))
+                    if target is not None and target != source and target not in targets:
+                        targets.append(target)
+            graph.edge_counts["patch"] += len(getattr(info, "patches", None) or [])
+        return graph
+
+    def _add_node(self, key: str) -> int:
+        node_id = len(self.names)
+        self.names.append(key)
+        self.ids[key] = node_id
+        for adjacency in self.edges.values():
+            adjacency.append([])
+        return node_id
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def index(self, name: str) -> Optional[int]:
+        return self.ids.get(_norm(name))
+
+    # -- Requirement structure ------------------------------------------------
+
+    def strongly_connected_components(self) -> tuple[list[int], int]:
+        """
+        Tarjan's algorithm over requirement edges.
+
+        Returns (component id per node, component count). Components are
+        numbered in reverse topological order: an edge between components
+        always points to a lower id.
+        """
+        if self._components is not None:
+            return self._components
+
+        adjacency = self.edges["requirement"]
+        n = len(adjacency)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        component = [-1] * n
+        stack: list[int] = []
+        counter = 0
+        count = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+            while work:
+                v, i = work[-1]
+                if i < len(adjacency[v]):
+                    work[-1] = (v, i + 1)
+                    w = adjacency[v][i]
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, 0))
+                    elif on_stack[w] and index[w] < low[v]:
+                        low[v] = index[w]
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component[w] = count
+                        if w == v:
+                            break
+                    count += 1
+
+        self._components = (component, count)
+        return self._components
+
+    def requirement_cycles(self) -> list[list[str]]:
+        """Groups of mods that (transitively) require each other."""
+        component, count = self.strongly_connected_components()
+        members: list[list[str]] = [[] for _ in range(count)]
+        for node_id, comp in enumerate(component):
+            members[comp].append(self.names[node_id])
+        return sorted(sorted(group) for group in members if len(group) > 1)
+
+    def requirement_depths(self) -> list[int]:
+        """
+        Longest requirement chain below each mod, in edges.
+
+        A requires B requires C → 2 for A. Mods in a requirement cycle share
+        one depth (the cycle collapses to a single node).
+        """
+        if self._depths is not None:
+            return self._depths
+
+        component, count = self.strongly_connected_components()
+        members: list[list[int]] = [[] for _ in range(count)]
+        for node_id, comp in enumerate(component):
+            members[comp].append(node_id)
+
+        adjacency = self.edges["requirement"]
+        comp_depth = [0] * count
+        # Reverse topological order: every dependency's component is done first.
+        for comp in range(count):
+            best = 0
+            for v in members[comp]:
+                for w in adjacency[v]:
+                    target = component[w]
+                    if target != comp and comp_depth[target] + 1 > best:
+                        best = comp_depth[target] + 1
+            comp_depth[comp] = best
+
+        self._depths = [comp_depth[comp] for comp in component]
+        return self._depths
+
+    def depth_of(self, name: str) -> Optional[int]:
+        node_id = self.index(name)
+        return None if node_id is None else self.requirement_depths()[node_id]
+
+    def depth_stats(self, top: int = 10) -> dict[str, Any]:
+        """
+        Depth summary over masterlist mods that have requirements.
+
+        Returns {"average", "max", "mods_with_requirements", "deepest": [[name, depth], ...]}.
+        """
+        depths = self.requirement_depths()
+        adjacency = self.edges["requirement"]
+        with_reqs = [i for i in range(self.masterlist_count) if adjacency[i]]
+        deepest = heapq.nlargest(top, with_reqs, key=lambda i: (depths[i], -i))
+        return {
+            "average": sum(depths[i] for i in with_reqs) / len(with_reqs) if with_reqs else 0.0,
+            "max": max((depths[i] for i in with_reqs), default=0),
+            "mods_with_requirements": len(with_reqs),
+            "deepest": [[self.names[i], depths[i]] for i in deepest],
+        }
+
+    # -- Degrees and pairs ----------------------------------------------------
+
+    def degree_distribution(self, edge_type: str, direction: str = "out") -> dict[int, int]:
+        """{degree: number of nodes} for one edge type ("out" or "in" edges)."""
+        adjacency = self.edges[edge_type]
+        if direction == "out":
+            degrees = [len(targets) for targets in adjacency]
+        elif direction == "in":
+            degrees = [0] * len(adjacency)
+            for targets in adjacency:
+                for w in targets:
+                    degrees[w] += 1
+        else:
+            raise ValueError(f"direction must be 'in' or 'out', not {direction!r}")
+        return dict(sorted(Counter(degrees).items()))
+
+    def top_incompatible_pairs(self, k: int = 20) -> list[tuple[str, str, int]]:
+        """
+        Most often stated incompatible pairs, A-B and B-A counted together.
+
+        Returns [(mod_a, mod_b, count)] with mod_a < mod_b, most common first.
+        """
+        counts: Counter = Counter()
+        for a, targets in enumerate(self.edges["incompatible"]):
+            for b in targets:
+                counts[(a, b) if a < b else (b, a)] += 1
+        names = self.names
+        pairs = ((*sorted((names[a], names[b])), count) for (a, b), count in counts.items())
+        return heapq.nsmallest(k, pairs, key=lambda pair: (-pair[2], pair[0], pair[1]))
@@ -2,6 +2,12 @@
 Mod Images & Media — Smart image previews for mods.
 Fetches mod images from Nexus API, caches them, and provides fallbacks.
 Also handles inline embedding for Imgur, videos, and guides.
+
+Image lookups go through one resolver: cached URLs (and cached misses) come
+from a single SQLite key-value file, missing ones are fetched concurrently,
+and every Nexus call passes a process-wide rate limiter. Mods without a
+Nexus ID are never searched inline; misses are queued for background
+prefetch so the next request finds them cached.
 """
 
 from __future__ import annotations
@@ -9,8 +15,12 @@ from __future__ import annotations
 import logging
 import os
 import re
+import sqlite3
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Optional
+from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +28,33 @@ logger = logging.getLogger(__name__)
 NEXUS_API_KEY = os.environ.get("NEXUS_API_KEY")
 NEXUS_API_BASE = "https://api.nexusmods.com/v1"
 NEXUS_AVAILABLE = bool(NEXUS_API_KEY)
+NEXUS_TIMEOUT = 5
+NEXUS_RATE_PER_SECOND = float(os.environ.get("NEXUS_RATE_PER_SECOND", "4"))
+NEXUS_RATE_BURST = 8
+
+NEXUS_GAME_IDS = {
+    "skyrimse": "skyrimspecialedition",
+    "skyrim": "skyrim",
+    "skyrimvr": "skyrimspecialedition",
+    "oblivion": "oblivion",
+    "fallout3": "fallout3",
+    "falloutnv": "newvegas",
+    "fallout4": "fallout4",
+    "starfield": "starfield",
+}
 
-# Image cache directory
-IMAGE_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "mod_images")
-os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+# Image cache: one SQLite file of key -> image URL ("" caches a miss)
+IMAGE_CACHE_DB = os.environ.get(
+    "MOD_IMAGE_CACHE_DB",
+    os.path.join(os.path.dirname(__file__), "..", "data", "mod_images.db"),
+)
 
-# Cache expiry (24 hours)
+# Cache expiry (24 hours); misses are retried sooner
 CACHE_EXPIRY = 24 * 60 * 60
+NEGATIVE_CACHE_EXPIRY = 6 * 60 * 60
+
+MAX_CONCURRENT_LOOKUPS = 8
+PREFETCH_WORKERS = 2
 
 # Placeholder images
 MOD_PLACEHOLDER = "/static/icons/mod-placeholder.svg"
@@ -45,6 +75,225 @@ EMBED_DOMAINS = {
 }
 
 
+class NexusRateLimiter:
+    """Token bucket shared by every thread that calls the Nexus API."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ImageCacheStore:
+    """SQLite key-value store of image URLs with per-entry expiry."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS image_cache (
+                    key TEXT PRIMARY KEY,
+                    image_url TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """Unexpired entries for ``keys``; a cached miss maps to ""."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found: dict[str, str] = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, image_url FROM image_cache "
+                    f"WHERE key IN ({placeholders}) AND expires_at > ?",
+                    (*chunk, now),
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def set_many(self, entries: dict[str, str]) -> None:
+        """Store URLs (or "" for a miss) with the matching expiry."""
+        if not entries:
+            return
+        now = time.time()
+        rows = [
+            (key, url, now + (CACHE_EXPIRY if url else NEGATIVE_CACHE_EXPIRY))
+            for key, url in entries.items()
+        ]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO image_cache (key, image_url, expires_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute(
+                "DELETE FROM image_cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            conn.commit()
+        return deleted
+
+
+_nexus_limiter = NexusRateLimiter(NEXUS_RATE_PER_SECOND, NEXUS_RATE_BURST)
+_image_store: Optional[ImageCacheStore] = None
+_image_store_lock = threading.Lock()
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+_prefetch_pending: set[str] = set()
+_prefetch_lock = threading.Lock()
+
+
+def get_image_store() -> ImageCacheStore:
+    global _image_store
+    with _image_store_lock:
+        if _image_store is None:
+            _image_store = ImageCacheStore(IMAGE_CACHE_DB)
+        return _image_store
+
+
+def _cache_key(game_id: str, mod_id: Optional[str], mod_name: str) -> str:
+    if mod_id:
+        return f"id:{game_id}:{mod_id}"
+    return f"name:{game_id}:{mod_name.lower().strip()}"
+
+
+def _nexus_get(path: str) -> Optional[Any]:
+    """
+    GET a Nexus API path, rate limited.
+
+    Returns the decoded body, or None when Nexus says the mod doesn't exist.
+    Raises on transient failures (timeouts, 429, 5xx) so they aren't cached.
+    """
+    import requests
+
+    _nexus_limiter.acquire()
+    response = requests.get(
+        f"{NEXUS_API_BASE}{path}",
+        headers={"apikey": NEXUS_API_KEY, "Accept": "application/json"},
+        timeout=NEXUS_TIMEOUT,
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def _picture(data: Any) -> str:
+    if not isinstance(data, dict):
+        return ""
+    return data.get("picture_url") or data.get("image_url") or ""
+
+
+def _fetch_image(game_id: str, mod_id: Optional[str], mod_name: str) -> dict[str, str]:
+    """
+    Look one mod up on Nexus: by ID first, then by name.
+
+    Returns the cache entries learned ({key: url or ""}); empty when the
+    lookup failed transiently.
+    """
+    nexus_game = NEXUS_GAME_IDS.get(game_id, game_id)
+    learned: dict[str, str] = {}
+    try:
+        image_url = ""
+        if mod_id:
+            image_url = _picture(_nexus_get(f"/games/{nexus_game}/mods/{quote(str(mod_id))}.json"))
+        if not image_url and mod_name:
+            data = _nexus_get(f"/games/{nexus_game}/mods/search.json?name={quote(mod_name)}")
+            mods = data.get("mods") if isinstance(data, dict) else None
+            match = mods[0] if mods else {}
+            image_url = _picture(match)
+            learned[_cache_key(game_id, None, mod_name)] = image_url
+            if image_url and match.get("id"):
+                learned[_cache_key(game_id, str(match["id"]), mod_name)] = image_url
+        if mod_id:
+            learned[_cache_key(game_id, mod_id, mod_name)] = image_url
+        return learned
+    except Exception as e:
+        logger.warning(f"Nexus image lookup failed for {mod_id or mod_name!r}: {e}")
+        return {}
+
+
+def resolve_mod_images(
+    game_id: str,
+    lookups: Iterable[tuple[Optional[str], str]],
+    use_cache: bool = True,
+    fetch_missing: bool = True,
+) -> dict[tuple[Optional[str], str], str]:
+    """
+    Resolve image URLs for many mods at once.
+
+    Args:
+        game_id: Game identifier (skyrimse, fallout4, etc.)
+        lookups: (nexus mod ID or None, mod name) pairs
+        use_cache: Read cached URLs and misses first
+        fetch_missing: Fetch uncached mods from Nexus (concurrently, rate limited);
+            when False they resolve to the placeholder
+
+    Returns:
+        {(mod_id, mod_name): image URL or placeholder}
+    """
+    lookups = list(dict.fromkeys(lookups))
+    if not NEXUS_AVAILABLE:
+        return dict.fromkeys(lookups, MOD_PLACEHOLDER)
+
+    keys = {lookup: _cache_key(game_id, *lookup) for lookup in lookups}
+    store = get_image_store()
+    cached = store.get_many(keys.values()) if use_cache else {}
+
+    missing: dict[str, tuple[Optional[str], str]] = {}
+    for lookup, key in keys.items():
+        if key not in cached:
+            missing.setdefault(key, lookup)
+
+    if missing and fetch_missing:
+        learned: dict[str, str] = {}
+        workers = min(MAX_CONCURRENT_LOOKUPS, len(missing))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for entries in pool.map(
+                lambda lookup: _fetch_image(game_id, *lookup), missing.values()
+            ):
+                learned.update(entries)
+        store.set_many(learned)
+        cached.update(learned)
+
+    return {lookup: cached.get(key) or MOD_PLACEHOLDER for lookup, key in keys.items()}
+
+
 def get_mod_image(
     game_id: str,
     mod_id: str,
@@ -63,135 +312,82 @@ def get_mod_image(
     Returns:
         Image URL (Nexus, cached, or placeholder)
     """
-    if not NEXUS_AVAILABLE:
-        return MOD_PLACEHOLDER
-
-    # Check cache first
-    cache_key = f"{game_id}_{mod_id}"
-    cache_file = os.path.join(IMAGE_CACHE_DIR, f"{cache_key}.json")
-
-    if use_cache and os.path.exists(cache_file):
-        try:
-            import json
-
-            with open(cache_file) as f:
-                data = json.load(f)
-
-            # Check if cache is still valid
-            if time.time() - data.get("timestamp", 0) < CACHE_EXPIRY:
-                return data.get("image_url", MOD_PLACEHOLDER)
-        except Exception as e:
-            logger.warning(f"Cache read failed for {cache_key}: {e}")
-
-    # Fetch from Nexus API
-    try:
-        import requests
-
-        # Map game_id to Nexus game_id
-        nexus_game_ids = {
-            "skyrimse": "skyrimspecialedition",
-            "skyrim": "skyrim",
-            "skyrimvr": "skyrimspecialedition",
-            "oblivion": "oblivion",
-            "fallout3": "fallout3",
-            "falloutnv": "newvegas",
-            "fallout4": "fallout4",
-            "starfield": "starfield",
-        }
-
-        nexus_game = nexus_game_ids.get(game_id, game_id)
-
-        headers = {
-            "apikey": NEXUS_API_KEY,
-            "Accept": "application/json",
-        }
-
-        url = f"{NEXUS_API_BASE}/games/{nexus_game}/mods/{mod_id}.json"
-        response = requests.get(url, headers=headers, timeout=5)
-
-        if response.status_code == 200:
-            data = response.json()
-            image_url = data.get("picture_url") or data.get("image_url")
-
-            if image_url:
-                # Cache the result
-                cache_result(cache_key, image_url)
-                return image_url
-
-        # Try searching by name as fallback
-        return search_mod_image_by_name(game_id, mod_name)
-
-    except Exception as e:
-        logger.warning(f"Nexus API fetch failed for mod {mod_id}: {e}")
-        return search_mod_image_by_name(game_id, mod_name)
+    lookup = (str(mod_id) if mod_id else None, mod_name)
+    return resolve_mod_images(game_id, [lookup], use_cache=use_cache)[lookup]
 
 
 def search_mod_image_by_name(game_id: str, mod_name: str) -> str:
     """Search Nexus API by mod name to find image."""
-    if not NEXUS_AVAILABLE:
-        return MOD_PLACEHOLDER
+    return resolve_mod_images(game_id, [(None, mod_name)])[(None, mod_name)]
 
-    try:
-        from urllib.parse import quote
-
-        import requests
-
-        nexus_game_ids = {
-            "skyrimse": "skyrimspecialedition",
-            "skyrim": "skyrim",
-            "skyrimvr": "skyrimspecialedition",
-            "oblivion": "oblivion",
-            "fallout3": "fallout3",
-            "falloutnv": "newvegas",
-            "fallout4": "fallout4",
-            "starfield": "starfield",
-        }
-
-        nexus_game = nexus_game_ids.get(game_id, game_id)
-
-        headers = {
-            "apikey": NEXUS_API_KEY,
-            "Accept": "application/json",
-        }
-
-        # Search for mod by name
-        url = f"{NEXUS_API_BASE}/games/{nexus_game}/mods/search.json?name={quote(mod_name)}"
-        response = requests.get(url, headers=headers, timeout=5)
-
-        if response.status_code == 200:
-            mods = response.json().get("mods", [])
-            if mods:
-                # Get first match
-                image_url = mods[0].get("picture_url") or mods[0].get("image_url")
-                if image_url:
-                    mod_id = mods[0].get("id", "unknown")
-                    cache_key = f"{game_id}_{mod_id}"
-                    cache_result(cache_key, image_url)
-                    return image_url
-
-        return MOD_PLACEHOLDER
 
-    except Exception as e:
-        logger.warning(f"Nexus API search failed for '{mod_name}': {e}")
-        return MOD_PLACEHOLDER
+def prefetch_mod_images(game_id: str, mod_names: Iterable[str]) -> int:
+    """
+    Queue uncached mods for a background name lookup.
 
+    Returns how many were queued; mods already cached or queued are skipped.
+    """
+    if not NEXUS_AVAILABLE:
+        return 0
+    global _prefetch_executor
+
+    names = {name.strip(): None for name in mod_names if name and name.strip()}
+    keys = {name: _cache_key(game_id, None, name) for name in names}
+    cached = get_image_store().get_many(keys.values())
+    queued = 0
+    with _prefetch_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(
+                max_workers=PREFETCH_WORKERS, thread_name_prefix="mod-image-prefetch"
+            )
+        for name, key in keys.items():
+            if key in cached or key in _prefetch_pending:
+                continue
+            _prefetch_pending.add(key)
+            _prefetch_executor.submit(_prefetch_one, game_id, name, key)
+            queued += 1
+    return queued
 
-def cache_result(cache_key: str, image_url: str):
-    """Cache image URL to disk."""
+
+def _prefetch_one(game_id: str, mod_name: str, key: str) -> None:
     try:
-        import json
+        get_image_store().set_many(_fetch_image(game_id, None, mod_name))
+    except Exception as e:
+        logger.warning(f"Image prefetch failed for {mod_name!r}: {e}")
+    finally:
+        with _prefetch_lock:
+            _prefetch_pending.discard(key)
 
-        cache_file = os.path.join(IMAGE_CACHE_DIR, f"{cache_key}.json")
-        data = {
-            "image_url": image_url,
-            "timestamp": time.time(),
-        }
 
-        with open(cache_file, "w") as f:
-            json.dump(data, f)
+def prefetch_popular_mod_images(game_id: str, limit: int = 200, db_path: str = "users.db") -> int:
+    """
+    Warm the image cache for the mods most often seen in community reports.
 
-    except Exception as e:
-        logger.warning(f"Cache write failed for {cache_key}: {e}")
+    Reads mod_compat_summaries (see mod_summary_service) and resolves the
+    uncached ones in the calling thread; run periodically from Celery beat.
+    Celery tasks have no Flask app context, so this opens its own connection
+    to the app database (app.DB_FILE) instead of using db.get_db().
+    Returns how many mods were looked up.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT mod_name FROM mod_compat_summaries
+            WHERE game = ?
+            ORDER BY total_reports DESC
+            LIMIT ?
+        """,
+            (game_id, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    lookups = [(None, row[0]) for row in rows]
+    keys = [_cache_key(game_id, *lookup) for lookup in lookups]
+    cached = get_image_store().get_many(keys)
+    uncached = [lookup for lookup, key in zip(lookups, keys) if key not in cached]
+    resolve_mod_images(game_id, uncached, use_cache=False)
+    return len(uncached)
 
 
 def extract_embed_info(text: str) -> list[dict]:
@@ -296,36 +492,17 @@ def generate_embed_html(embed_type: str, embed_url: str, thumbnail: Optional[str
     return ""
 
 
+def _nexus_mod_id(mod_entry: dict) -> Optional[str]:
+    match = re.search(r"/mods/(\d+)", mod_entry.get("nexus_url") or "")
+    return match.group(1) if match else None
+
+
 def enrich_mod_with_image(parser, mod_entry: dict, game_id: str) -> dict:
     """
     Enrich a mod entry with image URL.
     Tries multiple sources: LOOT data, Nexus API, search.
     """
-    mod_name = mod_entry.get("name", "")
-
-    # Check if already has image
-    if mod_entry.get("image_url") and mod_entry["image_url"] != MOD_PLACEHOLDER:
-        return mod_entry
-
-    # Try to get from LOOT database
-    mod_info = parser.mod_database.get(mod_name.lower().strip())
-    if mod_info and hasattr(mod_info, "picture_url") and mod_info.picture_url:
-        mod_entry["image_url"] = mod_info.picture_url
-        return mod_entry
-
-    # Try Nexus API if we have mod ID
-    nexus_url = mod_entry.get("nexus_url", "")
-    if nexus_url:
-        # Extract mod ID from Nexus URL
-        match = re.search(r"/mods/(\d+)", nexus_url)
-        if match:
-            mod_id = match.group(1)
-            mod_entry["image_url"] = get_mod_image(game_id, mod_id, mod_name)
-            return mod_entry
-
-    # Fallback to placeholder
-    mod_entry["image_url"] = MOD_PLACEHOLDER
-    return mod_entry
+    return enrich_recommendations_with_images(parser, [mod_entry], game_id)[0]
 
 
 # Batch image fetching for recommendations
@@ -336,12 +513,45 @@ def enrich_recommendations_with_images(
 ) -> list[dict]:
     """
     Enrich multiple mod recommendations with images.
-    Uses batching and caching for efficiency.
-    """
-    enriched = []
 
-    for rec in recommendations:
-        enriched_rec = enrich_mod_with_image(parser, rec, game_id)
-        enriched.append(enriched_rec)
-
-    return enriched
+    LOOT pictures are used as-is. Entries with a Nexus mod ID are resolved
+    in one batch (cache, then concurrent lookups). Entries without one use a
+    cached name lookup if there is one and are queued for prefetch if not.
+    """
+    by_id: dict[int, tuple[Optional[str], str]] = {}
+    by_name: dict[int, tuple[Optional[str], str]] = {}
+
+    for i, rec in enumerate(recommendations):
+        # Check if already has image
+        if rec.get("image_url") and rec["image_url"] != MOD_PLACEHOLDER:
+            continue
+        mod_name = rec.get("name", "")
+
+        # Try to get from LOOT database
+        mod_info = parser.mod_database.get(mod_name.lower().strip())
+        picture_url = getattr(mod_info, "picture_url", None) if mod_info else None
+        if picture_url:
+            rec["image_url"] = picture_url
+            continue
+
+        mod_id = _nexus_mod_id(rec)
+        if mod_id:
+            by_id[i] = (mod_id, mod_name)
+        elif mod_name:
+            by_name[i] = (None, mod_name)
+        else:
+            rec["image_url"] = MOD_PLACEHOLDER
+
+    resolved = resolve_mod_images(game_id, by_id.values()) if by_id else {}
+    if by_name:
+        resolved.update(resolve_mod_images(game_id, by_name.values(), fetch_missing=False))
+
+    uncached = []
+    for i, lookup in {**by_id, **by_name}.items():
+        recommendations[i]["image_url"] = resolved[lookup]
+        if i in by_name and resolved[lookup] == MOD_PLACEHOLDER:
+            uncached.append(lookup[1])
+    if uncached:
+        prefetch_mod_images(game_id, uncached)
+
+    return recommendations
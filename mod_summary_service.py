@@ -0,0 +1,225 @@
+"""
+Per-Mod Compatibility Summaries for SkyModderAI
+
+Mod pages and the embeddable widget show the same aggregates: report counts
+by status, a vote-weighted compatibility score, related mods and known
+patches. Computing those per view meant OR-scans over compatibility_reports
+on every hit, and embeds on popular Nexus pages turn that into read spikes.
+
+mod_compat_summaries holds one precomputed row per (mod, game). A row is
+refreshed whenever a report touching the mod is submitted, voted on or
+removed, using the compatibility_report_mods index, so only that mod's
+reports are read.
+
+Rendered embed fragments are cached per mod (one cache entry holding every
+theme variant) and dropped when the summary changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from flask import Response, request
+
+from cache_service import get_cache
+from db import get_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCORE = 75  # mods with no reports
+MAX_RELATED_MODS = 20
+MAX_PATCHES = 20
+EMBED_CACHE_TTL = 3600
+EMBED_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=600"
+
+
+def _embed_cache_key(mod_name: str, game: str) -> str:
+    return f"mod_embed:{game}:{mod_name.lower()}"
+
+
+def compute_mod_summary(mod_name: str, game: str) -> dict[str, Any]:
+    """
+    Aggregate every report involving a mod.
+
+    The score weights each report by its net votes + 1: compatible counts
+    fully, needs_patch half, incompatible not at all.
+    """
+    db = get_db()
+    key = mod_name.lower()
+    reports = db.execute(
+        """
+        SELECT r.mod_a, r.mod_b, r.status, r.description, r.upvotes, r.downvotes
+        FROM compatibility_report_mods m
+        JOIN compatibility_reports r ON r.id = m.report_id
+        WHERE m.mod_name = ? AND m.game = ?
+    """,
+        (key, game),
+    ).fetchall()
+
+    counts = {"compatible": 0, "incompatible": 0, "needs_patch": 0}
+    related: dict[str, int] = {}
+    patches = []
+    seen_patches = set()
+    weighted_score = 0.0
+    total_votes = 0
+
+    for report in reports:
+        status = report["status"]
+        counts[status] = counts.get(status, 0) + 1
+        other_mod = report["mod_b"] if report["mod_a"] == key else report["mod_a"]
+        related[other_mod] = related.get(other_mod, 0) + 1
+
+        vote_weight = (report["upvotes"] - report["downvotes"]) + 1
+        if status == "compatible":
+            weighted_score += vote_weight * 1.0
+        elif status == "needs_patch":
+            weighted_score += vote_weight * 0.5
+            description = report["description"] or ""
+            lowered = description.lower()
+            mentions_patch = "patch" in lowered or "compatibility" in lowered
+            if mentions_patch and (other_mod, description) not in seen_patches:
+                seen_patches.add((other_mod, description))
+                if len(patches) < MAX_PATCHES:
+                    patches.append({"patch_mod": other_mod, "description": description})
+        total_votes += vote_weight
+
+    if reports:
+        score = (weighted_score / total_votes * 100) if total_votes > 0 else 50
+    else:
+        score = DEFAULT_SCORE
+
+    related_mods = [
+        name for name, _ in sorted(related.items(), key=lambda item: (-item[1], item[0]))
+    ][:MAX_RELATED_MODS]
+
+    return {
+        "mod_name": key,
+        "game": game,
+        "total_reports": len(reports),
+        "compatible": counts["compatible"],
+        "incompatible": counts["incompatible"],
+        "needs_patch": counts["needs_patch"],
+        "score": round(score, 1),
+        "related_mods": related_mods,
+        "related_mods_count": len(related),
+        "patches": patches,
+        "updated_at": datetime.now(timezone.utc).timestamp(),
+    }
+
+
+def refresh_mod_summary(mod_name: str, game: str, commit: bool = True) -> dict[str, Any]:
+    """Recompute and store one mod's summary, and drop its cached embeds."""
+    summary = compute_mod_summary(mod_name, game)
+    db = get_db()
+    db.execute(
+        """
+        INSERT INTO mod_compat_summaries
+        (mod_name, game, total_reports, compatible, incompatible, needs_patch, score,
+         related_mods_json, related_mods_count, patches_json, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(mod_name, game) DO UPDATE SET
+            total_reports = excluded.total_reports,
+            compatible = excluded.compatible,
+            incompatible = excluded.incompatible,
+            needs_patch = excluded.needs_patch,
+            score = excluded.score,
+            related_mods_json = excluded.related_mods_json,
+            related_mods_count = excluded.related_mods_count,
+            patches_json = excluded.patches_json,
+            updated_at = excluded.updated_at
+    """,
+        (
+            summary["mod_name"],
+            game,
+            summary["total_reports"],
+            summary["compatible"],
+            summary["incompatible"],
+            summary["needs_patch"],
+            summary["score"],
+            json.dumps(summary["related_mods"]),
+            summary["related_mods_count"],
+            json.dumps(summary["patches"]),
+            summary["updated_at"],
+        ),
+    )
+    if commit:
+        db.commit()
+    get_cache().delete(_embed_cache_key(mod_name, game))
+    return summary
+
+
+def refresh_report_mods(mod_a: str, mod_b: str, game: str) -> None:
+    """Refresh both mods of a report after it's written, voted on or deleted."""
+    for mod_name in {mod_a.lower(), mod_b.lower()}:
+        try:
+            refresh_mod_summary(mod_name, game)
+        except Exception as e:
+            logger.warning(f"Failed to refresh mod summary for {mod_name}: {e}")
+
+
+def get_mod_summary(mod_name: str, game: str) -> dict[str, Any]:
+    """
+    Read a mod's summary.
+
+    Without a stored row the summary is computed. It is stored (via the
+    refresh path) only if the mod has reports, so page views and embeds for
+    arbitrary names never write.
+    """
+    row = (
+        get_db()
+        .execute(
+            "SELECT * FROM mod_compat_summaries WHERE mod_name = ? AND game = ?",
+            (mod_name.lower(), game),
+        )
+        .fetchone()
+    )
+    if row is None:
+        summary = compute_mod_summary(mod_name, game)
+        if summary["total_reports"]:
+            return refresh_mod_summary(mod_name, game)
+        return summary
+
+    summary = dict(row)
+    summary["related_mods"] = json.loads(summary.pop("related_mods_json") or "[]")
+    summary["patches"] = json.loads(summary.pop("patches_json") or "[]")
+    return summary
+
+
+def get_cached_embed(mod_name: str, game: str, theme: str, render) -> dict[str, str]:
+    """
+    Return {"html", "etag"} for an embed, rendering via ``render(summary)`` on a miss.
+
+    All themes for a mod share one cache entry so a summary refresh drops
+    them with a single exact delete. Mods without reports aren't cached, so
+    made-up names can't fill the cache.
+    """
+    cache = get_cache()
+    key = _embed_cache_key(mod_name, game)
+    variants = cache.get(key) or {}
+    entry = variants.get(theme)
+    if entry is None:
+        summary = get_mod_summary(mod_name, game)
+        html = render(summary)
+        entry = {"html": html, "etag": f'"{hashlib.sha1(html.encode("utf-8")).hexdigest()}"'}
+        if summary["total_reports"]:
+            variants[theme] = entry
+            cache.set(key, variants, ttl=EMBED_CACHE_TTL)
+    return entry
+
+
+def conditional_html_response(
+    entry: dict[str, str], cache_control: str = EMBED_CACHE_CONTROL
+) -> Response:
+    """HTML response with ETag/Cache-Control, answering If-None-Match with 304."""
+    headers = {"ETag": entry["etag"], "Cache-Control": cache_control}
+    if_none_match: Optional[str] = request.headers.get("If-None-Match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or entry["etag"] in [tag.strip() for tag in if_none_match.split(",")]
+    ):
+        return Response(status=304, headers=headers)
+    return Response(entry["html"], mimetype="text/html", headers=headers)
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from typing import Any, Optional, TypedDict
 
 from constants import ESL_LIMIT, PLUGIN_LIMIT, PLUGIN_LIMIT_WARN_THRESHOLD
+from pattern_matcher import PatternMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -245,24 +246,30 @@ def _check_system_strain(
     return warnings
 
 
+# Known script-heavy mods (substrings of the lowercased name)
+_SCRIPT_HEAVY_MATCHER = PatternMatcher(
+    (
+        (pattern, pattern)
+        for pattern in (
+            "ordinator",
+            "skyrim unlimited",
+            "spells",
+            "combat",
+            "ai overhaul",
+            "settlement",
+            "sim settlements",
+        )
+    ),
+    literal=True,
+    flags=0,
+)
+
+
 def _check_script_heavy_mods(mod_names: list[str]) -> list[ModWarning]:
     """Check for script-heavy mods that may cause issues."""
     warnings: list[ModWarning] = []
 
-    # Known script-heavy mods
-    script_heavy_patterns = [
-        "ordinator",
-        "skyrim unlimited",
-        "spells",
-        "combat",
-        "ai overhaul",
-        "settlement",
-        "sim settlements",
-    ]
-
-    heavy_count = sum(
-        1 for mod in mod_names if any(pattern in mod.lower() for pattern in script_heavy_patterns)
-    )
+    heavy_count = sum(1 for mod in mod_names if _SCRIPT_HEAVY_MATCHER.matches(mod.lower()))
 
     if heavy_count >= 5:
         warnings.append(
@@ -16,6 +16,7 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -365,6 +366,39 @@ class ConflictStat(Base):
     )
 
 
+class ActivityDailyRollup(Base):
+    """Pre-aggregated user activity per day, event type, game and feature."""
+
+    __tablename__ = "activity_daily_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(String(10), nullable=False, index=True)  # YYYY-MM-DD (UTC)
+    event_type = Column(String(100), nullable=False)
+    game = Column(String(50), nullable=False, default="")
+    feature = Column(String(100), nullable=False, default="")
+    event_count = Column(Integer, default=0)
+    user_sketch = Column(LargeBinary, nullable=True)  # HyperLogLog registers
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        UniqueConstraint("day", "event_type", "game", "feature", name="uq_activity_rollup"),
+    )
+
+
+class RollupWatermark(Base):
+    """Last raw row folded into a rollup table (for incremental refresh)."""
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(100), primary_key=True)
+    last_id = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
 # =============================================================================
 # Mod Author Models
 # =============================================================================
@@ -633,6 +667,7 @@ class KnowledgeSource(Base):
     # Content summary (shorthand, not full content)
     summary = Column(Text, nullable=True)
     key_points = Column(Text, nullable=True)  # JSON array of key points
+    minhash = Column(LargeBinary, nullable=True)  # MinHash signature (near_duplicates)
 
     # Linking
     conflicts_with = Column(Text, nullable=True)  # JSON array of mod IDs
@@ -642,6 +677,11 @@ class KnowledgeSource(Base):
     # Deviation tracking
     deviation_flags = Column(Text, nullable=True)  # JSON array
     is_standard_approach = Column(Boolean, default=True)
+    deviation_hash = Column(String(64), nullable=True)  # SHA256 of the labeling inputs
+    deviation_labeled_at = Column(DateTime, nullable=True)
+
+    # Semantic cluster (semantic_clusters / curation_service)
+    cluster_id = Column(Integer, nullable=True, index=True)
 
     # Status
     status = Column(String(50), default="active")  # active, trash, archived
@@ -679,6 +719,23 @@ class KnowledgeSource(Base):
         }
 
 
+class KnowledgeCluster(Base):
+    """Cluster of related knowledge sources found by TF-IDF k-means."""
+
+    __tablename__ = "knowledge_clusters"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game = Column(String(50), nullable=False)
+    category = Column(String(100), nullable=True)  # most common member category
+    label = Column(String(200), nullable=True)  # top TF-IDF terms, e.g. "skse_plugin"
+    size = Column(Integer, default=0)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
 class TrashBinItem(Base):
     """Quarantined items pending review/deletion."""
 
@@ -0,0 +1,142 @@
+"""
+Near Duplicates — MinHash/LSH detection of reworded knowledge sources.
+
+Reddit and Nexus reposts rarely match byte for byte, so an exact content
+hash misses them. Each knowledge source gets a MinHash signature of its
+character shingles when it is ingested (research_pipeline); compaction then
+finds candidates through LSH banding and verifies them with the exact
+Jaccard similarity of the shingle sets.
+
+Provides:
+- shingles(): normalized character shingles of a text
+- MinHash signatures, serialized to bytes for KnowledgeSource.minhash
+- LSHIndex: band buckets for candidate generation
+
+Usage:
+    from near_duplicates import LSHIndex, knowledge_text, minhash, shingles
+
+    signature = minhash(shingles(knowledge_text(title, summary)))
+    index = LSHIndex()
+    index.add(source_id, signature, scope=game)
+    candidates = index.query(signature, scope=game)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import struct
+from typing import Hashable, Iterable, Optional
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+# 16 bands of 4 rows: pairs above ~0.5 estimated similarity usually collide
+LSH_BANDS = 16
+LSH_ROWS = 4
+# Exact shingle Jaccard at or above which two sources count as duplicates
+JACCARD_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Fixed permutation coefficients, so stored signatures stay comparable
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, with runs of punctuation and whitespace collapsed to one space."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """Character shingles of the normalized text (the whole text if shorter)."""
+    norm = normalize(text)
+    if len(norm) <= size:
+        return {norm} if norm else set()
+    return {norm[i : i + size] for i in range(len(norm) - size + 1)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def minhash(shingle_set: Iterable[str]) -> tuple[int, ...]:
+    """MinHash signature (NUM_PERM values) of a shingle set."""
+    hashes = [_shingle_hash(s) for s in shingle_set]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+def knowledge_text(title: Optional[str], summary: Optional[str]) -> str:
+    """Text a knowledge source is shingled on (ingestion and compaction must agree)."""
+    return f"{title or ''} {summary or ''}"
+
+
+def minhash_signature(text: str) -> bytes:
+    """Serialized MinHash signature of a text, for KnowledgeSource.minhash."""
+    return signature_to_bytes(minhash(shingles(text)))
+
+
+def signature_to_bytes(signature: tuple[int, ...]) -> bytes:
+    return struct.pack(f"<{len(signature)}I", *signature)
+
+
+def signature_from_bytes(data: Optional[bytes]) -> Optional[tuple[int, ...]]:
+    """Rebuild a stored signature; None for missing or wrongly sized data."""
+    if not data or len(data) != 4 * NUM_PERM:
+        return None
+    return struct.unpack(f"<{NUM_PERM}I", bytes(data))
+
+
+def estimated_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Fraction of matching MinHash values (estimates the Jaccard similarity)."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures.
+
+    The signature is cut into `bands` bands of `rows` values; two signatures
+    become candidates when any band matches exactly. Keys can carry a scope
+    (e.g. the game) so sources from different games never collide.
+    """
+
+    def __init__(self, bands: int = LSH_BANDS, rows: int = LSH_ROWS) -> None:
+        if bands * rows > NUM_PERM:
+            raise ValueError("bands * rows must not exceed the signature length")
+        self.bands = bands
+        self.rows = rows
+        self._buckets: dict[tuple, list[Hashable]] = {}
+
+    def _band_keys(self, signature: tuple[int, ...], scope: Hashable) -> list[tuple]:
+        r = self.rows
+        return [(scope, band, signature[band * r : (band + 1) * r]) for band in range(self.bands)]
+
+    def add(self, key: Hashable, signature: tuple[int, ...], scope: Hashable = None) -> None:
+        for band_key in self._band_keys(signature, scope):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def query(self, signature: tuple[int, ...], scope: Hashable = None) -> list[Hashable]:
+        """Keys sharing at least one band with signature, in insertion order."""
+        found: dict[Hashable, None] = {}
+        for band_key in self._band_keys(signature, scope):
+            for key in self._buckets.get(band_key, ()):
+                found[key] = None
+        return list(found)
@@ -0,0 +1,71 @@
+"""
+Pattern Matcher — many patterns, one scan.
+
+Mod-name heuristics (heavy mods, script-heavy mods, cross-game hints) used to
+loop over every pattern for every mod. PatternMatcher compiles a pattern list
+into a single regex once, at import, and answers "which patterns match?" in
+one pass over the text.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class PatternMatcher(Generic[T]):
+    """
+    Ordered (pattern, value) pairs compiled into one alternation.
+
+    Each pattern becomes a named group inside a lookahead, so the scan reports
+    a zero-width hit at every position where some pattern starts, naming the
+    first pattern (in list order) that matches there. Taking the lowest index
+    over all positions gives exactly the result of trying the patterns one by
+    one, which keeps first-match semantics intact.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[tuple[str, T]],
+        *,
+        literal: bool = False,
+        flags: int = re.IGNORECASE,
+    ) -> None:
+        """
+        Args:
+            patterns: (pattern, value) pairs, highest priority first
+            literal: Treat patterns as plain substrings instead of regexes
+            flags: re flags for the combined regex
+        """
+        self._values: list[T] = []
+        groups = []
+        for index, (pattern, value) in enumerate(patterns):
+            self._values.append(value)
+            groups.append(f"(?P<p{index}>{re.escape(pattern) if literal else pattern})")
+        # (?!) never matches, so an empty matcher matches nothing.
+        body = "|".join(groups) or "(?!)"
+        self._scan = re.compile(f"(?=(?:{body}))", flags)
+
+    def _indices(self, text: str) -> set[int]:
+        return {int(m.lastgroup[1:]) for m in self._scan.finditer(text) if m.lastgroup}
+
+    def first(self, text: str) -> Optional[T]:
+        """Value of the first pattern in list order that matches text, or None."""
+        indices = self._indices(text)
+        return self._values[min(indices)] if indices else None
+
+    def matches(self, text: str) -> bool:
+        """True if any pattern matches text."""
+        return self._scan.search(text) is not None
+
+    def hits(self, text: str) -> list[T]:
+        """
+        Values of the patterns found in text, in list order.
+
+        A pattern is reported when it is the first to match at some position;
+        a lower-priority pattern starting at the same position is shadowed.
+        """
+        return [self._values[i] for i in sorted(self._indices(text))]
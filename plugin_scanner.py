@@ -0,0 +1,443 @@
+"""
+Plugin Record Scanner for SkyModderAI
+
+Reads Bethesda plugins (.esp/.esm/.esl, TES4 format) directly so conflict
+detection can see real record-level overrides instead of relying only on
+LOOT metadata.
+
+Only headers are read: the TES4 file header (masters, ESM/ESL flags, record
+count) and every GRUP/record header. Record bodies are skipped, never
+decompressed, and files are memory-mapped, so scanning a full Data folder is
+bounded by header count rather than data size.
+
+The override index maps each overridden record (origin plugin + object ID)
+to the plugins that edit it, in load order. Records edited by two or more
+plugins where the later one doesn't list the earlier as a master become
+"record_override" conflicts.
+
+CLI:
+    python plugin_scanner.py <Data folder> [--load-order plugins.txt] [-o report.json]
+
+The JSON report can be posted to /api/analyze as ``plugin_scan``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional, Union
+
+from exceptions import InvalidPluginError
+from loot_parser import ModConflict
+
+PLUGIN_EXTENSIONS = (".esp", ".esm", ".esl")
+REPORT_FORMAT = 1
+
+FLAG_MASTER = 0x00000001
+FLAG_LOCALIZED = 0x00000080
+FLAG_LIGHT = 0x00000200
+
+# type, data size, flags, form ID (the rest of the header is version info)
+_HEADER = struct.Struct("<4sIII")
+_SUBRECORD = struct.Struct("<4sH")
+_HEDR = struct.Struct("<fIi")
+_GRUP = b"GRUP"
+
+# Below this many plugins, scanning stays in-process.
+PARALLEL_THRESHOLD = 32
+MAX_CONFLICT_PAIRS = 200
+SAMPLE_FORM_IDS = 5
+
+
+@dataclass
+class PluginHeader:
+    """File header of a plugin (the TES4 record)."""
+
+    name: str
+    version: float
+    masters: list[str]
+    is_master: bool
+    is_light: bool
+    is_localized: bool
+    declared_records: int
+    header_size: int  # 20 for Oblivion, 24 for everything later
+
+
+@dataclass
+class PluginScan:
+    """Header plus the override records found in one plugin."""
+
+    header: PluginHeader
+    record_count: int = 0
+    record_types: dict[str, int] = field(default_factory=dict)
+    # Parallel arrays: raw form ID and index into override_type_names.
+    override_form_ids: array = field(default_factory=lambda: array("I"))
+    override_types: array = field(default_factory=lambda: array("H"))
+    override_type_names: list[str] = field(default_factory=list)
+
+
+# =============================================================================
+# Reading plugins
+# =============================================================================
+
+
+def _read_header(buf, name: str) -> tuple[PluginHeader, int]:
+    """Parse the TES4 record. Returns the header and the offset just past it."""
+    if len(buf) < 20 or bytes(buf[0:4]) != b"TES4":
+        raise InvalidPluginError(f"{name} is not a TES4-format plugin")
+    _, data_size, flags, _ = _HEADER.unpack_from(buf, 0)
+    header_size = 20 if bytes(buf[20:24]) == b"HEDR" else 24
+    end = header_size + data_size
+    if end > len(buf):
+        raise InvalidPluginError(f"{name} has a truncated file header")
+
+    version = 0.0
+    declared = 0
+    masters: list[str] = []
+    offset = header_size
+    big_size = None
+    while offset + 6 <= end:
+        sub_type, size = _SUBRECORD.unpack_from(buf, offset)
+        offset += 6
+        if big_size is not None:
+            size, big_size = big_size, None
+        if sub_type == b"XXXX":
+            big_size = struct.unpack_from("<I", buf, offset)[0]
+        elif sub_type == b"HEDR" and size >= _HEDR.size:
+            version, declared, _ = _HEDR.unpack_from(buf, offset)
+        elif sub_type == b"MAST":
+            raw = bytes(buf[offset : offset + size]).split(b"\0", 1)[0]
+            masters.append(raw.decode("cp1252", errors="replace"))
+        offset += size
+
+    header = PluginHeader(
+        name=name,
+        version=round(version, 2),
+        masters=masters,
+        is_master=bool(flags & FLAG_MASTER) or name.lower().endswith(".esm"),
+        is_light=bool(flags & FLAG_LIGHT) or name.lower().endswith(".esl"),
+        is_localized=bool(flags & FLAG_LOCALIZED),
+        declared_records=declared,
+        header_size=header_size,
+    )
+    return header, end
+
+
+def scan_buffer(buf, name: str) -> PluginScan:
+    """
+    Walk every GRUP and record header in a plugin held in ``buf``.
+
+    GRUP contents directly follow their header, so the walk is a flat loop:
+    step over a GRUP header into its contents, or over a record header and
+    its body. Only records whose form ID points at a master are kept.
+    """
+    header, offset = _read_header(buf, name)
+    master_count = len(header.masters)
+    step = header.header_size
+    end = len(buf)
+    unpack = _HEADER.unpack_from
+
+    scan = PluginScan(header=header)
+    type_counts: Counter = Counter()
+    type_index: dict[bytes, int] = {}
+    form_ids = scan.override_form_ids
+    types = scan.override_types
+
+    while offset + step <= end:
+        rec_type, size, _, form_id = unpack(buf, offset)
+        if rec_type == _GRUP:
+            offset += step
+            continue
+        type_counts[rec_type] += 1
+        if form_id >> 24 < master_count:
+            idx = type_index.get(rec_type)
+            if idx is None:
+                idx = type_index[rec_type] = len(type_index)
+            form_ids.append(form_id)
+            types.append(idx)
+        offset += step + size
+
+    if offset != end:
+        raise InvalidPluginError(f"{name} has a truncated record at offset {offset}")
+
+    scan.record_count = sum(type_counts.values())
+    scan.record_types = {t.decode("ascii", "replace"): n for t, n in type_counts.items()}
+    scan.override_type_names = [t.decode("ascii", "replace") for t in type_index]
+    return scan
+
+
+def scan_plugin(path: str, name: Optional[str] = None) -> PluginScan:
+    """Memory-map and scan one plugin file (``name`` defaults to the file name)."""
+    name = name or os.path.basename(path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise InvalidPluginError(f"{name} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return scan_buffer(mm, name)
+
+
+def _scan_or_none(path: str) -> Optional[PluginScan]:
+    try:
+        return scan_plugin(path)
+    except (InvalidPluginError, OSError, struct.error):
+        return None
+
+
+def scan_plugins(paths: list[str], workers: Optional[int] = None) -> list[PluginScan]:
+    """
+    Scan many plugins, in a process pool when there are enough to be worth it.
+
+    Unreadable or malformed plugins are skipped. Results keep input order.
+    """
+    if workers == 1 or len(paths) < PARALLEL_THRESHOLD:
+        results = [_scan_or_none(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(_scan_or_none, paths, chunksize=chunk))
+    return [r for r in results if r is not None]
+
+
+# =============================================================================
+# Override index
+# =============================================================================
+
+
+def build_override_index(
+    scans: list[PluginScan],
+) -> tuple[list[str], dict[int, Union[int, list[int]]], dict[int, str]]:
+    """
+    Build the FormID → plugins override index over scans in load order.
+
+    Records are keyed by (origin plugin, object ID) packed into one int, so
+    the same record reached through different master lists lines up. A key
+    edited by one plugin stores that plugin's index; only keys edited by
+    several plugins grow a list (and get their record type kept).
+
+    Returns (plugin_names, index, multi_override_types).
+    """
+    names = [s.header.name for s in scans]
+    plugin_ids: dict[str, int] = {}
+    index: dict[int, Union[int, list[int]]] = {}
+    multi_types: dict[int, str] = {}
+
+    def origin_id(name: str) -> int:
+        key = name.lower()
+        if key not in plugin_ids:
+            plugin_ids[key] = len(plugin_ids)
+        return plugin_ids[key]
+
+    for position, scan in enumerate(scans):
+        origin_id(scan.header.name)
+        master_ids = [origin_id(m) for m in scan.header.masters]
+        type_names = scan.override_type_names
+        for form_id, type_idx in zip(scan.override_form_ids, scan.override_types):
+            key = (master_ids[form_id >> 24] << 24) | (form_id & 0xFFFFFF)
+            seen = index.get(key)
+            if seen is None:
+                index[key] = position
+            elif isinstance(seen, int):
+                index[key] = [seen, position]
+                multi_types[key] = type_names[type_idx]
+            else:
+                seen.append(position)
+    return names, index, multi_types
+
+
+def find_record_conflicts(scans: list[PluginScan]) -> list[dict[str, Any]]:
+    """
+    Pair up plugins that override the same records.
+
+    For every record edited by several plugins, the last one wins; each
+    earlier editor is a loser unless the winner lists it as a master (an
+    intentional patch). Returns pairs sorted by conflict count.
+    """
+    names, index, multi_types = build_override_index(scans)
+    masters_of = [{m.lower() for m in s.header.masters} for s in scans]
+    pairs: dict[tuple[int, int], dict[str, Any]] = {}
+
+    for key, editors in index.items():
+        if isinstance(editors, int):
+            continue
+        winner = editors[-1]
+        for loser in set(editors[:-1]):
+            if loser == winner or names[loser].lower() in masters_of[winner]:
+                continue
+            entry = pairs.get((winner, loser))
+            if entry is None:
+                entry = pairs[(winner, loser)] = {"count": 0, "types": Counter(), "sample": []}
+            entry["count"] += 1
+            entry["types"][multi_types[key]] += 1
+            if len(entry["sample"]) < SAMPLE_FORM_IDS:
+                entry["sample"].append(f"{key & 0xFFFFFF:06X}")
+
+    conflicts = [
+        {
+            "winner": names[winner],
+            "loser": names[loser],
+            "count": entry["count"],
+            "record_types": [t for t, _ in entry["types"].most_common(5)],
+            "sample_form_ids": entry["sample"],
+        }
+        for (winner, loser), entry in pairs.items()
+    ]
+    conflicts.sort(key=lambda c: (-c["count"], c["winner"].lower(), c["loser"].lower()))
+    return conflicts[:MAX_CONFLICT_PAIRS]
+
+
+# =============================================================================
+# Reports
+# =============================================================================
+
+
+def parse_load_order(lines) -> list[str]:
+    """
+    Plugin names from plugins.txt / loadorder.txt lines.
+
+    Skips blanks, # comments and "-" (disabled) entries, and strips the "*"
+    that marks enabled plugins in plugins.txt.
+    """
+    names = []
+    for line in lines:
+        entry = line.strip()
+        if not entry or entry.startswith(("#", "-")):
+            continue
+        entry = entry.lstrip("*").strip()
+        if entry:
+            names.append(entry)
+    return names
+
+
+def order_plugins(paths: list[str], load_order: Optional[list[str]] = None) -> list[str]:
+    """
+    Sort plugin paths into load order.
+
+    With a load order (e.g. plugins.txt names), listed plugins come first in
+    that order and unlisted ones are dropped. Without one, masters load
+    before regular plugins, alphabetically within each group.
+    """
+    by_name = {os.path.basename(p).lower(): p for p in paths}
+    if load_order:
+        ordered = []
+        for entry in load_order:
+            path = by_name.pop(entry.strip().lstrip("*").lower(), None)
+            if path:
+                ordered.append(path)
+        return ordered
+    return sorted(
+        paths, key=lambda p: (not p.lower().endswith(".esm"), os.path.basename(p).lower())
+    )
+
+
+def build_report(scans: list[PluginScan]) -> dict[str, Any]:
+    """JSON-serializable summary: plugin headers plus record-level conflicts."""
+    return {
+        "format": REPORT_FORMAT,
+        "plugins": [
+            {
+                **asdict(s.header),
+                "record_count": s.record_count,
+                "override_count": len(s.override_form_ids),
+            }
+            for s in scans
+        ],
+        "conflicts": find_record_conflicts(scans),
+    }
+
+
+def scan_data_folder(
+    folder: str, load_order: Optional[list[str]] = None, workers: Optional[int] = None
+) -> dict[str, Any]:
+    """Scan every plugin in a Data folder and build the report."""
+    paths = [
+        os.path.join(folder, entry)
+        for entry in os.listdir(folder)
+        if entry.lower().endswith(PLUGIN_EXTENSIONS)
+    ]
+    return build_report(scan_plugins(order_plugins(paths, load_order), workers=workers))
+
+
+def report_to_conflicts(
+    report: dict[str, Any], enabled_mods: Optional[list[str]] = None
+) -> list[ModConflict]:
+    """
+    Turn a scan report's conflict pairs into ModConflicts for the analysis.
+
+    With ``enabled_mods``, pairs involving plugins not in the list are dropped.
+    """
+    if not isinstance(report, dict) or report.get("format") != REPORT_FORMAT:
+        return []
+    enabled = {m.lower() for m in enabled_mods} if enabled_mods is not None else None
+
+    conflicts = []
+    for pair in (report.get("conflicts") or [])[:MAX_CONFLICT_PAIRS]:
+        if not isinstance(pair, dict):
+            continue
+        winner = str(pair.get("winner") or "")[:200]
+        loser = str(pair.get("loser") or "")[:200]
+        if not winner or not loser:
+            continue
+        if enabled is not None and (winner.lower() not in enabled or loser.lower() not in enabled):
+            continue
+        try:
+            count = int(pair.get("count") or 0)
+        except (TypeError, ValueError):
+            continue
+        types = ", ".join(str(t)[:4] for t in (pair.get("record_types") or [])[:5])
+        conflicts.append(
+            ModConflict(
+                type="record_override",
+                severity="warning" if count >= 10 else "info",
+                message=(
+                    f"{winner} overrides {count} record(s) also edited by {loser}"
+                    + (f" ({types})" if types else "")
+                    + f". {winner}'s version wins."
+                ),
+                affected_mod=winner,
+                related_mod=loser,
+                suggested_action=(
+                    "Check the records in xEdit. If both mods' changes matter, "
+                    "make a conflict-resolution patch or use a compatibility patch."
+                ),
+            )
+        )
+    return conflicts
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scan plugins for record-level conflicts.")
+    parser.add_argument("folder", help="Game Data folder containing .esp/.esm/.esl files")
+    parser.add_argument("--load-order", help="plugins.txt / loadorder.txt to order plugins by")
+    parser.add_argument("--workers", type=int, default=None, help="Scanner processes")
+    parser.add_argument("-o", "--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    load_order = None
+    if args.load_order:
+        with open(args.load_order, encoding="utf-8-sig", errors="replace") as f:
+            load_order = parse_load_order(f)
+
+    report = scan_data_folder(args.folder, load_order=load_order, workers=args.workers)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(
+            f"Scanned {len(report['plugins'])} plugins, "
+            f"{len(report['conflicts'])} conflicting pairs → {args.output}"
+        )
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,17 +10,65 @@ Dimensions:
 5. Author Reputation - What's the author's track record?
 
 Each dimension scores 0.0-1.0, combined into weighted reliability score.
+
+score_source() scores one dict; score_batch() scores columns (one list per
+field) and returns arrays of dimension scores, vectorized with NumPy when it
+is installed. Both give identical results.
 """
 
 from __future__ import annotations
 
 import logging
+import math
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Optional
+from itertools import chain
+from typing import Any, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    NUMPY_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+DIMENSIONS = (
+    "source_credibility",
+    "content_freshness",
+    "community_validation",
+    "technical_accuracy",
+    "author_reputation",
+)
+
+# Weighted average (credibility + accuracy weighted higher)
+DIMENSION_WEIGHTS = {
+    "source_credibility": 0.25,
+    "content_freshness": 0.15,
+    "community_validation": 0.20,
+    "technical_accuracy": 0.25,
+    "author_reputation": 0.15,
+}
+
+# Trusted domains and the credibility floor they give, in precedence order
+TRUSTED_DOMAINS = {
+    "nexusmods.com": 0.85,
+    "reddit.com/r/skyrimmods": 0.75,
+    "reddit.com/r/fo4mods": 0.75,
+    "bethesda.net": 0.7,
+}
+KNOWN_AUTHORS = ("arthmoor", "enai siaion", "meh321", "doubleyou", "ruvyn")
+
+_TRUSTED_DOMAIN_RE = re.compile("|".join(re.escape(domain) for domain in TRUSTED_DOMAINS))
+_VERSION_NUMBER_RE = re.compile(r"\d+\.\d+\.\d+")
+_OFFICIAL_LINK_RE = re.compile(r"nexusmods\.com|github\.com")
+_CLICKBAIT_RE = re.compile(r"amazing|incredible|must have")
+_OLD_GAME_VERSION_RE = re.compile(r"1\.5\.|1\.4\.")
+_KNOWN_AUTHOR_RE = re.compile("|".join(re.escape(author) for author in KNOWN_AUTHORS))
+
 
 @dataclass
 class ReliabilityScore:
@@ -46,14 +94,7 @@ class ReliabilityScore:
 
     def compute(self) -> ReliabilityScore:
         """Compute overall score and confidence."""
-        # Weighted average (credibility + accuracy weighted higher)
-        weights = {
-            "source_credibility": 0.25,
-            "content_freshness": 0.15,
-            "community_validation": 0.20,
-            "technical_accuracy": 0.25,
-            "author_reputation": 0.15,
-        }
+        weights = DIMENSION_WEIGHTS
 
         self.overall_score = (
             self.source_credibility * weights["source_credibility"]
@@ -76,14 +117,14 @@ class ReliabilityScore:
         self.confidence = min(1.0, data_points / 5.0)
 
         # Add flags for edge cases
-        if self.content_freshness < 0.3:
-            self.flags.append("outdated")
-        if self.community_validation < 0.3:
-            self.flags.append("unverified")
-        if self.source_credibility < 0.3:
-            self.flags.append("low_credibility")
-        if self.overall_score >= 0.8:
-            self.flags.append("highly_reliable")
+        self.flags.extend(
+            score_flags(
+                self.source_credibility,
+                self.content_freshness,
+                self.community_validation,
+                self.overall_score,
+            )
+        )
 
         return self
 
@@ -107,6 +148,170 @@ class ReliabilityScore:
         }
 
 
+def score_flags(
+    source_credibility: float,
+    content_freshness: float,
+    community_validation: float,
+    overall_score: float,
+) -> list[str]:
+    """Edge-case flags for a scored source."""
+    flags = []
+    if content_freshness < 0.3:
+        flags.append("outdated")
+    if community_validation < 0.3:
+        flags.append("unverified")
+    if source_credibility < 0.3:
+        flags.append("low_credibility")
+    if overall_score >= 0.8:
+        flags.append("highly_reliable")
+    return flags
+
+
+@dataclass
+class BatchScores:
+    """
+    Dimension scores for a batch of sources, one entry per source.
+
+    Fields are NumPy float arrays when NumPy is available, else lists.
+    """
+
+    source_credibility: Any
+    content_freshness: Any
+    community_validation: Any
+    technical_accuracy: Any
+    author_reputation: Any
+    overall_score: Any
+    confidence: Any
+
+    def __len__(self) -> int:
+        return len(self.overall_score)
+
+    def flags(self, i: int) -> list[str]:
+        return score_flags(
+            self.source_credibility[i],
+            self.content_freshness[i],
+            self.community_validation[i],
+            self.overall_score[i],
+        )
+
+
+def combine_dimensions(
+    dimensions: Mapping[str, Sequence[float]], use_numpy: Optional[bool] = None
+) -> tuple[Any, Any]:
+    """
+    Overall scores and confidences from dimension score columns.
+
+    Same arithmetic as ReliabilityScore.compute(), so stored dimension scores
+    can be re-weighted without re-scoring the sources.
+    """
+    weights = DIMENSION_WEIGHTS
+    if NUMPY_AVAILABLE if use_numpy is None else use_numpy:
+        columns = {name: np.asarray(dimensions[name], dtype=np.float64) for name in DIMENSIONS}
+        overall = (
+            columns["source_credibility"] * weights["source_credibility"]
+            + columns["content_freshness"] * weights["content_freshness"]
+            + columns["community_validation"] * weights["community_validation"]
+            + columns["technical_accuracy"] * weights["technical_accuracy"]
+            + columns["author_reputation"] * weights["author_reputation"]
+        )
+        data_points = sum((columns[name] != 0.5).astype(np.int64) for name in DIMENSIONS)
+        return overall, np.minimum(1.0, data_points / 5.0)
+
+    overall_scores = []
+    confidences = []
+    for values in zip(*(dimensions[name] for name in DIMENSIONS)):
+        score = ReliabilityScore(*values).compute()
+        overall_scores.append(score.overall_score)
+        confidences.append(score.confidence)
+    return overall_scores, confidences
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    """A naive local datetime from an ISO string or datetime (None if unusable)."""
+    parsed: datetime
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    elif isinstance(value, datetime):
+        parsed = value
+    else:
+        return None
+    if parsed.tzinfo is not None:
+        # GitHub dates end in Z; compare them with datetime.now() in local time
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _domain_floor(url: str) -> float:
+    """Credibility floor of the highest-precedence trusted domain in a lowercase URL."""
+    return max((TRUSTED_DOMAINS[m] for m in _TRUSTED_DOMAIN_RE.findall(url)), default=0.0)
+
+
+def _accuracy_signals(
+    content: Optional[str],
+    title: Optional[str],
+    tags: Any,
+    has_evidence: Any,
+    is_solution: Any,
+    game_version: Optional[str],
+) -> tuple[int, int]:
+    """(positive, negative) technical accuracy signals of a source."""
+    content = content or ""
+    tags = tags or []
+
+    positive_signals = 0
+    negative_signals = 0
+
+    # Has code blocks or technical details
+    if "```" in content or "code" in tags:
+        positive_signals += 1
+
+    # Has version numbers
+    if _VERSION_NUMBER_RE.search(content):
+        positive_signals += 1
+
+    # Has links to official sources
+    if _OFFICIAL_LINK_RE.search(content):
+        positive_signals += 1
+
+    # Has screenshots/evidence
+    if has_evidence:
+        positive_signals += 1
+
+    # Marked as verified/solution
+    if is_solution:
+        positive_signals += 2
+
+    # Negative: clickbait title
+    if _CLICKBAIT_RE.search((title or "").lower()):
+        negative_signals += 1
+
+    # Negative: outdated game version mentioned
+    if _OLD_GAME_VERSION_RE.search(game_version or ""):
+        negative_signals += 1
+
+    return positive_signals, negative_signals
+
+
+def _by_value(func: Any, values: Any) -> Any:
+    """
+    func(v) for each value of an array, evaluated once per distinct value.
+
+    NumPy's log10/power may differ from libm in the last bit, which would
+    break parity with score_source(), so transcendental functions run in
+    Python over the (few) distinct inputs and are broadcast back.
+    """
+    unique, inverse = np.unique(values, return_inverse=True)
+    return np.asarray([func(v) for v in unique.tolist()], dtype=np.float64)[inverse.reshape(-1)]
+
+
+def _log10_by_value(values: Any) -> Any:
+    """math.log10(max(1, v)) for each value of an array."""
+    return _by_value(math.log10, np.maximum(1.0, values))
+
+
 class ReliabilityWeighter:
     """Computes reliability scores for information sources."""
 
@@ -161,26 +366,155 @@ class ReliabilityWeighter:
         Returns:
             ReliabilityScore object
         """
-        score = ReliabilityScore(
-            source_url=source_data.get("url", ""),
-            source_type=source_data.get("type", "unknown"),
-            game_version=source_data.get("game_version", ""),
+        return self._score_row(source_data)
+
+    def score_sources(
+        self, sources: Sequence[Mapping[str, Any]], now: Optional[datetime] = None
+    ) -> list[ReliabilityScore]:
+        """Score a list of source dicts in one batch (same results as score_source())."""
+        names = sorted({name for source in sources for name in source})
+        batch = self.score_batch(
+            {name: [source.get(name) for source in sources] for name in names}, now
         )
+        scores = []
+        for i, source in enumerate(sources):
+            score = self._new_score(source)
+            for name in DIMENSIONS:
+                setattr(score, name, float(getattr(batch, name)[i]))
+            scores.append(score.compute())
+        return scores
+
+    def score_batch(
+        self,
+        columns: Mapping[str, Sequence[Any]],
+        now: Optional[datetime] = None,
+        use_numpy: Optional[bool] = None,
+    ) -> BatchScores:
+        """
+        Score a batch of sources given as columns.
 
-        # 1. Source Credibility
-        score.source_credibility = self._score_source_credibility(source_data)
+        Args:
+            columns: The score_source() fields, one sequence per field, e.g.
+                {"url": [...], "published_date": [...], "endorsements": [...],
+                "content": [...]}. A missing field is missing for every source.
+            now: Reference time for freshness (naive local time, default now)
 
-        # 2. Content Freshness
-        score.content_freshness = self._score_freshness(source_data)
+        Returns:
+            BatchScores, entry i equal to score_source() of row i
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        n = lengths.pop() if lengths else 0
+
+        def column(name: str) -> Sequence[Any]:
+            values = columns.get(name)
+            return [None] * n if values is None else values
+
+        if not (NUMPY_AVAILABLE if use_numpy is None else use_numpy):
+            names = list(columns)
+            scores = [
+                self._score_row({name: columns[name][i] for name in names}, now) for i in range(n)
+            ]
+            return BatchScores(
+                **{
+                    name: [getattr(score, name) for score in scores]
+                    for name in DIMENSIONS + ("overall_score", "confidence")
+                }
+            )
 
-        # 3. Community Validation
-        score.community_validation = self._score_community_validation(source_data)
+        def array(values: Any, dtype: Any = np.float64) -> Any:
+            return np.fromiter(values, dtype=dtype, count=n)
 
-        # 4. Technical Accuracy (requires content analysis)
-        score.technical_accuracy = self._score_technical_accuracy(source_data)
+        def numbers(name: str) -> Any:
+            return array(value or 0 for value in column(name))
+
+        # 1. Source Credibility
+        types = [(value or "unknown").lower() for value in column("type")]
+        urls = [(value or "").lower() for value in column("url")]
+        base = array(self.SOURCE_BASE_SCORES.get(t, 0.3) for t in types)
+        base = np.maximum(base, array(_domain_floor(url) for url in urls))
+        https = array((url.startswith("https://") for url in urls), bool)
+        credibility = np.minimum(1.0, np.where(https, base, base * 0.9))
+
+        # 2. Content Freshness (whole days, as timedelta.days; cheaper than datetime64)
+        now = now or datetime.now()
+        references = [
+            _parse_date(updated or published)
+            for updated, published in zip(column("updated_date"), column("published_date"))
+        ]
+        dated = array((reference is not None for reference in references), bool)
+        age_days = array(((now - (reference or now)).days for reference in references), np.int64)
+        half_life = array(
+            (self.FRESHNESS_HALF_LIFE.get(t or "mod_release", 180) for t in column("content_type")),
+            np.int64,
+        )
+        decay = _by_value(lambda exponent: 2**exponent, -age_days / half_life)
+        freshness = np.where(dated, np.minimum(1.0, np.maximum(0.0, decay)), 0.5)
+
+        # 3. Community Validation
+        rating = numbers("rating")
+        community = (
+            np.minimum(1.0, _log10_by_value(numbers("endorsements")) / 4) * 0.4
+            + np.minimum(1.0, _log10_by_value(numbers("upvotes") + numbers("likes")) / 4) * 0.2
+            + np.where(rating != 0, rating / 5.0, 0.5) * 0.3
+            + np.minimum(1.0, _log10_by_value(numbers("comments")) / 3) * 0.1
+        )
+        community = np.minimum(1.0, np.maximum(0.0, community))
+
+        # 4. Technical Accuracy
+        signals = np.fromiter(
+            chain.from_iterable(
+                _accuracy_signals(
+                    content, title, tags, screenshots or images, solution or verified, version
+                )
+                for content, title, tags, screenshots, images, solution, verified, version in zip(
+                    column("content"),
+                    column("title"),
+                    column("tags"),
+                    column("has_screenshots"),
+                    column("has_images"),
+                    column("is_solution"),
+                    column("verified"),
+                    column("game_version"),
+                )
+            ),
+            dtype=np.int64,
+            count=2 * n,
+        ).reshape(n, 2)
+        positive, negative = signals[:, 0], signals[:, 1]
+        accuracy = (positive + 0.5) / (positive + negative + 1 + 1)
+        accuracy = np.minimum(1.0, np.maximum(0.0, accuracy))
 
         # 5. Author Reputation
-        score.author_reputation = self._score_author_reputation(source_data)
+        known_bonus = array(
+            0.2 if _KNOWN_AUTHOR_RE.search((a or "").lower()) else 0.0 for a in column("author")
+        )
+        reputation = (
+            np.minimum(1.0, _log10_by_value(numbers("author_endorsements")) / 4) * 0.4
+            + np.minimum(1.0, _log10_by_value(numbers("author_posts")) / 3) * 0.3
+            + np.minimum(1.0, _log10_by_value(numbers("author_karma")) / 5) * 0.1
+            + known_bonus
+        )
+        reputation = np.minimum(1.0, np.maximum(0.0, reputation))
+
+        dimensions = {
+            "source_credibility": credibility,
+            "content_freshness": freshness,
+            "community_validation": community,
+            "technical_accuracy": accuracy,
+            "author_reputation": reputation,
+        }
+        overall, confidence = combine_dimensions(dimensions, use_numpy=True)
+        return BatchScores(**dimensions, overall_score=overall, confidence=confidence)
+
+    def _new_score(self, source_data: Mapping[str, Any]) -> ReliabilityScore:
+        """An unscored ReliabilityScore with the source's metadata."""
+        score = ReliabilityScore(
+            source_url=source_data.get("url") or "",
+            source_type=source_data.get("type") or "unknown",
+            game_version=source_data.get("game_version") or "",
+        )
 
         # Set last updated
         updated = source_data.get("updated_date") or source_data.get("published_date")
@@ -192,24 +526,40 @@ class ReliabilityWeighter:
                     pass
             elif isinstance(updated, datetime):
                 score.last_updated = updated
+        return score
+
+    def _score_row(
+        self, source_data: Mapping[str, Any], now: Optional[datetime] = None
+    ) -> ReliabilityScore:
+        score = self._new_score(source_data)
+
+        # 1. Source Credibility
+        score.source_credibility = self._score_source_credibility(source_data)
+
+        # 2. Content Freshness
+        score.content_freshness = self._score_freshness(source_data, now)
+
+        # 3. Community Validation
+        score.community_validation = self._score_community_validation(source_data)
+
+        # 4. Technical Accuracy (requires content analysis)
+        score.technical_accuracy = self._score_technical_accuracy(source_data)
+
+        # 5. Author Reputation
+        score.author_reputation = self._score_author_reputation(source_data)
 
         return score.compute()
 
-    def _score_source_credibility(self, data: dict[str, Any]) -> float:
+    def _score_source_credibility(self, data: Mapping[str, Any]) -> float:
         """Score based on source type and domain."""
-        source_type = data.get("type", "unknown").lower()
+        source_type = (data.get("type") or "unknown").lower()
 
         # Base score from lookup table
         base_score = self.SOURCE_BASE_SCORES.get(source_type, 0.3)
 
         # Adjust for specific domains
-        url = data.get("url", "").lower()
-        if "nexusmods.com" in url:
-            base_score = max(base_score, 0.85)
-        elif "reddit.com/r/skyrimmods" in url or "reddit.com/r/fo4mods" in url:
-            base_score = max(base_score, 0.75)
-        elif "bethesda.net" in url:
-            base_score = max(base_score, 0.7)
+        url = (data.get("url") or "").lower()
+        base_score = max(base_score, _domain_floor(url))
 
         # Adjust for HTTPS, custom domain penalties
         if not url.startswith("https://"):
@@ -217,27 +567,19 @@ class ReliabilityWeighter:
 
         return min(1.0, base_score)
 
-    def _score_freshness(self, data: dict[str, Any]) -> float:
+    def _score_freshness(self, data: Mapping[str, Any], now: Optional[datetime] = None) -> float:
         """Score based on content age and update frequency."""
         published = data.get("published_date")
         updated = data.get("updated_date")
-        content_type = data.get("content_type", "mod_release")
+        content_type = data.get("content_type") or "mod_release"
 
         # Use updated date if available, else published
-        reference_date = updated or published
-        if not reference_date:
+        reference_date = _parse_date(updated or published)
+        if reference_date is None:
             return 0.5  # Unknown age
 
-        if isinstance(reference_date, str):
-            try:
-                reference_date = datetime.fromisoformat(reference_date)
-            except ValueError:
-                return 0.5
-        elif not isinstance(reference_date, datetime):
-            return 0.5
-
         # Calculate age in days
-        age_days = (datetime.now() - reference_date).days
+        age_days = ((now or datetime.now()) - reference_date).days
 
         # Get half-life for content type
         half_life = self.FRESHNESS_HALF_LIFE.get(content_type, 180)
@@ -247,18 +589,15 @@ class ReliabilityWeighter:
 
         return min(1.0, max(0.0, freshness))
 
-    def _score_community_validation(self, data: dict[str, Any]) -> float:
+    def _score_community_validation(self, data: Mapping[str, Any]) -> float:
         """Score based on community engagement and reception."""
-        endorsements = data.get("endorsements", 0)
-        upvotes = data.get("upvotes", 0)
-        likes = data.get("likes", 0)
-        views = data.get("views", 0)
-        comments = data.get("comments", 0)
-        rating = data.get("rating", 0)  # 0-5 scale
+        endorsements = data.get("endorsements") or 0
+        upvotes = data.get("upvotes") or 0
+        likes = data.get("likes") or 0
+        comments = data.get("comments") or 0
+        rating = data.get("rating") or 0  # 0-5 scale
 
         # Normalize endorsements (log scale)
-        import math
-
         endorsement_score = min(1.0, math.log10(max(1, endorsements)) / 4)  # 10k = 1.0
 
         # Upvote/like ratio (if available)
@@ -281,49 +620,19 @@ class ReliabilityWeighter:
 
         return min(1.0, max(0.0, score))
 
-    def _score_technical_accuracy(self, data: dict[str, Any]) -> float:
+    def _score_technical_accuracy(self, data: Mapping[str, Any]) -> float:
         """
         Score based on technical accuracy indicators.
         This requires content analysis - for now, use heuristics.
         """
-        content = data.get("content", "")
-        title = data.get("title", "")
-        tags = data.get("tags", [])
-
-        # Positive indicators
-        positive_signals = 0
-        negative_signals = 0
-
-        # Has code blocks or technical details
-        if "```" in content or "code" in tags:
-            positive_signals += 1
-
-        # Has version numbers
-        import re
-
-        if re.search(r"\d+\.\d+\.\d+", content):
-            positive_signals += 1
-
-        # Has links to official sources
-        if "nexusmods.com" in content or "github.com" in content:
-            positive_signals += 1
-
-        # Has screenshots/evidence
-        if data.get("has_screenshots") or data.get("has_images"):
-            positive_signals += 1
-
-        # Marked as verified/solution
-        if data.get("is_solution") or data.get("verified"):
-            positive_signals += 2
-
-        # Negative: clickbait title
-        if any(word in title.lower() for word in ["amazing", "incredible", "must have"]):
-            negative_signals += 1
-
-        # Negative: outdated game version mentioned
-        if data.get("game_version"):
-            if any(old in data["game_version"] for old in ["1.5.", "1.4."]):
-                negative_signals += 1
+        positive_signals, negative_signals = _accuracy_signals(
+            data.get("content"),
+            data.get("title"),
+            data.get("tags"),
+            data.get("has_screenshots") or data.get("has_images"),
+            data.get("is_solution") or data.get("verified"),
+            data.get("game_version"),
+        )
 
         # Calculate score
         total_signals = positive_signals + negative_signals + 1  # +1 to avoid division by zero
@@ -331,14 +640,12 @@ class ReliabilityWeighter:
 
         return min(1.0, max(0.0, score))
 
-    def _score_author_reputation(self, data: dict[str, Any]) -> float:
+    def _score_author_reputation(self, data: Mapping[str, Any]) -> float:
         """Score based on author's track record."""
-        author = data.get("author", "")
-        author_endorsements = data.get("author_endorsements", 0)
-        author_posts = data.get("author_posts", 0)
-        author_karma = data.get("author_karma", 0)
-
-        import math
+        author = data.get("author") or ""
+        author_endorsements = data.get("author_endorsements") or 0
+        author_posts = data.get("author_posts") or 0
+        author_karma = data.get("author_karma") or 0
 
         # Author endorsement score
         endorsement_score = min(1.0, math.log10(max(1, author_endorsements)) / 4)
@@ -350,8 +657,7 @@ class ReliabilityWeighter:
         karma_score = min(1.0, math.log10(max(1, author_karma)) / 5)
 
         # Known author bonus
-        known_authors = ["arthmoor", "enai siaion", "meh321", "doubleyou", "ruvyn"]
-        known_bonus = 0.2 if any(known in author.lower() for known in known_authors) else 0
+        known_bonus = 0.2 if _KNOWN_AUTHOR_RE.search(author.lower()) else 0
 
         score = endorsement_score * 0.4 + post_score * 0.3 + karma_score * 0.1 + known_bonus
 
@@ -372,8 +678,7 @@ class ReliabilityWeighter:
             Filtered list of sources with reliability scores added
         """
         filtered = []
-        for source in sources:
-            score = self.score_source(source)
+        for source, score in zip(sources, self.score_sources(sources)):
             if score.overall_score >= min_score and score.confidence >= min_confidence:
                 source["reliability_score"] = score.to_dict()
                 filtered.append(source)
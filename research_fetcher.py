@@ -0,0 +1,245 @@
+"""
+Research Fetcher - concurrent, rate-limited JSON fetching for the research pipeline.
+
+The research cycle used to fetch every Nexus/Reddit/GitHub page one after
+another, so a run spent most of its time waiting on the network. This
+fetcher:
+
+- runs requests on a bounded thread pool (one pooled requests.Session per
+  worker thread)
+- rate limits per host with a token bucket, and pauses a host when its
+  rate-limit headers (Nexus X-RL-*, GitHub/Reddit X-RateLimit-*) report an
+  exhausted quota or it answers 429 with Retry-After
+- sends If-None-Match / If-Modified-Since for URLs fetched before and serves
+  304 responses from the fetch cache (shared cache: Redis when configured)
+
+Usage:
+    from research_fetcher import ResearchFetcher
+
+    fetcher = ResearchFetcher()
+    results = fetcher.get_many([(url, params), ...], headers=headers)
+    for result in results:
+        if result.ok:
+            use(result.data)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterable, Mapping, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+FETCH_WORKERS = int(os.environ.get("RESEARCH_FETCH_WORKERS", "8"))
+FETCH_CACHE_TTL = 14 * 86400  # validators are reused by the weekly cycle
+DEFAULT_RATE = 2.0  # requests per second per host
+DEFAULT_BURST = 4
+MAX_PAUSE = 900.0  # never wait longer than this on a rate-limit reset
+
+# Requests per second and burst by host; unknown hosts get the defaults
+HOST_RATES: dict[str, tuple[float, int]] = {
+    "api.nexusmods.com": (float(os.environ.get("NEXUS_RATE_PER_SECOND", "4")), 8),
+    "api.github.com": (0.5, 4),  # search API: 30/min authenticated
+    "www.reddit.com": (1.0, 2),
+}
+
+# (remaining, reset) header pairs; reset is epoch seconds, seconds from now or ISO time
+_RATE_HEADERS = (
+    ("X-RL-Hourly-Remaining", "X-RL-Hourly-Reset"),  # Nexus
+    ("X-RL-Daily-Remaining", "X-RL-Daily-Reset"),  # Nexus
+    ("X-RateLimit-Remaining", "X-RateLimit-Reset"),  # GitHub, Reddit
+)
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one GET."""
+
+    url: str
+    status: int
+    data: Any = None
+    cached: bool = False  # served from the fetch cache after a 304
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status in (200, 304)
+
+
+class HostRateLimiter:
+    """Token bucket for one host, plus a pause imposed by the host's own quota headers."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Send nothing to this host for `seconds` (capped at MAX_PAUSE)."""
+        seconds = min(max(seconds, 0.0), MAX_PAUSE)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def observe(self, status: int, headers: Mapping[str, str]) -> None:
+        """Apply 429 Retry-After and exhausted-quota headers from a response."""
+        if status == 429:
+            self.pause(_seconds_until(headers.get("Retry-After")) or 60.0)
+            return
+        for remaining_header, reset_header in _RATE_HEADERS:
+            remaining = headers.get(remaining_header)
+            if remaining is None:
+                continue
+            try:
+                exhausted = float(remaining) < 1
+            except ValueError:
+                continue
+            if exhausted:
+                self.pause(_seconds_until(headers.get(reset_header)) or 60.0)
+
+
+def _seconds_until(value: Optional[str]) -> Optional[float]:
+    """Seconds until a reset header value: epoch seconds, a delay, or an HTTP/ISO date."""
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            try:
+                from datetime import datetime
+
+                when = datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                return None
+        return max(0.0, when - time.time())
+    # Epoch timestamps are large; small numbers are delays in seconds
+    return max(0.0, number - time.time()) if number > 1e9 else number
+
+
+def _cache_key(url: str, params: Optional[Mapping[str, Any]]) -> str:
+    full = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+    return "research_fetch:" + hashlib.sha256(full.encode("utf-8")).hexdigest()
+
+
+class ResearchFetcher:
+    """Bounded-concurrency GETs with per-host rate limits and conditional requests."""
+
+    def __init__(
+        self,
+        max_workers: int = FETCH_WORKERS,
+        host_rates: Optional[Mapping[str, tuple[float, int]]] = None,
+        timeout: float = 30.0,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self.timeout = timeout
+        self._limiters: dict[str, HostRateLimiter] = {}
+        self._limiters_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _limiter(self, host: str) -> HostRateLimiter:
+        with self._limiters_lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                rate, burst = self.host_rates.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+                limiter = self._limiters[host] = HostRateLimiter(rate, burst)
+            return limiter
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> FetchResult:
+        """GET url and decode JSON, revalidating against the fetch cache."""
+        key = _cache_key(url, params)
+        cached = get_cache().get(key)
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        limiter = self._limiter(urlsplit(url).netloc)
+        limiter.acquire()
+        try:
+            response = self._session().get(
+                url, params=params, headers=request_headers, timeout=timeout or self.timeout
+            )
+        except requests.RequestException as e:
+            return FetchResult(url, 0, error=str(e))
+        limiter.observe(response.status_code, response.headers)
+
+        if response.status_code == 304 and cached:
+            return FetchResult(url, 304, data=cached["data"], cached=True)
+        if response.status_code != 200:
+            return FetchResult(url, response.status_code, error=f"HTTP {response.status_code}")
+        try:
+            data = response.json()
+        except ValueError as e:
+            return FetchResult(url, 200, error=f"Invalid JSON: {e}")
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            get_cache().set(
+                key,
+                {"etag": etag, "last_modified": last_modified, "data": data},
+                ttl=FETCH_CACHE_TTL,
+            )
+        return FetchResult(url, 200, data=data)
+
+    def get_many(
+        self,
+        requests_: Iterable[tuple[str, Optional[Mapping[str, Any]]]],
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> list[FetchResult]:
+        """GET each (url, params) concurrently; results are in request order."""
+        items = list(requests_)
+        if not items:
+            return []
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda item: self.get(item[0], item[1], headers, timeout), items))
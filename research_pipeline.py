@@ -16,13 +16,36 @@ import logging
 from datetime import datetime
 from typing import Any, Optional
 
-import requests
-
 from db import get_db_session
 from models import KnowledgeSource, SourceCredibility, UserActivity
+from near_duplicates import knowledge_text, minhash_signature
+from research_fetcher import ResearchFetcher
 
 logger = logging.getLogger(__name__)
 
+NEXUS_API_URL = "https://api.nexusmods.com/v1"
+REDDIT_URL = "https://www.reddit.com"
+GITHUB_API_URL = "https://api.github.com"
+USER_AGENT = "SkyModderAI/1.0 (Research Pipeline)"
+
+# Games to scrape: our game id -> Nexus domain
+NEXUS_GAMES = {
+    "skyrimse": "skyrimspecialedition",
+    "skyrim": "skyrim",
+    "skyrimvr": "skyrimspecialedition",  # Same as SE
+    "fallout4": "fallout4",
+    "falloutnv": "newvegas",
+    "oblivion": "oblivion",
+}
+SUBREDDITS = [("skyrimmods", "skyrimse"), ("fo4mods", "fallout4"), ("modding", "general")]
+GITHUB_QUERIES = [
+    "skyrim modding tools",
+    "fallout modding",
+    "bethesda modding",
+    "skse plugin",
+    "xedit script",
+]
+
 
 def run_research_cycle() -> dict[str, Any]:
     """
@@ -40,11 +63,20 @@ def run_research_cycle() -> dict[str, Any]:
     logger.info("Starting research cycle...")
     start_time = datetime.now()
 
+    # One fetcher (rate limits, connection pools) and one URL set for all sources
+    fetcher = ResearchFetcher()
+    session = known_urls = None
+    try:
+        session = get_db_session()
+        known_urls = load_known_urls(session)
+    except Exception as e:
+        logger.warning(f"Could not preload known source URLs: {e}")
+
     results = {
-        "nexus": scrape_nexus_mods(),
-        "reddit": scrape_reddit(),
+        "nexus": scrape_nexus_mods(session, fetcher, known_urls),
+        "reddit": scrape_reddit(session, fetcher, known_urls),
         "forums": scrape_forums(),
-        "github": scrape_github(),
+        "github": scrape_github(session, fetcher, known_urls),
     }
 
     results["total_added"] = sum(r.get("added", 0) for r in results.values())
@@ -60,13 +92,18 @@ def run_research_cycle() -> dict[str, Any]:
     return results
 
 
-def scrape_nexus_mods() -> dict[str, Any]:
+def scrape_nexus_mods(
+    session=None, fetcher: Optional[ResearchFetcher] = None, known_urls: Optional[set[str]] = None
+) -> dict[str, Any]:
     """
     Scrape Nexus Mods API for new and updated mods.
 
     Requires Nexus API key from environment:
     export NEXUS_API_KEY=your_key_here
 
+    The updated-mod lists for all games are fetched concurrently, then the
+    detail pages of mods not already in the knowledge base.
+
     Returns:
         {"mods_found": int, "added": int, "errors": int}
     """
@@ -81,77 +118,82 @@ def scrape_nexus_mods() -> dict[str, Any]:
         return {"mods_found": 0, "added": 0, "errors": 0, "skipped": True}
 
     try:
-        import requests
-
         from reliability_weighter import get_reliability_weighter
 
-        session = get_db_session()
+        session = session or get_db_session()
+        fetcher = fetcher or ResearchFetcher()
+        known_urls = load_known_urls(session) if known_urls is None else known_urls
         weighter = get_reliability_weighter()
 
-        # Nexus API endpoints
-        base_url = "https://api.nexusmods.com/v1"
-        headers = {"apikey": api_key, "User-Agent": "SkyModderAI/1.0 (Research Pipeline)"}
-
-        # Games to scrape
-        games = {
-            "skyrimse": "skyrimspecialedition",
-            "skyrim": "skyrim",
-            "skyrimvr": "skyrimspecialedition",  # Same as SE
-            "fallout4": "fallout4",
-            "falloutnv": "newvegas",
-            "oblivion": "oblivion",
-        }
+        headers = {"apikey": api_key, "User-Agent": USER_AGENT}
 
         mods_found = 0
-        added = 0
         errors = 0
 
-        for game_id, nexus_game in games.items():
-            try:
-                # Get recently updated mods
-                url = f"{base_url}/games/{nexus_game}/mods/updated.json"
-                params = {"period": "1w"}  # Last week
+        # Get recently updated mods (last week) for every game at once
+        listings = fetcher.get_many(
+            [
+                (f"{NEXUS_API_URL}/games/{nexus_game}/mods/updated.json", {"period": "1w"})
+                for nexus_game in NEXUS_GAMES.values()
+            ],
+            headers=headers,
+        )
 
-                response = requests.get(url, headers=headers, params=params, timeout=30)
-                if response.status_code != 200:
-                    logger.warning(f"Nexus API returned {response.status_code} for {nexus_game}")
-                    errors += 1
-                    continue
+        # Only mods we don't know yet need a detail request
+        pending = []
+        queued = set(known_urls)
+        for (game_id, nexus_game), listing in zip(NEXUS_GAMES.items(), listings):
+            if not listing.ok:
+                logger.warning(f"Nexus API returned {listing.status} for {nexus_game}")
+                errors += 1
+                continue
+            mods = listing.data.get("mods", [])
+            mods_found += len(mods)
+            for mod in mods[:50]:  # Limit to top 50 per game
+                mod_id = mod.get("id")
+                if mod_id and nexus_mod_url(nexus_game, mod_id) not in queued:
+                    queued.add(nexus_mod_url(nexus_game, mod_id))
+                    pending.append((game_id, nexus_game, mod_id))
+
+        details = fetcher.get_many(
+            [
+                (f"{NEXUS_API_URL}/games/{nexus_game}/mods/{mod_id}.json", None)
+                for _, nexus_game, mod_id in pending
+            ],
+            headers=headers,
+            timeout=10,
+        )
 
-                mods = response.json().get("mods", [])
-                mods_found += len(mods)
-
-                # Process each mod
-                for mod in mods[:50]:  # Limit to top 50 per game
-                    try:
-                        mod_info = process_nexus_mod(mod, game_id, nexus_game, headers, base_url)
-                        if mod_info:
-                            # Score reliability
-                            score = weighter.score_source(
-                                {
-                                    "url": mod_info["source_url"],
-                                    "type": "nexus_mods",
-                                    "endorsements": mod_info.get("endorsements", 0),
-                                    "published_date": mod_info.get("created_at"),
-                                    "updated_date": mod_info.get("updated_at"),
-                                    "author": mod_info.get("author"),
-                                    "content": mod_info.get("summary", ""),
-                                    "game_version": game_id,
-                                }
-                            )
-
-                            # Add to knowledge base
-                            add_knowledge_source(session, mod_info, score)
-                            added += 1
-
-                    except Exception as e:
-                        logger.debug(f"Error processing Nexus mod: {e}")
-                        errors += 1
+        candidates = []
+        for (game_id, nexus_game, mod_id), detail in zip(pending, details):
+            try:
+                if not detail.ok:
+                    continue
+                mod_info = nexus_mod_knowledge(detail.data, game_id, nexus_game, mod_id)
+                candidates.append(
+                    (
+                        mod_info,
+                        {
+                            "url": mod_info["source_url"],
+                            "type": "nexus_mods",
+                            "endorsements": mod_info.get("endorsements", 0),
+                            "published_date": mod_info.get("created_at"),
+                            "updated_date": mod_info.get("updated_at"),
+                            "author": mod_info.get("author"),
+                            "content": mod_info.get("summary", ""),
+                            "game_version": game_id,
+                        },
+                    )
+                )
 
             except Exception as e:
-                logger.warning(f"Error scraping {nexus_game}: {e}")
+                logger.debug(f"Error processing Nexus mod: {e}")
                 errors += 1
 
+        # Score reliability in one batch and add to knowledge base
+        scores = weighter.score_sources([source for _, source in candidates])
+        entries = [(mod_info, score) for (mod_info, _), score in zip(candidates, scores)]
+        added = add_knowledge_sources(session, entries, known_urls)
         session.commit()
 
         result = {"mods_found": mods_found, "added": added, "errors": errors}
@@ -163,8 +205,17 @@ def scrape_nexus_mods() -> dict[str, Any]:
         return {"mods_found": 0, "added": 0, "errors": 1, "error": str(e)}
 
 
+def nexus_mod_url(nexus_game: str, mod_id: Any) -> str:
+    return f"https://www.nexusmods.com/{nexus_game}/mods/{mod_id}"
+
+
 def process_nexus_mod(
-    mod: dict[str, Any], game_id: str, nexus_game: str, headers: dict[str, str], base_url: str
+    mod: dict[str, Any],
+    game_id: str,
+    nexus_game: str,
+    headers: dict[str, str],
+    base_url: str,
+    fetcher: Optional[ResearchFetcher] = None,
 ) -> Optional[dict[str, Any]]:
     """Process a single Nexus mod into knowledge source format."""
     try:
@@ -174,49 +225,53 @@ def process_nexus_mod(
 
         # Get full mod details
         detail_url = f"{base_url}/games/{nexus_game}/mods/{mod_id}.json"
-        response = requests.get(detail_url, headers=headers, timeout=10)
-        if response.status_code != 200:
+        detail = (fetcher or ResearchFetcher()).get(detail_url, headers=headers, timeout=10)
+        if not detail.ok:
             return None
 
-        details = response.json()
-
-        # Extract relevant info
-        return {
-            "source_url": f"https://www.nexusmods.com/{nexus_game}/mods/{mod_id}",
-            "title": details.get("name", "Unknown Mod"),
-            "summary": (details.get("summary", "") or "")[:500],
-            "game": game_id,
-            "game_version": None,  # Nexus doesn't provide this consistently
-            "mod_version": details.get("version", ""),
-            "category": categorize_nexus_mod(details),
-            "subcategory": None,
-            "tags": extract_nexus_tags(details),
-            "author": details.get("author", ""),
-            "endorsements": details.get("endorsement_count", 0),
-            "created_at": (
-                datetime.fromtimestamp(details.get("created_time", 0)).isoformat()
-                if details.get("created_time")
-                else None
-            ),
-            "updated_at": (
-                datetime.fromtimestamp(details.get("updated_time", 0)).isoformat()
-                if details.get("updated_time")
-                else None
-            ),
-            "content_hash": None,  # Will be computed
-            "requires": extract_requirements(details),
-            "conflicts_with": None,
-            "compatible_with": None,
-            "deviation_flags": None,
-            "is_standard_approach": True,
-            "status": "active",
-        }
+        return nexus_mod_knowledge(detail.data, game_id, nexus_game, mod_id)
 
     except Exception as e:
         logger.debug(f"Error processing Nexus mod details: {e}")
         return None
 
 
+def nexus_mod_knowledge(
+    details: dict[str, Any], game_id: str, nexus_game: str, mod_id: Any
+) -> dict[str, Any]:
+    """Convert Nexus mod details into knowledge source format."""
+    return {
+        "source_url": nexus_mod_url(nexus_game, mod_id),
+        "title": details.get("name", "Unknown Mod"),
+        "summary": (details.get("summary", "") or "")[:500],
+        "game": game_id,
+        "game_version": None,  # Nexus doesn't provide this consistently
+        "mod_version": details.get("version", ""),
+        "category": categorize_nexus_mod(details),
+        "subcategory": None,
+        "tags": extract_nexus_tags(details),
+        "author": details.get("author", ""),
+        "endorsements": details.get("endorsement_count", 0),
+        "created_at": (
+            datetime.fromtimestamp(details.get("created_time", 0)).isoformat()
+            if details.get("created_time")
+            else None
+        ),
+        "updated_at": (
+            datetime.fromtimestamp(details.get("updated_time", 0)).isoformat()
+            if details.get("updated_time")
+            else None
+        ),
+        "content_hash": None,  # Will be computed
+        "requires": extract_requirements(details),
+        "conflicts_with": None,
+        "compatible_with": None,
+        "deviation_flags": None,
+        "is_standard_approach": True,
+        "status": "active",
+    }
+
+
 def categorize_nexus_mod(details: dict[str, Any]) -> str:
     """Categorize Nexus mod based on its properties."""
     categories = details.get("categories", [])
@@ -309,7 +364,9 @@ def extract_requirements(details: dict[str, Any]) -> list[str]:
     return requirements
 
 
-def scrape_reddit() -> dict[str, Any]:
+def scrape_reddit(
+    session=None, fetcher: Optional[ResearchFetcher] = None, known_urls: Optional[set[str]] = None
+) -> dict[str, Any]:
     """
     Scrape Reddit for modding discussions.
 
@@ -324,97 +381,92 @@ def scrape_reddit() -> dict[str, Any]:
     logger.info("Scraping Reddit...")
 
     try:
-        import requests
-
         from reliability_weighter import get_reliability_weighter
 
-        session = get_db_session()
+        session = session or get_db_session()
+        fetcher = fetcher or ResearchFetcher()
+        known_urls = load_known_urls(session) if known_urls is None else known_urls
         weighter = get_reliability_weighter()
 
-        subreddits = [("skyrimmods", "skyrimse"), ("fo4mods", "fallout4"), ("modding", "general")]
-
         posts_found = 0
-        added = 0
         errors = 0
+        candidates = []
 
-        for subreddit, game_id in subreddits:
-            try:
-                # Reddit JSON endpoint (no auth required for public subs)
-                url = f"https://www.reddit.com/r/{subreddit}/hot.json"
-                headers = {"User-Agent": "SkyModderAI/1.0 (Research Pipeline)"}
-
-                response = requests.get(url, headers=headers, timeout=30)
-                if response.status_code != 200:
-                    logger.warning(f"Reddit returned {response.status_code} for r/{subreddit}")
-                    errors += 1
-                    continue
-
-                data = response.json()
-                posts = data.get("data", {}).get("children", [])
-                posts_found += len(posts)
-
-                # Process each post
-                for post in posts[:30]:  # Limit to top 30 per subreddit
-                    try:
-                        post_data = post.get("data", {})
-
-                        # Skip if no selftext (link posts only)
-                        if not post_data.get("selftext"):
-                            continue
+        # Reddit JSON endpoint (no auth required for public subs)
+        listings = fetcher.get_many(
+            [(f"{REDDIT_URL}/r/{subreddit}/hot.json", None) for subreddit, _ in SUBREDDITS],
+            headers={"User-Agent": USER_AGENT},
+        )
 
-                        # Score reliability
-                        score = weighter.score_source(
+        for (subreddit, game_id), listing in zip(SUBREDDITS, listings):
+            if not listing.ok:
+                logger.warning(f"Reddit returned {listing.status} for r/{subreddit}")
+                errors += 1
+                continue
+
+            posts = listing.data.get("data", {}).get("children", [])
+            posts_found += len(posts)
+
+            # Process each post
+            for post in posts[:30]:  # Limit to top 30 per subreddit
+                try:
+                    post_data = post.get("data", {})
+
+                    # Skip if no selftext (link posts only)
+                    if not post_data.get("selftext"):
+                        continue
+
+                    url = f"https://www.reddit.com/r/{subreddit}/comments/{post_data.get('id')}"
+                    if url in known_urls:
+                        continue
+
+                    created_at = (
+                        datetime.fromtimestamp(post_data.get("created_utc", 0)).isoformat()
+                        if post_data.get("created_utc")
+                        else None
+                    )
+
+                    knowledge = {
+                        "source_url": url,
+                        "title": post_data.get("title", "")[:500],
+                        "summary": (post_data.get("selftext", "") or "")[:1000],
+                        "game": game_id,
+                        "category": "community_discussion",
+                        "tags": ["reddit", subreddit],
+                        "author": post_data.get("author", ""),
+                        "upvotes": post_data.get("ups", 0),
+                        "comments": post_data.get("num_comments", 0),
+                        "created_at": created_at,
+                        "status": "active",
+                    }
+                    candidates.append(
+                        (
+                            knowledge,
                             {
-                                "url": f"https://www.reddit.com/r/{subreddit}/comments/{post_data.get('id')}",
+                                "url": url,
                                 "type": "reddit_general",
                                 "upvotes": post_data.get("ups", 0),
                                 "comments": post_data.get("num_comments", 0),
-                                "published_date": (
-                                    datetime.fromtimestamp(
-                                        post_data.get("created_utc", 0)
-                                    ).isoformat()
-                                    if post_data.get("created_utc")
-                                    else None
-                                ),
+                                "published_date": created_at,
                                 "author": post_data.get("author", ""),
                                 "content": post_data.get("selftext", "")[:2000],
                                 "game_version": game_id,
-                            }
+                            },
                         )
+                    )
 
-                        # Add to knowledge base if score is good
-                        if score.overall_score >= 0.5:
-                            knowledge = {
-                                "source_url": f"https://www.reddit.com/r/{subreddit}/comments/{post_data.get('id')}",
-                                "title": post_data.get("title", "")[:500],
-                                "summary": (post_data.get("selftext", "") or "")[:1000],
-                                "game": game_id,
-                                "category": "community_discussion",
-                                "tags": ["reddit", subreddit],
-                                "author": post_data.get("author", ""),
-                                "upvotes": post_data.get("ups", 0),
-                                "comments": post_data.get("num_comments", 0),
-                                "created_at": (
-                                    datetime.fromtimestamp(
-                                        post_data.get("created_utc", 0)
-                                    ).isoformat()
-                                    if post_data.get("created_utc")
-                                    else None
-                                ),
-                                "status": "active",
-                            }
-
-                            add_knowledge_source(session, knowledge, score)
-                            added += 1
-
-                    except Exception as e:
-                        logger.debug(f"Error processing Reddit post: {e}")
-                        errors += 1
-
-            except Exception as e:
-                logger.warning(f"Error scraping r/{subreddit}: {e}")
-                errors += 1
+                except Exception as e:
+                    logger.debug(f"Error processing Reddit post: {e}")
+                    errors += 1
 
+        # Score reliability in one batch; add to knowledge base if score is good
+        scores = weighter.score_sources([source for _, source in candidates])
+        entries = [
+            (knowledge, score)
+            for (knowledge, _), score in zip(candidates, scores)
+            if score.overall_score >= 0.5
+        ]
+        added = add_knowledge_sources(session, entries, known_urls)
         session.commit()
 
         result = {"posts_found": posts_found, "added": added, "errors": errors}
@@ -452,7 +504,9 @@ def scrape_forums() -> dict[str, Any]:
     }
 
 
-def scrape_github() -> dict[str, Any]:
+def scrape_github(
+    session=None, fetcher: Optional[ResearchFetcher] = None, known_urls: Optional[set[str]] = None
+) -> dict[str, Any]:
     """
     Scrape GitHub for modding tools and resources.
 
@@ -464,52 +518,68 @@ def scrape_github() -> dict[str, Any]:
     try:
         import os
 
-        import requests
-
         from reliability_weighter import get_reliability_weighter
 
-        session = get_db_session()
+        session = session or get_db_session()
+        fetcher = fetcher or ResearchFetcher()
+        known_urls = load_known_urls(session) if known_urls is None else known_urls
         weighter = get_reliability_weighter()
 
         # GitHub API (optional token for higher rate limits)
         token = os.getenv("GITHUB_TOKEN")
-        headers = {"User-Agent": "SkyModderAI/1.0 (Research Pipeline)"}
+        headers = {"User-Agent": USER_AGENT}
         if token:
             headers["Authorization"] = f"token {token}"
 
-        # Search for modding tools
-        search_queries = [
-            "skyrim modding tools",
-            "fallout modding",
-            "bethesda modding",
-            "skse plugin",
-            "xedit script",
-        ]
-
         repos_found = 0
-        added = 0
         errors = 0
+        candidates = []
 
-        for query in search_queries:
-            try:
-                url = "https://api.github.com/search/repositories"
-                params = {"q": query, "sort": "stars", "order": "desc", "per_page": 10}
-
-                response = requests.get(url, headers=headers, params=params, timeout=30)
-                if response.status_code != 200:
-                    logger.warning(f"GitHub API returned {response.status_code}")
-                    errors += 1
-                    continue
-
-                data = response.json()
-                repos = data.get("items", [])
-                repos_found += len(repos)
+        # Search for modding tools
+        searches = fetcher.get_many(
+            [
+                (
+                    f"{GITHUB_API_URL}/search/repositories",
+                    {"q": query, "sort": "stars", "order": "desc", "per_page": 10},
+                )
+                for query in GITHUB_QUERIES
+            ],
+            headers=headers,
+        )
 
-                # Process each repo
-                for repo in repos:
-                    try:
-                        # Score reliability
-                        score = weighter.score_source(
+        for query, search in zip(GITHUB_QUERIES, searches):
+            if not search.ok:
+                logger.warning(f"GitHub API returned {search.status} for '{query}'")
+                errors += 1
+                continue
+
+            repos = search.data.get("items", [])
+            repos_found += len(repos)
+
+            # Process each repo
+            for repo in repos:
+                try:
+                    if repo.get("html_url") in known_urls:
+                        continue
+
+                    knowledge = {
+                        "source_url": repo.get("html_url"),
+                        "title": repo.get("name", "")[:500],
+                        "summary": (repo.get("description", "") or "")[:1000],
+                        "game": "general",
+                        "category": "tool",
+                        "subcategory": "modding_tool",
+                        "tags": ["github", "tool", "open_source"],
+                        "author": repo.get("owner", {}).get("login", ""),
+                        "stars": repo.get("stargazers_count", 0),
+                        "forks": repo.get("forks_count", 0),
+                        "created_at": repo.get("created_at"),
+                        "updated_at": repo.get("updated_at"),
+                        "status": "active",
+                    }
+                    candidates.append(
+                        (
+                            knowledge,
                             {
                                 "url": repo.get("html_url"),
                                 "type": "github",
@@ -518,38 +588,22 @@ def scrape_github() -> dict[str, Any]:
                                 "updated_date": repo.get("updated_at"),
                                 "content": repo.get("description", ""),
                                 "game_version": "general",
-                            }
+                            },
                         )
+                    )
 
-                        # Add to knowledge base if score is good
-                        if score.overall_score >= 0.6:
-                            knowledge = {
-                                "source_url": repo.get("html_url"),
-                                "title": repo.get("name", "")[:500],
-                                "summary": (repo.get("description", "") or "")[:1000],
-                                "game": "general",
-                                "category": "tool",
-                                "subcategory": "modding_tool",
-                                "tags": ["github", "tool", "open_source"],
-                                "author": repo.get("owner", {}).get("login", ""),
-                                "stars": repo.get("stargazers_count", 0),
-                                "forks": repo.get("forks_count", 0),
-                                "created_at": repo.get("created_at"),
-                                "updated_at": repo.get("updated_at"),
-                                "status": "active",
-                            }
-
-                            add_knowledge_source(session, knowledge, score)
-                            added += 1
-
-                    except Exception as e:
-                        logger.debug(f"Error processing GitHub repo: {e}")
-                        errors += 1
-
-            except Exception as e:
-                logger.warning(f"Error scraping GitHub for '{query}': {e}")
-                errors += 1
+                except Exception as e:
+                    logger.debug(f"Error processing GitHub repo: {e}")
+                    errors += 1
 
+        # Score reliability in one batch; add to knowledge base if score is good
+        scores = weighter.score_sources([source for _, source in candidates])
+        entries = [
+            (knowledge, score)
+            for (knowledge, _), score in zip(candidates, scores)
+            if score.overall_score >= 0.6
+        ]
+        added = add_knowledge_sources(session, entries, known_urls)
         session.commit()
 
         result = {"repos_found": repos_found, "added": added, "errors": errors}
@@ -561,83 +615,111 @@ def scrape_github() -> dict[str, Any]:
         return {"repos_found": 0, "added": 0, "errors": 1, "error": str(e)}
 
 
+def load_known_urls(session) -> set[str]:
+    """Source URLs already in the knowledge base, loaded once per research cycle."""
+    return {url for (url,) in session.query(KnowledgeSource.source_url)}
+
+
 def add_knowledge_source(session, knowledge: dict[str, Any], score) -> bool:
     """Add knowledge source to database with credibility score."""
-    try:
-        # Check if already exists
-        existing = (
-            session.query(KnowledgeSource)
-            .filter(KnowledgeSource.source_url == knowledge["source_url"])
-            .first()
-        )
+    return add_knowledge_sources(session, [(knowledge, score)]) == 1
 
-        if existing:
-            logger.debug(f"Knowledge source already exists: {knowledge['source_url']}")
-            return False
-
-        # Create credibility record
-        credibility = SourceCredibility(
-            source_url=knowledge["source_url"],
-            source_type=(
-                "nexus_mods"
-                if "nexusmods" in knowledge["source_url"]
-                else (
-                    "reddit"
-                    if "reddit" in knowledge["source_url"]
-                    else "github"
-                    if "github" in knowledge["source_url"]
-                    else "unknown"
-                )
-            ),
-            overall_score=score.overall_score,
-            source_credibility=score.source_credibility,
-            content_freshness=score.content_freshness,
-            community_validation=score.community_validation,
-            technical_accuracy=score.technical_accuracy,
-            author_reputation=score.author_reputation,
-            confidence=score.confidence,
-            flags=json.dumps(score.flags) if score.flags else None,
-        )
-        session.add(credibility)
-        session.flush()  # Get ID
-
-        # Create knowledge source
-        import hashlib
-
-        content_for_hash = f"{knowledge.get('title', '')}|{knowledge.get('summary', '')}|{knowledge.get('game', '')}"
-        content_hash = hashlib.sha256(content_for_hash.encode()).hexdigest()
-
-        source = KnowledgeSource(
-            source_url=knowledge["source_url"],
-            title=knowledge["title"],
-            content_hash=content_hash,
-            game=knowledge.get("game", "unknown"),
-            game_version=knowledge.get("game_version"),
-            mod_version=knowledge.get("mod_version"),
-            category=knowledge.get("category", "uncategorized"),
-            subcategory=knowledge.get("subcategory"),
-            tags=json.dumps(knowledge.get("tags", [])) if knowledge.get("tags") else None,
-            credibility_id=credibility.id,
-            summary=knowledge.get("summary"),
-            key_points=None,
-            conflicts_with=None,
-            requires=(
-                json.dumps(knowledge.get("requires", [])) if knowledge.get("requires") else None
-            ),
-            compatible_with=None,
-            deviation_flags=None,
-            is_standard_approach=knowledge.get("is_standard_approach", True),
-            status=knowledge.get("status", "active"),
-        )
-        session.add(source)
 
-        logger.debug(f"Added knowledge source: {knowledge['source_url']}")
-        return True
+def add_knowledge_sources(
+    session, entries: list[tuple[dict[str, Any], Any]], known_urls: Optional[set[str]] = None
+) -> int:
+    """
+    Add (knowledge, score) pairs with their credibility records in one batch.
+
+    URLs in known_urls (loaded from the database when not given) or repeated
+    within the batch are skipped; known_urls is updated with the added URLs.
+    The rows are written on the next flush/commit.
+
+    Returns:
+        Number of knowledge sources added
+    """
+    import hashlib
+
+    try:
+        if known_urls is None:
+            urls = [knowledge["source_url"] for knowledge, _ in entries]
+            known_urls = {
+                url
+                for (url,) in session.query(KnowledgeSource.source_url).filter(
+                    KnowledgeSource.source_url.in_(urls)
+                )
+            }
+
+        rows = []
+        for knowledge, score in entries:
+            if knowledge["source_url"] in known_urls:
+                logger.debug(f"Knowledge source already exists: {knowledge['source_url']}")
+                continue
+            known_urls.add(knowledge["source_url"])
+
+            # Create credibility record
+            credibility = SourceCredibility(
+                source_url=knowledge["source_url"],
+                source_type=(
+                    "nexus_mods"
+                    if "nexusmods" in knowledge["source_url"]
+                    else (
+                        "reddit"
+                        if "reddit" in knowledge["source_url"]
+                        else "github"
+                        if "github" in knowledge["source_url"]
+                        else "unknown"
+                    )
+                ),
+                overall_score=score.overall_score,
+                source_credibility=score.source_credibility,
+                content_freshness=score.content_freshness,
+                community_validation=score.community_validation,
+                technical_accuracy=score.technical_accuracy,
+                author_reputation=score.author_reputation,
+                confidence=score.confidence,
+                flags=json.dumps(score.flags) if score.flags else None,
+            )
+
+            # Create knowledge source
+            content_for_hash = f"{knowledge.get('title', '')}|{knowledge.get('summary', '')}|{knowledge.get('game', '')}"
+            content_hash = hashlib.sha256(content_for_hash.encode()).hexdigest()
+
+            source = KnowledgeSource(
+                source_url=knowledge["source_url"],
+                title=knowledge["title"],
+                content_hash=content_hash,
+                game=knowledge.get("game", "unknown"),
+                game_version=knowledge.get("game_version"),
+                mod_version=knowledge.get("mod_version"),
+                category=knowledge.get("category", "uncategorized"),
+                subcategory=knowledge.get("subcategory"),
+                tags=json.dumps(knowledge.get("tags", [])) if knowledge.get("tags") else None,
+                credibility=credibility,
+                summary=knowledge.get("summary"),
+                minhash=minhash_signature(
+                    knowledge_text(knowledge.get("title"), knowledge.get("summary"))
+                ),
+                key_points=None,
+                conflicts_with=None,
+                requires=(
+                    json.dumps(knowledge.get("requires", [])) if knowledge.get("requires") else None
+                ),
+                compatible_with=None,
+                deviation_flags=None,
+                is_standard_approach=knowledge.get("is_standard_approach", True),
+                status=knowledge.get("status", "active"),
+            )
+            rows.extend((credibility, source))
+            logger.debug(f"Added knowledge source: {knowledge['source_url']}")
+
+        session.add_all(rows)
+        return len(rows) // 2
 
     except Exception as e:
-        logger.debug(f"Error adding knowledge source: {e}")
+        logger.debug(f"Error adding knowledge sources: {e}")
         session.rollback()
-        return False
+        return 0
 
 
 def track_research_run(results: dict[str, Any]):
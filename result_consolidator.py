@@ -6,10 +6,12 @@ Transforms overwhelming lists into hierarchical, scannable structures.
 
 from __future__ import annotations
 
+import html
 import logging
 from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Any, Optional
+from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
@@ -111,41 +113,58 @@ class ResultConsolidator:
         if not conflicts:
             return ConsolidatedResult()
 
-        result = ConsolidatedResult(total_items=len(conflicts))
-
+        result = ConsolidatedResult()
         # Group by affected mod and conflict type
         groups: dict[str, ConsolidatedGroup] = {}
-
         for conflict in conflicts:
-            # Determine severity
-            severity = conflict.get("severity", "info").lower()
-            severity_key = self.SEVERITY_MAP.get(severity, 2)
-
-            # Group key: affected_mod + conflict_type
-            affected_mod = conflict.get("affected_mod", "Unknown")
-            conflict_type = conflict.get("type", "general")
-            group_key = f"{affected_mod}.{conflict_type}"
-
-            # Create group if doesn't exist
-            if group_key not in groups:
-                group_title = self.GROUP_TITLES.get(
-                    conflict_type, f"{conflict_type.replace('_', ' ').title()} - {affected_mod}"
-                )
-
-                groups[group_key] = ConsolidatedGroup(
-                    key=group_key, title=group_title, severity=severity
-                )
-
-            # Add conflict to group
-            groups[group_key].add(conflict)
-
-            # Update severity counts
-            if severity_key == 0:
-                result.critical_count += 1
-            elif severity_key == 1:
-                result.warning_count += 1
-            else:
-                result.info_count += 1
+            self.add_conflict(result, groups, conflict)
+        return self.finish(result, groups)
+
+    def add_conflict(
+        self,
+        result: ConsolidatedResult,
+        groups: dict[str, ConsolidatedGroup],
+        conflict: dict[str, Any],
+    ) -> None:
+        """Fold one conflict into result's counts and its affected_mod.type group."""
+        result.total_items += 1
+
+        # Determine severity
+        severity = conflict.get("severity", "info").lower()
+        severity_key = self.SEVERITY_MAP.get(severity, 2)
+
+        # Group key: affected_mod + conflict_type
+        affected_mod = conflict.get("affected_mod", "Unknown")
+        conflict_type = conflict.get("type", "general")
+        group_key = f"{affected_mod}.{conflict_type}"
+
+        # Create group if doesn't exist
+        if group_key not in groups:
+            group_title = self.GROUP_TITLES.get(
+                conflict_type, f"{conflict_type.replace('_', ' ').title()} - {affected_mod}"
+            )
+
+            groups[group_key] = ConsolidatedGroup(
+                key=group_key, title=group_title, severity=severity
+            )
+
+        # Add conflict to group
+        groups[group_key].add(conflict)
+
+        # Update severity counts
+        if severity_key == 0:
+            result.critical_count += 1
+        elif severity_key == 1:
+            result.warning_count += 1
+        else:
+            result.info_count += 1
+
+    def finish(
+        self, result: ConsolidatedResult, groups: dict[str, ConsolidatedGroup]
+    ) -> ConsolidatedResult:
+        """Sort the groups built by add_conflict() and fill in the quick view."""
+        if not result.total_items:
+            return result
 
         # Sort groups by severity, then by count
         sorted_groups = sorted(
@@ -306,6 +325,139 @@ class ResultConsolidator:
         return "\n".join(lines)
 
 
+# Flat-list severity names for the severity buckets ConflictDetector uses
+_FLAT_SEVERITY = {"error": "critical", "warning": "warning", "info": "info"}
+
+_NEXUS_SEARCH = "https://www.nexusmods.com/games/{slug}/mods?keyword="
+
+
+class ConflictAssembler:
+    """
+    Build every conflict view of an analysis response in one traversal.
+
+    Each conflict is added with the severity bucket it came from, so nothing
+    has to search the bucket lists again. One add() produces the escaped API
+    dict (with links), the flat dict used for transparency and consolidation,
+    and folds the flat dict into the consolidated groups. Link blocks depend
+    only on the conflict type and the mods involved; they are memoized, since
+    large lists repeat the same few types across thousands of LOOT messages.
+    """
+
+    def __init__(
+        self,
+        nexus_slug: str,
+        occurrence_counts: Optional[dict[int, int]] = None,
+        consolidator: Optional[ResultConsolidator] = None,
+    ) -> None:
+        """
+        Args:
+            nexus_slug: Nexus game slug for mod search links
+            occurrence_counts: Community occurrence counts keyed by id(conflict)
+            consolidator: Consolidator for the grouped view (default: singleton)
+        """
+        self.nexus_slug = nexus_slug
+        self.occurrence_counts = occurrence_counts or {}
+        self.consolidator = consolidator or get_consolidator()
+        self.by_severity: dict[str, list[dict[str, Any]]] = {
+            "error": [],
+            "warning": [],
+            "info": [],
+        }
+        self.flat: list[dict[str, Any]] = []
+        self._result = ConsolidatedResult()
+        self._groups: dict[str, ConsolidatedGroup] = {}
+        self._links: dict[tuple[str, str, str], list[dict[str, str]]] = {}
+        self._resolution_links: dict[str, list[tuple[str, str]]] = {}
+
+    def add(self, conflict: Any, severity: str) -> None:
+        """Add a conflict from the "error", "warning" or "info" bucket."""
+        d = conflict.__dict__.copy()
+        d["message"] = html.escape(str(d.get("message", "")))
+        if d.get("suggested_action"):
+            d["suggested_action"] = html.escape(str(d["suggested_action"]))
+        d["links"] = self._conflict_links(conflict)
+        if id(conflict) in self.occurrence_counts:
+            d["occurrence_count"] = self.occurrence_counts[id(conflict)]
+        self.by_severity[severity].append(d)
+
+        flat = {
+            "affected_mod": getattr(conflict, "affected_mod", ""),
+            "type": getattr(conflict, "type", "unknown"),
+            "severity": _FLAT_SEVERITY[severity],
+            "message": str(getattr(conflict, "message", "")),
+            "suggested_action": getattr(conflict, "suggested_action", ""),
+            "related_mod": getattr(conflict, "related_mod", ""),
+        }
+        self.flat.append(flat)
+        self.consolidator.add_conflict(self._result, self._groups, flat)
+
+    def add_all(self, conflicts: list[Any], severity: str) -> None:
+        for conflict in conflicts:
+            self.add(conflict, severity)
+
+    def consolidated(self) -> ConsolidatedResult:
+        """The grouped view of everything added so far."""
+        return self.consolidator.finish(self._result, self._groups)
+
+    def _conflict_links(self, conflict: Any) -> list[dict[str, str]]:
+        """Contextual links (Nexus, xEdit, LOOT) + resolution links from knowledge_index."""
+        conflict_type = getattr(conflict, "type", "info")
+        affected = conflict.affected_mod or ""
+        related = getattr(conflict, "related_mod", None) or ""
+        key = (conflict_type, affected, related)
+        links = self._links.get(key)
+        if links is None:
+            links = self._build_links(conflict_type, affected, related)
+            self._links[key] = links
+        # Shallow copies: callers get their own list, the link dicts are shared.
+        return list(links)
+
+    def _build_links(self, conflict_type: str, affected: str, related: str) -> list[dict[str, str]]:
+        base = _NEXUS_SEARCH.format(slug=self.nexus_slug)
+        links = []
+        if affected:
+            links.append(
+                {
+                    "title": "Nexus: " + (affected[:30] + "…" if len(affected) > 30 else affected),
+                    "url": base + quote(affected),
+                }
+            )
+        if related and related != affected:
+            links.append(
+                {
+                    "title": "Nexus: " + (related[:30] + "…" if len(related) > 30 else related),
+                    "url": base + quote(related),
+                }
+            )
+        if conflict_type == "dirty_edits":
+            from conflict_detector import _XEDIT_DOCS
+
+            links.append({"title": "xEdit cleaning guide", "url": _XEDIT_DOCS})
+        if conflict_type == "load_order_violation":
+            links.append({"title": "LOOT", "url": "https://loot.github.io/"})
+        # Add resolution links from knowledge_index (dedupe by URL)
+        seen_urls = {lnk["url"] for lnk in links}
+        for title, url in self._resolution_links_for(conflict_type):
+            if url not in seen_urls:
+                seen_urls.add(url)
+                links.append({"title": title, "url": url})
+        return links
+
+    def _resolution_links_for(self, conflict_type: str) -> list[tuple[str, str]]:
+        links = self._resolution_links.get(conflict_type)
+        if links is None:
+            from knowledge_index import get_resolution_for_conflict
+
+            resolution = get_resolution_for_conflict(conflict_type)
+            links = [
+                (link[0], link[1])
+                for link in resolution.get("links") or []
+                if isinstance(link, (list, tuple)) and len(link) >= 2
+            ]
+            self._resolution_links[conflict_type] = links
+        return links
+
+
 # Singleton instance
 _consolidator: Optional[ResultConsolidator] = None
 
@@ -2,12 +2,19 @@
 SkyModderAI - RSS Feed Service
 
 Generate RSS feeds for mods, compatibility reports, and author updates.
+
+Rendered feeds are cached per (feed type, key, limit) together with an ETag
+and Last-Modified taken from the newest report, so repeat polls from feed
+readers are answered with 304 Not Modified without touching the database.
+New or deleted reports invalidate the affected feeds.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
 from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
 from typing import Any, Optional
 from xml.etree import ElementTree as ET
 
@@ -15,90 +22,149 @@ from flask import Response, request
 
 logger = logging.getLogger(__name__)
 
+FEED_CACHE_TTL = 900  # 15 minutes; invalidation handles new reports sooner
+FEED_CACHE_CONTROL = "public, max-age=300"
+PRIVATE_FEED_CACHE_CONTROL = "private, max-age=300"
+
+
+def _rfc822(timestamp: Optional[float]) -> str:
+    """Format a unix timestamp for RSS / HTTP date headers."""
+    return formatdate(timestamp or datetime.now(timezone.utc).timestamp(), usegmt=True)
+
+
+def _feed_cache_key(feed_type: str, key: str) -> str:
+    """Cache key for a feed's rendered variants (one entry per limit)."""
+    return f"rss:{feed_type}:{key}"
+
 
 class RSSFeedService:
     """Service for generating RSS feeds."""
 
+    # -------------------------------------------------------------------------
+    # Cached entry points (used by the routes)
+    # -------------------------------------------------------------------------
+
+    def get_mod_feed(self, mod_name: str, game: str, limit: int = 50) -> Optional[dict[str, Any]]:
+        """Cached mod feed: {"xml", "etag", "last_modified"} or None."""
+        return self._cached_feed(
+            "mod",
+            f"{game}:{mod_name.lower()}",
+            limit,
+            lambda: self._mod_feed(mod_name, game, limit),
+        )
+
+    def get_compatibility_feed(
+        self, game: str = None, status: str = None, limit: int = 50
+    ) -> Optional[dict[str, Any]]:
+        """Cached compatibility feed: {"xml", "etag", "last_modified"} or None."""
+        return self._cached_feed(
+            "compat",
+            f"{game or '*'}:{status or '*'}",
+            limit,
+            lambda: self._compatibility_feed(game, status, limit),
+        )
+
+    def get_author_feed(self, user_email: str, limit: int = 50) -> Optional[dict[str, Any]]:
+        """Cached author feed: {"xml", "etag", "last_modified"} or None."""
+        return self._cached_feed(
+            "author",
+            user_email.lower(),
+            limit,
+            lambda: self._author_feed(user_email, limit),
+        )
+
+    def _cached_feed(self, feed_type: str, key: str, limit: int, build) -> Optional[dict]:
+        """Return a cached feed entry, building and caching it on a miss."""
+        from cache_service import get_cache
+
+        cache = get_cache()
+        cache_key = _feed_cache_key(feed_type, key)
+
+        variants = cache.get(cache_key) or {}
+        entry = variants.get(str(limit))
+        if entry:
+            return entry
+
+        entry = build()
+        if entry:
+            variants[str(limit)] = entry
+            cache.set(cache_key, variants, ttl=FEED_CACHE_TTL)
+        return entry
+
+    # -------------------------------------------------------------------------
+    # Uncached generators (kept for callers that want the XML string)
+    # -------------------------------------------------------------------------
+
     def generate_mod_feed(self, mod_name: str, game: str, limit: int = 50) -> str:
         """Generate RSS feed for a specific mod."""
+        entry = self._mod_feed(mod_name, game, limit)
+        return entry["xml"] if entry else ""
+
+    def generate_compatibility_feed(
+        self, game: str = None, status: str = None, limit: int = 50
+    ) -> str:
+        """Generate RSS feed for compatibility reports."""
+        entry = self._compatibility_feed(game, status, limit)
+        return entry["xml"] if entry else ""
+
+    def generate_author_feed(self, user_email: str, limit: int = 50) -> str:
+        """Generate RSS feed for a mod author's updates."""
+        entry = self._author_feed(user_email, limit)
+        return entry["xml"] if entry else ""
+
+    # -------------------------------------------------------------------------
+    # Builders
+    # -------------------------------------------------------------------------
+
+    def _mod_feed(self, mod_name: str, game: str, limit: int) -> Optional[dict[str, Any]]:
+        """Build the mod feed from the mod → report index."""
         try:
             from db import get_db
 
             db = get_db()
 
-            # Get mod details
-            mod_detail = db.execute(
-                """
-                SELECT * FROM mod_details
-                WHERE mod_name = ? AND game = ?
-            """,
-                (mod_name.lower(), game),
-            ).fetchone()
-
-            # Get recent compatibility reports
+            # Recent compatibility reports (single range scan on the index)
             reports = db.execute(
                 """
-                SELECT * FROM compatibility_reports
-                WHERE (mod_a = ? OR mod_b = ?) AND game = ?
-                ORDER BY created_at DESC
+                SELECT r.* FROM compatibility_report_mods m
+                JOIN compatibility_reports r ON r.id = m.report_id
+                WHERE m.mod_name = ? AND m.game = ?
+                ORDER BY m.created_at DESC
                 LIMIT ?
             """,
-                (mod_name.lower(), mod_name.lower(), game, limit),
+                (mod_name.lower(), game, limit),
             ).fetchall()
 
-            # Build RSS feed
-            root = ET.Element("rss", version="2.0")
-            channel = ET.SubElement(root, "channel")
-
-            # Channel info
-            ET.SubElement(channel, "title").text = f"SkyModderAI - {mod_name} Compatibility"
-            ET.SubElement(
-                channel, "link"
-            ).text = f"https://skymodderai.com/mod/{mod_name}?game={game}"
-            ET.SubElement(
-                channel, "description"
-            ).text = f"Compatibility reports for {mod_name} ({game})"
-            ET.SubElement(channel, "language").text = "en-us"
-            ET.SubElement(channel, "lastBuildDate").text = datetime.now(timezone.utc).strftime(
-                "%a, %d %b %Y %H:%M:%S GMT"
-            )
-
-            # Add items for each report
+            items = []
             for report in reports:
-                item = ET.SubElement(channel, "item")
-
                 # Determine other mod in report
                 other_mod = (
                     report["mod_b"] if report["mod_a"] == mod_name.lower() else report["mod_a"]
                 )
-
-                ET.SubElement(
-                    item, "title"
-                ).text = f"{report['status'].replace('_', ' ').title()}: {mod_name} + {other_mod}"
-                ET.SubElement(
-                    item, "link"
-                ).text = (
-                    f"https://skymodderai.com/compatibility/{mod_name}/vs/{other_mod}?game={game}"
+                items.append(
+                    {
+                        "report": report,
+                        "title": f"{report['status'].replace('_', ' ').title()}: {mod_name} + {other_mod}",
+                        "link": f"https://skymodderai.com/compatibility/{mod_name}/vs/{other_mod}?game={game}",
+                        "categories": [report["status"]],
+                    }
                 )
-                ET.SubElement(item, "guid").text = f"report-{report['id']}"
-                ET.SubElement(item, "pubDate").text = datetime.fromtimestamp(
-                    report["created_at"], timezone.utc
-                ).strftime("%a, %d %b %Y %H:%M:%S GMT")
-                ET.SubElement(item, "description").text = report["description"]
-
-                # Category (status)
-                ET.SubElement(item, "category").text = report["status"]
 
-            return ET.tostring(root, encoding="unicode", xml_declaration=True)
+            return self._build_feed(
+                title=f"SkyModderAI - {mod_name} Compatibility",
+                link=f"https://skymodderai.com/mod/{mod_name}?game={game}",
+                description=f"Compatibility reports for {mod_name} ({game})",
+                items=items,
+            )
 
         except Exception as e:
             logger.error(f"Failed to generate mod RSS feed: {e}")
-            return ""
+            return None
 
-    def generate_compatibility_feed(
-        self, game: str = None, status: str = None, limit: int = 50
-    ) -> str:
-        """Generate RSS feed for compatibility reports."""
+    def _compatibility_feed(
+        self, game: Optional[str], status: Optional[str], limit: int
+    ) -> Optional[dict[str, Any]]:
+        """Build the compatibility reports feed."""
         try:
             from db import get_db
 
@@ -124,53 +190,35 @@ class RSSFeedService:
 
             reports = db.execute(query, params).fetchall()
 
-            # Build RSS feed
-            root = ET.Element("rss", version="2.0")
-            channel = ET.SubElement(root, "channel")
-
-            # Channel info
             title = "SkyModderAI - Compatibility Reports"
             if game:
                 title += f" ({game})"
             if status:
                 title += f" - {status.replace('_', ' ').title()}"
 
-            ET.SubElement(channel, "title").text = title
-            ET.SubElement(channel, "link").text = "https://skymodderai.com/compatibility/browse"
-            ET.SubElement(
-                channel, "description"
-            ).text = "Latest compatibility reports from SkyModderAI"
-            ET.SubElement(channel, "language").text = "en-us"
-            ET.SubElement(channel, "lastBuildDate").text = datetime.now(timezone.utc).strftime(
-                "%a, %d %b %Y %H:%M:%S GMT"
+            items = [
+                {
+                    "report": report,
+                    "title": f"{report['mod_a']} ↔ {report['mod_b']}",
+                    "link": f"https://skymodderai.com/compatibility/{report['mod_a']}/vs/{report['mod_b']}?game={report['game']}",
+                    "categories": [report["status"], report["game"]],
+                }
+                for report in reports
+            ]
+
+            return self._build_feed(
+                title=title,
+                link="https://skymodderai.com/compatibility/browse",
+                description="Latest compatibility reports from SkyModderAI",
+                items=items,
             )
 
-            # Add items
-            for report in reports:
-                item = ET.SubElement(channel, "item")
-
-                ET.SubElement(item, "title").text = f"{report['mod_a']} ↔ {report['mod_b']}"
-                ET.SubElement(
-                    item, "link"
-                ).text = f"https://skymodderai.com/compatibility/{report['mod_a']}/vs/{report['mod_b']}?game={report['game']}"
-                ET.SubElement(item, "guid").text = f"report-{report['id']}"
-                ET.SubElement(item, "pubDate").text = datetime.fromtimestamp(
-                    report["created_at"], timezone.utc
-                ).strftime("%a, %d %b %Y %H:%M:%S GMT")
-                ET.SubElement(item, "description").text = report["description"]
-
-                # Categories
-                ET.SubElement(item, "category").text = report["status"]
-                ET.SubElement(item, "category").text = report["game"]
-
-            return ET.tostring(root, encoding="unicode", xml_declaration=True)
-
         except Exception as e:
             logger.error(f"Failed to generate compatibility RSS feed: {e}")
-            return ""
+            return None
 
-    def generate_author_feed(self, user_email: str, limit: int = 50) -> str:
-        """Generate RSS feed for a mod author's updates."""
+    def _author_feed(self, user_email: str, limit: int) -> Optional[dict[str, Any]]:
+        """Build the author feed for all of an author's verified mods."""
         try:
             from db import get_db
 
@@ -186,59 +234,86 @@ class RSSFeedService:
             ).fetchall()
 
             if not claims:
-                return ""
-
-            # Get recent reports for author's mods
-            mod_conditions = " OR ".join(
-                [
-                    f"(mod_a = '{c['mod_name']}' OR mod_b = '{c['mod_name']}') AND game = '{c['game']}'"
-                    for c in claims
-                ]
-            )
+                return None
 
-            query = f"""
-                SELECT * FROM compatibility_reports
+            # Get recent reports for author's mods via the mod → report index
+            mod_conditions = " OR ".join(["(m.mod_name = ? AND m.game = ?)"] * len(claims))
+            params: list[Any] = []
+            for claim in claims:
+                params.extend([claim["mod_name"].lower(), claim["game"]])
+            params.append(limit)
+
+            reports = db.execute(
+                f"""
+                SELECT DISTINCT r.* FROM compatibility_report_mods m
+                JOIN compatibility_reports r ON r.id = m.report_id
                 WHERE {mod_conditions}
-                ORDER BY created_at DESC
+                ORDER BY r.created_at DESC
                 LIMIT ?
-            """
-
-            reports = db.execute(query, (limit,)).fetchall()
-
-            # Build RSS feed
-            root = ET.Element("rss", version="2.0")
-            channel = ET.SubElement(root, "channel")
+            """,
+                params,
+            ).fetchall()
 
-            # Channel info
-            ET.SubElement(channel, "title").text = "SkyModderAI - Your Mod Updates"
-            ET.SubElement(channel, "link").text = "https://skymodderai.com/mod-author/dashboard"
-            ET.SubElement(channel, "description").text = "Updates for your verified mods"
-            ET.SubElement(channel, "language").text = "en-us"
-            ET.SubElement(channel, "lastBuildDate").text = datetime.now(timezone.utc).strftime(
-                "%a, %d %b %Y %H:%M:%S GMT"
+            items = [
+                {
+                    "report": report,
+                    "title": f"New Report: {report['mod_a']} + {report['mod_b']}",
+                    "link": f"https://skymodderai.com/compatibility/{report['mod_a']}/vs/{report['mod_b']}?game={report['game']}",
+                    "categories": [],
+                }
+                for report in reports
+            ]
+
+            return self._build_feed(
+                title="SkyModderAI - Your Mod Updates",
+                link="https://skymodderai.com/mod-author/dashboard",
+                description="Updates for your verified mods",
+                items=items,
             )
 
-            # Add items
-            for report in reports:
-                item = ET.SubElement(channel, "item")
-
-                ET.SubElement(
-                    item, "title"
-                ).text = f"New Report: {report['mod_a']} + {report['mod_b']}"
-                ET.SubElement(
-                    item, "link"
-                ).text = f"https://skymodderai.com/compatibility/{report['mod_a']}/vs/{report['mod_b']}?game={report['game']}"
-                ET.SubElement(item, "guid").text = f"report-{report['id']}"
-                ET.SubElement(item, "pubDate").text = datetime.fromtimestamp(
-                    report["created_at"], timezone.utc
-                ).strftime("%a, %d %b %Y %H:%M:%S GMT")
-                ET.SubElement(item, "description").text = report["description"]
-
-            return ET.tostring(root, encoding="unicode", xml_declaration=True)
-
         except Exception as e:
             logger.error(f"Failed to generate author RSS feed: {e}")
-            return ""
+            return None
+
+    @staticmethod
+    def _build_feed(
+        title: str, link: str, description: str, items: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """
+        Render an RSS document and its validators.
+
+        lastBuildDate and Last-Modified are the newest report's timestamp (not
+        "now"), so an unchanged feed renders byte-for-byte identically and
+        keeps the same ETag.
+        """
+        newest = max((item["report"]["created_at"] or 0 for item in items), default=0)
+
+        root = ET.Element("rss", version="2.0")
+        channel = ET.SubElement(root, "channel")
+
+        # Channel info
+        ET.SubElement(channel, "title").text = title
+        ET.SubElement(channel, "link").text = link
+        ET.SubElement(channel, "description").text = description
+        ET.SubElement(channel, "language").text = "en-us"
+        ET.SubElement(channel, "lastBuildDate").text = _rfc822(newest or None)
+
+        # Add items for each report
+        for entry in items:
+            report = entry["report"]
+            item = ET.SubElement(channel, "item")
+            ET.SubElement(item, "title").text = entry["title"]
+            ET.SubElement(item, "link").text = entry["link"]
+            ET.SubElement(item, "guid").text = f"report-{report['id']}"
+            ET.SubElement(item, "pubDate").text = _rfc822(report["created_at"])
+            ET.SubElement(item, "description").text = report["description"]
+            for category in entry["categories"]:
+                ET.SubElement(item, "category").text = category
+
+        xml = ET.tostring(root, encoding="unicode", xml_declaration=True)
+        etag = hashlib.sha1(xml.encode("utf-8")).hexdigest()[:20]
+
+        return {"xml": xml, "etag": f'"{etag}"', "last_modified": newest or None}
 
 
 def get_rss_feed_service() -> RSSFeedService:
@@ -246,6 +321,60 @@ def get_rss_feed_service() -> RSSFeedService:
     return RSSFeedService()
 
 
+def invalidate_report_feeds(mod_a: str, mod_b: str, game: str) -> int:
+    """
+    Drop cached feeds that may include a report for this mod pair.
+
+    Called after compatibility reports are created or deleted.
+    """
+    try:
+        from cache_service import get_cache
+
+        cache = get_cache()
+        cleared = 0
+        for mod_name in {mod_a.lower(), mod_b.lower()}:
+            # Exact delete: mod names may contain pattern metacharacters
+            cleared += int(cache.delete(_feed_cache_key("mod", f"{game}:{mod_name}")))
+        cleared += cache.clear_pattern("rss:compat:*")
+        cleared += cache.clear_pattern("rss:author:*")
+        return cleared
+    except Exception as e:
+        logger.debug(f"RSS feed invalidation failed: {e}")
+        return 0
+
+
+def _feed_response(
+    entry: Optional[dict[str, Any]], filename: str, cache_control: str = FEED_CACHE_CONTROL
+) -> Optional[Response]:
+    """Build a feed response, answering conditional GETs with 304."""
+    if not entry:
+        return None
+
+    headers = {
+        "ETag": entry["etag"],
+        "Cache-Control": cache_control,
+        "Content-Disposition": f"attachment; filename={filename}",
+    }
+    if entry.get("last_modified"):
+        headers["Last-Modified"] = _rfc822(entry["last_modified"])
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        if entry["etag"] in [tag.strip() for tag in if_none_match.split(",")] or (
+            if_none_match.strip() == "*"
+        ):
+            return Response(status=304, headers=headers)
+    elif entry.get("last_modified") and request.headers.get("If-Modified-Since"):
+        try:
+            since = parsedate_to_datetime(request.headers["If-Modified-Since"]).timestamp()
+            if int(entry["last_modified"]) <= int(since):
+                return Response(status=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    return Response(entry["xml"], mimetype="application/rss+xml", headers=headers)
+
+
 # Flask routes for RSS feeds
 def create_rss_routes(app):
     """Register RSS feed routes with Flask app."""
@@ -262,14 +391,12 @@ def create_rss_routes(app):
             limit_int = 50
 
         service = get_rss_feed_service()
-        feed_content = service.generate_mod_feed(mod_name, game, limit_int)
+        response = _feed_response(
+            service.get_mod_feed(mod_name, game, limit_int), f"{mod_name}_feed.xml"
+        )
 
-        if feed_content:
-            return Response(
-                feed_content,
-                mimetype="application/rss+xml",
-                headers={"Content-Disposition": f"attachment; filename={mod_name}_feed.xml"},
-            )
+        if response is not None:
+            return response
         else:
             return Response("Failed to generate feed", status=500)
 
@@ -285,21 +412,19 @@ def create_rss_routes(app):
         except ValueError:
             limit_int = 50
 
-        service = get_rss_feed_service()
-        feed_content = service.generate_compatibility_feed(game, status, limit_int)
+        filename = "compatibility_feed"
+        if game:
+            filename += f"_{game}"
+        if status:
+            filename += f"_{status}"
 
-        if feed_content:
-            filename = "compatibility_feed"
-            if game:
-                filename += f"_{game}"
-            if status:
-                filename += f"_{status}"
+        service = get_rss_feed_service()
+        response = _feed_response(
+            service.get_compatibility_feed(game, status, limit_int), f"{filename}.xml"
+        )
 
-            return Response(
-                feed_content,
-                mimetype="application/rss+xml",
-                headers={"Content-Disposition": f"attachment; filename={filename}.xml"},
-            )
+        if response is not None:
+            return response
         else:
             return Response("Failed to generate feed", status=500)
 
@@ -319,13 +444,13 @@ def create_rss_routes(app):
             limit_int = 50
 
         service = get_rss_feed_service()
-        feed_content = service.generate_author_feed(session["user_email"], limit_int)
-
-        if feed_content:
-            return Response(
-                feed_content,
-                mimetype="application/rss+xml",
-                headers={"Content-Disposition": "attachment; filename=author_feed.xml"},
-            )
+        response = _feed_response(
+            service.get_author_feed(session["user_email"], limit_int),
+            "author_feed.xml",
+            cache_control=PRIVATE_FEED_CACHE_CONTROL,
+        )
+
+        if response is not None:
+            return response
         else:
             return Response("No verified mods or failed to generate feed", status=404)
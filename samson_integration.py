@@ -216,7 +216,7 @@ class SamsonCuration:
         # For now, just clean reports with 0 votes and very old
         old_unused = db.execute(
             """
-            SELECT id FROM compatibility_reports
+            SELECT id, mod_a, mod_b, game FROM compatibility_reports
             WHERE upvotes = 0 AND downvotes = 0
             AND created_at < ?
         """,
@@ -226,10 +226,19 @@ class SamsonCuration:
         count = 0
         for report in old_unused:
             db.execute("DELETE FROM compatibility_reports WHERE id = ?", (report["id"],))
+            db.execute("DELETE FROM compatibility_report_mods WHERE report_id = ?", (report["id"],))
             count += 1
 
         db.commit()
 
+        if old_unused:
+            from mod_summary_service import refresh_report_mods
+            from rss_service import invalidate_report_feeds
+
+            for report in old_unused:
+                invalidate_report_feeds(report["mod_a"], report["mod_b"], report["game"])
+                refresh_report_mods(report["mod_a"], report["mod_b"], report["game"])
+
         logger.info(f"Cleaned {count} orphaned compatibility reports")
         return {"count": count}
 
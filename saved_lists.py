@@ -5,10 +5,10 @@ Syncs mod lists across devices with full analysis snapshots.
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any, Optional
 
+import json_provider
 from db import get_db
 
 logger = logging.getLogger(__name__)
@@ -88,7 +88,7 @@ def get_saved_lists(
         # Parse analysis snapshot if present
         if row["analysis_snapshot"]:
             try:
-                list_data["analysis"] = json.loads(row["analysis_snapshot"])
+                list_data["analysis"] = json_provider.loads(row["analysis_snapshot"])
             except Exception as e:
                 logger.warning(f"Failed to parse analysis snapshot for list {row['id']}: {e}")
                 list_data["analysis"] = None
@@ -134,7 +134,7 @@ def save_list(
     tags_str = ",".join(tags) if tags else None
 
     # Convert analysis to JSON string
-    analysis_json = json.dumps(analysis_snapshot) if analysis_snapshot else None
+    analysis_json = json_provider.dumps(analysis_snapshot) if analysis_snapshot else None
 
     try:
         # Try to update existing
@@ -270,7 +270,7 @@ def get_list_by_id(user_email: str, list_id: int) -> Optional[dict[str, Any]]:
 
     if row["analysis_snapshot"]:
         try:
-            list_data["analysis"] = json.loads(row["analysis_snapshot"])
+            list_data["analysis"] = json_provider.loads(row["analysis_snapshot"])
         except Exception as e:
             logger.warning(f"Failed to parse analysis snapshot: {e}")
             list_data["analysis"] = None
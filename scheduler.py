@@ -4,6 +4,7 @@ Scheduler Service - Scheduled intelligence jobs for SkyModderAI.
 Provides:
 - 2 AM daily curation job (clustering, compaction, trash audit)
 - Weekly report generation (Mondays at 3 AM)
+- Hourly activity rollups for reporting
 - Model retraining scheduling
 - Research pipeline scheduling
 
@@ -316,6 +317,31 @@ def run_weekly_report():
         raise
 
 
+def run_activity_rollup():
+    """
+    Activity rollup job (hourly).
+
+    Folds user_activity rows added since the last run into the
+    activity_daily_rollups table used by the weekly report.
+    """
+    logger.info("Starting activity rollup job...")
+    start_time = datetime.now()
+
+    try:
+        from activity_rollup import refresh_activity_rollups
+
+        results = refresh_activity_rollups()
+
+        logger.info(
+            f"Activity rollup completed in {(datetime.now() - start_time).total_seconds():.2f}s"
+        )
+        logger.info(f"Results: {results}")
+
+    except Exception as e:
+        logger.exception(f"Activity rollup job failed: {e}")
+        raise
+
+
 def run_research_pipeline():
     """
     Research pipeline job (every 6 hours).
@@ -511,6 +537,9 @@ def setup_default_jobs():
     # Weekly report (Mondays 3 AM UTC)
     scheduler.schedule_weekly("weekly_report", run_weekly_report, day="monday", hour=3, minute=0)
 
+    # Activity rollups (hourly)
+    scheduler.schedule_interval("activity_rollup", run_activity_rollup, seconds=3600)
+
     # Research pipeline (every 6 hours)
     scheduler.schedule_interval("research_pipeline", run_research_pipeline, seconds=21600)
 
@@ -1,273 +1,592 @@
 """
-SkyModderAI - Performance Benchmarking Suite
-
-Benchmarks:
-- Deterministic analysis speed
-- Cache performance
-- Export generation time
-- Research pipeline throughput
-- API response times
-
-Run with: python scripts/benchmark_performance.py
+SkyModderAI - Analysis Benchmark Suite
+
+Times the analysis hot paths against a pinned masterlist fixture
+(tests/data/benchmark_masterlist_skyrimse.yaml), with load orders generated
+from the real plugin names in it: masters first, then a sample that
+includes typos, unknown mods and load-after cycles. Each case is warmed up,
+timed with perf_counter_ns, then run once more under tracemalloc to record
+allocations.
+
+Cases:
+- parser_load            masterlist YAML -> mod database
+- database_load          JSON mod database cache -> mod database (app start-up)
+- name_resolution        get_mod_info over a generated list
+- analyze_load_order     ConflictDetector.analyze_load_order (50/250/1000 mods)
+- suggested_load_order   ConflictDetector.get_suggested_load_order
+- bm25_search            ModSearchEngine.search
+- api_analyze            POST /api/analyze through the Flask test client
+
+Results are written as JSON. Pass --baseline to compare against an earlier
+run; --max-regression turns a slower p50 into a non-zero exit.
+
+Run with: python scripts/benchmark_performance.py [--only analyze] [--baseline old.json]
+Regenerate the fixture: python scripts/benchmark_performance.py --write-fixture
 """
 
 from __future__ import annotations
 
+import argparse
+import gc
+import hashlib
 import json
+import math
 import os
+import platform
+import random
+import shutil
+import subprocess
 import sys
+import tempfile
 import time
-from datetime import datetime
-from typing import Any
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-
-class Benchmark:
-    """Benchmark runner."""
-
-    def __init__(self, name: str):
-        self.name = name
-        self.results: list[dict[str, Any]] = []
-
-    def run(self, func, *args, iterations: int = 10, **kwargs) -> dict[str, Any]:
-        """Run a function multiple times and collect metrics."""
-        durations = []
-
-        for i in range(iterations):
-            start = time.time()
-            result = func(*args, **kwargs)
-            duration = time.time() - start
-            durations.append(duration)
-
-        # Calculate stats
-        avg = sum(durations) / len(durations)
-        min_d = min(durations)
-        max_d = max(durations)
-        p95 = sorted(durations)[int(len(durations) * 0.95)] if len(durations) > 1 else max_d
-
-        stats = {
-            "name": self.name,
-            "iterations": iterations,
-            "avg_ms": round(avg * 1000, 2),
-            "min_ms": round(min_d * 1000, 2),
-            "max_ms": round(max_d * 1000, 2),
-            "p95_ms": round(p95 * 1000, 2),
-        }
-
-        self.results.append(stats)
-        return stats
-
-    def report(self) -> str:
-        """Generate benchmark report."""
-        report = []
-        report.append("=" * 70)
-        report.append("SkyModderAI Performance Benchmark Report")
-        report.append(f"Generated: {datetime.now().isoformat()}")
-        report.append("=" * 70)
-        report.append("")
-
-        for result in self.results:
-            report.append(f"\n{result['name']}")
-            report.append("-" * len(result["name"]))
-            report.append(f"  Iterations: {result['iterations']}")
-            report.append(f"  Average:    {result['avg_ms']} ms")
-            report.append(f"  Min:        {result['min_ms']} ms")
-            report.append(f"  Max:        {result['max_ms']} ms")
-            report.append(f"  P95:        {result['p95_ms']} ms")
-
-        report.append("")
-        report.append("=" * 70)
-
-        return "\n".join(report)
-
-
-def benchmark_deterministic_analysis(runner: Benchmark):
-    """Benchmark deterministic analysis functions."""
-    from deterministic_analysis import (
-        analyze_load_order_deterministic,
-        generate_bespoke_setups_deterministic,
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+GAME = "skyrimse"
+FIXTURE_PATH = ROOT / "tests" / "data" / "benchmark_masterlist_skyrimse.yaml"
+FIXTURE_NAMES = ROOT / "tests" / "data" / "loadorder_skyrimse_254.txt"
+FIXTURE_SEED = 20240611
+DEFAULT_OUTPUT = ROOT / "benchmark_report.json"
+LIST_SIZES = (50, 250, 1000)
+SEARCH_QUERIES = ("ordinator perks", "great cities", "weather lighting", "patch", "skyui")
+
+_UNKNOWN_WORDS = (
+    ("My", "Custom", "Better", "Immersive", "Lore-Friendly", "Simple", "Realistic"),
+    ("Tweaks", "Armor Pack", "Followers", "Patch", "Overhaul", "Retexture", "Fixes"),
+)
+
+
+# =============================================================================
+# Fixture and load-order generation
+# =============================================================================
+
+
+def _fixture_base_names() -> list[str]:
+    names = []
+    for line in FIXTURE_NAMES.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            names.append(line.lstrip("*+-"))
+    return list(dict.fromkeys(names))
+
+
+def _stem(name: str) -> str:
+    return name.rsplit(".", 1)[0]
+
+
+def build_fixture_masterlist(
+    names: list[str], seed: int = FIXTURE_SEED, patches: int = 1200, cycles: int = 6
+) -> dict[str, Any]:
+    """
+    Deterministic LOOT-format masterlist over real plugin names.
+
+    Adds requirements and load-after rules on earlier plugins, occasional
+    incompatibilities and dirty-edit messages, compatibility patches that
+    require two plugins, and a few mutual load-after pairs (cycles).
+    """
+    rng = random.Random(seed)
+    plugins: list[dict[str, Any]] = []
+    for i, name in enumerate(names):
+        entry: dict[str, Any] = {"name": name}
+        window = names[max(0, i - 40) : i]
+        if window and i > 5 and rng.random() < 0.35:
+            entry["req"] = rng.sample(window, min(len(window), rng.randint(1, 2)))
+        if window and rng.random() < 0.5:
+            entry["after"] = rng.sample(window, min(len(window), rng.randint(1, 3)))
+        if rng.random() < 0.04:
+            entry["inc"] = [rng.choice([n for n in names if n != name])]
+        if rng.random() < 0.1:
+            entry["tag"] = ["Delev", "Relev"]
+        if rng.random() < 0.15:
+            entry["msg"] = [
+                {"type": "warn", "content": "Contains dirty edits. Clean with SSEEdit."}
+            ]
+        plugins.append(entry)
+
+    plugins_by_name = {p["name"]: p for p in plugins}
+    regular = [n for n in names[5:] if not n.lower().endswith(".esm")]
+    for _ in range(cycles):
+        a, b = rng.sample(regular, 2)
+        plugins_by_name[a].setdefault("after", []).append(b)
+        plugins_by_name[b].setdefault("after", []).append(a)
+
+    seen = set()
+    while len(seen) < patches:
+        a, b = rng.sample(regular, 2)
+        patch_name = f"{_stem(a)} - {_stem(b)} Patch.esp"
+        if patch_name in seen:
+            continue
+        seen.add(patch_name)
+        plugins.append({"name": patch_name, "req": [a, b], "after": [a, b]})
+    return {"bash_tags": ["Delev", "Relev"], "plugins": plugins}
+
+
+def write_fixture(path: Path = FIXTURE_PATH) -> Path:
+    data = build_fixture_masterlist(_fixture_base_names())
+    header = (
+        "# Pinned benchmark masterlist. Generated by\n"
+        "#   python scripts/benchmark_performance.py --write-fixture\n"
+        "# Regenerate rather than editing by hand.\n"
+    )
+    path.write_text(
+        header + yaml.safe_dump(data, sort_keys=False, allow_unicode=True, width=1000),
+        encoding="utf-8",
     )
+    return path
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    stem, dot, ext = name.rpartition(".")
+    if len(stem) < 4:
+        return name.lower()
+    i = rng.randrange(1, len(stem) - 2)
+    kind = rng.randrange(4)
+    if kind == 0:  # swapped letters
+        stem = stem[:i] + stem[i + 1] + stem[i] + stem[i + 2 :]
+    elif kind == 1:  # dropped letter
+        stem = stem[:i] + stem[i + 1 :]
+    elif kind == 2:  # underscores for spaces
+        stem = stem.replace(" ", "_")
+    else:  # lower-cased
+        stem = stem.lower()
+    return f"{stem}{dot}{ext}"
+
+
+def _unknown(rng: random.Random, i: int) -> str:
+    return f"{rng.choice(_UNKNOWN_WORDS[0])} {rng.choice(_UNKNOWN_WORDS[1])} {i}.esp"
+
+
+def generate_load_order(
+    names: list[str],
+    size: int,
+    rng: random.Random,
+    typo_rate: float = 0.05,
+    unknown_rate: float = 0.05,
+    cycle_pairs: tuple[tuple[str, str], ...] = (),
+) -> list[str]:
+    """
+    A load order of ``size`` plugins sampled from ``names``.
+
+    Masters load first, both plugins of each cycle pair are included, and a
+    share of the rest are mistyped or replaced by mods LOOT doesn't know.
+    """
+    forced = [n for pair in cycle_pairs for n in pair]
+    pool = [n for n in names if n not in forced]
+    sample = forced + rng.sample(pool, max(0, min(size, len(names)) - len(forced)))
+    sample.sort(key=lambda n: (not n.lower().endswith(".esm"), names.index(n)))
+
+    out = []
+    for i, name in enumerate(sample):
+        roll = rng.random()
+        if name.lower().endswith(".esm") or name in forced:
+            out.append(name)
+        elif roll < unknown_rate:
+            out.append(_unknown(rng, i))
+        elif roll < unknown_rate + typo_rate:
+            out.append(_typo(name, rng))
+        else:
+            out.append(name)
+    while len(out) < size:
+        out.append(_unknown(rng, len(out)))
+    return out
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+
+def _percentile(sorted_values: list[int], pct: float) -> int:
+    """Nearest-rank percentile."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int) -> dict[str, Any]:
+    """Time ``fn`` (after warmup), then trace one more call's allocations."""
+    for _ in range(warmup):
+        fn()
+
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    samples = []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter_ns()
+            fn()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    allocated = sum(s.size_diff for s in stats if s.size_diff > 0)
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+
+    samples.sort()
+    ms = 1_000_000
+    return {
+        "iterations": iterations,
+        "warmup": warmup,
+        "mean_ms": round(sum(samples) / len(samples) / ms, 4),
+        "min_ms": round(samples[0] / ms, 4),
+        "p50_ms": round(_percentile(samples, 50) / ms, 4),
+        "p95_ms": round(_percentile(samples, 95) / ms, 4),
+        "p99_ms": round(_percentile(samples, 99) / ms, 4),
+        "max_ms": round(samples[-1] / ms, 4),
+        "peak_kib": round(peak / 1024, 1),
+        "retained_kib": round(allocated / 1024, 1),
+        "retained_blocks": blocks,
+    }
 
-    print("\nRunning deterministic analysis benchmarks...")
 
-    # Small mod list (10 mods)
-    small_list = [f"Mod_{i}.esp" for i in range(10)]
-    runner.run(
-        analyze_load_order_deterministic,
-        small_list,
-        "skyrimse",
-        iterations=20,
-        name="Deterministic Analysis (10 mods)",
-    )
+@dataclass
+class BenchCase:
+    name: str
+    setup: Callable[[BenchContext], Callable[[], Any]]
+    iterations: int = 50
+    warmup: int = 3
 
-    # Medium mod list (50 mods)
-    medium_list = [f"Mod_{i}.esp" for i in range(50)]
-    runner.run(
-        analyze_load_order_deterministic,
-        medium_list,
-        "skyrimse",
-        iterations=20,
-        name="Deterministic Analysis (50 mods)",
-    )
 
-    # Large mod list (200 mods)
-    large_list = [f"Mod_{i}.esp" for i in range(200)]
-    runner.run(
-        analyze_load_order_deterministic,
-        large_list,
-        "skyrimse",
-        iterations=10,
-        name="Deterministic Analysis (200 mods)",
-    )
+class BenchContext:
+    """Lazily built shared state: fixture parser, generated lists, Flask client."""
 
-    # Setup generation
-    preferences = {"combat": "souls_like", "graphics": "balanced", "stability": "max"}
-    runner.run(
-        generate_bespoke_setups_deterministic,
-        "skyrimse",
-        preferences,
-        None,
-        3,
-        iterations=20,
-        name="Bespoke Setup Generation",
-    )
+    def __init__(self, masterlist_path: Path, seed: int, workdir: Path) -> None:
+        self.masterlist_path = masterlist_path
+        self.seed = seed
+        self.workdir = workdir
+        self._lists: dict[int, list[str]] = {}
 
+    @cached_property
+    def masterlist_text(self) -> str:
+        return self.masterlist_path.read_text(encoding="utf-8")
 
-def benchmark_caching(runner: Benchmark):
-    """Benchmark cache operations."""
-    from cache_service import get_cache
+    def new_parser(self):
+        from loot_parser import LOOTParser
 
-    print("\nRunning cache benchmarks...")
+        return LOOTParser(GAME, cache_dir=str(self.workdir / "data"))
 
-    cache = get_cache()
+    @cached_property
+    def parser(self):
+        parser = self.new_parser()
+        parser.masterlist_data = yaml.safe_load(self.masterlist_text)
+        parser.parse_masterlist()
+        parser.save_database()
+        return parser
 
-    # Write benchmark
-    def write_test():
-        cache.set("benchmark:test", {"data": "test"}, ttl=60)
+    @cached_property
+    def plugin_names(self) -> list[str]:
+        return [p["name"] for p in yaml.safe_load(self.masterlist_text)["plugins"]]
 
-    runner.run(write_test, iterations=50, name="Cache Write")
+    @cached_property
+    def cycle_pairs(self) -> tuple[tuple[str, str], ...]:
+        db = self.parser.mod_database
+        pairs = []
+        for key, info in db.items():
+            for other in info.load_after:
+                other_info = db.get(self.parser._normalize_name(other))
+                if other_info and key < other_info.clean_name:
+                    if any(self.parser._normalize_name(a) == key for a in other_info.load_after):
+                        pairs.append((info.name, other_info.name))
+        return tuple(sorted(pairs))
 
-    # Read benchmark
-    def read_test():
-        cache.get("benchmark:test")
+    def load_order(self, size: int) -> list[str]:
+        if size not in self._lists:
+            rng = random.Random(self.seed + size)
+            self._lists[size] = generate_load_order(
+                self.plugin_names, size, rng, cycle_pairs=self.cycle_pairs[:2]
+            )
+        return self._lists[size]
 
-    runner.run(read_test, iterations=100, name="Cache Read")
+    def entries(self, size: int):
+        from conflict_detector import ModListEntry
 
-    # Search cache benchmark
-    def search_cache():
-        cache.cache_search("skyrimse", "texture mods")
-        cache.set_search("skyrimse", "texture mods", [{"result": "test"}], ttl=3600)
+        return [ModListEntry(name=n, position=i) for i, n in enumerate(self.load_order(size))]
 
-    runner.run(search_cache, iterations=50, name="Cache Search Operations")
+    @cached_property
+    def client(self):
+        """Flask test client for app.py, run from a scratch dir seeded with the fixture."""
+        data_dir = self.workdir / "data"
+        self.parser.save_database()  # data/skyrimse_mod_database.json
+        shutil.copy(self.masterlist_path, data_dir / f"{GAME}_masterlist.yaml")
+        os.chdir(self.workdir)
+        os.environ.setdefault("FLASK_ENV", "testing")
 
+        from app import app
 
-def benchmark_presentation(runner: Benchmark):
-    """Benchmark presentation/export functions."""
-    from presentation_service import (
-        _format_as_markdown,
-        create_guide_content,
-        format_as_html,
-        format_as_latex,
-    )
+        app.config["TESTING"] = True
+        return app.test_client()
 
-    print("\nRunning presentation benchmarks...")
-
-    # Create test content
-    content = create_guide_content(
-        title="Benchmark Test Guide",
-        summary="Testing export performance",
-        sections=[{"title": f"Section {i}", "content": "Content here"} for i in range(10)],
-        warnings=[{"level": "high", "message": "Test warning"} for _ in range(5)],
-        recommendations=[{"priority": "high", "content": f"Recommendation {i}"} for i in range(10)],
-        sources=[
-            {"title": f"Source {i}", "url": "https://example.com", "credibility_score": 0.9}
-            for i in range(5)
-        ],
-    )
 
-    # LaTeX formatting
-    runner.run(format_as_latex, content, iterations=10, name="LaTeX Formatting")
+def _setup_parser_load(ctx: BenchContext):
+    data = yaml.safe_load(ctx.masterlist_text)
 
-    # HTML formatting
-    runner.run(format_as_html, content, iterations=20, name="HTML Formatting")
+    def run():
+        parser = ctx.new_parser()
+        parser.masterlist_data = data
+        parser.parse_masterlist()
 
-    # Markdown formatting
-    runner.run(_format_as_markdown, content, iterations=20, name="Markdown Formatting")
+    return run
 
 
-def benchmark_reliability(runner: Benchmark):
-    """Benchmark reliability weighting."""
-    from reliability_weighter import get_reliability_weighter
+def _setup_yaml_and_parse(ctx: BenchContext):
+    def run():
+        parser = ctx.new_parser()
+        parser.masterlist_data = yaml.safe_load(ctx.masterlist_text)
+        parser.parse_masterlist()
 
-    print("\nRunning reliability weighting benchmarks...")
+    return run
 
-    weighter = get_reliability_weighter()
 
-    # Test source
-    source = {
-        "url": "https://nexusmods.com/skyrimspecialedition/mods/123",
-        "type": "nexus_mods",
-        "endorsements": 1500,
-        "published_date": "2025-06-15T00:00:00",
-        "author": "Arthmoor",
-        "content": "Unofficial Skyrim Special Edition Patch",
-        "game_version": "skyrimse",
-    }
+def _setup_database_load(ctx: BenchContext):
+    path = ctx.parser._database_path()
 
-    def score_source():
-        return weighter.score_source(source)
+    def run():
+        ctx.new_parser().load_database(path)
 
-    runner.run(score_source, iterations=100, name="Reliability Scoring")
+    return run
 
-    # Filter benchmark
-    sources = [source.copy() for _ in range(50)]
 
-    def filter_sources():
-        return weighter.filter_by_reliability(sources, min_score=0.5)
+def _setup_name_resolution(ctx: BenchContext):
+    names = ctx.load_order(1000)
+    parser = ctx.parser
 
-    runner.run(filter_sources, iterations=20, name="Reliability Filtering (50 sources)")
+    def run():
+        for name in names:
+            parser.get_mod_info(name)
 
+    return run
 
-def run_all_benchmarks():
-    """Run all benchmarks and generate report."""
-    runner = Benchmark("SkyModderAI")
 
-    print("=" * 70)
-    print("SkyModderAI Performance Benchmarking Suite")
-    print("=" * 70)
+def _setup_analyze(size: int):
+    def setup(ctx: BenchContext):
+        from conflict_detector import ConflictDetector
 
-    benchmark_deterministic_analysis(runner)
-    benchmark_caching(runner)
-    benchmark_presentation(runner)
-    benchmark_reliability(runner)
+        entries = ctx.entries(size)
 
-    # Generate report
-    report = runner.report()
-    print("\n" + report)
+        def run():
+            ConflictDetector(ctx.parser).analyze_load_order(entries)
 
-    # Save report
-    report_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmark_report.json"
-    )
+        return run
+
+    return setup
+
+
+def _setup_suggested_order(size: int):
+    def setup(ctx: BenchContext):
+        from conflict_detector import ConflictDetector
+
+        entries = ctx.entries(size)
+        detector = ConflictDetector(ctx.parser)
 
-    with open(report_path, "w") as f:
-        json.dump(runner.results, f, indent=2)
+        def run():
+            detector.get_suggested_load_order(entries)
 
-    print(f"\nReport saved to: {report_path}")
+        return run
 
-    return runner.results
+    return setup
+
+
+def _setup_bm25(ctx: BenchContext):
+    from search_engine import ModSearchEngine
+
+    engine = ModSearchEngine()
+    engine.index_parser(ctx.parser)
+
+    def run():
+        for query in SEARCH_QUERIES:
+            engine.search(query, limit=25)
+
+    return run
+
+
+def _setup_api_analyze(size: int):
+    def setup(ctx: BenchContext):
+        client = ctx.client
+        body = {"game": GAME, "mod_list": "\n".join(f"*{n}" for n in ctx.load_order(size))}
+        counter = iter(range(1_000_000))
+
+        def run():
+            # A distinct client address per call keeps the per-IP rate limit out of the way.
+            i = next(counter)
+            response = client.post(
+                "/api/analyze",
+                json=body,
+                headers={"X-Forwarded-For": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"},
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/analyze returned {response.status_code}")
+
+        return run
+
+    return setup
+
+
+CASES = [
+    BenchCase("parser_load", _setup_parser_load, iterations=10, warmup=1),
+    BenchCase("parser_load_with_yaml", _setup_yaml_and_parse, iterations=5, warmup=1),
+    BenchCase("database_load", _setup_database_load, iterations=10, warmup=1),
+    BenchCase("name_resolution_1000", _setup_name_resolution, iterations=20),
+    *[BenchCase(f"analyze_load_order_{n}", _setup_analyze(n), iterations=30) for n in LIST_SIZES],
+    *[
+        BenchCase(f"suggested_load_order_{n}", _setup_suggested_order(n), iterations=30)
+        for n in LIST_SIZES
+    ],
+    BenchCase("bm25_search", _setup_bm25, iterations=50),
+    BenchCase("api_analyze_250", _setup_api_analyze(250), iterations=20, warmup=2),
+]
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(
+    masterlist_path: Path = FIXTURE_PATH,
+    only: Optional[list[str]] = None,
+    seed: int = FIXTURE_SEED,
+    scale: float = 1.0,
+) -> dict[str, Any]:
+    """Run the selected cases and return the JSON-ready report."""
+    cwd = os.getcwd()
+    workdir = Path(tempfile.mkdtemp(prefix="skymodderai-bench-"))
+    ctx = BenchContext(masterlist_path, seed, workdir)
+    results: dict[str, Any] = {}
+    try:
+        for case in CASES:
+            if only and not any(term in case.name for term in only):
+                continue
+            print(f"  {case.name} ...", end="", flush=True)
+            try:
+                fn = case.setup(ctx)
+                stats = measure(
+                    fn, max(1, round(case.iterations * scale)), max(1, round(case.warmup * scale))
+                )
+            except Exception as e:
+                print(f" failed: {e}")
+                results[case.name] = {"error": str(e)}
+                continue
+            results[case.name] = stats
+            print(f" p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "generated": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "masterlist": str(masterlist_path),
+            "masterlist_sha256": hashlib.sha256(masterlist_path.read_bytes()).hexdigest(),
+            "seed": seed,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> list[dict[str, Any]]:
+    """Per-case p50/p95 change against a baseline report (ratios, 1.0 = unchanged)."""
+    rows = []
+    for name, stats in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "error" in stats or "error" in base:
+            continue
+        rows.append(
+            {
+                "name": name,
+                "p50_ms": stats["p50_ms"],
+                "baseline_p50_ms": base["p50_ms"],
+                "p50_ratio": round(stats["p50_ms"] / base["p50_ms"], 3) if base["p50_ms"] else None,
+                "p95_ratio": round(stats["p95_ms"] / base["p95_ms"], 3) if base["p95_ms"] else None,
+            }
+        )
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the SkyModderAI analysis hot paths.")
+    parser.add_argument("--only", nargs="*", help="Run cases whose name contains any of these")
+    parser.add_argument("--masterlist", type=Path, default=FIXTURE_PATH)
+    parser.add_argument("--seed", type=int, default=FIXTURE_SEED)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply iteration counts")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=None,
+        help="Exit 1 if any p50 is more than this fraction slower than the baseline (e.g. 0.2)",
+    )
+    parser.add_argument("--write-fixture", action="store_true", help="Regenerate the fixture")
+    args = parser.parse_args(argv)
+
+    if args.write_fixture:
+        print(f"Fixture written: {write_fixture()}")
+        return 0
+
+    print("=" * 70)
+    print("SkyModderAI Analysis Benchmarks")
+    print("=" * 70)
+    report = run_benchmarks(args.masterlist, args.only, args.seed, args.scale)
+
+    exit_code = 1 if any("error" in s for s in report["results"].values()) else 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("masterlist_sha256") != report["meta"]["masterlist_sha256"]:
+            print("\n⚠️  Baseline used a different masterlist; ratios are not comparable.")
+        report["comparison"] = compare(report, baseline)
+        print(f"\n{'case':<28}{'p50 ms':>12}{'base ms':>12}{'ratio':>9}")
+        for row in report["comparison"]:
+            print(
+                f"{row['name']:<28}{row['p50_ms']:>12}{row['baseline_p50_ms']:>12}"
+                f"{row['p50_ratio'] or '-':>9}"
+            )
+            if (
+                args.max_regression is not None
+                and row["p50_ratio"]
+                and row["p50_ratio"] > 1 + args.max_regression
+            ):
+                exit_code = 1
+
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nReport saved to: {args.output}")
+    return exit_code
 
 
 if __name__ == "__main__":
-    results = run_all_benchmarks()
-
-    # Exit with appropriate code
-    avg_times = [r["avg_ms"] for r in results]
-    if any(t > 1000 for t in avg_times):  # Any avg > 1 second
-        print("\n⚠️  Warning: Some operations exceeded 1 second average")
-        sys.exit(1)
-    else:
-        print("\n✅ All benchmarks passed (avg < 1 second)")
-        sys.exit(0)
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Session Cache — write-light session validation.
+
+Every request resolves its session cookie, and handlers look up the user's
+tier, often more than once (the community feed does it per post). Without
+caching that is a SELECT plus an UPDATE/commit of last_seen on every page
+view, which makes sessions the main source of SQLite write locks.
+
+- Session rows and user status (tier, email_verified) are cached for a short
+  TTL in the shared cache (Redis when configured, else in-process). Session
+  keys hash the token so raw tokens never leave the database. User status
+  is also memoized per request.
+- Writers call invalidate_session() / invalidate_user_status() so
+  revocations and tier changes (including Stripe webhooks) apply at once,
+  not after the TTL.
+- last_seen is written at most once per session per LAST_SEEN_INTERVAL; due
+  updates are queued and flushed in batches by flush_last_seen().
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from flask import g, has_request_context
+
+from cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_TTL = int(os.environ.get("SESSION_CACHE_TTL", "60"))  # seconds
+USER_STATUS_CACHE_TTL = int(os.environ.get("USER_STATUS_CACHE_TTL", "60"))  # seconds
+LAST_SEEN_INTERVAL = int(os.environ.get("SESSION_LAST_SEEN_INTERVAL", "300"))  # seconds
+LAST_SEEN_FLUSH_INTERVAL = 5.0  # seconds between batched last_seen writes
+
+
+def _session_key(token: str) -> str:
+    return "session:" + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _user_status_key(email: str) -> str:
+    return f"user_status:{email.lower()}"
+
+
+# =============================================================================
+# Sessions
+# =============================================================================
+
+
+def get_cached_session(token: str) -> Optional[dict[str, Any]]:
+    """Cached session row for token, or None on a miss."""
+    return get_cache().get(_session_key(token))  # type: ignore[no-any-return]
+
+
+def cache_session(token: str, row: Any) -> dict[str, Any]:
+    """Cache a user_sessions row (sqlite3.Row or dict); returns it as a dict."""
+    data = dict(row)
+    get_cache().set(_session_key(token), data, ttl=SESSION_CACHE_TTL)
+    return data
+
+
+def invalidate_session(token: str) -> None:
+    """Drop a session from the cache and the last_seen queue."""
+    get_cache().delete(_session_key(token))
+    last_seen_batcher.forget(token)
+
+
+def invalidate_sessions(tokens: Iterable[str]) -> None:
+    for token in tokens:
+        invalidate_session(token)
+
+
+# =============================================================================
+# User status (tier, email_verified)
+# =============================================================================
+
+
+def get_cached_user_status(email: str) -> Optional[dict[str, Any]]:
+    """{"tier", "verified"} for email from this request's memo or the shared cache, or None."""
+    key = _user_status_key(email)
+    memo = g.setdefault("_user_status_memo", {}) if has_request_context() else {}
+    if key in memo:
+        return memo[key]  # type: ignore[no-any-return]
+    status = get_cache().get(key)
+    if status is not None:
+        memo[key] = status
+    return status  # type: ignore[no-any-return]
+
+
+def cache_user_status(email: str, status: dict[str, Any]) -> None:
+    key = _user_status_key(email)
+    if has_request_context():
+        g.setdefault("_user_status_memo", {})[key] = status
+    get_cache().set(key, status, ttl=USER_STATUS_CACHE_TTL)
+
+
+def invalidate_user_status(email: str) -> None:
+    key = _user_status_key(email)
+    if has_request_context():
+        g.setdefault("_user_status_memo", {}).pop(key, None)
+    get_cache().delete(key)
+
+
+# =============================================================================
+# last_seen coalescing
+# =============================================================================
+
+
+def _parse_timestamp(value: Any) -> float:
+    """Unix time of a SQLite CURRENT_TIMESTAMP value (UTC), 0 if unparseable."""
+    if not value:
+        return 0.0
+    try:
+        return (
+            datetime.strptime(str(value)[:19], "%Y-%m-%d %H:%M:%S")
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+    except ValueError:
+        return 0.0
+
+
+class LastSeenBatcher:
+    """
+    Decides which sessions need a last_seen write and queues them.
+
+    touch() is called on every validated request; a session is queued only
+    when its last write is at least `interval` seconds old. take_due() hands
+    the queue to the writer at most every `flush_interval` seconds.
+    """
+
+    def __init__(self, interval: float, flush_interval: float) -> None:
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self._written: dict[str, float] = {}
+        self._pending: set[str] = set()
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def touch(self, token: str, last_seen: Any = None) -> None:
+        now = time.time()
+        with self._lock:
+            written = self._written.get(token)
+            if written is None:
+                written = _parse_timestamp(last_seen)
+            if now - written < self.interval:
+                self._written.setdefault(token, written)
+                return
+            self._written[token] = now
+            self._pending.add(token)
+            if len(self._written) > 10_000:
+                cutoff = now - self.interval
+                self._written = {t: ts for t, ts in self._written.items() if ts >= cutoff}
+
+    def take_due(self, force: bool = False) -> list[str]:
+        now = time.time()
+        with self._lock:
+            if not self._pending or (not force and now - self._last_flush < self.flush_interval):
+                return []
+            tokens = list(self._pending)
+            self._pending.clear()
+            self._last_flush = now
+            return tokens
+
+    def forget(self, token: str) -> None:
+        with self._lock:
+            self._written.pop(token, None)
+            self._pending.discard(token)
+
+
+last_seen_batcher = LastSeenBatcher(LAST_SEEN_INTERVAL, LAST_SEEN_FLUSH_INTERVAL)
+
+
+def flush_last_seen(db: sqlite3.Connection, force: bool = False) -> int:
+    """Write queued last_seen updates in one transaction. Returns how many were written."""
+    tokens = last_seen_batcher.take_due(force=force)
+    if not tokens:
+        return 0
+    try:
+        db.executemany(
+            "UPDATE user_sessions SET last_seen = CURRENT_TIMESTAMP WHERE token = ?",
+            [(token,) for token in tokens],
+        )
+        db.commit()
+    except Exception as e:
+        logger.warning(f"last_seen flush failed: {e}")
+        return 0
+    return len(tokens)
@@ -5,7 +5,6 @@ Allows users to create and share links to their mod lists and analysis results.
 
 from __future__ import annotations
 
-import json
 import secrets
 import string
 from datetime import datetime, timedelta, timezone
@@ -13,6 +12,7 @@ from typing import Any, Optional
 
 from flask import current_app as app
 
+import json_provider
 from db import get_db
 
 
@@ -64,8 +64,8 @@ def create_shared_load_order(
                 share_id,
                 expires_at,
                 game,
-                json.dumps(mod_list),
-                json.dumps(analysis_results),
+                json_provider.dumps(mod_list),
+                json_provider.dumps(analysis_results),
                 user_email,
                 title,
                 notes,
@@ -120,8 +120,8 @@ def get_shared_load_order(share_id: str, increment_view: bool = True) -> Optiona
 
         # Convert row to dict and parse JSON fields
         result = dict(row)
-        result["mod_list"] = json.loads(result["mod_list"])
-        result["analysis_results"] = json.loads(result["analysis_results"])
+        result["mod_list"] = json_provider.loads(result["mod_list"])
+        result["analysis_results"] = json_provider.loads(result["analysis_results"])
         return result
 
     except Exception as e:
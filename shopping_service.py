@@ -21,6 +21,8 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
+from ad_events import AdEventBuffer, ClickWindow, CounterKey, flush_buffer, touched_keys
+
 logger = logging.getLogger(__name__)
 
 
@@ -146,11 +148,34 @@ class AdClick:
         }
 
 
+_IMPRESSION_LOG_COLUMNS = (
+    "creative_id",
+    "campaign_id",
+    "business_id",
+    "placement",
+    "user_id",
+    "session_id",
+    "timestamp",
+)
+_CLICK_LOG_COLUMNS = (
+    "creative_id",
+    "campaign_id",
+    "business_id",
+    "user_id",
+    "fingerprint_hash",
+    "billable",
+    "rejection_reason",
+    "cost",
+    "timestamp",
+)
+
+
 class ShoppingService:
     """Manage business advertising campaigns and pay-per-click billing."""
 
     # Pricing: $5 per 1,000 clicks
     CPM_RATE = 5.00
+    CLICKS_PER_PLAN = 1000
     METER_MODEL = True  # Simple meter charge, no packages
 
     # Fraud protection: 24-hour dedup window
@@ -353,6 +378,9 @@ class ShoppingService:
 
     def get_campaign_stats(self, campaign_id: int) -> dict[str, Any]:
         """Get campaign statistics."""
+        # Stats count the audit logs; write buffered events first
+        self.flush_events(force=True)
+
         db = self._get_db()
 
         # Get impressions count
@@ -529,33 +557,20 @@ class ShoppingService:
         user_id: str = None,
         session_id: str = None,
     ) -> bool:
-        """Record an ad impression."""
+        """Record an ad impression (buffered; see flush_events())."""
         now = time.time()
 
-        db = self._get_db()
-
         # Log impression
-        db.execute(
-            """
-            INSERT INTO ad_impressions (
-                creative_id, campaign_id, business_id, placement,
-                user_id, session_id, timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
+        shopping_events.log(
+            "ad_impressions",
+            _IMPRESSION_LOG_COLUMNS,
             (creative_id, campaign_id, business_id, placement, user_id, session_id, now),
         )
 
         # Update creative impressions
-        db.execute(
-            """
-            UPDATE ad_creatives
-            SET impressions = impressions + 1
-            WHERE id = ?
-            """,
-            (creative_id,),
-        )
+        shopping_events.increment("ad_creatives", "id", creative_id, "impressions")
 
-        db.commit()
+        self.flush_events()
         return True
 
     def record_click(
@@ -582,21 +597,10 @@ class ShoppingService:
         now = time.time()
         cost = self._calculate_click_cost()
 
-        db = self._get_db()
-
         # Check for duplicate within 24h window
-        last_click = db.execute(
-            """
-            SELECT timestamp FROM ad_clicks
-            WHERE fingerprint_hash = ? AND campaign_id = ?
-            AND timestamp > ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-            """,
-            (fingerprint_hash, campaign_id, now - self.FRAUD_WINDOW),
-        ).fetchone()
-
-        if last_click:
+        if not shopping_click_window.warmed:
+            self._warm_click_window(now)
+        if shopping_click_window.hit(fingerprint_hash, campaign_id, now):
             # Duplicate click - log but mark as non-billable
             click = AdClick(
                 id=0,
@@ -611,6 +615,7 @@ class ShoppingService:
                 timestamp=now,
             )
             self._log_click(click)
+            self.flush_events()
             logger.debug(f"Duplicate click filtered: campaign {campaign_id}")
             return False, "Duplicate click (24h window)", click
 
@@ -620,7 +625,10 @@ class ShoppingService:
             return False, "Campaign not found", None
 
         is_free_click = self._is_first_month_free(campaign)
-        has_credits = campaign.click_credits > 0
+        pending_credits = shopping_events.pending(
+            "ad_campaigns", "id", campaign_id, "click_credits"
+        )
+        has_credits = campaign.click_credits + pending_credits > 0
 
         if not is_free_click and not has_credits:
             # No credits and not in free period - log but don't bill
@@ -637,6 +645,7 @@ class ShoppingService:
                 timestamp=now,
             )
             self._log_click(click)
+            self.flush_events()
             logger.warning(f"Click rejected: campaign {campaign_id} has no credits")
             return False, "No click credits remaining", click
 
@@ -656,43 +665,23 @@ class ShoppingService:
         self._log_click(click)
 
         # Update creative clicks
-        db.execute(
-            """
-            UPDATE ad_creatives
-            SET clicks = clicks + 1
-            WHERE id = ?
-            """,
-            (creative_id,),
-        )
+        shopping_events.increment("ad_creatives", "id", creative_id, "clicks")
 
         # Deduct credits if not free
         if not is_free_click:
-            db.execute(
-                """
-                UPDATE ad_campaigns
-                SET click_credits = click_credits - 1,
-                    spent_amount = spent_amount + ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (cost, campaign_id),
-            )
+            shopping_events.increment("ad_campaigns", "id", campaign_id, "click_credits", -1)
+            shopping_events.increment("ad_campaigns", "id", campaign_id, "spent_amount", cost)
 
-        db.commit()
+        self.flush_events()
 
         logger.info(f"Click recorded: campaign {campaign_id} (free: {is_free_click})")
         return True, "Click recorded", click
 
     def _log_click(self, click: AdClick):
-        """Log click to database."""
-        db = self._get_db()
-        db.execute(
-            """
-            INSERT INTO ad_clicks (
-                creative_id, campaign_id, business_id, user_id,
-                fingerprint_hash, billable, rejection_reason, cost, timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        """Queue click for the audit log."""
+        shopping_events.log(
+            "ad_clicks",
+            _CLICK_LOG_COLUMNS,
             (
                 click.creative_id,
                 click.campaign_id,
@@ -705,7 +694,41 @@ class ShoppingService:
                 click.timestamp,
             ),
         )
-        db.commit()
+
+    def _warm_click_window(self, now: float) -> None:
+        """Seed the duplicate-click window from clicks logged in the last FRAUD_WINDOW."""
+        db = self._get_db()
+        rows = db.execute(
+            """
+            SELECT fingerprint_hash, campaign_id, MAX(timestamp) AS last_click
+            FROM ad_clicks
+            WHERE timestamp > ?
+            GROUP BY fingerprint_hash, campaign_id
+            """,
+            (now - self.FRAUD_WINDOW,),
+        ).fetchall()
+        shopping_click_window.warm(
+            (row["fingerprint_hash"], row["campaign_id"], row["last_click"]) for row in rows
+        )
+
+    def flush_events(self, force: bool = False) -> int:
+        """
+        Write buffered impressions, clicks and credit debits in one transaction.
+
+        Runs at most every FLUSH_INTERVAL seconds unless forced.
+        """
+        return flush_buffer(
+            self._get_db(), shopping_events, force=force, after=self._touch_campaigns
+        )
+
+    def _touch_campaigns(self, counts: dict[CounterKey, float]) -> None:
+        """Bump updated_at on campaigns whose credits or spend changed."""
+        campaign_ids = touched_keys(counts, "ad_campaigns")
+        if campaign_ids:
+            self._get_db().executemany(
+                "UPDATE ad_campaigns SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [(campaign_id,) for campaign_id in campaign_ids],
+            )
 
     # ==================== Ad Serving ====================
 
@@ -823,6 +846,10 @@ class ShoppingService:
         return ads
 
 
+# Per-process ad event buffer and duplicate-click window (see ad_events)
+shopping_events = AdEventBuffer()
+shopping_click_window = ClickWindow(ShoppingService.FRAUD_WINDOW)
+
 # Singleton instance
 _shopping_service: Optional[ShoppingService] = None
 
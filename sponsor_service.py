@@ -22,6 +22,14 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Optional
 
+from ad_events import (
+    AdEventBuffer,
+    ClickWindow,
+    CounterKey,
+    flush_buffer,
+    touched_keys,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -162,6 +170,17 @@ class ClickRecord:
         }
 
 
+_CLICK_LOG_COLUMNS = (
+    "sponsor_id",
+    "creative_id",
+    "user_id",
+    "fingerprint_hash",
+    "billable",
+    "rejection_reason",
+    "timestamp",
+)
+
+
 class SponsorService:
     """Manage sponsors, creatives, clicks, and billing."""
 
@@ -539,36 +558,15 @@ class SponsorService:
         return db.total_changes > 0
 
     def record_creative_impression(self, creative_id: str) -> bool:
-        """Record an impression for a creative."""
-        db = self._get_db()
-
-        # Update creative impressions
-        db.execute(
-            """
-            UPDATE sponsor_creatives
-            SET impressions = impressions + 1
-            WHERE creative_id = ?
-        """,
-            (creative_id,),
-        )
-
-        # Get sponsor_id and update sponsor impressions
-        row = db.execute(
-            "SELECT sponsor_id FROM sponsor_creatives WHERE creative_id = ?", (creative_id,)
-        ).fetchone()
-
-        if row:
-            db.execute(
-                """
-                UPDATE sponsors
-                SET impressions = impressions + 1
-                WHERE sponsor_id = ?
-            """,
-                (row["sponsor_id"],),
-            )
+        """
+        Record an impression for a creative.
 
-        db.commit()
-        return db.total_changes > 0
+        Counted in memory; flush_events() writes creative and sponsor totals
+        and recomputes CTR/ranking in one batch.
+        """
+        sponsor_events.increment("sponsor_creatives", "creative_id", creative_id, "impressions")
+        self.flush_events()
+        return True
 
     # ==================== Click Tracking & Fraud Protection ====================
 
@@ -602,19 +600,9 @@ class SponsorService:
         now = time.time()
 
         # Check for duplicate within 24h window
-        db = self._get_db()
-        last_click = db.execute(
-            """
-            SELECT timestamp FROM sponsor_clicks
-            WHERE fingerprint_hash = ? AND sponsor_id = ?
-            AND timestamp > ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """,
-            (fingerprint_hash, sponsor_id, now - self.FRAUD_WINDOW),
-        ).fetchone()
-
-        if last_click:
+        if not sponsor_click_window.warmed:
+            self._warm_click_window(now)
+        if sponsor_click_window.hit(fingerprint_hash, sponsor_id, now):
             # Duplicate click - log but mark as non-billable
             click_record = ClickRecord(
                 sponsor_id=sponsor_id,
@@ -626,6 +614,7 @@ class SponsorService:
                 timestamp=now,
             )
             self._log_click(click_record)
+            self.flush_events()
             logger.debug(f"Duplicate click filtered: {sponsor_id} from {fingerprint_hash[:16]}...")
             return False, "Duplicate click (24h window)", click_record
 
@@ -641,60 +630,21 @@ class SponsorService:
         )
         self._log_click(click_record)
 
-        # Update sponsor stats
-        db.execute(
-            """
-            UPDATE sponsors
-            SET clicks = clicks + 1, billable_clicks = billable_clicks + 1
-            WHERE sponsor_id = ?
-        """,
-            (sponsor_id,),
-        )
-
+        # Update sponsor stats (CTR and ranking are recomputed on flush)
+        sponsor_events.increment("sponsors", "sponsor_id", sponsor_id, "clicks")
+        sponsor_events.increment("sponsors", "sponsor_id", sponsor_id, "billable_clicks")
         if creative_id:
-            db.execute(
-                """
-                UPDATE sponsor_creatives
-                SET clicks = clicks + 1
-                WHERE creative_id = ?
-            """,
-                (creative_id,),
-            )
-
-        # Update CTR
-        if sponsor.impressions > 0:
-            new_ctr = (sponsor.clicks / sponsor.impressions) * 100
-            db.execute(
-                """
-                UPDATE sponsors SET ctr = ? WHERE sponsor_id = ?
-            """,
-                (new_ctr, sponsor_id),
-            )
-
-            # Update ranking score
-            new_ranking = self._calculate_ranking_score(sponsor.community_score, new_ctr)
-            db.execute(
-                """
-                UPDATE sponsors SET ranking_score = ? WHERE sponsor_id = ?
-            """,
-                (new_ranking, sponsor_id),
-            )
-
-        db.commit()
+            sponsor_events.increment("sponsor_creatives", "creative_id", creative_id, "clicks")
+        self.flush_events()
 
         logger.info(f"Billable click recorded: {sponsor_id} from {fingerprint_hash[:16]}...")
         return True, "Click recorded", click_record
 
     def _log_click(self, click: ClickRecord):
-        """Log click to database for billing audit."""
-        db = self._get_db()
-        db.execute(
-            """
-            INSERT INTO sponsor_clicks (
-                sponsor_id, creative_id, user_id, fingerprint_hash,
-                billable, rejection_reason, timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
+        """Queue click for the billing audit log."""
+        sponsor_events.log(
+            "sponsor_clicks",
+            _CLICK_LOG_COLUMNS,
             (
                 click.sponsor_id,
                 click.creative_id,
@@ -705,7 +655,77 @@ class SponsorService:
                 click.timestamp,
             ),
         )
-        db.commit()
+
+    def _warm_click_window(self, now: float) -> None:
+        """Seed the duplicate-click window from clicks logged in the last FRAUD_WINDOW."""
+        db = self._get_db()
+        rows = db.execute(
+            """
+            SELECT fingerprint_hash, sponsor_id, MAX(timestamp) AS last_click
+            FROM sponsor_clicks
+            WHERE timestamp > ?
+            GROUP BY fingerprint_hash, sponsor_id
+        """,
+            (now - self.FRAUD_WINDOW,),
+        ).fetchall()
+        sponsor_click_window.warm(
+            (row["fingerprint_hash"], row["sponsor_id"], row["last_click"]) for row in rows
+        )
+
+    def flush_events(self, force: bool = False) -> int:
+        """
+        Write buffered impressions, clicks and audit rows in one transaction.
+
+        Runs at most every FLUSH_INTERVAL seconds unless forced. Sponsors
+        whose counters changed get CTR and ranking recomputed in the same batch.
+        """
+        return flush_buffer(self._get_db(), sponsor_events, force=force, after=self._apply_rollups)
+
+    def _apply_rollups(self, counts: dict[CounterKey, float]) -> None:
+        """Roll creative impressions up to sponsors and recompute CTR/ranking for them."""
+        db = self._get_db()
+        sponsor_ids = touched_keys(counts, "sponsors")
+
+        creative_impressions = {
+            key: amount
+            for (table, _, key, column), amount in counts.items()
+            if table == "sponsor_creatives" and column == "impressions"
+        }
+        if creative_impressions:
+            placeholders = ", ".join("?" for _ in creative_impressions)
+            rows = db.execute(
+                f"SELECT creative_id, sponsor_id FROM sponsor_creatives "
+                f"WHERE creative_id IN ({placeholders})",
+                list(creative_impressions),
+            ).fetchall()
+            sponsor_impressions: dict[str, float] = {}
+            for row in rows:
+                sponsor_impressions[row["sponsor_id"]] = (
+                    sponsor_impressions.get(row["sponsor_id"], 0)
+                    + creative_impressions[row["creative_id"]]
+                )
+            db.executemany(
+                "UPDATE sponsors SET impressions = impressions + ? WHERE sponsor_id = ?",
+                [(amount, sid) for sid, amount in sponsor_impressions.items()],
+            )
+            sponsor_ids.update(sponsor_impressions)
+
+        if not sponsor_ids:
+            return
+        placeholders = ", ".join("?" for _ in sponsor_ids)
+        rows = db.execute(
+            f"SELECT sponsor_id, clicks, impressions, community_score FROM sponsors "
+            f"WHERE sponsor_id IN ({placeholders}) AND impressions > 0",
+            list(sponsor_ids),
+        ).fetchall()
+        updates = []
+        for row in rows:
+            ctr = (row["clicks"] / row["impressions"]) * 100
+            ranking = self._calculate_ranking_score(row["community_score"] or 0.0, ctr)
+            updates.append((ctr, ranking, row["sponsor_id"]))
+        db.executemany(
+            "UPDATE sponsors SET ctr = ?, ranking_score = ? WHERE sponsor_id = ?", updates
+        )
 
     # ==================== Community Voting ====================
 
@@ -822,6 +842,9 @@ class SponsorService:
 
     def get_billing_summary(self, sponsor_id: str) -> dict[str, Any]:
         """Get billing summary for a sponsor."""
+        # Billing reads the stored totals and audit log; write buffered clicks first
+        self.flush_events(force=True)
+
         sponsor = self.get_sponsor(sponsor_id)
         if not sponsor:
             return {"error": "Sponsor not found"}
@@ -865,6 +888,10 @@ class SponsorService:
 
 # ==================== Singleton ====================
 
+# Per-process ad event buffer and duplicate-click window (see ad_events)
+sponsor_events = AdEventBuffer()
+sponsor_click_window = ClickWindow(SponsorService.FRAUD_WINDOW)
+
 _sponsor_service: Optional[SponsorService] = None
 
 
@@ -0,0 +1,180 @@
+"""
+Stage Timing for SkyModderAI
+
+Lightweight spans for finding which part of a request is slow:
+
+    with stage("detect_conflicts"):
+        detector.analyze_load_order(mods)
+
+    @timed_stage("system_impact")
+    def get_system_impact(...): ...
+
+A request opts in with start_stage_timer(endpoint); stage() calls outside
+an active timer (other endpoints, background jobs, tests) are no-ops. When
+the request ends, each stage's duration is added to an in-process histogram,
+exposed in Prometheus text format by render_prometheus() (served at /metrics).
+
+Histograms are per process: with several gunicorn workers, each worker
+reports its own series and Prometheus sums them.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+# Seconds; analyze stages range from sub-millisecond to multi-second masterlist loads.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_METRIC = "skymodderai_stage_duration_seconds"
+REQUEST_METRIC = "skymodderai_request_duration_seconds"
+
+_HELP = {
+    STAGE_METRIC: "Time spent in each stage of an instrumented request.",
+    REQUEST_METRIC: "Total request handling time.",
+}
+
+
+class StageTimer:
+    """Collects stage durations for one request (or one job)."""
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}  # name -> seconds, in first-seen order
+        self.finished = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add time to a stage; a stage entered twice accumulates."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """Stage durations in milliseconds."""
+        return {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+
+    def finish(self, metrics: Optional[StageMetrics] = None) -> None:
+        """Feed the stages into the histograms (once)."""
+        if self.finished:
+            return
+        self.finished = True
+        metrics = metrics or stage_metrics
+        for name, seconds in self.stages.items():
+            metrics.observe(STAGE_METRIC, {"endpoint": self.endpoint, "stage": name}, seconds)
+
+
+class StageMetrics:
+    """Thread-safe cumulative histograms keyed by metric name and labels."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (metric, sorted label items) -> [per-bucket counts, sum, count]
+        self._series: dict[tuple[str, tuple[tuple[str, str], ...]], list[Any]] = {}
+
+    def observe(self, metric: str, labels: dict[str, str], seconds: float) -> None:
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += seconds
+            series[2] += 1
+
+    def snapshot(self) -> dict[tuple[str, tuple[tuple[str, str], ...]], list[Any]]:
+        with self._lock:
+            return {key: [list(s[0]), s[1], s[2]] for key, s in self._series.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: list[str] = []
+        by_metric: dict[str, list] = {}
+        for (metric, labels), series in sorted(self.snapshot().items()):
+            by_metric.setdefault(metric, []).append((labels, series))
+
+        for metric, entries in by_metric.items():
+            lines.append(f"# HELP {metric} {_HELP.get(metric, metric)}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, (counts, total, count) in entries:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label_text},le="+Inf"}} {count}')
+                lines.append(f"{metric}_sum{{{label_text}}} {total:.6f}")
+                lines.append(f"{metric}_count{{{label_text}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+stage_metrics = StageMetrics()
+
+
+def start_stage_timer(endpoint: str) -> StageTimer:
+    """Start timing stages for the current request."""
+    from flask import g
+
+    timer = StageTimer(endpoint)
+    g.stage_timer = timer
+    return timer
+
+
+def current_stage_timer() -> Optional[StageTimer]:
+    from flask import g, has_app_context
+
+    if not has_app_context():
+        return None
+    return g.get("stage_timer")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as ``name`` if the current request is being timed."""
+    timer = current_stage_timer()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def timed_stage(name: Optional[str] = None) -> Callable:
+    """Decorator form of stage(); defaults to the function name."""
+
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def render_prometheus() -> str:
+    return stage_metrics.render_prometheus()
@@ -19,10 +19,11 @@ Engine flow:
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from typing import Optional
 
+from pattern_matcher import PatternMatcher
+
 # =============================================================================
 # GPU Performance Database (100+ GPUs)
 # =============================================================================
@@ -194,6 +195,14 @@ _HEAVY_PATTERNS = [
     (r"\b(physics|hdt\s*smp)\b", "Physics mod", "medium", {"fps_impact": -8, "vram_gb": 0.3}),
 ]
 
+_HEAVY_MATCHER = PatternMatcher(
+    (
+        (pattern, (category, impact, metrics))
+        for pattern, category, impact, metrics in _HEAVY_PATTERNS
+    ),
+    flags=0,
+)
+
 _GAME_VRAM_MULTIPLIERS = {
     "skyrimse": 1.0,
     "skyrim": 0.8,
@@ -424,19 +433,18 @@ def get_system_impact(
     heavy_mods: list[HeavyMod] = []
 
     for name in mod_names:
-        name_lower = name.lower()
-        for pattern, category, impact, metrics in _HEAVY_PATTERNS:
-            if re.search(pattern, name_lower):
-                heavy_mods.append(
-                    HeavyMod(
-                        name=name,
-                        category=category,
-                        impact=impact,
-                        fps_impact=metrics.get("fps_impact", 0),
-                        vram_gb=metrics.get("vram_gb", 0.0),
-                    )
+        hit = _HEAVY_MATCHER.first(name.lower())
+        if hit:
+            category, impact, metrics = hit
+            heavy_mods.append(
+                HeavyMod(
+                    name=name,
+                    category=category,
+                    impact=impact,
+                    fps_impact=metrics.get("fps_impact", 0),
+                    vram_gb=metrics.get("vram_gb", 0.0),
                 )
-                break
+            )
 
     impact_order = {"high": 3, "medium": 2, "low": 1}
     heavy_mods.sort(key=lambda m: (-impact_order.get(m.impact, 0), m.name.lower()))
@@ -0,0 +1,35 @@
+"""
+Tests for /api/analyze response shaping: fields= projection and compression.
+"""
+
+import brotli
+
+from app import app
+
+MOD_LIST = "*Skyrim.esm\n*Update.esm\n*SkyUI_SE.esp\n"
+
+
+def test_fields_projection_skips_text_reports():
+    client = app.test_client()
+    res = client.post(
+        "/api/analyze?fields=summary,conflicts", json={"mod_list": MOD_LIST, "game": "skyrimse"}
+    )
+    assert res.status_code == 200
+    assert set(res.get_json()) == {"success", "summary", "conflicts"}
+
+    res = client.post(
+        "/api/analyze", json={"mod_list": MOD_LIST, "game": "skyrimse", "fields": ["report"]}
+    )
+    assert set(res.get_json()) == {"success", "report"}
+
+
+def test_full_payload_by_default_and_brotli_negotiated():
+    res = app.test_client().post(
+        "/api/analyze",
+        json={"mod_list": MOD_LIST, "game": "skyrimse"},
+        headers={"Accept-Encoding": "br, gzip"},
+    )
+    assert res.status_code == 200
+    assert res.headers["Content-Encoding"] == "br"
+    payload = app.json.loads(brotli.decompress(res.data))
+    assert {"report", "ai_context", "consolidated", "summary"} <= set(payload)
@@ -0,0 +1,29 @@
+"""
+Tests for API-key verification in app.py going through api_key_cache.
+"""
+
+from api_key_cache import flush_usage
+from app import api_key_create, api_key_list, api_key_lookup, api_key_revoke, app, get_db
+
+
+def test_lookup_cached_counted_and_revoked():
+    with app.test_request_context():
+        raw, key_id, *_ = api_key_create("apikeys@example.com", label="bot")
+        assert api_key_lookup(raw) == "apikeys@example.com"
+
+        statements = []
+        get_db().set_trace_callback(statements.append)
+        assert api_key_lookup(raw) == "apikeys@example.com"
+        assert not [s for s in statements if "FROM api_keys" in s]
+        get_db().set_trace_callback(None)
+
+        listed = {k["id"]: k for k in api_key_list("apikeys@example.com")}
+        assert listed[key_id]["request_count"] == 2
+        flush_usage(get_db(), force=True)
+        listed = {k["id"]: k for k in api_key_list("apikeys@example.com")}
+        assert listed[key_id]["request_count"] == 2
+        assert listed[key_id]["last_used_at"]
+
+        assert api_key_revoke("apikeys@example.com", key_id)
+        assert api_key_lookup(raw) is None
+        assert api_key_lookup("mck_not-a-real-key") is None
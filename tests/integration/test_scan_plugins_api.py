@@ -0,0 +1,70 @@
+"""
+Tests for /api/scan-plugins endpoint.
+"""
+
+import io
+
+import pytest
+
+from app import SESSION_COOKIE_NAME, app, session_create
+from tests.unit.test_plugin_scanner import make_plugin
+
+SKYRIM = make_plugin(records=[(b"WEAP", 0x00012EB7)], flags=0x1)
+WEAPONS = make_plugin(["Skyrim.esm"], [(b"WEAP", 0x00012EB7)])
+BALANCE = make_plugin(["Skyrim.esm"], [(b"WEAP", 0x00012EB7)])
+
+
+@pytest.fixture
+def logged_in_client():
+    client = app.test_client()
+    with app.app_context():
+        token, _ = session_create("scanner@example.com", remember_me=False, user_agent="pytest")
+    client.set_cookie(SESSION_COOKIE_NAME, token)
+    return client
+
+
+def _upload(client):
+    return client.post(
+        "/api/scan-plugins",
+        data={
+            "plugins": [
+                (io.BytesIO(BALANCE), "Balance.esp"),
+                (io.BytesIO(SKYRIM), "Skyrim.esm"),
+                (io.BytesIO(WEAPONS), "Weapons.esp"),
+                (io.BytesIO(b"junk"), "Broken.esp"),
+            ],
+            "load_order": "*Skyrim.esm\n*Weapons.esp\n*Balance.esp\n",
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def test_scan_plugins_requires_auth():
+    res = _upload(app.test_client())
+    assert res.status_code == 401
+
+
+def test_scan_plugins_orders_by_enabled_load_order(logged_in_client):
+    res = _upload(logged_in_client)
+    assert res.status_code == 200
+    report = res.get_json()
+    assert [p["name"] for p in report["plugins"]] == ["Skyrim.esm", "Weapons.esp", "Balance.esp"]
+    assert report["conflicts"][0]["winner"] == "Balance.esp"
+    assert report["skipped"] == ["Broken.esp"]
+
+
+def test_chunked_upload_over_limit_rejected(logged_in_client, monkeypatch):
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", 1000)
+    body = (
+        b"--b\r\n"
+        b'Content-Disposition: form-data; name="plugins"; filename="Big.esp"\r\n\r\n'
+        + b"x" * 5000
+        + b"\r\n--b--\r\n"
+    )
+    res = logged_in_client.post(
+        "/api/scan-plugins",
+        input_stream=io.BytesIO(body),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+        environ_overrides={"wsgi.input_terminated": True},  # chunked: no Content-Length
+    )
+    assert res.status_code == 413
@@ -0,0 +1,48 @@
+"""
+Tests for session validation and tier lookups going through session_cache.
+"""
+
+from app import (
+    app,
+    get_db,
+    get_user_tier,
+    session_create,
+    session_get,
+    session_revoke,
+    session_revoke_all_other,
+    set_user_tier,
+)
+
+
+def _queries(db):
+    statements = []
+    db.set_trace_callback(statements.append)
+    return statements
+
+
+def test_session_validation_cached_and_revocation_immediate():
+    with app.test_request_context():
+        token, _ = session_create("cache@example.com", remember_me=False, user_agent="pytest")
+        other, _ = session_create("cache@example.com", remember_me=False, user_agent="pytest")
+        assert session_get(token)["user_email"] == "cache@example.com"
+
+        statements = _queries(get_db())
+        assert session_get(token)["user_email"] == "cache@example.com"
+        assert statements == []  # no SELECT, no last_seen UPDATE
+
+        session_revoke(token)
+        assert session_get(token) is None
+
+        assert session_get(other) is not None
+        session_revoke_all_other("cache@example.com", keep_token="unrelated")
+        assert session_get(other) is None
+        get_db().set_trace_callback(None)
+
+
+def test_tier_change_visible_at_once():
+    with app.test_request_context():
+        set_user_tier("tier-cache@example.com", "free")
+        assert get_user_tier("tier-cache@example.com") == "free"
+        set_user_tier("tier-cache@example.com", "pro")
+        assert get_user_tier("tier-cache@example.com") == "pro"
+        set_user_tier("tier-cache@example.com", "free")
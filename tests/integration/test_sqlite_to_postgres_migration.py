@@ -0,0 +1,143 @@
+"""
+Tests for migrations/migrate_sqlite_to_postgres.py.
+
+Level planning runs everywhere; the end-to-end copy needs a scratch
+PostgreSQL database in TEST_POSTGRES_URL (CI starts a service container).
+"""
+
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from migrations.migrate_sqlite_to_postgres import (
+    CHECKPOINT_TABLE,
+    get_postgres_engine,
+    get_sqlite_connection,
+    get_table_dependencies,
+    load_checkpoints,
+    plan_table_levels,
+    reset_checkpoints,
+    run_migration,
+    verify_migration,
+)
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    path = str(tmp_path / "app.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE users (email TEXT PRIMARY KEY, tier TEXT, email_verified BOOLEAN);
+        CREATE TABLE user_activity (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT REFERENCES users(email),
+            event_type TEXT NOT NULL,
+            event_data TEXT
+        );
+        CREATE TABLE conflict_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game TEXT, mod_a TEXT, mod_b TEXT, occurrence_count INTEGER
+        );
+        """
+    )
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?, ?)",
+        [(f"user{i}@example.com", "free", i % 2) for i in range(20)],
+    )
+    conn.executemany(
+        "INSERT INTO user_activity (user_email, event_type, event_data) VALUES (?, ?, ?)",
+        [(f"user{i % 20}@example.com", "analyze", "" if i % 7 else None) for i in range(1000)],
+    )
+    conn.executemany(
+        "INSERT INTO conflict_stats (game, mod_a, mod_b, occurrence_count) VALUES (?, ?, ?, ?)",
+        [("skyrimse", f"Mod{i}.esp", f'Mod "{i + 1}", x.esp', i) for i in range(300)],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_levels_put_parents_first(sqlite_path):
+    tables = ["user_activity", "conflict_stats", "users"]
+    conn = get_sqlite_connection(sqlite_path)
+    deps = get_table_dependencies(conn, tables)
+    conn.close()
+
+    levels = plan_table_levels(tables, deps)
+    assert levels == [["conflict_stats", "users"], ["user_activity"]]
+
+
+def test_levels_break_cycles():
+    levels = plan_table_levels(["a", "b"], {"a": {"b"}, "b": {"a"}})
+    assert sorted(t for level in levels for t in level) == ["a", "b"]
+
+
+@pytest.mark.requires_db
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+def test_migration_copies_resumes_and_verifies(sqlite_path):
+    tables = ["users", "user_activity", "conflict_stats"]
+    engine = get_postgres_engine(TEST_POSTGRES_URL)
+    with engine.begin() as conn:
+        for table in ["user_activity", "conflict_stats", "users", CHECKPOINT_TABLE]:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(
+            text("CREATE TABLE users (email TEXT PRIMARY KEY, tier TEXT, email_verified BOOLEAN)")
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE user_activity (id SERIAL PRIMARY KEY, "
+                "user_email TEXT REFERENCES users(email), event_type TEXT NOT NULL, "
+                "event_data TEXT)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE conflict_stats (id SERIAL PRIMARY KEY, game TEXT, "
+                "mod_a TEXT, mod_b TEXT, occurrence_count INTEGER)"
+            )
+        )
+
+    result = run_migration(sqlite_path, engine, tables, workers=2, batch_size=128)
+    assert result["failed_tables"] == []
+    assert result["total_rows"] == 1320
+
+    report = verify_migration(sqlite_path, engine, tables)
+    assert all(entry["ok"] for entry in report)
+
+    with engine.connect() as conn:
+        nulls = conn.execute(
+            text("SELECT COUNT(*) FROM user_activity WHERE event_data IS NULL")
+        ).scalar()
+    assert nulls == len([i for i in range(1000) if i % 7 == 0])
+
+    # New rows after a completed run are picked up once checkpoints are reset
+    # for that table; untouched tables are skipped.
+    sqlite_conn = sqlite3.connect(sqlite_path)
+    sqlite_conn.execute(
+        "INSERT INTO user_activity (user_email, event_type) VALUES ('user1@example.com', 'search')"
+    )
+    sqlite_conn.commit()
+    sqlite_conn.close()
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"UPDATE {CHECKPOINT_TABLE} SET completed = FALSE WHERE table_name = 'user_activity'"
+            )
+        )
+
+    result = run_migration(sqlite_path, engine, tables, workers=2, batch_size=128)
+    assert result["total_rows"] == 1
+    assert load_checkpoints(engine)["user_activity"]["rows_copied"] == 1001
+    assert all(entry["ok"] for entry in verify_migration(sqlite_path, engine, tables))
+
+    # A full re-run over an already migrated target skips existing keys
+    # instead of aborting on duplicates.
+    reset_checkpoints(engine)
+    result = run_migration(sqlite_path, engine, tables, workers=2, batch_size=128)
+    assert result["failed_tables"] == []
+    assert all(entry["ok"] for entry in verify_migration(sqlite_path, engine, tables))
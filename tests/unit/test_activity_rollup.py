@@ -0,0 +1,168 @@
+"""
+Tests for activity_rollup.py — daily rollups must agree with the raw events.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import activity_rollup
+from activity_rollup import (
+    ACTIVITY_ROLLUP_WATERMARK,
+    HyperLogLog,
+    _day_range,
+    get_event_count,
+    get_rollup_metrics,
+    refresh_activity_rollups,
+)
+from models import (
+    ActivityDailyRollup,
+    Base,
+    RollupWatermark,
+    UserActivity,
+    create_database_engine,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_database_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _add_event(session, event_type, day, email=None, **data):
+    session.add(
+        UserActivity(
+            event_type=event_type,
+            event_data=json.dumps(data),
+            user_email=email,
+            created_at=datetime.strptime(day, "%Y-%m-%d").replace(hour=12),
+        )
+    )
+
+
+class TestHyperLogLog:
+    def test_estimate_within_error(self):
+        hll = HyperLogLog()
+        for i in range(10000):
+            hll.add(f"user{i}@example.com")
+        assert abs(hll.count() - 10000) / 10000 < 0.05
+
+    def test_small_counts_are_exact_enough(self):
+        hll = HyperLogLog()
+        for email in ["a@x.com", "b@x.com", "a@x.com", "c@x.com"]:
+            hll.add(email)
+        assert hll.count() == 3
+
+    def test_merge_matches_union(self):
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            a.add(f"u{i}")
+        for i in range(2000, 5000):
+            b.add(f"u{i}")
+        merged = HyperLogLog.from_bytes(a.to_bytes())
+        merged.merge(b)
+        assert abs(merged.count() - 5000) / 5000 < 0.05
+
+
+class TestRefreshActivityRollups:
+    def test_counts_by_type_game_and_feature(self, session):
+        _add_event(session, "analyze", "2026-10-12", "a@x.com", game="skyrimse")
+        _add_event(session, "analyze", "2026-10-12", "b@x.com", game="skyrimse")
+        _add_event(session, "analyze", "2026-10-13", "a@x.com", game="fallout4")
+        _add_event(session, "search", "2026-10-13", None, feature="mod_search")
+        session.commit()
+
+        stats = refresh_activity_rollups(session=session, batch_size=2)
+        assert stats["processed"] == 4
+
+        metrics = get_rollup_metrics(
+            datetime(2026, 10, 12), datetime(2026, 10, 19), session=session
+        )
+        assert metrics["total_events"] == 4
+        assert metrics["by_type"] == {"analyze": 3, "search": 1}
+        assert metrics["by_game"] == {"skyrimse": 2, "fallout4": 1}
+        assert metrics["by_feature"] == {"mod_search": 1}
+        assert metrics["unique_users"] == 2
+
+    def test_refresh_is_incremental(self, session):
+        _add_event(session, "curation_run", "2026-10-12")
+        session.commit()
+        refresh_activity_rollups(session=session)
+
+        _add_event(session, "curation_run", "2026-10-12")
+        session.commit()
+        stats = refresh_activity_rollups(session=session)
+
+        assert stats["processed"] == 1
+        assert session.query(ActivityDailyRollup).count() == 1
+        assert (
+            get_event_count(
+                "curation_run", datetime(2026, 10, 12), datetime(2026, 10, 13), session=session
+            )
+            == 2
+        )
+
+    def test_period_excludes_other_days(self, session):
+        _add_event(session, "search", "2026-10-01")
+        _add_event(session, "search", "2026-10-14")
+        session.commit()
+        refresh_activity_rollups(session=session)
+
+        assert (
+            get_event_count(
+                "search", datetime(2026, 10, 12), datetime(2026, 10, 19), session=session
+            )
+            == 1
+        )
+
+    def test_week_is_seven_days(self):
+        now = datetime(2026, 10, 18, 15, 30)
+        days = _day_range(now - timedelta(days=7), now)
+        assert days[0] == "2026-10-11" and days[-1] == "2026-10-17"
+        assert len(days) == 7
+
+    def test_opens_own_session_without_app_context(self, tmp_path, monkeypatch):
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        Base.metadata.create_all(engine)
+        seed = sessionmaker(bind=engine)()
+        _add_event(seed, "search", "2026-10-14")
+        seed.commit()
+        seed.close()
+        monkeypatch.setattr(activity_rollup, "_session_factory", sessionmaker(bind=engine))
+
+        assert refresh_activity_rollups()["processed"] == 1
+        assert get_event_count("search", datetime(2026, 10, 12), datetime(2026, 10, 19)) == 1
+
+    def test_concurrent_run_does_not_double_count(self, tmp_path):
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        seed = factory()
+        _add_event(seed, "analyze", "2026-10-14")
+        _add_event(seed, "analyze", "2026-10-14")
+        seed.add(RollupWatermark(name=ACTIVITY_ROLLUP_WATERMARK, last_id=0))
+        seed.commit()
+        seed.close()
+
+        # Another refresh folds the rows after the slow one has read last_id=0.
+        other = factory()
+        assert refresh_activity_rollups(session=other)["processed"] == 2
+        other.close()
+
+        slow = factory()
+        stale = RollupWatermark(name=ACTIVITY_ROLLUP_WATERMARK, last_id=0)
+        slow.get = lambda model, key: stale
+        stats = refresh_activity_rollups(session=slow)
+        assert stats["processed"] == 0
+        assert stats["last_id"] == 0
+        slow.close()
+
+        check = factory()
+        assert check.query(ActivityDailyRollup).one().event_count == 2
+        check.close()
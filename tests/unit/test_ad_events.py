@@ -0,0 +1,195 @@
+"""
+Tests for ad_events.py and the buffered sponsor/shopping event tracking.
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, g
+
+import shopping_service
+import sponsor_service
+from ad_events import AdEventBuffer, ClickWindow, flush_buffer
+from shopping_service import ShoppingService
+from sponsor_service import SponsorService
+
+
+def _dict_row(cursor, row):
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+def _request(ip="203.0.113.7", agent="pytest"):
+    return SimpleNamespace(remote_addr=ip, headers={"User-Agent": agent})
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = _dict_row
+    conn.executescript(
+        """
+        CREATE TABLE sponsors (
+            sponsor_id TEXT PRIMARY KEY, name TEXT, website TEXT, category TEXT,
+            status TEXT, impressions INTEGER DEFAULT 0, clicks INTEGER DEFAULT 0,
+            billable_clicks INTEGER DEFAULT 0, ctr REAL DEFAULT 0.0,
+            community_score REAL DEFAULT 0.0, ranking_score REAL DEFAULT 0.0
+        );
+        CREATE TABLE sponsor_creatives (
+            creative_id TEXT PRIMARY KEY, sponsor_id TEXT,
+            impressions INTEGER DEFAULT 0, clicks INTEGER DEFAULT 0
+        );
+        CREATE TABLE sponsor_clicks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, sponsor_id TEXT, creative_id TEXT,
+            user_id TEXT, fingerprint_hash TEXT, billable INTEGER,
+            rejection_reason TEXT, timestamp REAL
+        );
+        CREATE TABLE ad_creatives (
+            id INTEGER PRIMARY KEY, impressions INTEGER DEFAULT 0, clicks INTEGER DEFAULT 0
+        );
+        CREATE TABLE ad_campaigns (
+            id INTEGER PRIMARY KEY, business_id TEXT, name TEXT, status TEXT,
+            budget_type TEXT, budget_amount REAL, spent_amount REAL DEFAULT 0.0,
+            click_credits INTEGER, click_price_per_thousand REAL, first_month_free INTEGER,
+            first_month_start TEXT, first_month_end TEXT, start_date TEXT, end_date TEXT,
+            created_at TEXT, updated_at TEXT
+        );
+        CREATE TABLE ad_impressions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, creative_id INTEGER, campaign_id INTEGER,
+            business_id TEXT, placement TEXT, user_id TEXT, session_id TEXT, timestamp REAL
+        );
+        CREATE TABLE ad_clicks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, creative_id INTEGER, campaign_id INTEGER,
+            business_id TEXT, user_id TEXT, fingerprint_hash TEXT, billable INTEGER,
+            rejection_reason TEXT, cost REAL, timestamp REAL
+        );
+        INSERT INTO sponsors (sponsor_id, name, website, category, status, community_score)
+            VALUES ('s1', 'Sponsor', 'https://example.com', 'tools', 'active', 0.8);
+        INSERT INTO sponsor_creatives (creative_id, sponsor_id) VALUES ('c1', 's1'), ('c2', 's1');
+        INSERT INTO ad_creatives (id) VALUES (1);
+        INSERT INTO ad_campaigns (id, business_id, name, status, budget_type, budget_amount,
+            click_credits, click_price_per_thousand, first_month_free)
+            VALUES (7, 'b1', 'Launch', 'active', 'prepaid', 5.0, 1, 5.0, 0);
+        """
+    )
+    app = Flask(__name__)
+    with app.app_context():
+        g.db = conn
+        yield conn
+
+
+@pytest.fixture(autouse=True)
+def fresh_buffers(monkeypatch):
+    monkeypatch.setattr(sponsor_service, "sponsor_events", AdEventBuffer())
+    monkeypatch.setattr(sponsor_service, "sponsor_click_window", ClickWindow(86400))
+    monkeypatch.setattr(shopping_service, "shopping_events", AdEventBuffer())
+    monkeypatch.setattr(shopping_service, "shopping_click_window", ClickWindow(86400))
+
+
+def test_buffer_aggregates_until_due():
+    buffer = AdEventBuffer(flush_interval=60)
+    buffer.increment("t", "id", 1, "hits")
+    buffer.increment("t", "id", 1, "hits", 2)
+    buffer.log("log", ("a", "b"), (1, 2))
+    assert buffer.pending("t", "id", 1, "hits") == 3
+    assert buffer.take_due() == ({}, {})
+
+    counts, logs = buffer.take_due(force=True)
+    assert counts == {("t", "id", 1, "hits"): 3}
+    assert logs == {("log", ("a", "b")): [(1, 2)]}
+    buffer.restore(counts, logs)
+    assert buffer.pending("t", "id", 1, "hits") == 3
+
+
+def test_failed_flush_keeps_events():
+    conn = sqlite3.connect(":memory:")
+    buffer = AdEventBuffer()
+    buffer.increment("missing_table", "id", 1, "hits")
+    assert flush_buffer(conn, buffer, force=True) == 0
+    assert buffer.pending("missing_table", "id", 1, "hits") == 1
+
+
+def test_click_window_slides_and_warms():
+    window = ClickWindow(window=100)
+    assert not window.hit("fp", "s1", now=1000)
+    assert window.hit("fp", "s1", now=1050)
+    assert not window.hit("fp", "s2", now=1050)
+    # Each click refreshes the window, duplicates included
+    assert window.hit("fp", "s1", now=1140)
+    assert not window.hit("fp", "s1", now=1241)
+
+    warmed = ClickWindow(window=100)
+    warmed.warm([("fp", "s1", 990.0)])
+    assert warmed.warmed
+    assert warmed.hit("fp", "s1", now=1000)
+
+
+def test_click_window_prunes_oldest():
+    window = ClickWindow(window=100, maxsize=2)
+    window.hit("a", 1, now=0)
+    window.hit("b", 1, now=10)
+    window.hit("c", 1, now=20)
+    assert not window.hit("a", 1, now=30)  # evicted, so not a duplicate
+
+
+def test_sponsor_events_flush_in_one_batch(db):
+    service = SponsorService()
+    for creative_id in ("c1", "c1", "c2", "c2"):
+        assert service.record_creative_impression(creative_id)
+    billable, message, _ = service.record_click("s1", "c1", "u1", _request())
+    assert billable and message == "Click recorded"
+    billable, message, _ = service.record_click("s1", "c1", "u1", _request())
+    assert not billable and message == "Duplicate click (24h window)"
+
+    # Nothing written until the flush interval passes
+    assert db.execute("SELECT COUNT(*) AS n FROM sponsor_clicks").fetchone()["n"] == 0
+
+    summary = service.get_billing_summary("s1")
+    assert summary["performance"]["impressions"] == 4
+    assert summary["performance"]["clicks"] == 1
+    assert summary["performance"]["billable_clicks"] == 1
+    assert summary["performance"]["ctr"] == pytest.approx(25.0)
+    assert summary["ranking_score"] == pytest.approx(service._calculate_ranking_score(0.8, 25.0))
+    assert summary["audit"] == {"total_clicks_logged": 2, "billable_clicks": 1}
+    creatives = db.execute(
+        "SELECT creative_id, impressions, clicks FROM sponsor_creatives ORDER BY creative_id"
+    ).fetchall()
+    assert creatives == [
+        {"creative_id": "c1", "impressions": 2, "clicks": 1},
+        {"creative_id": "c2", "impressions": 2, "clicks": 0},
+    ]
+
+
+def test_sponsor_window_warms_from_click_log(db):
+    service = SponsorService()
+    fingerprint = service._hash_fingerprint("203.0.113.7", "pytest")
+    db.execute(
+        "INSERT INTO sponsor_clicks (sponsor_id, fingerprint_hash, billable, timestamp) "
+        "VALUES ('s1', ?, 1, strftime('%s', 'now') - 60)",
+        (fingerprint,),
+    )
+    billable, message, _ = service.record_click("s1", None, None, _request())
+    assert not billable and message == "Duplicate click (24h window)"
+
+
+def test_shopping_credits_account_for_pending_debits(db):
+    service = ShoppingService()
+    service.record_impression(1, 7, "b1", placement="pixel")
+    billable, message, click = service.record_click(1, 7, "b1", request=_request())
+    assert billable and click.cost == pytest.approx(0.005)
+    # The campaign's single credit is spent, even though the debit isn't written yet
+    billable, message, _ = service.record_click(1, 7, "b1", request=_request(ip="198.51.100.1"))
+    assert not billable and message == "No click credits remaining"
+
+    stats = service.get_campaign_stats(7)
+    assert stats == {"impressions": 1, "clicks": 2, "billable_clicks": 1, "total_cost": 0.005}
+    campaign = db.execute(
+        "SELECT click_credits, spent_amount, updated_at FROM ad_campaigns"
+    ).fetchone()
+    assert campaign["click_credits"] == 0
+    assert campaign["spent_amount"] == pytest.approx(0.005)
+    assert campaign["updated_at"] is not None
+    assert db.execute("SELECT impressions, clicks FROM ad_creatives").fetchone() == {
+        "impressions": 1,
+        "clicks": 1,
+    }
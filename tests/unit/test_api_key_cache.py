@@ -0,0 +1,115 @@
+"""
+Tests for api_key_cache.py — cached API-key verification and batched usage counts.
+"""
+
+import sqlite3
+import uuid
+
+import pytest
+
+import api_key_cache
+from api_key_cache import ApiKeyCache, ApiKeyUsage, flush_usage
+
+
+@pytest.fixture
+def keys():
+    """Fake api_keys table: key_hash -> entry, with a call log."""
+    table = {}
+    calls = []
+
+    def load(key_hash):
+        calls.append(key_hash)
+        return table.get(key_hash)
+
+    return table, calls, load
+
+
+def _hash():
+    return uuid.uuid4().hex  # unique per test so the shared cache starts cold
+
+
+def test_valid_key_loaded_once(keys):
+    table, calls, load = keys
+    key_hash = _hash()
+    table[key_hash] = {"user_email": "dev@example.com", "key_id": 1}
+    cache = ApiKeyCache(maxsize=10)
+    for _ in range(3):
+        assert cache.lookup(key_hash, load)["user_email"] == "dev@example.com"
+    assert calls == [key_hash]
+
+    # Another worker's LRU is cold but the shared tier has the entry.
+    assert ApiKeyCache().lookup(key_hash, load)["key_id"] == 1
+    assert calls == [key_hash]
+
+
+def test_invalid_keys_negatively_cached(keys):
+    _, calls, load = keys
+    key_hash = _hash()
+    cache = ApiKeyCache()
+    assert cache.lookup(key_hash, load) is None
+    assert cache.lookup(key_hash, load) is None
+    assert ApiKeyCache().lookup(key_hash, load) is None
+    assert calls == [key_hash]
+
+
+def test_revoke_and_forget(keys):
+    table, calls, load = keys
+    key_hash = _hash()
+    table[key_hash] = {"user_email": "dev@example.com", "key_id": 1}
+    cache, other_worker = ApiKeyCache(), ApiKeyCache(ttl=0)
+    assert cache.lookup(key_hash, load)
+    cache.revoke(key_hash)
+    assert cache.lookup(key_hash, load) is None
+    assert other_worker.lookup(key_hash, load) is None  # sees the shared tombstone
+    assert calls == [key_hash]
+
+    cache.forget(key_hash)
+    assert cache.lookup(key_hash, load)  # reloaded from the table
+    assert calls == [key_hash, key_hash]
+
+
+def test_lru_evicts_oldest(keys):
+    table, calls, load = keys
+    cache = ApiKeyCache(maxsize=2)
+    hashes = [_hash() for _ in range(3)]
+    for key_hash in hashes:
+        table[key_hash] = {"user_email": "dev@example.com", "key_id": 1}
+        cache.lookup(key_hash, load)
+    assert list(cache._entries) == hashes[1:]
+
+
+def test_load_errors_not_cached(keys):
+    key_hash = _hash()
+
+    def broken(_):
+        raise sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError):
+        ApiKeyCache().lookup(key_hash, broken)
+    table, calls, load = keys
+    table[key_hash] = {"user_email": "dev@example.com", "key_id": 1}
+    assert ApiKeyCache().lookup(key_hash, load)
+
+
+def test_usage_flushed_in_batches(monkeypatch):
+    usage = ApiKeyUsage(flush_interval=3600)
+    monkeypatch.setattr(api_key_cache, "api_key_usage", usage)
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE api_keys (key_hash TEXT, request_count INTEGER, last_used_at TEXT)")
+    db.executemany("INSERT INTO api_keys VALUES (?, ?, NULL)", [("a", 5), ("b", None)])
+
+    for key_hash in ("a", "a", "b"):
+        usage.record(key_hash)
+    assert usage.pending("a") == 2
+    assert flush_usage(db) == 0  # interval not reached
+    assert flush_usage(db, force=True) == 2
+    assert dict(db.execute("SELECT key_hash, request_count FROM api_keys")) == {"a": 7, "b": 1}
+    assert usage.pending("a") == 0
+
+
+def test_failed_flush_keeps_counts(monkeypatch):
+    usage = ApiKeyUsage()
+    monkeypatch.setattr(api_key_cache, "api_key_usage", usage)
+    usage.record("a")
+    assert flush_usage(sqlite3.connect(":memory:"), force=True) == 0  # no api_keys table
+    assert usage.pending("a") == 1
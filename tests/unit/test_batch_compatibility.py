@@ -0,0 +1,85 @@
+"""
+Tests for batch_compatibility.py — one mod against many load orders.
+"""
+
+import pytest
+
+from batch_compatibility import run_batch_test
+from loot_parser import LOOTParser, ModInfo
+
+
+def _info(name, **fields):
+    values = {
+        "requirements": [],
+        "incompatibilities": [],
+        "load_after": [],
+        "load_before": [],
+        "patches": [],
+        "dirty_edits": False,
+        "messages": [],
+        "tags": [],
+    }
+    values.update(fields)
+    return ModInfo(name=name, clean_name=name.lower(), **values)
+
+
+@pytest.fixture
+def parser(tmp_path):
+    parser = LOOTParser("skyrimse", cache_dir=str(tmp_path))
+    parser.mod_database = {
+        "mymod": _info("MyMod", incompatibilities=["Rival"], load_after=["Base"]),
+        "rival": _info("Rival"),
+        "base": _info("Base"),
+        "other": _info("Other"),
+    }
+    return parser
+
+
+def test_per_order_results_and_rule_matrix(parser):
+    batch = run_batch_test(
+        "mymod",
+        [["Base", "Rival", "MyMod"], ["MyMod", "Base"], ["Base", "Other"]],
+        parser,
+        names=["Rival list", "Wrong order", None],
+        workers=1,
+    )
+
+    assert batch["resolved"] == "MyMod"
+    first, second, third = batch["results"]
+    assert first["load_order_name"] == "Rival list"
+    assert first["status"] == "error"
+    assert second["status"] == "warning"
+    assert third["status"] == "ok"
+    assert third["added_mod"] is True
+    assert third["load_order_name"] == "Load Order 3"
+
+    aggregate = batch["aggregate"]
+    assert (aggregate["orders_with_errors"], aggregate["orders_with_warnings"]) == (1, 1)
+    assert aggregate["clean_orders"] == 1
+    assert [(r["type"], r["other_mod"], r["orders"]) for r in aggregate["rule_matrix"]] == [
+        ("incompatible", "Rival", 1),
+        ("load_order_violation", "Base", 1),
+    ]
+
+
+def test_lookups_shared_across_orders(parser, monkeypatch):
+    calls = []
+    original = parser.get_mod_info
+
+    def counting(name):
+        calls.append(name.lower())
+        return original(name)
+
+    monkeypatch.setattr(parser, "get_mod_info", counting)
+    run_batch_test("MyMod", [["Base", "Other", "Unknown"]] * 20, parser, workers=1)
+
+    # Resolve the author's mod once, then each distinct name once for the batch.
+    assert sorted(calls) == ["base", "mymod", "mymod", "other", "unknown"]
+
+
+def test_process_pool_matches_serial(parser):
+    orders = [["Base", "Rival"], ["Other"], ["MyMod", "Base"]] * 25
+    serial = run_batch_test("MyMod", orders, parser, workers=1)
+    pooled = run_batch_test("MyMod", orders, parser, workers=2)
+    assert pooled == serial
+    assert serial["aggregate"]["rule_matrix"][0]["orders"] == 25
@@ -0,0 +1,128 @@
+"""
+Tests for batch trust-score recalculation in business_service.py.
+"""
+
+import sqlite3
+
+import pytest
+from flask import Flask, g
+
+from business_service import BusinessService
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        CREATE TABLE businesses (
+            id TEXT PRIMARY KEY, name TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE business_trust_scores (
+            business_id TEXT PRIMARY KEY,
+            community_vote_score REAL DEFAULT 0.0,
+            longevity_score REAL DEFAULT 0.0,
+            flag_penalty REAL DEFAULT 0.0,
+            trust_score REAL DEFAULT 0.0,
+            trust_tier TEXT DEFAULT 'new',
+            total_votes INTEGER DEFAULT 0,
+            positive_votes INTEGER DEFAULT 0,
+            total_flags INTEGER DEFAULT 0,
+            last_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE business_votes (
+            business_id TEXT, voter_user_id TEXT, score INTEGER, context TEXT,
+            voted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(business_id, voter_user_id)
+        );
+        CREATE TABLE business_flags (
+            business_id TEXT, reporter_user_id TEXT, reason TEXT, detail TEXT,
+            status TEXT DEFAULT 'open', reported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed_at TIMESTAMP
+        );
+        INSERT INTO businesses (id, name, created_at) VALUES
+            ('old', 'Old Co', datetime('now', '-2 years')),
+            ('young', 'Young Co', datetime('now', '-90 days')),
+            ('quiet', 'Quiet Co', datetime('now', '-3 years'));
+        INSERT INTO business_trust_scores (business_id, last_calculated) VALUES
+            ('old', datetime('now', '-1 day')),
+            ('young', datetime('now', '-1 day')),
+            ('quiet', datetime('now', '-1 day'));
+        """
+    )
+    conn.executemany(
+        "INSERT INTO business_votes (business_id, voter_user_id, score, voted_at) "
+        "VALUES ('old', ?, ?, datetime('now', '-1 hour'))",
+        [(f"u{i}", 5 if i < 30 else 2) for i in range(40)],
+    )
+    conn.execute(
+        "INSERT INTO business_flags (business_id, reporter_user_id, reason, reported_at) "
+        "VALUES ('old', 'u1', 'spam', datetime('now', '-1 hour'))"
+    )
+    conn.execute(
+        "INSERT INTO business_flags (business_id, reporter_user_id, reason, status, "
+        "reported_at, reviewed_at) VALUES ('old', 'u2', 'spam', 'resolved', "
+        "datetime('now', '-30 days'), datetime('now', '-1 hour'))"
+    )
+    app = Flask(__name__)
+    with app.app_context():
+        g.db = conn
+        yield conn
+
+
+def _score(db, business_id):
+    return dict(
+        db.execute(
+            "SELECT * FROM business_trust_scores WHERE business_id = ?", (business_id,)
+        ).fetchone()
+    )
+
+
+def test_full_run_scores_every_business(db):
+    result = BusinessService().calculate_all_trust_scores(full=True)
+    assert result == {"candidates": 3, "updated": 3}
+
+    old = _score(db, "old")
+    # 30/40 positive, volume 0.4 -> 0.3; fully ramped; half the flags open
+    assert old["total_votes"] == 40 and old["positive_votes"] == 30
+    assert old["community_vote_score"] == 0.3
+    assert old["longevity_score"] == 1.0
+    assert old["flag_penalty"] == 7.5
+    assert old["trust_score"] == pytest.approx((0.3 * 0.4 + 0.1 + 0.1 + 0.15) * 100 - 7.5, abs=0.05)
+    assert old["trust_tier"] == "rising"
+    assert old["total_flags"] == 2
+
+    young = _score(db, "young")
+    assert young["longevity_score"] == pytest.approx(0.25, abs=0.01)
+    assert young["trust_tier"] == "rising"
+
+
+def test_incremental_run_only_touches_changed_businesses(db):
+    service = BusinessService()
+    # 'old' has activity since its last run; 'young' is still ramping longevity
+    assert sorted(service._dirty_business_ids(db)) == ["old", "young"]
+    assert service.calculate_all_trust_scores() == {"candidates": 2, "updated": 2}
+    assert _score(db, "quiet")["trust_score"] == 0.0
+
+    assert service._dirty_business_ids(db) == ["young"]
+    db.execute(
+        "INSERT INTO business_votes (business_id, voter_user_id, score) VALUES ('quiet', 'u1', 5)"
+    )
+    assert sorted(service._dirty_business_ids(db)) == ["quiet", "young"]
+
+
+def test_missing_score_row_is_created(db):
+    db.execute("INSERT INTO businesses (id, name, created_at) VALUES ('new', 'New', '2020-01-01')")
+    service = BusinessService()
+    assert "new" in service._dirty_business_ids(db)
+    service.calculate_all_trust_scores()
+    assert _score(db, "new")["longevity_score"] == 1.0
+
+
+def test_vote_recalculates_single_business(db):
+    service = BusinessService()
+    assert service.vote("quiet", "voter", 5)
+    quiet = _score(db, "quiet")
+    assert quiet["total_votes"] == 1 and quiet["positive_votes"] == 1
+    assert quiet["community_vote_score"] == 0.01
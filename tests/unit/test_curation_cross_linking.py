@@ -0,0 +1,84 @@
+"""
+Tests for curation_service.run_cross_linking — bulk, incremental cross-links.
+"""
+
+import json
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from curation_service import CROSS_LINK_WATERMARK, run_cross_linking
+from models import Base, KnowledgeSource, RollupWatermark, create_database_engine
+
+
+@pytest.fixture
+def session():
+    engine = create_database_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _add(session, n, requires=(), conflicts=(), compatible=None, status="active"):
+    session.add(
+        KnowledgeSource(
+            id=n,
+            source_url=f"https://example.com/{n}",
+            title=f"Source {n}",
+            game="skyrimse",
+            requires=json.dumps(list(requires)),
+            conflicts_with=json.dumps(list(conflicts)),
+            compatible_with=compatible,
+            status=status,
+        )
+    )
+
+
+def _links(session):
+    session.expire_all()
+    return {
+        s.id: json.loads(s.compatible_with) if s.compatible_with else []
+        for s in session.query(KnowledgeSource).order_by(KnowledgeSource.id)
+    }
+
+
+def test_links_sources_sharing_mods(session):
+    _add(session, 1, requires=["SKSE"])
+    _add(session, 2, requires=["SKSE"], conflicts=["USSEP"], compatible="not json")
+    _add(session, 3, conflicts=["USSEP", "SKSE"])
+    _add(session, 4, requires=["SKSE"], status="archived")
+    _add(session, 5, requires=["Other"])
+    session.commit()
+
+    assert run_cross_linking(session) == {"links_added": 3}
+    assert _links(session) == {1: [2, 3], 2: [3], 3: [], 4: [], 5: []}
+    assert session.get(RollupWatermark, CROSS_LINK_WATERMARK).last_id == 5
+
+
+def test_incremental_run_only_links_new_sources(session):
+    _add(session, 1, requires=["SKSE"])
+    _add(session, 2, requires=["SKSE"])
+    session.commit()
+    run_cross_linking(session)
+
+    # A link removed by hand is not re-added: old pairs are not revisited
+    session.get(KnowledgeSource, 1).compatible_with = json.dumps([])
+    _add(session, 3, requires=["SKSE"])
+    session.commit()
+
+    assert run_cross_linking(session) == {"links_added": 2}
+    assert _links(session) == {1: [3], 2: [3], 3: []}
+    assert run_cross_linking(session) == {"links_added": 0}
+
+    assert run_cross_linking(session, full=True) == {"links_added": 1}
+    assert _links(session)[1] == [3, 2]
+
+
+def test_existing_links_are_kept(session):
+    _add(session, 1, requires=["SKSE"], compatible=json.dumps([9]))
+    _add(session, 2, requires=["SKSE"])
+    session.commit()
+
+    assert run_cross_linking(session) == {"links_added": 1}
+    assert _links(session)[1] == [9, 2]
@@ -0,0 +1,186 @@
+"""
+Tests for streaming deviation labeling in deviation_labeler.py.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import deviation_labeler
+from deviation_labeler import (
+    _label_batch,
+    _Labeler,
+    analyze_deviations,
+    analyze_source_deviations,
+    batch_label_deviations,
+    extract_methods,
+)
+from models import Base, KnowledgeSource, SourceCredibility, create_database_engine
+
+OLD = datetime.now() - timedelta(days=365)
+
+
+@pytest.fixture
+def session():
+    engine = create_database_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _add(session, n, summary, title="Guide", score=None, verified=False, **fields):
+    credibility = None
+    if score is not None:
+        credibility = SourceCredibility(
+            source_url=f"https://example.com/{n}",
+            source_type="reddit",
+            overall_score=score,
+            last_verified=OLD if verified else None,
+        )
+    session.add(
+        KnowledgeSource(
+            id=n,
+            source_url=f"https://example.com/{n}",
+            title=title,
+            summary=summary,
+            game=fields.pop("game", "skyrimse"),
+            category=fields.pop("category", "fix"),
+            credibility=credibility,
+            created_at=fields.pop("created_at", OLD),
+            **fields,
+        )
+    )
+
+
+def _flags(session):
+    session.expire_all()
+    return {
+        s.id: sorted(json.loads(s.deviation_flags)) if s.deviation_flags else []
+        for s in session.query(KnowledgeSource).order_by(KnowledgeSource.id)
+    }
+
+
+def test_extract_methods_matches_overlapping_keywords():
+    assert extract_methods("Install with MO2, enable the ENB and disable the rest") == {
+        "install",
+        "mo2",
+        "enable",
+        "enb",
+        "disable",
+    }
+    assert extract_methods("nothing here") == set()
+
+
+def test_single_source_analysis_still_works_on_plain_objects():
+    class MockSource:
+        title = "Experimental SKSE Hook Mod"
+        summary = "Uses a memory patch. Only works with 1.6.1170."
+        credibility = None
+        created_at = datetime.now()
+        game_version = "1.6.1170"
+
+    flags, risk_level = analyze_source_deviations(MockSource())
+    assert set(flags) == {
+        "experimental",
+        "non_standard_memory_patch",
+        "novel_technique",
+        "version_sensitive",
+        "moderate_credibility",
+        "unverified",
+    }
+    assert risk_level == "high"
+
+
+def test_streams_pages_and_flags_consensus_conflicts(session, monkeypatch):
+    monkeypatch.setattr(deviation_labeler, "PAGE_SIZE", 2)
+    _add(session, 1, "Install with MO2", score=0.9, verified=True)
+    _add(session, 2, "Install the patch with MO2", score=0.9, verified=True)
+    _add(session, 3, "Use Vortex", score=0.9, verified=True)
+    _add(session, 4, "Beta workaround hack", title="WIP", score=0.3)
+    _add(session, 5, "Use Vortex", score=0.9, verified=True, category="other")
+    _add(session, 6, "Experimental", status="archived")
+    session.commit()
+
+    result = analyze_deviations(session, workers=1)
+    assert result == {
+        "analyzed": 5,
+        "skipped": 0,
+        "deviations_found": 2,
+        "high_risk": 1,
+        "medium_risk": 0,
+        "low_risk": 1,
+    }
+    assert _flags(session) == {
+        1: [],
+        2: [],
+        3: ["conflicts_consensus"],
+        4: [
+            "experimental",
+            "low_credibility",
+            "non_standard_code_hack",
+            "non_standard_workaround",
+            "unverified",
+        ],
+        5: [],
+        6: [],
+    }
+    assert session.get(KnowledgeSource, 4).is_standard_approach is False
+    assert session.get(KnowledgeSource, 3).is_standard_approach is True
+    assert session.get(KnowledgeSource, 1).deviation_labeled_at is not None
+
+
+def test_unchanged_sources_are_skipped(session):
+    _add(session, 1, "Install with MO2", score=0.9, verified=True)
+    _add(session, 2, "Install with MO2", score=0.9, verified=True)
+    _add(session, 3, "Install with MO2", score=0.9, verified=True, category="other")
+    session.commit()
+    assert analyze_deviations(session, workers=1)["analyzed"] == 3
+
+    again = analyze_deviations(session, workers=1)
+    assert again["analyzed"] == 0 and again["skipped"] == 3
+
+    # A changed summary relabels that source and the one whose consensus it changed
+    session.get(KnowledgeSource, 2).summary = "Use Vortex"
+    session.commit()
+    again = analyze_deviations(session, workers=1)
+    assert again["analyzed"] == 2 and again["skipped"] == 1
+    assert _flags(session) == {1: ["conflicts_consensus"], 2: ["conflicts_consensus"], 3: []}
+
+    assert analyze_deviations(session, full=True, workers=1)["analyzed"] == 3
+
+
+def test_pool_labels_match_in_process(monkeypatch):
+    monkeypatch.setattr(deviation_labeler, "PARALLEL_THRESHOLD", 1)
+    items = [
+        ("WIP mod", "beta dll injection", "1.5.97", False, True, 0.3, False),
+        ("Guide", "install with mo2, se only", "1.5.97", True, False, 0.9, True),
+        ("Guide", None, None, False, False, 0.5, True),
+    ] * 4
+    labeler = _Labeler(workers=2)
+    try:
+        assert labeler.label(items) == _label_batch(items)
+    finally:
+        labeler.close()
+
+
+def test_batch_label_reports_missing_ids(session):
+    _add(session, 1, "Beta workaround", score=0.3)
+    _add(session, 2, "Install with MO2", score=0.9, verified=True)
+    session.commit()
+
+    assert batch_label_deviations([1, 2, 1, 99], session) == {
+        "processed": 2,
+        "labeled": 1,
+        "errors": 1,
+    }
+    assert _flags(session)[1] == [
+        "experimental",
+        "low_credibility",
+        "non_standard_workaround",
+        "unverified",
+    ]
+    # The weekly analysis owns is_standard_approach
+    assert session.get(KnowledgeSource, 1).is_standard_approach is True
@@ -0,0 +1,133 @@
+"""
+Tests for github_fetcher.py against a local stand-in for the GitHub API and raw hosts.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cache_service import get_cache
+from github_fetcher import fetch_github_repo, select_files
+
+SHA = "a" * 40
+FILES = {
+    "README.md": "# Example mod",
+    "Scripts/Source/MyQuest.psc": "Scriptname MyQuest extends Quest",
+    "SKSE/Plugins/Example.ini": "[General]\nbEnabled=1",
+    "docs/notes.txt": "some notes",
+    "slow/config.json": '{"slow": true}',
+}
+TREE = [{"path": path, "type": "blob", "size": len(body)} for path, body in FILES.items()] + [
+    {"path": "Scripts", "type": "tree"},
+    {"path": "Example.esp", "type": "blob", "size": 4096},
+    {"path": "textures/icon.dds", "type": "blob", "size": 90000},
+]
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    requests_seen: list = []
+    slow_delay = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/plain"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except BrokenPipeError:
+            pass  # client gave up (time budget)
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        if self.path == "/api/repos/owner/mod/commits/HEAD":
+            return self._send(200, SHA)
+        if self.path == f"/api/repos/owner/mod/git/trees/{SHA}?recursive=1":
+            return self._send(200, json.dumps({"sha": SHA, "tree": TREE}), "application/json")
+        prefix = f"/raw/owner/mod/{SHA}/"
+        if self.path.startswith(prefix):
+            path = self.path[len(prefix) :]
+            if path.startswith("slow/"):
+                time.sleep(self.slow_delay)
+            if path in FILES:
+                return self._send(200, FILES[path])
+        return self._send(404, "not found")
+
+
+@pytest.fixture
+def server():
+    FakeGitHub.requests_seen = []
+    FakeGitHub.slow_delay = 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    httpd.daemon_threads = True
+    httpd.block_on_close = False
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    get_cache().clear_pattern("github_repo:*")
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield {"api_base": f"{base}/api", "raw_base": f"{base}/raw"}
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_select_files_ranks_and_budgets():
+    paths, plugins = select_files(TREE, max_files=3)
+    assert paths == ["README.md", "Scripts/Source/MyQuest.psc", "SKSE/Plugins/Example.ini"]
+    assert plugins == ["Example.esp"]
+
+    paths, _ = select_files(TREE, max_bytes=len(FILES["README.md"]))
+    assert paths == ["README.md"]
+
+
+def test_relevant_names_match_the_file_name_not_directories():
+    tree = [
+        {"path": f"fomod/images/shot{i}.png", "type": "blob", "size": 90000} for i in range(6)
+    ] + [
+        {"path": "fomod/ModuleConfig.xml", "type": "blob", "size": 4000},
+        {"path": "license/readme/tool.exe", "type": "blob", "size": 1000},
+        {"path": "scripts/source/main.psc", "type": "blob", "size": 2000},
+    ]
+    paths, _ = select_files(tree)
+    assert paths == ["fomod/ModuleConfig.xml", "scripts/source/main.psc"]
+
+
+def test_fetches_tree_and_caches_by_sha(server):
+    files = fetch_github_repo("owner", "mod", **server)
+
+    assert set(files) == set(FILES) | {"_plugins_list"}
+    assert all(files[path] == body for path, body in FILES.items())
+    assert "Example.esp" in files["_plugins_list"]
+    assert not any("icon.dds" in p for p in FakeGitHub.requests_seen)
+
+    seen = len(FakeGitHub.requests_seen)
+    again = fetch_github_repo("owner", "mod", **server)
+    assert again == files
+    assert FakeGitHub.requests_seen[seen:] == ["/api/repos/owner/mod/commits/HEAD"]
+
+
+def test_time_budget_returns_partial_and_skips_cache(server):
+    FakeGitHub.slow_delay = 2.0
+
+    started = time.monotonic()
+    files = fetch_github_repo("owner", "mod", time_budget=0.75, **server)
+    assert time.monotonic() - started < 1.5
+    assert "README.md" in files
+    assert "slow/config.json" not in files
+
+    FakeGitHub.slow_delay = 0.0
+    files = fetch_github_repo("owner", "mod", **server)
+    assert "slow/config.json" in files
+
+
+def test_unknown_repo_raises(server):
+    import requests
+
+    with pytest.raises(requests.HTTPError):
+        fetch_github_repo("owner", "missing", **server)
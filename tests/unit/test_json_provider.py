@@ -0,0 +1,74 @@
+"""
+Tests for json_provider.py — orjson-backed provider matching Flask's output.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import FastJSONProvider
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+PAYLOAD = {
+    "b": [1, 2.5, None, True],
+    "a": {"nested": "ünïcode"},
+    "ranks": {3: "third", 1: "first"},
+    "when": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    "price": Decimal("1.10"),
+    "id": UUID("12345678-1234-5678-1234-567812345678"),
+    "point": Point(1, 2),
+}
+
+
+def _app(provider):
+    app = Flask(__name__)
+    app.json = provider(app)
+
+    @app.route("/payload")
+    def payload():
+        return jsonify(PAYLOAD)
+
+    return app
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_response_matches_default_provider(debug):
+    fast, default = _app(FastJSONProvider), _app(DefaultJSONProvider)
+    fast.debug = default.debug = debug
+    got = fast.test_client().get("/payload")
+    expected = default.test_client().get("/payload")
+    assert got.mimetype == "application/json"
+    assert json.loads(got.data) == json.loads(expected.data)
+    assert list(json.loads(got.data)) == sorted(json.loads(got.data))
+    assert got.data.endswith(b"\n")
+    assert (b"\n  " in got.data) is debug
+
+
+def test_dumps_falls_back_for_values_orjson_rejects():
+    provider = FastJSONProvider(Flask(__name__))
+    assert json.loads(provider.dumps({"big": 2**70})) == {"big": 2**70}
+    assert provider.dumps({"a": 1}, indent=4) == json.dumps({"a": 1}, indent=4)
+    assert provider.loads("[NaN]")[0] != provider.loads("[NaN]")[0]  # NaN via stdlib
+    with pytest.raises(TypeError):
+        provider.dumps({"bad": object()})
+
+
+def test_storage_helpers_round_trip():
+    data = {"mods": ["SkyUI.esp", "ünïcode.esp"], "counts": {"errors": 0}}
+    assert json_provider.loads(json_provider.dumps(data)) == data
+    assert json_provider.loads(json.dumps(data).encode("utf-8")) == data
+    with pytest.raises(ValueError):
+        json_provider.loads("{not json")
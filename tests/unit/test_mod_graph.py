@@ -0,0 +1,92 @@
+"""
+Tests for mod_graph.py and the fuel export built on it.
+"""
+
+import random
+import sys
+from types import SimpleNamespace
+
+from mod_graph import ModGraph
+from samson_fuel import extract_fuel
+
+
+def _info(requirements=(), incompatibilities=(), patches=()):
+    return SimpleNamespace(
+        requirements=list(requirements),
+        incompatibilities=list(incompatibilities),
+        load_after=[],
+        load_before=[],
+        patches=list(patches),
+    )
+
+
+DATABASE = {
+    "a": _info(["B.esp"], incompatibilities=["X.esp"]),
+    "b": _info(["C.esm"]),
+    "c": _info(),
+    # A cycle: d -> e -> d, and d also needs a (depth 2).
+    "d": _info(["E.esp", "A.esp"]),
+    "e": _info(["D.esp"], incompatibilities=["X.esp"]),
+    "x": _info(incompatibilities=["A.esp", "E.esp"], patches=[{"mod": "a"}]),
+    "f": _info(["SKSE64"]),
+}
+
+
+def test_depths_cycles_and_external_nodes():
+    graph = ModGraph.from_mod_database(DATABASE)
+
+    assert graph.masterlist_count == 7
+    assert graph.index("skse64") == 7
+    assert [graph.depth_of(n) for n in "abcdef"] == [2, 1, 0, 3, 3, 1]
+    assert graph.requirement_cycles() == [["d", "e"]]
+
+    stats = graph.depth_stats(top=2)
+    assert stats["mods_with_requirements"] == 5
+    assert stats["max"] == 3
+    assert stats["average"] == (2 + 1 + 3 + 3 + 1) / 5
+    assert stats["deepest"] == [["d", 3], ["e", 3]]
+
+
+def test_degrees_and_incompatible_pairs():
+    graph = ModGraph.from_mod_database(DATABASE)
+    assert graph.degree_distribution("requirement", "out") == {0: 3, 1: 4, 2: 1}
+    assert graph.degree_distribution("requirement", "in")[1] == 6
+    assert graph.top_incompatible_pairs(2) == [("a", "x", 2), ("e", "x", 2)]
+
+
+def test_long_chain_has_no_recursion_limit():
+    n = sys.getrecursionlimit() + 500
+    database = {f"m{i}": _info([f"m{i + 1}.esp"] if i + 1 < n else []) for i in range(n)}
+    graph = ModGraph.from_mod_database(database)
+    assert graph.depth_of("m0") == n - 1
+
+
+def test_depths_match_brute_force_on_random_dags():
+    rng = random.Random(7)
+    for _ in range(20):
+        n = 40
+        database = {
+            f"m{i}": _info([f"m{j}" for j in range(i + 1, n) if rng.random() < 0.08])
+            for i in range(n)
+        }
+        graph = ModGraph.from_mod_database(database)
+
+        # Edges only point to higher indices, so fill longest chains from the end.
+        longest = [0] * n
+        for i in reversed(range(n)):
+            reqs = database[f"m{i}"].requirements
+            longest[i] = max((longest[int(r[1:])] + 1 for r in reqs), default=0)
+
+        assert [graph.depth_of(f"m{i}") for i in range(n)] == longest
+
+
+def test_fuel_export_uses_graph():
+    fuel = extract_fuel(SimpleNamespace(mod_database=DATABASE, game="skyrimse"))
+    structure = fuel["structure"]
+    assert structure["edge_types"]["requirement"] == 6
+    assert structure["edge_types"]["incompatible"] == 4
+    assert structure["cooperation_ratio"] == round(1 / 5, 4)
+    assert structure["avg_dependency_depth"] == 2.0
+    assert structure["max_dependency_depth"] == 3
+    assert structure["requirement_cycles"] == 1
+    assert fuel["aggregate"]["top_incompatible_pairs"][:2] == [["a", "x"], ["e", "x"]]
@@ -0,0 +1,167 @@
+"""
+Tests for mod_images.py image resolution against a local stand-in for the Nexus API.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import mod_images
+from mod_images import (
+    MOD_PLACEHOLDER,
+    ImageCacheStore,
+    NexusRateLimiter,
+    enrich_recommendations_with_images,
+    get_mod_image,
+    prefetch_popular_mod_images,
+)
+
+MODS = {"100": "https://img.example/skyui.png", "200": None}
+SEARCH = {"SkyUI": {"id": 100, "picture_url": "https://img.example/skyui.png"}}
+
+
+class FakeNexus(BaseHTTPRequestHandler):
+    requests_seen: list = []
+    delay = 0.0
+    fail = False
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        time.sleep(self.delay)
+        if self.fail:
+            return self._send(429, {"message": "slow down"})
+        prefix = "/v1/games/skyrimspecialedition/mods/"
+        if self.path.startswith(prefix + "search.json?name="):
+            name = self.path.split("=", 1)[1]
+            return self._send(200, {"mods": [SEARCH[name]] if name in SEARCH else []})
+        mod_id = self.path[len(prefix) :].removesuffix(".json")
+        if mod_id in MODS:
+            return self._send(200, {"mod_id": int(mod_id), "picture_url": MODS[mod_id]})
+        return self._send(404, {"message": "not found"})
+
+
+@pytest.fixture
+def nexus(tmp_path, monkeypatch):
+    FakeNexus.requests_seen = []
+    FakeNexus.delay = 0.0
+    FakeNexus.fail = False
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeNexus)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(mod_images, "NEXUS_AVAILABLE", True)
+    monkeypatch.setattr(mod_images, "NEXUS_API_KEY", "test-key")
+    monkeypatch.setattr(mod_images, "NEXUS_API_BASE", f"http://127.0.0.1:{httpd.server_port}/v1")
+    monkeypatch.setattr(mod_images, "_nexus_limiter", NexusRateLimiter(1000, 100))
+    monkeypatch.setattr(mod_images, "_image_store", ImageCacheStore(str(tmp_path / "images.db")))
+    yield FakeNexus
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _parser(**pictures):
+    return SimpleNamespace(
+        mod_database={name: SimpleNamespace(picture_url=url) for name, url in pictures.items()}
+    )
+
+
+def _rec(name, mod_id=None):
+    url = f"https://www.nexusmods.com/skyrimspecialedition/mods/{mod_id}" if mod_id else ""
+    return {"name": name, "nexus_url": url, "image_url": MOD_PLACEHOLDER}
+
+
+def test_hits_and_misses_are_cached(nexus):
+    assert get_mod_image("skyrimse", "100", "SkyUI") == "https://img.example/skyui.png"
+    # No picture and no search match: a miss, cached so Nexus isn't asked again.
+    assert get_mod_image("skyrimse", "200", "Nothing") == MOD_PLACEHOLDER
+    seen = len(nexus.requests_seen)
+    assert seen == 3
+
+    assert get_mod_image("skyrimse", "100", "SkyUI") == "https://img.example/skyui.png"
+    assert get_mod_image("skyrimse", "200", "Nothing") == MOD_PLACEHOLDER
+    assert len(nexus.requests_seen) == seen
+
+
+def test_transient_failures_not_cached(nexus):
+    nexus.fail = True
+    assert get_mod_image("skyrimse", "100", "SkyUI") == MOD_PLACEHOLDER
+    nexus.fail = False
+    assert get_mod_image("skyrimse", "100", "SkyUI") == "https://img.example/skyui.png"
+
+
+def test_batch_resolves_concurrently(nexus):
+    nexus.delay = 0.2
+    recs = [_rec(f"Mod{i}", 1000 + i) for i in range(8)] + [_rec("Loot", 5)]
+    started = time.monotonic()
+    enrich_recommendations_with_images(
+        _parser(loot="https://img.example/loot.png"), recs, "skyrimse"
+    )
+    elapsed = time.monotonic() - started
+
+    assert recs[-1]["image_url"] == "https://img.example/loot.png"
+    # Eight unknown IDs: each needs an ID lookup and a name search.
+    assert len(nexus.requests_seen) == 16
+    assert elapsed < 1.5
+
+
+def test_name_only_entries_prefetched_in_background(nexus):
+    recs = [_rec("SkyUI")]
+    enrich_recommendations_with_images(_parser(), recs, "skyrimse")
+    assert recs[0]["image_url"] == MOD_PLACEHOLDER
+
+    deadline = time.monotonic() + 5
+    while mod_images._prefetch_pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    recs = [_rec("SkyUI")]
+    enrich_recommendations_with_images(_parser(), recs, "skyrimse")
+    assert recs[0]["image_url"] == "https://img.example/skyui.png"
+    assert nexus.requests_seen == ["/v1/games/skyrimspecialedition/mods/search.json?name=SkyUI"]
+
+
+def test_popular_prefetch_runs_without_app_context(nexus, tmp_path):
+    db_path = str(tmp_path / "users.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE mod_compat_summaries (game TEXT, mod_name TEXT, total_reports INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO mod_compat_summaries VALUES (?, ?, ?)",
+        [("skyrimse", "SkyUI", 9), ("skyrimse", "Unknown Mod", 3), ("fallout4", "Other", 50)],
+    )
+    conn.commit()
+    conn.close()
+
+    assert prefetch_popular_mod_images("skyrimse", db_path=db_path) == 2
+    assert sorted(nexus.requests_seen) == [
+        "/v1/games/skyrimspecialedition/mods/search.json?name=SkyUI",
+        "/v1/games/skyrimspecialedition/mods/search.json?name=Unknown%20Mod",
+    ]
+    # Both are cached now, so a second run has nothing to look up.
+    assert prefetch_popular_mod_images("skyrimse", db_path=db_path) == 0
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = NexusRateLimiter(rate=20, burst=2)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # Two from the burst, then four at 20/s.
+    assert time.monotonic() - started >= 0.18
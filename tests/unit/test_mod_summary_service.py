@@ -0,0 +1,145 @@
+"""
+Tests for mod_summary_service.py — precomputed per-mod summaries and cached embeds.
+"""
+
+import sqlite3
+
+import pytest
+from flask import Flask, g
+
+import blueprints.mod_detail as mod_detail
+from compatibility_service import CompatibilityService
+from mod_summary_service import get_mod_summary
+
+SCHEMA = """
+CREATE TABLE compatibility_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mod_a TEXT NOT NULL, mod_b TEXT NOT NULL, game TEXT NOT NULL,
+    status TEXT NOT NULL, description TEXT, user_email TEXT NOT NULL,
+    upvotes INTEGER DEFAULT 0, downvotes INTEGER DEFAULT 0, verified INTEGER DEFAULT 0,
+    created_at REAL NOT NULL, updated_at REAL NOT NULL
+);
+CREATE TABLE compatibility_report_mods (
+    mod_name TEXT NOT NULL, game TEXT NOT NULL, report_id INTEGER NOT NULL,
+    created_at REAL NOT NULL, PRIMARY KEY (mod_name, game, report_id)
+);
+CREATE TABLE compatibility_votes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INTEGER NOT NULL, user_email TEXT NOT NULL, vote INTEGER NOT NULL,
+    voted_at REAL NOT NULL, UNIQUE(report_id, user_email)
+);
+CREATE TABLE mod_compat_summaries (
+    mod_name TEXT NOT NULL, game TEXT NOT NULL,
+    total_reports INTEGER NOT NULL DEFAULT 0, compatible INTEGER NOT NULL DEFAULT 0,
+    incompatible INTEGER NOT NULL DEFAULT 0, needs_patch INTEGER NOT NULL DEFAULT 0,
+    score REAL NOT NULL, related_mods_json TEXT NOT NULL DEFAULT '[]',
+    related_mods_count INTEGER NOT NULL DEFAULT 0, patches_json TEXT NOT NULL DEFAULT '[]',
+    updated_at REAL NOT NULL, PRIMARY KEY (mod_name, game)
+);
+"""
+
+
+@pytest.fixture
+def app(monkeypatch):
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.db = conn
+    app.renders = []
+
+    @app.before_request
+    def attach_db():
+        g.db = conn
+
+    def fake_render(template, **context):
+        app.renders.append(context)
+        return f"<div class='{context['theme']}'>{context['mod_name']} {context['score']}</div>"
+
+    monkeypatch.setattr(mod_detail, "render_template", fake_render)
+    app.register_blueprint(mod_detail.mod_detail_bp)
+
+    from cache_service import get_cache
+
+    get_cache().clear_pattern("mod_embed:*")
+    yield app
+    conn.close()
+
+
+def _service_call(app, method, *args):
+    with app.test_request_context():
+        g.db = app.db
+        return getattr(CompatibilityService(), method)(*args)
+
+
+def _submit(app, mod_a, mod_b, status="compatible", description=None):
+    return _service_call(
+        app,
+        "submit_compatibility_report",
+        mod_a,
+        mod_b,
+        "skyrimse",
+        status,
+        description or f"{mod_a} and {mod_b}",
+        "tester@example.com",
+    )
+
+
+def _summary(app, mod_name):
+    with app.test_request_context():
+        g.db = app.db
+        return get_mod_summary(mod_name, "skyrimse")
+
+
+def test_summary_refreshed_on_submit_and_vote(app):
+    _submit(app, "SkyUI.esp", "USSEP.esm")
+    report_id = _submit(
+        app, "Ordinator.esp", "SkyUI.esp", "needs_patch", "Needs the compatibility patch"
+    )
+    _submit(app, "Ordinator.esp", "Vokrii.esp", "incompatible")
+
+    summary = _summary(app, "SkyUI.esp")
+    assert (summary["total_reports"], summary["compatible"], summary["needs_patch"]) == (2, 1, 1)
+    assert summary["score"] == 75.0
+    assert sorted(summary["related_mods"]) == ["ordinator.esp", "ussep.esm"]
+    assert summary["patches"] == [
+        {"patch_mod": "ordinator.esp", "description": "Needs the compatibility patch"}
+    ]
+
+    assert _service_call(app, "vote_report", report_id, "voter@example.com", -1)
+    # The needs_patch report now carries zero weight.
+    assert _summary(app, "SkyUI.esp")["score"] == 100.0
+    assert _summary(app, "Vokrii.esp")["score"] == 0.0
+
+
+def test_unknown_mod_gets_default_score_without_writing(app):
+    summary = _summary(app, "Nothing.esp")
+    assert summary["total_reports"] == 0
+    assert summary["score"] == 75
+    assert app.db.execute("SELECT COUNT(*) FROM mod_compat_summaries").fetchone()[0] == 0
+
+    app.test_client().get("/mod/Made-Up.esp/embed?theme=dark")
+    assert app.db.execute("SELECT COUNT(*) FROM mod_compat_summaries").fetchone()[0] == 0
+
+
+def test_embed_cached_with_etag_and_invalidated(app):
+    _submit(app, "SkyUI.esp", "USSEP.esm")
+    client = app.test_client()
+
+    first = client.get("/mod/SkyUI.esp/embed?game=skyrimse&theme=light")
+    assert first.status_code == 200
+    assert "light" in first.get_data(as_text=True)
+    assert first.headers["Cache-Control"].startswith("public")
+    etag = first.headers["ETag"]
+
+    again = client.get("/mod/SkyUI.esp/embed?theme=light", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert len(app.renders) == 1
+
+    _submit(app, "SkyUI.esp", "Bad.esp", "incompatible")
+    changed = client.get("/mod/SkyUI.esp/embed?theme=light", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert app.renders[-1]["score"] == 50.0
@@ -0,0 +1,141 @@
+"""
+Tests for near_duplicates.py and MinHash-based knowledge compaction.
+"""
+
+import json
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from curation_service import COMPACTION_WATERMARK, run_information_compaction
+from models import (
+    Base,
+    KnowledgeSource,
+    RollupWatermark,
+    SourceCredibility,
+    TrashBinItem,
+    create_database_engine,
+)
+from near_duplicates import (
+    LSHIndex,
+    estimated_similarity,
+    jaccard,
+    knowledge_text,
+    minhash,
+    minhash_signature,
+    shingles,
+    signature_from_bytes,
+)
+
+POST = (
+    "Crash on startup after installing SkyUI",
+    "If the game crashes on startup after installing SkyUI, update SKSE to the latest "
+    "version and make sure the Address Library for SKSE Plugins is installed.",
+)
+REPOST = (
+    "Crash on start-up after installing SkyUI!",
+    "If the game crashes on startup after installing SkyUI: update SKSE to the latest "
+    "version, and make sure the Address Library for SKSE plugins is installed.",
+)
+OTHER = (
+    "Best ENB presets for Skyrim",
+    "A roundup of ENB presets ranked by performance and visual quality on mid-range GPUs.",
+)
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Hello, World!") == shingles("hello world")
+    assert shingles("abc") == {"abc"}
+    assert shingles("") == set()
+
+
+def test_signature_tracks_jaccard():
+    a, b, c = (shingles(knowledge_text(*text)) for text in (POST, REPOST, OTHER))
+    assert jaccard(a, b) >= 0.8
+    assert jaccard(a, c) < 0.2
+    sig_a, sig_b, sig_c = minhash(a), minhash(b), minhash(c)
+    assert estimated_similarity(sig_a, sig_b) == pytest.approx(jaccard(a, b), abs=0.2)
+    assert estimated_similarity(sig_a, sig_c) < 0.3
+
+
+def test_signature_round_trip():
+    data = minhash_signature(knowledge_text(*POST))
+    assert signature_from_bytes(data) == minhash(shingles(knowledge_text(*POST)))
+    assert signature_from_bytes(b"short") is None
+    assert signature_from_bytes(None) is None
+
+
+def test_lsh_candidates_are_scoped():
+    index = LSHIndex()
+    index.add(1, minhash(shingles(knowledge_text(*POST))), scope="skyrimse")
+    index.add(2, minhash(shingles(knowledge_text(*OTHER))), scope="skyrimse")
+    index.add(3, minhash(shingles(knowledge_text(*POST))), scope="fallout4")
+    assert index.query(minhash(shingles(knowledge_text(*REPOST))), scope="skyrimse") == [1]
+    with pytest.raises(ValueError):
+        LSHIndex(bands=20, rows=4)
+
+
+@pytest.fixture
+def session():
+    engine = create_database_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _add(session, n, text, game="skyrimse", score=0.5, signed=True):
+    credibility = SourceCredibility(
+        source_url=f"https://example.com/{n}", source_type="reddit", overall_score=score
+    )
+    session.add(credibility)
+    session.flush()
+    session.add(
+        KnowledgeSource(
+            id=n,
+            source_url=f"https://example.com/{n}",
+            title=text[0],
+            summary=text[1],
+            game=game,
+            credibility_id=credibility.id,
+            minhash=minhash_signature(knowledge_text(*text)) if signed else None,
+        )
+    )
+
+
+def _statuses(session):
+    session.expire_all()
+    return {s.id: s.status for s in session.query(KnowledgeSource).order_by(KnowledgeSource.id)}
+
+
+def test_compaction_archives_reworded_repost(session):
+    _add(session, 1, POST, score=0.4)
+    _add(session, 2, OTHER)
+    _add(session, 3, REPOST, score=0.9)
+    _add(session, 4, POST, game="fallout4")
+    session.commit()
+
+    result = run_information_compaction(session)
+    assert result["duplicates_removed"] == 1
+    assert result["space_saved_bytes"] == len(POST[1].encode("utf-8"))
+    # The more credible repost is kept; other games are never merged
+    assert _statuses(session) == {1: "archived", 2: "active", 3: "active", 4: "active"}
+    trash = session.query(TrashBinItem).one()
+    assert trash.item_id == 1
+    assert json.loads(trash.action_data)["kept_id"] == 3
+    assert session.get(RollupWatermark, COMPACTION_WATERMARK).last_id == 4
+
+
+def test_compaction_is_incremental_and_backfills_signatures(session):
+    _add(session, 1, POST, signed=False)
+    _add(session, 2, OTHER)
+    session.commit()
+    assert run_information_compaction(session)["duplicates_removed"] == 0
+    assert signature_from_bytes(session.get(KnowledgeSource, 1).minhash) is not None
+
+    # Old pairs are not revisited; the new repost is compared with everything
+    _add(session, 3, REPOST, score=0.1)
+    session.commit()
+    assert run_information_compaction(session)["duplicates_removed"] == 1
+    assert _statuses(session) == {1: "active", 2: "active", 3: "archived"}
+    assert run_information_compaction(session)["duplicates_removed"] == 0
@@ -0,0 +1,126 @@
+"""
+Tests for pattern_matcher.py and the mod-name heuristics built on it.
+"""
+
+import re
+
+import conflict_detector
+import system_impact
+from loot_parser import LOOTParser, ModInfo, neutral_messages, neutralize_message
+from mod_warnings import _check_script_heavy_mods
+from pattern_matcher import PatternMatcher
+
+NAMES = [
+    "ENB Light",
+    "JK's Skyrim",
+    "Beyond Skyrim - Bruma",
+    "Skyrim Flora Overhaul",
+    "4K 8K Textures",
+    "Realistic Water Two",
+    "Obsidian Weathers",
+    "Nemesis Unlimited Behavior Engine",
+    "HDT SMP Physics",
+    "SkyUI",
+    "Legacy of the Dragonborn 2K",
+    "CBBE 3BA Physics",
+    "Immersive Citizens - AI Overhaul",
+    "Grass Overhaul ENB",
+    "UNP High Poly Head",
+]
+
+
+def test_first_follows_list_order_not_position():
+    matcher = PatternMatcher([("_se.", "dot"), ("skyui_se", "name")], literal=True)
+    # "skyui_se" starts earlier in the text, but "_se." has priority.
+    assert matcher.first("skyui_se.esp") == "dot"
+    assert matcher.first("skyui_se") == "name"
+    assert matcher.first("skyui") is None
+
+
+def test_hits_and_matches():
+    matcher = PatternMatcher([(r"\b4k\b", "4k"), (r"\b8k\b", "8k"), (r"\benb\b", "enb")])
+    assert matcher.hits("4K and 8K textures") == ["4k", "8k"]
+    assert matcher.matches("ENB Series")
+    assert not matcher.matches("SkyUI")
+    assert PatternMatcher([]).first("anything") is None
+
+
+def test_heavy_matcher_matches_pattern_loop():
+    for name in NAMES:
+        name_lower = name.lower()
+        expected = next(
+            (
+                (category, impact, metrics)
+                for pattern, category, impact, metrics in system_impact._HEAVY_PATTERNS
+                if re.search(pattern, name_lower)
+            ),
+            None,
+        )
+        assert system_impact._HEAVY_MATCHER.first(name_lower) == expected, name
+
+
+def test_cross_game_matches_hint_loop():
+    games = {hint[0] for hint in conflict_detector._CROSS_GAME_HINTS} | {"starfield"}
+    names = [
+        "SkyUI_SE.esp",
+        "USSEP.esp",
+        "Special Edition Patch",
+        "Fallout 3 Fallout 4",
+        "USKP.esp",
+    ]
+    for game in games:
+        for name in names:
+            expected = next(
+                (
+                    (wrong, suggestion)
+                    for gid, pattern, wrong, suggestion in conflict_detector._CROSS_GAME_HINTS
+                    if gid == game and pattern in name.lower()
+                ),
+                None,
+            )
+            assert conflict_detector._check_cross_game(name, game) == expected, (game, name)
+
+
+def test_script_heavy_count():
+    mods = ["Ordinator", "Apocalypse Spells", "Wildcat Combat", "Sim Settlements", "AI Overhaul"]
+    assert len(_check_script_heavy_mods(mods)) == 1
+    assert _check_script_heavy_mods(mods[:4] + ["SkyUI"]) == []
+
+
+def test_messages_neutralized_at_parse_time(tmp_path):
+    parser = LOOTParser("skyrimse", cache_dir=str(tmp_path))
+    parser.masterlist_data = {
+        "plugins": [
+            {
+                "name": "Foo.esp",
+                "msg": [{"type": "warn", "content": "A patch is required for Bar."}],
+            }
+        ]
+    }
+    parser.parse_masterlist()
+    info = parser.mod_database["foo"]
+    assert info.neutral_messages == ["A patch may be required for Bar."]
+
+    parser.save_database()
+    reloaded = LOOTParser("skyrimse", cache_dir=str(tmp_path))
+    assert reloaded.load_database()
+    assert reloaded.mod_database["foo"].neutral_messages == info.neutral_messages
+
+
+def test_neutral_messages_for_hand_built_mod_info():
+    info = ModInfo(
+        name="Foo.esp",
+        clean_name="foo",
+        requirements=[],
+        incompatibilities=[],
+        load_after=[],
+        load_before=[],
+        patches=[],
+        dirty_edits=False,
+        messages=[
+            "You seem to be using Bar, but you have not enabled a compatibility patch for this mod."
+        ],
+        tags=[],
+    )
+    assert neutral_messages(info) == [neutralize_message(info.messages[0])]
+    assert info.neutral_messages[0].startswith("This may conflict if you have Bar,")
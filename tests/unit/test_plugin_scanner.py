@@ -0,0 +1,152 @@
+"""
+Tests for plugin_scanner.py using synthetic TES4-format plugins.
+"""
+
+import json
+import struct
+
+import pytest
+
+from exceptions import InvalidPluginError
+from plugin_scanner import (
+    build_report,
+    main,
+    parse_load_order,
+    report_to_conflicts,
+    scan_buffer,
+    scan_data_folder,
+    scan_plugin,
+    scan_plugins,
+)
+
+
+def _subrecord(sub_type, data):
+    return sub_type + struct.pack("<H", len(data)) + data
+
+
+def _record(rec_type, form_id, body=b"\0" * 12, flags=0):
+    return struct.pack("<4sIIIHHHH", rec_type, len(body), flags, form_id, 0, 0, 44, 0) + body
+
+
+def _grup(label, contents):
+    return struct.pack("<4sI4siHHHH", b"GRUP", 24 + len(contents), label, 0, 0, 0, 0, 0) + contents
+
+
+def make_plugin(masters=(), records=(), flags=0, version=1.71):
+    """Build a plugin: TES4 header, then one top-level GRUP per record type."""
+    header_data = _subrecord(b"HEDR", struct.pack("<fIi", version, len(records), 0x800))
+    header_data += _subrecord(b"CNAM", b"tester\0")
+    for master in masters:
+        header_data += _subrecord(b"MAST", master.encode() + b"\0")
+        header_data += _subrecord(b"DATA", b"\0" * 8)
+    plugin = _record(b"TES4", 0, header_data, flags)
+
+    by_type = {}
+    for rec_type, form_id in records:
+        by_type.setdefault(rec_type, b"")
+        by_type[rec_type] += _record(rec_type, form_id)
+    for rec_type, contents in by_type.items():
+        plugin += _grup(rec_type, contents)
+    return plugin
+
+
+@pytest.fixture
+def data_folder(tmp_path):
+    plugins = {
+        "Skyrim.esm": make_plugin(
+            records=[(b"WEAP", 0x00012EB7), (b"ARMO", 0x00012E49), (b"NPC_", 0x00013BBF)],
+            flags=0x1,
+        ),
+        # Both edit the same weapon and armor from Skyrim.esm; Balance doesn't know about Weapons.
+        "Weapons.esp": make_plugin(["Skyrim.esm"], [(b"WEAP", 0x00012EB7), (b"ARMO", 0x00012E49)]),
+        "Balance.esp": make_plugin(
+            ["Skyrim.esm"], [(b"WEAP", 0x00012EB7), (b"ARMO", 0x00012E49), (b"WEAP", 0x01000800)]
+        ),
+        # A patch listing both as masters also wins the weapon, intentionally.
+        "Patch.esp": make_plugin(
+            ["Skyrim.esm", "Weapons.esp", "Balance.esp"], [(b"WEAP", 0x00012EB7)], flags=0x200
+        ),
+    }
+    for name, data in plugins.items():
+        (tmp_path / name).write_bytes(data)
+    (tmp_path / "broken.esp").write_bytes(b"not a plugin")
+    return tmp_path
+
+
+def test_header_and_record_walk():
+    scan = scan_buffer(
+        make_plugin(["Skyrim.esm"], [(b"WEAP", 0x00000001), (b"WEAP", 0x01000801)], flags=0x201),
+        "Mod.esp",
+    )
+    assert scan.header.masters == ["Skyrim.esm"]
+    assert scan.header.is_master and scan.header.is_light
+    assert scan.header.version == 1.71
+    assert scan.header.declared_records == 2
+    assert scan.record_count == 2
+    assert scan.record_types == {"WEAP": 2}
+    # Only the record pointing at a master is an override.
+    assert list(scan.override_form_ids) == [0x00000001]
+
+
+def test_truncated_or_foreign_files_rejected():
+    plugin = make_plugin(["Skyrim.esm"], [(b"WEAP", 1)])
+    with pytest.raises(InvalidPluginError):
+        scan_buffer(plugin[:-4], "Cut.esp")
+    with pytest.raises(InvalidPluginError):
+        scan_buffer(b"BSA\0" + b"\0" * 40, "Archive.esp")
+
+
+def test_override_conflicts_skip_patches(data_folder):
+    order = ["Skyrim.esm", "Weapons.esp", "Balance.esp", "Patch.esp", "broken.esp"]
+    report = scan_data_folder(str(data_folder), load_order=order)
+
+    assert [p["name"] for p in report["plugins"]] == order[:4]
+    assert report["conflicts"] == [
+        {
+            "winner": "Balance.esp",
+            "loser": "Weapons.esp",
+            "count": 1,
+            "record_types": ["ARMO"],
+            "sample_form_ids": ["012E49"],
+        }
+    ]
+
+
+def test_parse_load_order_strips_enabled_marker():
+    lines = ["# comment", "*Skyrim.esm", "", "  *Weapons.esp ", "-Old.esp", "Balance.esp"]
+    assert parse_load_order(lines) == ["Skyrim.esm", "Weapons.esp", "Balance.esp"]
+
+
+def test_scan_plugin_uses_given_name(data_folder, tmp_path):
+    stored = tmp_path / "0.plugin"
+    stored.write_bytes((data_folder / "Weapons.esp").read_bytes())
+    assert scan_plugin(str(stored), "Weapons.esp").header.name == "Weapons.esp"
+
+
+def test_default_order_puts_masters_first(data_folder):
+    report = scan_data_folder(str(data_folder))
+    assert report["plugins"][0]["name"] == "Skyrim.esm"
+
+
+def test_process_pool_matches_serial(data_folder):
+    paths = [str(data_folder / n) for n in ("Skyrim.esm", "Weapons.esp", "Balance.esp")] * 12
+    serial = scan_plugins(paths, workers=1)
+    pooled = scan_plugins(paths, workers=2)
+    assert build_report(pooled) == build_report(serial)
+
+
+def test_report_feeds_analysis(data_folder, tmp_path):
+    load_order = tmp_path / "plugins.txt"
+    load_order.write_text("# comment\n*Skyrim.esm\n*Weapons.esp\n*Balance.esp\n*Patch.esp\n")
+    output = tmp_path / "report.json"
+    assert main([str(data_folder), "--load-order", str(load_order), "-o", str(output)]) == 0
+    report = json.loads(output.read_text())
+
+    conflicts = report_to_conflicts(report, ["Skyrim.esm", "Weapons.esp", "Balance.esp"])
+    assert len(conflicts) == 1
+    assert conflicts[0].type == "record_override"
+    assert conflicts[0].affected_mod == "Balance.esp"
+    assert conflicts[0].related_mod == "Weapons.esp"
+
+    assert report_to_conflicts(report, ["Skyrim.esm", "Balance.esp"]) == []
+    assert report_to_conflicts({"format": 99, "conflicts": report["conflicts"]}) == []
@@ -0,0 +1,196 @@
+"""
+Tests for batch reliability scoring and credibility re-weighting.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import reliability_weighter
+from curation_service import run_credibility_rescore
+from models import Base, SourceCredibility, create_database_engine
+from reliability_weighter import (
+    DIMENSIONS,
+    NUMPY_AVAILABLE,
+    ReliabilityScore,
+    ReliabilityWeighter,
+    combine_dimensions,
+)
+
+# Half a day off whole days, so scoring a moment apart can't change an age
+NOW = datetime.now()
+DAYS_AGO = [NOW - timedelta(days=days, hours=12) for days in (0, 3, 45, 400, 2000)]
+
+SOURCES = [
+    {
+        "url": "https://www.nexusmods.com/skyrimspecialedition/mods/266",
+        "type": "nexus_mods",
+        "endorsements": 125000,
+        "published_date": DAYS_AGO[3].isoformat(),
+        "updated_date": DAYS_AGO[1].isoformat(),
+        "author": "Arthmoor",
+        "author_endorsements": 50000,
+        "content": "Fixes hundreds of bugs. Requires 1.6.1170, see nexusmods.com",
+        "game_version": "skyrimse",
+    },
+    {
+        "url": "http://reddit.com/r/skyrimmods/comments/abc",
+        "type": "reddit_general",
+        "upvotes": 250,
+        "likes": 3,
+        "comments": 45,
+        "rating": 4.5,
+        "published_date": DAYS_AGO[2],
+        "title": "This AMAZING fix",
+        "content": "```ini\nbEnableFileSelection=1\n```",
+        "tags": ["code"],
+        "verified": True,
+        "game_version": "1.5.97",
+        "content_type": "technical_fix",
+    },
+    {
+        "url": "https://github.com/ianpatt/skse64",
+        "type": "github",
+        "published_date": DAYS_AGO[4].replace(tzinfo=timezone.utc).isoformat(),
+        "updated_date": "2026-01-02T03:04:05Z",
+        "content": None,
+        "has_images": True,
+        "content_type": "guide_tutorial",
+    },
+    {"url": "ftp://random-forum.com/thread", "type": "Forum_General", "published_date": "bad"},
+    {"type": None, "url": None, "author": None, "endorsements": None, "comments": 7},
+    {"published_date": DAYS_AGO[0], "content_type": "news_announcement", "author": "xMEH321x"},
+    {},
+]
+
+
+def _columns(sources):
+    names = sorted({name for source in sources for name in source})
+    return {name: [source.get(name) for source in sources] for name in names}
+
+
+def _assert_matches_single(batch, sources):
+    weighter = ReliabilityWeighter()
+    assert len(batch) == len(sources)
+    for i, source in enumerate(sources):
+        single = weighter.score_source(source)
+        for name in DIMENSIONS + ("overall_score", "confidence"):
+            assert float(getattr(batch, name)[i]) == getattr(single, name), (i, name)
+        assert batch.flags(i) == single.flags
+
+
+@pytest.mark.parametrize("use_numpy", [None, False])
+def test_batch_matches_single_item_scores(use_numpy):
+    batch = ReliabilityWeighter().score_batch(_columns(SOURCES), use_numpy=use_numpy)
+    _assert_matches_single(batch, SOURCES)
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy not installed")
+def test_numpy_batch_matches_single_item_scores_on_random_sources():
+    rng = random.Random(7)
+    sources = []
+    for _ in range(2000):
+        source = {
+            "url": rng.choice(["https://nexusmods.com/m", "http://bethesda.net/x", None]),
+            "type": rng.choice(["nexus_mods", "reddit_general", "github", "other"]),
+            "published_date": (NOW - timedelta(days=rng.randint(-5, 3000), hours=12)).isoformat(),
+            "content_type": rng.choice([None, "technical_fix", "guide_tutorial"]),
+            "content": rng.choice(["v1.2.3 on github.com", "plain", None]),
+            "author": rng.choice(["meh321", "someone", None]),
+        }
+        for name in ("endorsements", "upvotes", "comments", "author_posts", "author_karma"):
+            source[name] = rng.choice([0, None, rng.randint(1, 10**6), rng.random() * 100])
+        sources.append(source)
+
+    batch = ReliabilityWeighter().score_batch(_columns(sources))
+    assert type(batch.overall_score).__name__ == "ndarray"
+    _assert_matches_single(batch, sources)
+
+
+def test_score_sources_and_filter_use_the_batch():
+    weighter = ReliabilityWeighter()
+    scores = weighter.score_sources(SOURCES)
+    assert [s.to_dict() for s in scores] == [weighter.score_source(s).to_dict() for s in SOURCES]
+
+    filtered = weighter.filter_by_reliability([dict(s) for s in SOURCES], min_score=0.5)
+    passing = [
+        source.get("url")
+        for source, score in zip(SOURCES, scores)
+        if score.overall_score >= 0.5 and score.confidence >= 0.3
+    ]
+    assert passing and [s.get("url") for s in filtered] == passing
+    assert filtered[0]["reliability_score"] == scores[0].to_dict()
+
+
+def test_timezone_aware_dates_are_scored():
+    # GitHub timestamps end in Z; these used to raise comparing with datetime.now()
+    score = ReliabilityWeighter().score_source(SOURCES[2])
+    assert 0.0 < score.content_freshness < 1.0
+    assert score.last_updated.tzinfo is not None
+
+
+def test_batch_rejects_ragged_columns():
+    weighter = ReliabilityWeighter()
+    with pytest.raises(ValueError):
+        weighter.score_batch({"url": ["a", "b"], "endorsements": [1]})
+    assert len(weighter.score_batch({})) == 0
+    assert weighter.score_sources([]) == []
+
+
+def test_combine_dimensions_matches_compute():
+    dimensions = {name: [0.5, 0.9, 0.1, 0.73] for name in DIMENSIONS}
+    dimensions["content_freshness"] = [0.5, 0.2, 1.0, 0.5]
+    expected = [ReliabilityScore(*values).compute() for values in zip(*dimensions.values())]
+    for use_numpy in [None, False]:
+        overall, confidence = combine_dimensions(dimensions, use_numpy=use_numpy)
+        assert [float(x) for x in overall] == [s.overall_score for s in expected]
+        assert [float(x) for x in confidence] == [s.confidence for s in expected]
+
+
+@pytest.fixture
+def session():
+    engine = create_database_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def test_rescore_reweights_stored_scores(session, monkeypatch):
+    weighter = ReliabilityWeighter()
+    for source in SOURCES[:3]:
+        score = weighter.score_source(source)
+        session.add(
+            SourceCredibility(
+                source_url=source["url"],
+                source_type=source["type"],
+                overall_score=score.overall_score,
+                source_credibility=score.source_credibility,
+                content_freshness=score.content_freshness,
+                community_validation=score.community_validation,
+                technical_accuracy=score.technical_accuracy,
+                author_reputation=score.author_reputation,
+                confidence=score.confidence,
+                flags=json.dumps(score.flags) if score.flags else None,
+            )
+        )
+    session.commit()
+    assert run_credibility_rescore(session) == {"processed": 3, "updated": 0}
+
+    monkeypatch.setitem(reliability_weighter.DIMENSION_WEIGHTS, "source_credibility", 0.6)
+    monkeypatch.setitem(reliability_weighter.DIMENSION_WEIGHTS, "technical_accuracy", 0.5)
+    assert run_credibility_rescore(session) == {"processed": 3, "updated": 3}
+
+    session.expire_all()
+    for source in SOURCES[:3]:
+        stored = session.query(SourceCredibility).filter_by(source_url=source["url"]).one()
+        expected = weighter.score_source(source)
+        assert stored.overall_score == expected.overall_score
+        assert json.loads(stored.flags or "[]") == expected.flags
+    assert "highly_reliable" in json.loads(
+        session.query(SourceCredibility).filter_by(source_url=SOURCES[0]["url"]).one().flags
+    )
+    assert run_credibility_rescore(session)["updated"] == 0
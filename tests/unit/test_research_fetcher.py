@@ -0,0 +1,225 @@
+"""
+Tests for research_fetcher.py and the research pipeline scrapers, against a local stub API.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import research_pipeline
+from cache_service import get_cache
+from models import Base, KnowledgeSource, SourceCredibility, create_database_engine
+from reliability_weighter import get_reliability_weighter
+from research_fetcher import HostRateLimiter, ResearchFetcher, _seconds_until
+
+MODS = {
+    101: {"name": "SkyUI", "summary": "Menu overhaul", "description": "Requires SKSE"},
+    102: {"name": "Known Mod", "summary": "Already ingested"},
+    103: {"name": "Cutting Room Floor", "summary": "Restores cut content"},
+}
+
+
+class FakeApi(BaseHTTPRequestHandler):
+    requests_seen: list = []
+    delay = 0.0
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(cls.delay)
+            self._route()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def _route(self):
+        path = self.path.split("?")[0]
+        if path.startswith("/slow/"):
+            return self._send(200, {"path": path})
+        if path == "/v1/games/skyrimspecialedition/mods/updated.json":
+            etag = '"updated-v1"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            mods = [{"id": mod_id} for mod_id in MODS]
+            return self._send(200, {"mods": mods}, {"ETag": etag, "X-RL-Hourly-Remaining": "99"})
+        if path.endswith("/mods/updated.json"):
+            return self._send(200, {"mods": []})
+        if path.startswith("/v1/games/skyrimspecialedition/mods/"):
+            mod_id = int(path.rsplit("/", 1)[1].split(".")[0])
+            details = {"created_time": 1700000000, "endorsement_count": 50, **MODS[mod_id]}
+            return self._send(200, details)
+        return self._send(404, {"error": "not found"})
+
+
+@pytest.fixture
+def server():
+    FakeApi.requests_seen = []
+    FakeApi.delay = 0.0
+    FakeApi.active = FakeApi.max_active = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeApi)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    get_cache().clear_pattern("research_fetch:*")
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fetcher(server):
+    # The stub host gets a generous bucket; rate limiting is tested on its own
+    return ResearchFetcher(max_workers=3, host_rates={server.split("//")[1]: (1000.0, 100)})
+
+
+@pytest.fixture
+def session():
+    engine = create_database_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def test_seconds_until_reads_delays_and_epochs():
+    assert _seconds_until("30") == 30
+    assert _seconds_until(str(time.time() + 120)) == pytest.approx(120, abs=2)
+    assert _seconds_until("2000-01-01T00:00:00Z") == 0
+    assert _seconds_until("garbage") is None
+    assert _seconds_until(None) is None
+
+
+def test_limiter_pauses_on_exhausted_quota_and_retry_after():
+    limiter = HostRateLimiter(rate=100, burst=10)
+    limiter.observe(200, {"X-RL-Hourly-Remaining": "5", "X-RL-Hourly-Reset": "60"})
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started < 0.05
+
+    limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0.3"})
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.25
+
+    limiter.observe(429, {"Retry-After": "0.2"})
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.15
+
+
+def test_token_bucket_spaces_requests():
+    limiter = HostRateLimiter(rate=20, burst=1)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.14
+
+
+def test_conditional_request_serves_304_from_cache(server, fetcher):
+    url = f"{server}/v1/games/skyrimspecialedition/mods/updated.json"
+    first = fetcher.get(url, {"period": "1w"})
+    assert first.ok and not first.cached
+    assert len(first.data["mods"]) == 3
+
+    second = fetcher.get(url, {"period": "1w"})
+    assert second.status == 304 and second.cached
+    assert second.data == first.data
+    assert FakeApi.requests_seen[-1][1] == '"updated-v1"'
+
+    missing = fetcher.get(f"{server}/nope")
+    assert not missing.ok and missing.status == 404
+
+
+def test_get_many_is_concurrent_but_bounded(server, fetcher):
+    FakeApi.delay = 0.2
+    urls = [(f"{server}/slow/{i}", None) for i in range(6)]
+    started = time.monotonic()
+    results = fetcher.get_many(urls)
+    elapsed = time.monotonic() - started
+
+    assert [r.data["path"] for r in results] == [f"/slow/{i}" for i in range(6)]
+    assert FakeApi.max_active == 3
+    assert 0.35 < elapsed < 1.0
+
+    # Unknown hosts fall back to the default bucket (2/s, burst 4)
+    FakeApi.delay = 0.0
+    started = time.monotonic()
+    ResearchFetcher(max_workers=3).get_many(urls)
+    assert time.monotonic() - started >= 0.9
+
+
+def test_scrape_nexus_skips_known_mods_and_inserts_in_bulk(server, fetcher, session, monkeypatch):
+    monkeypatch.setenv("NEXUS_API_KEY", "test-key")
+    monkeypatch.setattr(research_pipeline, "NEXUS_API_URL", f"{server}/v1")
+    session.add(
+        KnowledgeSource(
+            source_url=research_pipeline.nexus_mod_url("skyrimspecialedition", 102),
+            title="Known Mod",
+            game="skyrimse",
+        )
+    )
+    session.commit()
+
+    result = research_pipeline.scrape_nexus_mods(session, fetcher)
+    # skyrimse and skyrimvr share a Nexus domain: both list the mods
+    assert result == {"mods_found": 6, "added": 2, "errors": 0}
+    detail_paths = [path for path, _ in FakeApi.requests_seen if "/mods/1" in path]
+    # Each new mod is fetched once; the known mod is never fetched
+    assert sorted(detail_paths) == [
+        "/v1/games/skyrimspecialedition/mods/101.json",
+        "/v1/games/skyrimspecialedition/mods/103.json",
+    ]
+
+    skyui = session.query(KnowledgeSource).filter_by(title="SkyUI").one()
+    assert json.loads(skyui.requires) == ["SKSE"]
+    assert skyui.credibility.source_type == "nexus_mods"
+    assert session.query(KnowledgeSource).count() == 3
+
+    # Second run revalidates the listing and finds nothing new
+    assert research_pipeline.scrape_nexus_mods(session, fetcher)["added"] == 0
+    assert session.query(SourceCredibility).count() == 2
+
+
+def test_add_knowledge_sources_dedupes_batch_and_known(session):
+    score = get_reliability_weighter().score_source({"url": "https://github.com/a/b"})
+    entries = [
+        ({"source_url": "https://github.com/a/b", "title": "b"}, score),
+        ({"source_url": "https://github.com/a/b", "title": "b again"}, score),
+        ({"source_url": "https://github.com/a/c", "title": "c"}, score),
+    ]
+    known = {"https://github.com/a/c"}
+    assert research_pipeline.add_knowledge_sources(session, entries, known) == 1
+    assert known == {"https://github.com/a/b", "https://github.com/a/c"}
+    session.commit()
+
+    assert not research_pipeline.add_knowledge_source(session, *entries[0])
+    assert research_pipeline.add_knowledge_source(session, *entries[2])
+    session.commit()
+    assert research_pipeline.load_known_urls(session) == {
+        "https://github.com/a/b",
+        "https://github.com/a/c",
+    }
@@ -0,0 +1,82 @@
+"""
+Tests for result_consolidator.py — single-pass conflict assembly.
+"""
+
+from conflict_detector import _XEDIT_DOCS
+from loot_parser import ModConflict
+from result_consolidator import ConflictAssembler, ResultConsolidator, consolidate_conflicts
+
+
+def _conflicts():
+    errors = [
+        ModConflict("incompatible", "error", "A <b>breaks</b> B", "A.esp", related_mod="B.esp"),
+    ]
+    warnings = [
+        ModConflict("dirty_edits", "warning", "Clean A", "A.esp", suggested_action="Use <xEdit>"),
+        ModConflict("load_order_violation", "warning", "Move C", "C.esp", related_mod="A.esp"),
+    ]
+    info = [ModConflict("info", "info", f"Note {i}", "C.esp") for i in range(3)]
+    return errors, warnings, info
+
+
+def _assemble():
+    errors, warnings, info = _conflicts()
+    assembler = ConflictAssembler("skyrimspecialedition")
+    assembler.add_all(errors, "error")
+    assembler.add_all(warnings, "warning")
+    assembler.add_all(info, "info")
+    return assembler
+
+
+def test_api_dicts_escaped_and_linked():
+    assembler = _assemble()
+    error = assembler.by_severity["error"][0]
+    assert error["message"] == "A &lt;b&gt;breaks&lt;/b&gt; B"
+    assert "occurrence_count" not in error
+
+    warning, load_order = assembler.by_severity["warning"]
+    assert warning["suggested_action"] == "Use &lt;xEdit&gt;"
+    urls = [link["url"] for link in warning["links"]]
+    assert urls[0] == "https://www.nexusmods.com/games/skyrimspecialedition/mods?keyword=A.esp"
+    assert _XEDIT_DOCS in urls
+    assert len(urls) == len(set(urls))
+    assert [link["title"] for link in load_order["links"]][:3] == [
+        "Nexus: C.esp",
+        "Nexus: A.esp",
+        "LOOT",
+    ]
+
+
+def test_occurrence_counts_and_memoized_links():
+    _, _, info = _conflicts()
+    assembler = ConflictAssembler("skyrimspecialedition", occurrence_counts={id(info[1]): 4})
+    assembler.add_all(info, "info")
+    assert [d.get("occurrence_count") for d in assembler.by_severity["info"]] == [None, 4, None]
+
+    first, second, _ = assembler.by_severity["info"]
+    assert first["links"] == second["links"]
+    assert first["links"] is not second["links"]
+    assert len(assembler._links) == 1
+
+
+def test_flat_list_and_consolidated_view_match_two_pass_result():
+    assembler = _assemble()
+    assert [d["severity"] for d in assembler.flat] == [
+        "critical",
+        "warning",
+        "warning",
+        "info",
+        "info",
+        "info",
+    ]
+    assert assembler.flat[0]["message"] == "A <b>breaks</b> B"
+    assert assembler.consolidated().to_dict() == consolidate_conflicts(assembler.flat).to_dict()
+
+
+def test_empty_assembly():
+    assembler = ConflictAssembler("skyrimspecialedition")
+    assert (
+        assembler.consolidated().to_dict()
+        == ResultConsolidator().consolidate_conflicts([]).to_dict()
+    )
+    assert assembler.by_severity == {"error": [], "warning": [], "info": []}
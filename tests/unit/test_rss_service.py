@@ -0,0 +1,101 @@
+"""
+Tests for rss_service.py — cached feeds, conditional GETs and invalidation.
+"""
+
+import sqlite3
+
+import pytest
+from flask import Flask, g
+
+from compatibility_service import CompatibilityService
+from rss_service import create_rss_routes
+
+SCHEMA = """
+CREATE TABLE compatibility_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mod_a TEXT NOT NULL, mod_b TEXT NOT NULL, game TEXT NOT NULL,
+    status TEXT NOT NULL, description TEXT, user_email TEXT NOT NULL,
+    upvotes INTEGER DEFAULT 0, downvotes INTEGER DEFAULT 0, verified INTEGER DEFAULT 0,
+    created_at REAL NOT NULL, updated_at REAL NOT NULL
+);
+CREATE TABLE compatibility_report_mods (
+    mod_name TEXT NOT NULL, game TEXT NOT NULL, report_id INTEGER NOT NULL,
+    created_at REAL NOT NULL, PRIMARY KEY (mod_name, game, report_id)
+);
+"""
+
+
+@pytest.fixture
+def client():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+
+    @app.before_request
+    def attach_db():
+        g.db = conn
+
+    create_rss_routes(app)
+
+    from cache_service import get_cache
+
+    get_cache().clear_pattern("rss:*")
+
+    with app.test_client() as test_client:
+        test_client.submit = lambda *args: _submit(app, conn, *args)
+        yield test_client
+    conn.close()
+
+
+def _submit(app, conn, mod_a, mod_b, status="compatible"):
+    with app.test_request_context():
+        g.db = conn
+        return CompatibilityService().submit_compatibility_report(
+            mod_a, mod_b, "skyrimse", status, f"{mod_a} and {mod_b}", "tester@example.com"
+        )
+
+
+def test_mod_feed_uses_index_and_sets_validators(client):
+    client.submit("SkyUI.esp", "USSEP.esm")
+    client.submit("Ordinator.esp", "SkyUI.esp", "needs_patch")
+    client.submit("Ordinator.esp", "Vokrii.esp", "incompatible")
+
+    response = client.get("/feed/mod/SkyUI.esp.xml?game=skyrimse")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert body.count("<item>") == 2
+    assert "Vokrii" not in body
+    assert response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+
+
+def test_unchanged_feed_returns_304(client):
+    client.submit("SkyUI.esp", "USSEP.esm")
+    first = client.get("/feed/compatibility.xml")
+
+    again = client.get("/feed/compatibility.xml", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+
+    since = client.get(
+        "/feed/compatibility.xml",
+        headers={"If-Modified-Since": first.headers["Last-Modified"]},
+    )
+    assert since.status_code == 304
+
+
+def test_new_report_invalidates_feed(client):
+    client.submit("SkyUI.esp", "USSEP.esm")
+    first = client.get("/feed/mod/USSEP.esm.xml?game=skyrimse")
+
+    client.submit("USSEP.esm", "Ordinator.esp")
+    second = client.get(
+        "/feed/mod/USSEP.esm.xml?game=skyrimse",
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert second.status_code == 200
+    assert second.get_data(as_text=True).count("<item>") == 2
+    assert second.headers["ETag"] != first.headers["ETag"]
@@ -0,0 +1,151 @@
+"""
+Tests for semantic_clusters.py and the clustering/category discovery curation jobs.
+"""
+
+import math
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import curation_service
+from curation_service import run_category_discovery, run_semantic_clustering
+from models import Base, KnowledgeCluster, KnowledgeSource, create_database_engine
+from semantic_clusters import NUMPY_AVAILABLE, build_index, kmeans, tokenize, top_terms
+
+ENB = [
+    ("ENB preset for Cathedral Weathers", "Bright ENB preset tuned for Cathedral Weathers"),
+    ("Cathedral Weathers ENB", "Vibrant weathers ENB preset with bright lighting"),
+    ("Lighting ENB preset", "ENB preset for bright weathers and interior lighting"),
+]
+SKSE = [
+    ("SKSE crash fix", "Crash on startup fixed by updating SKSE and Address Library"),
+    ("Address Library crash", "Startup crash: install Address Library for SKSE plugins"),
+    ("SKSE plugin crash", "SKSE plugin crash on startup needs the latest Address Library"),
+]
+OTHER = ("Armor retexture", "Steel armor textures in 4K")
+
+
+def test_tokenize_drops_short_words_and_stopwords():
+    assert tokenize("The SKSE plugin is for AE and SE") == ["skse", "plugin"]
+
+
+def test_index_vectors_are_normalized_and_filtered():
+    index = build_index([" ".join(t) for t in ENB + SKSE + [OTHER]], use_numpy=False)
+    assert "enb" in index.terms and "skse" in index.terms
+    assert "steel" not in index.terms  # in one document only
+    for vector in index.vectors[:-1]:
+        assert math.isclose(math.sqrt(sum(w * w for w in vector.values())), 1.0)
+    assert top_terms(index, [0, 1, 2]) == ["enb", "weathers"]
+
+
+def test_kmeans_separates_topics():
+    index = build_index([" ".join(t) for t in ENB + SKSE + [OTHER]], use_numpy=False)
+    labels, similarity = kmeans(index, range(7), k=2)
+    assert len(set(labels[:3])) == 1 and len(set(labels[3:6])) == 1
+    assert labels[0] != labels[3]
+    assert min(similarity[:6]) > 0.5
+    assert similarity[6] == 0.0  # no shared terms with either topic
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy/SciPy not installed")
+def test_numpy_backend_matches_python():
+    texts = [" ".join(t) for t in ENB + SKSE + [OTHER]] * 3
+    fast = build_index(texts, use_numpy=True)
+    slow = build_index(texts, use_numpy=False)
+    assert fast.terms == slow.terms
+    seeds = [[0, 1], [3]]
+    fast_labels, fast_sim = kmeans(fast, range(len(texts)), seeds, k=3)
+    slow_labels, slow_sim = kmeans(slow, range(len(texts)), seeds, k=3)
+    assert fast_labels == slow_labels
+    assert fast_sim == pytest.approx(slow_sim)
+    assert top_terms(fast, [3, 4, 5]) == top_terms(slow, [3, 4, 5])
+
+
+@pytest.fixture
+def session():
+    engine = create_database_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _add(session, n, text, game="skyrimse", category="design", **fields):
+    session.add(
+        KnowledgeSource(
+            id=n,
+            source_url=f"https://example.com/{n}",
+            title=text[0],
+            summary=text[1],
+            game=game,
+            category=category,
+            **fields,
+        )
+    )
+
+
+def _clusters(session):
+    session.expire_all()
+    return {s.id: s.cluster_id for s in session.query(KnowledgeSource).order_by(KnowledgeSource.id)}
+
+
+def test_clustering_assigns_stable_cluster_ids(session):
+    for n, text in enumerate(ENB, start=1):
+        _add(session, n, text)
+    for n, text in enumerate(SKSE, start=4):
+        _add(session, n, text, category="utility")
+    _add(session, 7, OTHER)
+    _add(session, 8, ENB[0], game="fallout4")
+    _add(session, 9, ENB[1], game="fallout4", status="archived", cluster_id=99)
+    session.commit()
+
+    result = run_semantic_clustering(session)
+    assert result == {"processed": 8, "clusters_found": 2, "reassigned": 6}
+    ids = _clusters(session)
+    assert ids[1] == ids[2] == ids[3] and ids[4] == ids[5] == ids[6]
+    assert ids[1] != ids[4]
+    assert ids[7] is None and ids[8] is None and ids[9] is None
+
+    enb = session.get(KnowledgeCluster, ids[1])
+    assert (enb.game, enb.category, enb.label, enb.size) == (
+        "skyrimse",
+        "design",
+        "enb_weathers",
+        3,
+    )
+    assert session.get(KnowledgeCluster, ids[4]).category == "utility"
+
+    # Unchanged sources keep their clusters; nothing is rewritten
+    assert run_semantic_clustering(session)["reassigned"] == 0
+    assert _clusters(session) == ids
+
+    # A new member joins the existing cluster
+    _add(session, 10, ("ENB preset weathers", "Bright lighting ENB preset for weathers"))
+    session.commit()
+    assert run_semantic_clustering(session)["reassigned"] == 1
+    assert _clusters(session)[10] == ids[1]
+    assert session.get(KnowledgeCluster, ids[1]).size == 4
+
+
+def test_category_discovery_reads_clusters(session, monkeypatch):
+    monkeypatch.setattr(curation_service, "DISCOVERY_MIN_SIZE", 3)
+    for n, text in enumerate(ENB, start=1):
+        _add(session, n, text, subcategory="weather" if n == 1 else None)
+    for n, text in enumerate(SKSE, start=4):
+        _add(session, n, text, category="utility" if n < 6 else "fun")
+    session.commit()
+    assert run_category_discovery(session) == {"new_categories": 0, "recategorized": 0}
+
+    run_semantic_clustering(session)
+    assert run_category_discovery(session) == {"new_categories": 2, "recategorized": 4}
+    session.expire_all()
+    subcategories = {
+        s.id: s.subcategory for s in session.query(KnowledgeSource).order_by(KnowledgeSource.id)
+    }
+    assert subcategories[1] == "weather"
+    assert subcategories[2] == subcategories[3] == "enb_weathers"
+    # Only members in the cluster's own category are recategorized
+    assert subcategories[4] == subcategories[5] is not None
+    assert subcategories[6] is None
+
+    assert run_category_discovery(session) == {"new_categories": 0, "recategorized": 0}
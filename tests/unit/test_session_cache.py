@@ -0,0 +1,87 @@
+"""
+Tests for session_cache.py — cached sessions/user status and batched last_seen.
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+
+import session_cache
+from session_cache import (
+    LastSeenBatcher,
+    cache_session,
+    cache_user_status,
+    flush_last_seen,
+    get_cached_session,
+    get_cached_user_status,
+    invalidate_session,
+    invalidate_user_status,
+)
+
+
+def _sqlite_ts(seconds_ago):
+    when = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return when.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@pytest.fixture
+def batcher(monkeypatch):
+    batcher = LastSeenBatcher(interval=300, flush_interval=5)
+    monkeypatch.setattr(session_cache, "last_seen_batcher", batcher)
+    return batcher
+
+
+def test_last_seen_written_once_per_interval(batcher):
+    batcher.touch("recent", _sqlite_ts(60))
+    batcher.touch("stale", _sqlite_ts(600))
+    batcher.touch("stale", _sqlite_ts(600))
+    assert batcher.take_due() == ["stale"]
+
+    batcher.touch("stale", _sqlite_ts(600))  # just queued; not due again
+    batcher.touch("other", None)
+    assert batcher.take_due() == []  # flush interval not reached
+    assert batcher.take_due(force=True) == ["other"]
+
+
+def test_flush_batches_updates(batcher):
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE user_sessions (token TEXT PRIMARY KEY, last_seen TEXT)")
+    old = _sqlite_ts(3600)
+    db.executemany("INSERT INTO user_sessions VALUES (?, ?)", [("a", old), ("b", old), ("c", old)])
+    for token in ("a", "b", "c"):
+        batcher.touch(token, old)
+    invalidate_session("c")  # revoked sessions drop out of the queue
+
+    assert flush_last_seen(db) == 2
+    assert flush_last_seen(db, force=True) == 0
+    rows = dict(db.execute("SELECT token, last_seen FROM user_sessions"))
+    assert rows["a"] > old and rows["b"] > old and rows["c"] == old
+
+
+def test_session_cache_round_trip():
+    token = f"token-{time.time()}"
+    assert get_cached_session(token) is None
+    cached = cache_session(token, {"token": token, "user_email": "a@example.com", "expires_at": 1})
+    assert get_cached_session(token) == cached
+    invalidate_session(token)
+    assert get_cached_session(token) is None
+
+
+def test_user_status_memoized_per_request():
+    app = Flask(__name__)
+    email = f"user-{time.time()}@example.com"
+    with app.test_request_context():
+        cache_user_status(email, {"tier": "pro", "verified": True})
+        session_cache.get_cache().delete(session_cache._user_status_key(email))
+        # Still served from this request's memo
+        assert get_cached_user_status(email) == {"tier": "pro", "verified": True}
+        invalidate_user_status(email)
+        assert get_cached_user_status(email) is None
+
+    with app.test_request_context():
+        cache_user_status(email, {"tier": "free", "verified": False})
+    with app.test_request_context():
+        assert get_cached_user_status(email.upper()) == {"tier": "free", "verified": False}
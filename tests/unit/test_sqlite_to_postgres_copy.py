@@ -0,0 +1,47 @@
+"""
+Tests for the COPY writer in migrations/migrate_sqlite_to_postgres.py (no PostgreSQL needed).
+"""
+
+import csv
+import io
+
+from migrations.migrate_sqlite_to_postgres import _copy_batch, _copy_csv
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+        self.copied = None
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy_expert(self, sql, buf):
+        self.statements.append(sql)
+        self.copied = buf.read()
+
+
+def test_null_is_distinct_from_empty_string():
+    text = _copy_csv([[None, "", 1, "\\N"]])
+    assert text == '\\N,"",1,"\\N"\n'
+
+
+def test_values_round_trip_as_csv():
+    rows = [[True, 2.5, b"\x00\xff", 'Mod "1", x.esp', "line\nbreak"]]
+    text = _copy_csv(rows)
+    assert text.startswith('true,2.5,"\\x00ff",')
+    assert next(csv.reader(io.StringIO(text)))[3:] == ['Mod "1", x.esp', "line\nbreak"]
+
+
+def test_copy_batch_stages_and_skips_conflicts():
+    cursor = RecordingCursor()
+    _copy_batch(cursor, "user_activity", ["id", "event_data"], [[1, None], [2, ""]])
+
+    create, copy, insert = cursor.statements
+    assert create.startswith("CREATE TEMP TABLE _stage_user_activity (LIKE user_activity)")
+    assert "ON COMMIT DROP" in create
+    assert copy.startswith('COPY _stage_user_activity ("id", "event_data") FROM STDIN')
+    assert "NULL '\\N'" in copy
+    assert insert.startswith('INSERT INTO user_activity ("id", "event_data") SELECT')
+    assert insert.endswith("ON CONFLICT DO NOTHING")
+    assert cursor.copied == '1,\\N\n2,""\n'
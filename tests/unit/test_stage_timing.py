@@ -0,0 +1,106 @@
+"""
+Tests for stage_timing.py — per-request stage spans and Prometheus output.
+"""
+
+import pytest
+from flask import Flask, jsonify
+
+from logging_utils import RequestLoggingMiddleware
+from stage_timing import (
+    REQUEST_METRIC,
+    STAGE_METRIC,
+    StageMetrics,
+    StageTimer,
+    stage,
+    stage_metrics,
+    start_stage_timer,
+    timed_stage,
+)
+from transparency_service import AnalysisMetadata
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    stage_metrics.reset()
+    yield
+    stage_metrics.reset()
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    RequestLoggingMiddleware(app)
+
+    @timed_stage()
+    def enrich():
+        return 2
+
+    @app.route("/work")
+    def work():
+        timer = start_stage_timer("work")
+        with stage("parse"):
+            value = 1
+        value += enrich()
+        with stage("parse"):
+            value += 1
+        return jsonify({"value": value, "stages": sorted(timer.as_dict())})
+
+    @app.route("/plain")
+    def plain():
+        with stage("ignored"):
+            return jsonify({"ok": True})
+
+    return app.test_client()
+
+
+def test_request_stages_feed_histograms(client):
+    resp = client.get("/work")
+    assert resp.get_json() == {"value": 4, "stages": ["enrich", "parse"]}
+
+    snapshot = stage_metrics.snapshot()
+    parse_key = (STAGE_METRIC, (("endpoint", "work"), ("stage", "parse")))
+    assert snapshot[parse_key][2] == 1  # two parse blocks, one observation
+    assert (STAGE_METRIC, (("endpoint", "work"), ("stage", "enrich"))) in snapshot
+    assert (REQUEST_METRIC, (("endpoint", "work"), ("method", "GET"))) in snapshot
+
+
+def test_stage_is_noop_without_timer(client):
+    assert client.get("/plain").get_json() == {"ok": True}
+    assert all(metric == REQUEST_METRIC for metric, _ in stage_metrics.snapshot())
+
+    with stage("outside_request"):
+        pass  # no app context at all
+
+
+def test_timer_finishes_once():
+    metrics = StageMetrics()
+    timer = StageTimer("analyze")
+    timer.record("load", 0.2)
+    timer.record("load", 0.1)
+    assert timer.as_dict() == {"load": 300.0}
+    timer.finish(metrics)
+    timer.finish(metrics)
+    assert metrics.snapshot()[(STAGE_METRIC, (("endpoint", "analyze"), ("stage", "load")))][2] == 1
+
+
+def test_prometheus_exposition():
+    metrics = StageMetrics(buckets=(0.1, 1.0))
+    labels = {"endpoint": "analyze", "stage": "load"}
+    metrics.observe(STAGE_METRIC, labels, 0.05)
+    metrics.observe(STAGE_METRIC, labels, 0.5)
+    metrics.observe(STAGE_METRIC, labels, 3.0)
+
+    text = metrics.render_prometheus()
+    assert f"# TYPE {STAGE_METRIC} histogram" in text
+    prefix = f'{STAGE_METRIC}_bucket{{endpoint="analyze",stage="load",'
+    assert f'{prefix}le="0.1"}} 1' in text
+    assert f'{prefix}le="1.0"}} 2' in text
+    assert f'{prefix}le="+Inf"}} 3' in text
+    assert f'{STAGE_METRIC}_sum{{endpoint="analyze",stage="load"}} 3.550000' in text
+    assert f'{STAGE_METRIC}_count{{endpoint="analyze",stage="load"}} 3' in text
+
+
+def test_metadata_stages_opt_in():
+    metadata = AnalysisMetadata(stages={"load_masterlist": 12.5})
+    assert "stages_ms" not in metadata.to_dict()["timing"]
+    assert metadata.to_dict(include_stages=True)["timing"]["stages_ms"] == {"load_masterlist": 12.5}
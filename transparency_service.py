@@ -31,6 +31,9 @@ class AnalysisMetadata:
     # Performance metrics
     performance: dict[str, Any] = field(default_factory=dict)
 
+    # Per-stage durations in ms (see stage_timing); only shown to admins
+    stages: dict[str, float] = field(default_factory=dict)
+
     # Confidence score
     confidence: float = 0.0
 
@@ -38,9 +41,9 @@ class AnalysisMetadata:
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
-    def to_dict(self) -> dict[str, Any]:
+    def to_dict(self, include_stages: bool = False) -> dict[str, Any]:
         """Convert to dictionary for API response."""
-        return {
+        data = {
             "data_sources": self.data_sources,
             "filters": self.filters,
             "ai_involvement": self.ai_involvement,
@@ -52,6 +55,9 @@ class AnalysisMetadata:
                 "duration_ms": self.performance.get("duration_ms", 0),
             },
         }
+        if include_stages:
+            data["timing"]["stages_ms"] = self.stages
+        return data
 
 
 class TransparencyService:
@@ -81,7 +87,11 @@ class TransparencyService:
         return metadata
 
     def complete_analysis(
-        self, analysis_id: str, metadata: AnalysisMetadata, result: dict[str, Any]
+        self,
+        analysis_id: str,
+        metadata: AnalysisMetadata,
+        result: dict[str, Any],
+        stages: Optional[dict[str, float]] = None,
     ) -> AnalysisMetadata:
         """
         Complete analysis tracking.
@@ -90,6 +100,7 @@ class TransparencyService:
             analysis_id: Unique identifier
             metadata: AnalysisMetadata object
             result: Analysis result dictionary
+            stages: Stage durations in ms so far (StageTimer.as_dict())
 
         Returns:
             Updated AnalysisMetadata
@@ -99,6 +110,7 @@ class TransparencyService:
         duration_ms = (time.time() - start_time) * 1000
 
         metadata.completed_at = datetime.now()
+        metadata.stages = dict(stages or {})
         metadata.performance = {
             "duration_ms": round(duration_ms, 2),
             "items_analyzed": len(result.get("mod_list", [])),
@@ -306,10 +318,13 @@ def start_analysis(analysis_id: str) -> AnalysisMetadata:
 
 
 def complete_analysis(
-    analysis_id: str, metadata: AnalysisMetadata, result: dict[str, Any]
+    analysis_id: str,
+    metadata: AnalysisMetadata,
+    result: dict[str, Any],
+    stages: Optional[dict[str, float]] = None,
 ) -> AnalysisMetadata:
     """Complete analysis tracking."""
-    return get_transparency_service().complete_analysis(analysis_id, metadata, result)
+    return get_transparency_service().complete_analysis(analysis_id, metadata, result, stages)
 
 
 def create_transparency_panel(
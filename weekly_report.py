@@ -9,16 +9,28 @@ Generates weekly email to chris@skymodderai.com with:
 - Questions for Chris
 
 Run Mondays at 3 AM UTC via scheduler.
+
+Activity counts come from the daily rollups in activity_rollup.py rather than
+raw user_activity rows.
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from sqlalchemy import func
+
+from activity_rollup import get_event_count, get_rollup_metrics, refresh_activity_rollups
 from db import get_db_session
-from models import ConflictStat, KnowledgeSource, TrashBinItem, UserActivity, UserFeedback
+from models import (
+    ConflictStat,
+    KnowledgeSource,
+    SourceCredibility,
+    TrashBinItem,
+    UserFeedback,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +51,9 @@ def generate_weekly_report() -> dict[str, Any]:
     """
     logger.info("Generating weekly report...")
 
+    # Fold any events since the last scheduled rollup into the daily tables
+    refresh_activity_rollups()
+
     # Calculate period (last 7 days)
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=7)
@@ -92,13 +107,7 @@ def _gather_positive_metrics(start_date: datetime, end_date: datetime) -> list[s
             positives.append(f"Identified {conflicts_resolved} mod conflicts this week")
 
         # Check curation runs
-        curation_runs = (
-            session.query(UserActivity)
-            .filter(
-                UserActivity.event_type == "curation_run", UserActivity.created_at >= start_date
-            )
-            .count()
-        )
+        curation_runs = get_event_count("curation_run", start_date, end_date)
 
         if curation_runs > 0:
             positives.append(f"Automated curation ran {curation_runs} times")
@@ -158,14 +167,7 @@ def _gather_issues(start_date: datetime, end_date: datetime) -> list[str]:
 
     try:
         # Check for failed curation runs
-        failed_curations = (
-            session.query(UserActivity)
-            .filter(
-                UserActivity.event_type == "curation_run_failed",
-                UserActivity.created_at >= start_date,
-            )
-            .count()
-        )
+        failed_curations = get_event_count("curation_run_failed", start_date, end_date)
 
         if failed_curations > 0:
             issues.append(f"Curation pipeline failed {failed_curations} times")
@@ -279,13 +281,9 @@ def _generate_suggestions(start_date: datetime, end_date: datetime) -> list[str]
             )
 
         # Analyze search patterns
-        search_activities = (
-            session.query(UserActivity)
-            .filter(UserActivity.event_type == "search", UserActivity.created_at >= start_date)
-            .all()
-        )
+        search_count = get_event_count("search", start_date, end_date)
 
-        if len(search_activities) > 100:
+        if search_count > 100:
             suggestions.append("Consider adding search result pagination (high search volume)")
 
         # Check for version coverage gaps
@@ -309,13 +307,7 @@ def _generate_suggestions(start_date: datetime, end_date: datetime) -> list[str]
                     )
 
         # Check research pipeline efficiency
-        research_activities = (
-            session.query(UserActivity)
-            .filter(
-                UserActivity.event_type == "research_run", UserActivity.created_at >= start_date
-            )
-            .count()
-        )
+        research_activities = get_event_count("research_run", start_date, end_date)
 
         if research_activities > 0:
             suggestions.append("Increase research frequency for high-demand games")
@@ -444,26 +436,27 @@ def get_user_feedback_summary(start_date: datetime, end_date: datetime) -> dict[
     session = get_db_session()
 
     try:
-        feedback = (
-            session.query(UserFeedback)
-            .filter(UserFeedback.created_at >= start_date, UserFeedback.created_at < end_date)
+        period = (UserFeedback.created_at >= start_date, UserFeedback.created_at < end_date)
+
+        by_category = dict(
+            session.query(UserFeedback.category, func.count(UserFeedback.id))
+            .filter(*period)
+            .group_by(UserFeedback.category)
+            .all()
+        )
+        by_status = dict(
+            session.query(UserFeedback.status, func.count(UserFeedback.id))
+            .filter(*period)
+            .group_by(UserFeedback.status)
             .all()
         )
 
-        summary = {"total": len(feedback), "by_category": {}, "by_status": {}, "top_issues": []}
-
-        for item in feedback:
-            # Count by category
-            if item.category not in summary["by_category"]:
-                summary["by_category"][item.category] = 0
-            summary["by_category"][item.category] += 1
-
-            # Count by status
-            if item.status not in summary["by_status"]:
-                summary["by_status"][item.status] = 0
-            summary["by_status"][item.status] += 1
-
-        return summary
+        return {
+            "total": sum(by_category.values()),
+            "by_category": by_category,
+            "by_status": by_status,
+            "top_issues": [],
+        }
 
     except Exception as e:
         logger.debug(f"Error getting feedback summary: {e}")
@@ -471,31 +464,14 @@ def get_user_feedback_summary(start_date: datetime, end_date: datetime) -> dict[
 
 
 def get_activity_metrics(start_date: datetime, end_date: datetime) -> dict[str, Any]:
-    """Get activity metrics for the period."""
-    session = get_db_session()
+    """
+    Get activity metrics for the period.
 
+    Reads the daily rollups (day granularity), so unique_users is a
+    HyperLogLog estimate rather than an exact count.
+    """
     try:
-        activities = (
-            session.query(UserActivity)
-            .filter(UserActivity.created_at >= start_date, UserActivity.created_at < end_date)
-            .all()
-        )
-
-        metrics = {"total_events": len(activities), "by_type": {}, "unique_users": set()}
-
-        for activity in activities:
-            # Count by type
-            if activity.event_type not in metrics["by_type"]:
-                metrics["by_type"][activity.event_type] = 0
-            metrics["by_type"][activity.event_type] += 1
-
-            # Track unique users
-            if activity.user_email:
-                metrics["unique_users"].add(activity.user_email)
-
-        metrics["unique_users"] = len(metrics["unique_users"])
-
-        return metrics
+        return get_rollup_metrics(start_date, end_date)
 
     except Exception as e:
         logger.debug(f"Error getting activity metrics: {e}")